@@ -29,7 +29,7 @@ from __future__ import absolute_import
 
 __authors__ = ["T. Vincent", "H.Payno"]
 __license__ = "MIT"
-__date__ = "19/11/2018"
+__date__ = "19/10/2026"
 
 import numpy
 import logging
@@ -309,11 +309,13 @@ class Colormap(qt.QObject):
             Nx3 or Nx4 numpy array of RGB(A) colors,
             either uint8 or float in [0, 1].
             If 'name' is None, then this array is used as the colormap.
-    :param str normalization: Normalization: 'linear' (default) or 'log'
+    :param str normalization:
+        Normalization: 'linear' (default), 'log', 'gamma' or 'equalized'
     :param float vmin:
         Lower bound of the colormap or None for autoscale (default)
     :param float vmax:
         Upper bounds of the colormap or None for autoscale (default)
+    :param float gamma: Exponent used by the 'gamma' normalization
     """
 
     LINEAR = 'linear'
@@ -322,13 +324,23 @@ class Colormap(qt.QObject):
     LOGARITHM = 'log'
     """constant for logarithmic normalization"""
 
-    NORMALIZATIONS = (LINEAR, LOGARITHM)
+    GAMMA = 'gamma'
+    """constant for gamma correction normalization"""
+
+    EQUALIZED = 'equalized'
+    """constant for histogram equalization normalization"""
+
+    NORMALIZATIONS = (LINEAR, LOGARITHM, GAMMA, EQUALIZED)
     """Tuple of managed normalizations"""
 
+    DEFAULT_GAMMA = 2.
+    """Default exponent of the gamma normalization"""
+
     sigChanged = qt.Signal()
     """Signal emitted when the colormap has changed."""
 
-    def __init__(self, name=None, colors=None, normalization=LINEAR, vmin=None, vmax=None):
+    def __init__(self, name=None, colors=None, normalization=LINEAR, vmin=None, vmax=None,
+                 gamma=DEFAULT_GAMMA):
         qt.QObject.__init__(self)
         self._editable = True
 
@@ -365,6 +377,7 @@ class Colormap(qt.QObject):
         self._normalization = str(normalization)
         self._vmin = float(vmin) if vmin is not None else None
         self._vmax = float(vmax) if vmax is not None else None
+        self._gamma = self._checkGamma(gamma)
 
     def setFromColormap(self, other):
         """Set this colormap using information from the `other` colormap.
@@ -382,6 +395,8 @@ class Colormap(qt.QObject):
         else:
             self.setColormapLUT(other.getColormapLUT())
         self.setNormalization(other.getNormalization())
+        self.setGammaNormalizationParameter(
+            other.getGammaNormalizationParameter())
         self.setVRange(other.getVMin(), other.getVMax())
         self.blockSignals(old)
         self.sigChanged.emit()
@@ -467,7 +482,8 @@ class Colormap(qt.QObject):
         self.sigChanged.emit()
 
     def getNormalization(self):
-        """Return the normalization of the colormap ('log' or 'linear')
+        """Return the normalization of the colormap
+        ('linear', 'log', 'gamma' or 'equalized')
 
         :return: the normalization of the colormap
         :rtype: str
@@ -475,7 +491,7 @@ class Colormap(qt.QObject):
         return self._normalization
 
     def setNormalization(self, norm):
-        """Set the norm ('log', 'linear')
+        """Set the norm ('linear', 'log', 'gamma' or 'equalized')
 
         :param str norm: the norm to set
         """
@@ -484,6 +500,39 @@ class Colormap(qt.QObject):
         self._normalization = str(norm)
         self.sigChanged.emit()
 
+    @staticmethod
+    def _checkGamma(gamma):
+        """Returns the exponent of the 'gamma' normalization as a float
+
+        :param float gamma: The exponent to check
+        :raises ValueError: If gamma is not strictly positive
+        :rtype: float
+        """
+        gamma = float(gamma)
+        if not numpy.isfinite(gamma) or gamma <= 0.:
+            raise ValueError("Gamma must be strictly positive, got %s" % gamma)
+        return gamma
+
+    def getGammaNormalizationParameter(self):
+        """Return the exponent used by the 'gamma' normalization
+
+        :rtype: float
+        """
+        return self._gamma
+
+    def setGammaNormalizationParameter(self, gamma):
+        """Set the exponent used by the 'gamma' normalization
+
+        :param float gamma: The exponent, it MUST be strictly positive
+        """
+        if self.isEditable() is False:
+            raise NotEditableError('Colormap is not editable')
+        gamma = self._checkGamma(gamma)
+        if gamma == self._gamma:
+            return
+        self._gamma = gamma
+        self.sigChanged.emit()
+
     def isAutoscale(self):
         """Return True if both min and max are in autoscale mode"""
         return self._vmin is None and self._vmax is None
@@ -645,6 +694,8 @@ class Colormap(qt.QObject):
             return self.getVMax()
         elif item == 'colors':
             return self.getColormapLUT()
+        elif item == 'gamma':
+            return self.getGammaNormalizationParameter()
         else:
             raise KeyError(item)
 
@@ -661,7 +712,8 @@ class Colormap(qt.QObject):
             'vmin': self._vmin,
             'vmax': self._vmax,
             'autoscale': self.isAutoscale(),
-            'normalization': self._normalization
+            'normalization': self._normalization,
+            'gamma': self._gamma
         }
 
     def _setFromDict(self, dic):
@@ -680,6 +732,7 @@ class Colormap(qt.QObject):
                 colors = None
         vmin = dic['vmin'] if 'vmin' in dic else None
         vmax = dic['vmax'] if 'vmax' in dic else None
+        gamma = self._checkGamma(dic.get('gamma', Colormap.DEFAULT_GAMMA))
         if 'normalization' in dic:
             normalization = dic['normalization']
         else:
@@ -707,6 +760,7 @@ class Colormap(qt.QObject):
         self._vmax = vmax
         self._autoscale = True if (vmin is None and vmax is None) else False
         self._normalization = normalization
+        self._gamma = gamma
 
         self.sigChanged.emit()
 
@@ -725,7 +779,8 @@ class Colormap(qt.QObject):
                         colors=self.getColormapLUT(),
                         vmin=self._vmin,
                         vmax=self._vmax,
-                        normalization=self._normalization)
+                        normalization=self._normalization,
+                        gamma=self._gamma)
 
     def applyToData(self, data):
         """Apply the colormap to the data
@@ -734,7 +789,8 @@ class Colormap(qt.QObject):
         """
         vmin, vmax = self.getColormapRange(data)
         normalization = self.getNormalization()
-        return _cmap(data, self._colors, vmin, vmax, normalization)
+        return _cmap(data, self._colors, vmin, vmax, normalization,
+                     gamma=self._gamma)
 
     @staticmethod
     def getSupportedColormaps():
@@ -761,10 +817,10 @@ class Colormap(qt.QObject):
         return str(self._toDict())
 
     def _getDefaultMin(self):
-        return DEFAULT_MIN_LIN if self._normalization == Colormap.LINEAR else DEFAULT_MIN_LOG
+        return DEFAULT_MIN_LOG if self._normalization == Colormap.LOGARITHM else DEFAULT_MIN_LIN
 
     def _getDefaultMax(self):
-        return DEFAULT_MAX_LIN if self._normalization == Colormap.LINEAR else DEFAULT_MAX_LOG
+        return DEFAULT_MAX_LOG if self._normalization == Colormap.LOGARITHM else DEFAULT_MAX_LIN
 
     def __eq__(self, other):
         """Compare colormap values and not pointers"""
@@ -774,12 +830,13 @@ class Colormap(qt.QObject):
             return False
         return (self.getName() == other.getName() and
                 self.getNormalization() == other.getNormalization() and
+                self.getGammaNormalizationParameter() == other.getGammaNormalizationParameter() and
                 self.getVMin() == other.getVMin() and
                 self.getVMax() == other.getVMax() and
                 numpy.array_equal(self.getColormapLUT(), other.getColormapLUT())
                 )
 
-    _SERIAL_VERSION = 1
+    _SERIAL_VERSION = 2
 
     def restoreState(self, byteArray):
         """
@@ -799,7 +856,7 @@ class Colormap(qt.QObject):
             return False
 
         version = stream.readUInt32()
-        if version != self._SERIAL_VERSION:
+        if version not in (1, self._SERIAL_VERSION):
             _logger.warning("Serial version mismatch. Found %d." % version)
             return False
 
@@ -815,12 +872,17 @@ class Colormap(qt.QObject):
         else:
             vmax = None
         normalization = stream.readQString()
+        if version >= 2:
+            gamma = stream.readDouble()
+        else:
+            gamma = Colormap.DEFAULT_GAMMA
 
         # emit change event only once
         old = self.blockSignals(True)
         try:
             self.setName(name)
             self.setNormalization(normalization)
+            self.setGammaNormalizationParameter(gamma)
             self.setVRange(vmin, vmax)
         finally:
             self.blockSignals(old)
@@ -846,6 +908,7 @@ class Colormap(qt.QObject):
         if self.getVMax() is not None:
             stream.writeQVariant(self.getVMax())
         stream.writeQString(self.getNormalization())
+        stream.writeDouble(self.getGammaNormalizationParameter())
         return data
 
 
@@ -1003,7 +1003,7 @@ class ColormapDialog(qt.QDialog):
             self._maxValue.setEnabled(colormap.isEditable())
 
             axis = self._plot.getXAxis()
-            scale = axis.LINEAR if colormap.getNormalization() == Colormap.LINEAR else axis.LOGARITHMIC
+            scale = axis.LOGARITHMIC if colormap.getNormalization() == Colormap.LOGARITHM else axis.LINEAR
             axis.setScale(scale)
 
             self._ignoreColormapChange = False
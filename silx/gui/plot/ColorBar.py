@@ -613,6 +613,12 @@ class _ColorScale(qt.QWidget):
         elif colormap.getNormalization() == colors.Colormap.LOGARITHM:
             rpos = (numpy.log10(vmax) - numpy.log10(vmin)) * value + numpy.log10(vmin)
             return numpy.power(10., rpos)
+        elif colormap.getNormalization() == colors.Colormap.GAMMA:
+            gamma = colormap.getGammaNormalizationParameter()
+            return vmin + (vmax - vmin) * numpy.power(value, 1. / gamma)
+        elif colormap.getNormalization() == colors.Colormap.EQUALIZED:
+            # Data distribution is not known: approximate as linear
+            return vmin + (vmax - vmin) * value
         else:
             err = "normalization type (%s) is not managed by the _ColorScale Widget" % colormap['normalization']
             raise ValueError(err)
@@ -741,7 +747,9 @@ class _TickBar(qt.QWidget):
             self.subTicks = ()
         elif self._norm == colors.Colormap.LOGARITHM:
             self._computeTicksLog(nticks)
-        elif self._norm == colors.Colormap.LINEAR:
+        elif self._norm in (colors.Colormap.LINEAR,
+                            colors.Colormap.GAMMA,
+                            colors.Colormap.EQUALIZED):
             self._computeTicksLin(nticks)
         else:
             err = 'TickBar - Wrong normalization %s' % self._norm
@@ -798,7 +806,10 @@ class _TickBar(qt.QWidget):
     def _getRelativePosition(self, val):
         """Return the relative position of val according to min and max value
         """
-        if self._norm == colors.Colormap.LINEAR:
+        if self._norm in (colors.Colormap.LINEAR,
+                          colors.Colormap.GAMMA,
+                          colors.Colormap.EQUALIZED):
+            # Ticks of non-linear normalizations are laid out linearly
             return 1 - (val - self._vmin) / (self._vmax - self._vmin)
         elif self._norm == colors.Colormap.LOGARITHM:
             return 1 - (numpy.log10(val) - numpy.log10(self._vmin)) / (numpy.log10(self._vmax) - numpy.log10(self._vmin))
@@ -27,7 +27,7 @@
 
 __authors__ = ["V. Valls"]
 __license__ = "MIT"
-__date__ = "23/07/2018"
+__date__ = "19/10/2026"
 
 
 import logging
@@ -48,8 +48,9 @@ _logger = logging.getLogger(__name__)
 
 from silx.opencl import ocl
 if ocl is not None:
+    # Devices are only probed when the widget is created
     from silx.opencl import sift
-else:  # No OpenCL device or no pyopencl
+else:  # pyopencl not installed or disabled
     sift = None
 
 
@@ -204,7 +205,7 @@ class CompareImagesToolBar(qt.QToolBar):
         action.setCheckable(True)
         self.__autoAlignAction = action
         menu.addAction(action)
-        if sift is None:
+        if sift is None or not ocl:
             action.setEnabled(False)
             action.setToolTip("Sift module is not available")
         self.__alignmentGroup.addAction(action)
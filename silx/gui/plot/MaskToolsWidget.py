@@ -35,7 +35,7 @@ from __future__ import division
 
 __authors__ = ["T. Vincent", "P. Knobel"]
 __license__ = "MIT"
-__date__ = "29/08/2018"
+__date__ = "19/10/2026"
 
 
 import os
@@ -207,12 +207,10 @@ class ImageMask(BaseMask):
         :param vertices: Nx2 array of polygon corners as (row, col)
         :param bool mask: True to mask (default), False to unmask.
         """
-        fill = shapes.polygon_fill_mask(vertices, self._mask.shape)
         if mask:
-            self._mask[fill != 0] = level
+            shapes.fill_polygons(self._mask, [vertices], level)
         else:
-            self._mask[numpy.logical_and(fill != 0,
-                                         self._mask == level)] = 0
+            shapes.fill_polygons(self._mask, [vertices], 0, replace=level)
         self._notify()
 
     def updatePoints(self, level, rows, cols, mask=True):
@@ -247,8 +245,12 @@ class ImageMask(BaseMask):
         :param float radius: Radius of the disk in mask array unit
         :param bool mask: True to mask (default), False to unmask.
         """
-        rows, cols = shapes.circle_fill(crow, ccol, radius)
-        self.updatePoints(level, rows, cols, mask)
+        if mask:
+            shapes.fill_disks(self._mask, [(crow, ccol)], radius, level)
+        else:
+            shapes.fill_disks(self._mask, [(crow, ccol)], radius, 0,
+                              replace=level)
+        self._notify()
 
     def updateLine(self, level, row0, col0, row1, col1, width, mask=True):
         """Mask/Unmask a line of the given mask level.
@@ -261,8 +263,13 @@ class ImageMask(BaseMask):
         :param int width: Width of the line in mask array unit.
         :param bool mask: True to mask (default), False to unmask.
         """
-        rows, cols = shapes.draw_line(row0, col0, row1, col1, width)
-        self.updatePoints(level, rows, cols, mask)
+        if mask:
+            shapes.draw_lines(self._mask, [(row0, col0)], [(row1, col1)],
+                              width, level)
+        else:
+            shapes.draw_lines(self._mask, [(row0, col0)], [(row1, col1)],
+                              width, 0, replace=level)
+        self._notify()
 
 
 class MaskToolsWidget(BaseMaskToolsWidget):
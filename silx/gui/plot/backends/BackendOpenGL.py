@@ -1071,6 +1071,11 @@ class BackendOpenGL(BackendBase.BackendBase, glu.OpenGLWidget):
         if draggable:
             behaviors.add('draggable')
 
+        if (data.ndim == 2 and
+                colormap.getNormalization() not in ('linear', 'log')):
+            # Normalization not supported by the shader: convert to RGBA
+            data = colormap.applyToData(data)
+
         if data.ndim == 2:
             # Ensure array is contiguous and eventually convert its type
             if data.dtype in (numpy.float32, numpy.uint8, numpy.uint16):
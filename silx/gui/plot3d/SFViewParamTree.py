@@ -1439,7 +1439,7 @@ class NormalizationNode(ColormapBase):
     Item is a QComboBox.
     """
     editable = True
-    listValues = list(Colormap.NORMALIZATIONS)
+    listValues = [Colormap.LINEAR, Colormap.LOGARITHM]
 
     def getEditor(self, parent, option, index):
         editor = qt.QComboBox(parent)
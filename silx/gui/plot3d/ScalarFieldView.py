@@ -32,7 +32,7 @@ from __future__ import absolute_import
 
 __authors__ = ["T. Vincent"]
 __license__ = "MIT"
-__date__ = "14/06/2018"
+__date__ = "19/10/2026"
 
 import re
 import logging
@@ -45,7 +45,7 @@ from silx.gui import qt, icons
 from silx.gui.colors import rgba
 from silx.gui.colors import Colormap
 
-from silx.math.marchingcubes import MarchingCubes
+from silx.math.marchingcubes import marching_cubes_slabs
 from silx.math.combo import min_max
 
 from .scene import axes, cutplane, interaction, primitives, transform
@@ -209,7 +209,7 @@ class Isosurface(qt.QObject):
                 return
 
             st = time.time()
-            vertices, normals, indices = MarchingCubes(
+            vertices, normals, indices = marching_cubes_slabs(
                 self._data,
                 isolevel=self._level)
             _logger.info('Computed iso-surface in %f s.', time.time() - st)
@@ -699,7 +699,12 @@ class CutPlane(qt.QObject):
 
         sceneCMap.colormap = colormap.getNColors()
 
-        sceneCMap.norm = colormap.getNormalization()
+        norm = colormap.getNormalization()
+        if norm not in sceneCMap.NORMS:
+            _logger.warning(
+                'Unsupported normalization %s, using linear instead', norm)
+            norm = 'linear'
+        sceneCMap.norm = norm
         range_ = colormap.getColormapRange(data=self._dataRange)
         sceneCMap.range_ = range_
 
@@ -765,7 +765,8 @@ class ColormapRow(_ColormapBaseProxyRow):
             notify=self._sigColormapChanged,
             editorHint=list(self._colormapsMapping.keys())))
 
-        norms = [norm.title() for norm in self._colormap.NORMALIZATIONS]
+        norms = [norm.title() for norm in (self._colormap.LINEAR,
+                                           self._colormap.LOGARITHM)]
         self.addRow(ProxyRow(
             name='Normalization',
             fget=self._getNormalization,
@@ -163,7 +163,10 @@ class ColormapMixIn(_ColormapMixIn):
             colormap = self.getColormap()
 
             self.__sceneColormap.colormap = colormap.getNColors()
-            self.__sceneColormap.norm = colormap.getNormalization()
+            norm = colormap.getNormalization()
+            if norm not in self.__sceneColormap.NORMS:
+                norm = 'linear'  # Fallback for unsupported normalizations
+            self.__sceneColormap.norm = norm
             range_ = colormap.getColormapRange(data=self._dataRange)
             self.__sceneColormap.range_ = range_
 
@@ -29,14 +29,14 @@ from __future__ import absolute_import
 
 __authors__ = ["T. Vincent"]
 __license__ = "MIT"
-__date__ = "24/04/2018"
+__date__ = "19/10/2026"
 
 import logging
 import time
 import numpy
 
 from silx.math.combo import min_max
-from silx.math.marchingcubes import MarchingCubes
+from silx.math.marchingcubes import MarchingCubes, marching_cubes_slabs
 
 from ... import qt
 from ...colors import rgba
@@ -290,7 +290,7 @@ class Isosurface(Item3D):
                 return
 
             st = time.time()
-            vertices, normals, indices = MarchingCubes(
+            vertices, normals, indices = marching_cubes_slabs(
                 data,
                 isolevel=self._level)
             _logger.info('Computed iso-surface in %f s.', time.time() - st)
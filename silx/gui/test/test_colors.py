@@ -29,7 +29,7 @@ from __future__ import absolute_import
 
 __authors__ = ["H.Payno"]
 __license__ = "MIT"
-__date__ = "09/11/2018"
+__date__ = "19/10/2026"
 
 import unittest
 import numpy
@@ -321,7 +321,7 @@ class TestObjectAPI(ParametricTestCase):
             numpy.array((-numpy.inf, numpy.inf, 1.0, 2.0)),  # Some infinite
         ]
 
-        for normalization in ('linear', 'log'):
+        for normalization in Colormap.NORMALIZATIONS:
             colormap = Colormap(name='gray',
                                 normalization=normalization,
                                 vmin=None,
@@ -334,6 +334,35 @@ class TestObjectAPI(ParametricTestCase):
                     self.assertEqual(image.shape[-1], 4)
                     self.assertEqual(image.shape[:-1], data.shape)
 
+    def testGammaNormalizationParameter(self):
+        """Test gamma normalization parameter getter/setter"""
+        colormap = Colormap(name='gray', normalization=Colormap.GAMMA,
+                            vmin=0, vmax=100, gamma=0.5)
+        self.assertEqual(colormap.getGammaNormalizationParameter(), 0.5)
+        self.assertEqual(colormap.copy(), colormap)
+
+        colormap.setGammaNormalizationParameter(2.)
+        self.assertEqual(colormap['gamma'], 2.)
+        image = colormap.applyToData(numpy.array((0., 50., 100.)))
+        self.assertEqual(image[1, 0], 64)
+
+        with self.assertRaises(ValueError):
+            colormap.setGammaNormalizationParameter(0.)
+
+        other = Colormap()
+        other._setFromDict(colormap._toDict())
+        self.assertEqual(other, colormap)
+
+        for gamma in (0., -1., float('inf'), float('nan')):
+            with self.subTest(gamma=gamma):
+                with self.assertRaises(ValueError):
+                    Colormap(normalization=Colormap.GAMMA, gamma=gamma)
+                state = colormap._toDict()
+                state['gamma'] = gamma
+                with self.assertRaises(ValueError):
+                    other._setFromDict(state)
+        self.assertEqual(other.getGammaNormalizationParameter(), 2.)
+
     def testGetNColors(self):
         """Test getNColors method"""
         # specific LUT
@@ -1,6 +1,6 @@
 # coding: utf-8
 # /*##########################################################################
-# Copyright (C) 2017 European Synchrotron Radiation Facility
+# Copyright (C) 2017-2026 European Synchrotron Radiation Facility
 #
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the "Software"), to deal
@@ -22,4 +22,45 @@
 #
 # ############################################################################*/
 
-from silx.opencl.backprojection import *
+"""(Filtered) backprojection.
+
+:class:`Backprojection` is the OpenCL implementation from
+:mod:`silx.opencl.backprojection` if an OpenCL device is available,
+and the CPU implementation from :mod:`silx.image.radon` otherwise.
+
+The implementation is selected when an instance is created, so that
+importing this module does not probe OpenCL devices.
+"""
+
+from silx.opencl import common as _common
+
+
+def _backend():
+    """Returns the module providing the implementation.
+
+    OpenCL devices are probed on the first call.
+    """
+    if _common.ocl:
+        from silx.opencl import backprojection
+        return backprojection
+    from silx.image import radon
+    return radon
+
+
+class Backprojection(object):
+    """(Filtered) backprojection of sinograms.
+
+    Creating an instance returns a
+    :class:`silx.opencl.backprojection.Backprojection` if an OpenCL device
+    is available and a :class:`silx.image.radon.Backprojection` otherwise,
+    see those classes for the parameters.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        return _backend().Backprojection(*args, **kwargs)
+
+
+def fourier_filter(sino, filter_=None, fft_size=None):
+    """Filter a sinogram or a stack of sinograms in the Fourier domain,
+    see :func:`silx.image.radon.fourier_filter`"""
+    return _backend().fourier_filter(sino, filter_=filter_, fft_size=fft_size)
@@ -25,11 +25,12 @@
 
 __authors__ = ["J. Kieffer"]
 __license__ = "MIT"
-__date__ = "15/09/2016"
+__date__ = "19/10/2026"
 __doc__ = "Bilinear interpolator, peak finder, line-profile for images"
 
 import cython
 from cython.view cimport array as cvarray
+from cython.parallel import prange
 import numpy
 from libc.math cimport floor, ceil, sin, cos, sqrt, atan2
 import logging
@@ -47,6 +48,8 @@ cdef class BilinearImage:
     cpdef size_t coarse_local_maxi(self, size_t)
     cdef size_t c_local_maxi(self, size_t) nogil
     cdef float c_funct(self, float, float) nogil
+    cdef void c_profile_line(self, float, float, float, float, int,
+                             int, bint, float *) nogil
 
     def __cinit__(self, data not None):
         """Constructor
@@ -247,25 +250,92 @@ cdef class BilinearImage:
         return self.width * current0 + current1
 
     @cython.boundscheck(False)
-    def map_coordinates(self, coordinates):
+    @cython.wraparound(False)
+    def map_coordinates(self, coordinates, out=None):
         """Map coordinates of the array on the image
 
+        Coordinates are processed in parallel.
+
         :param coordinates: 2-tuple of array of the same size (row_array, column_array)
+        :param out: Optional C-contiguous float32 array with the shape of the
+            coordinate arrays in which to store the result
         :return: array of values at given coordinates
+        :raises ValueError: If out is not a C-contiguous array
         """
         cdef:
-            float[:] d0, d1, res
-            size_t size, i
+            float[::1] d0, d1, res
+            Py_ssize_t size, i
         shape = coordinates[0].shape
         size = coordinates[0].size
         d0 = numpy.ascontiguousarray(coordinates[0].ravel(), dtype=numpy.float32)
         d1 = numpy.ascontiguousarray(coordinates[1].ravel(), dtype=numpy.float32)
         assert size == d1.size
-        res = numpy.empty(size, dtype=numpy.float32)
+        if out is None:
+            out = numpy.empty(shape, dtype=numpy.float32)
+        else:
+            assert out.shape == shape
+            if not out.flags.c_contiguous:
+                # reshape would return a copy, leaving out unchanged
+                raise ValueError("out must be a C-contiguous array")
+        res = out.reshape(-1)
         with nogil:
-            for i in range(size):
+            for i in prange(size):
                 res[i] = self.c_funct(d1[i], d0[i])
-        return numpy.asarray(res).reshape(shape)
+        return out
+
+    @cython.cdivision(True)
+    cdef void c_profile_line(self, float src_row, float src_col,
+                             float dst_row, float dst_col, int lengt,
+                             int linewidth, bint compute_mean,
+                             float * result) nogil:
+        """Compute the profile of a line, see :meth:`profile_line`
+
+        :param lengt: Number of points of the profile (>= 2)
+        :param result: Buffer of lengt floats where to write the profile
+
+        This method is Cython only due to the NOGIL
+        """
+        cdef:
+            float d_row, d_col, length, col_width, row_width, sum
+            float row, col, new_row, new_col
+            int i, j, cnt
+
+        d_row = dst_row - src_row
+        d_col = dst_col - src_col
+
+        # Offsets to deal with linewidth
+        length = sqrt(d_row * d_row + d_col * d_col)
+        row_width = d_col / length
+        col_width = - d_row / length
+
+        d_row /= <float> (lengt -1)
+        d_col /= <float> (lengt -1)
+
+        # Offset position to the center of the bottom pixels of the profile
+        src_row -= row_width * (linewidth - 1) / 2.
+        src_col -= col_width * (linewidth - 1) / 2.
+
+        for i in range(lengt):
+            sum = 0
+            cnt = 0
+
+            row = src_row + i * d_row
+            col = src_col + i * d_col
+
+            for j in range(linewidth):
+                new_row = row + j * row_width
+                new_col = col + j * col_width
+                if ((new_col >= 0) and (new_col < self.width) and
+                        (new_row >= 0) and (new_row < self.height)):
+                    cnt = cnt + 1
+                    sum = sum + self.c_funct(new_col, new_row)
+            if cnt:
+                if compute_mean:
+                    result[i] = sum / cnt
+                else:
+                    result[i] = sum
+            else:
+                result[i] = 0
 
     @cython.boundscheck(False)
     def profile_line(self, src, dst, int linewidth=1, method='mean'):
@@ -289,9 +359,9 @@ cdef class BilinearImage:
         Inspired from skimage
         """
         cdef:
-            float src_row, src_col, dst_row, dst_col, d_row, d_col
-            float length, col_width, row_width, sum, row, col, new_row, new_col
-            int lengt, i, j, cnt
+            float src_row, src_col, dst_row, dst_col, d_row, d_col, length
+            int lengt
+            bint compute_mean
             float[::1] result
         src_row, src_col = src
         dst_row, dst_col = dst
@@ -300,43 +370,81 @@ cdef class BilinearImage:
             return numpy.array([self.c_funct(src_col, src_row)])
         d_row = dst_row - src_row
         d_col = dst_col - src_col
-
-        # Offsets to deal with linewidth
         length = sqrt(d_row * d_row + d_col * d_col)
-        row_width = d_col / length
-        col_width = - d_row / length
-
         lengt = <int> ceil(length + 1)
-        d_row /= <float> (lengt -1)
-        d_col /= <float> (lengt -1)
 
         result = numpy.zeros(lengt, dtype=numpy.float32)
 
-        # Offset position to the center of the bottom pixels of the profile
-        src_row -= row_width * (linewidth - 1) / 2.
-        src_col -= col_width * (linewidth - 1) / 2.
-
         compute_mean = (method == 'mean')
         with nogil:
-            for i in range(lengt):
-                sum = 0
-                cnt = 0
-
-                row = src_row + i * d_row
-                col = src_col + i * d_col
-
-                for j in range(linewidth):
-                    new_row = row + j * row_width
-                    new_col = col + j * col_width
-                    if ((new_col >= 0) and (new_col < self.width) and
-                            (new_row >= 0) and (new_row < self.height)):
-                        cnt = cnt + 1
-                        sum = sum + self.c_funct(new_col, new_row)
-                if cnt:
-                    if compute_mean is True:
-                        result[i] += sum / cnt
-                    else:
-                        result[i] += sum
+            self.c_profile_line(src_row, src_col, dst_row, dst_col, lengt,
+                                linewidth, compute_mean, &result[0])
 
         # Ensures the result is exported as numpy array and not memory view.
         return numpy.asarray(result)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def profile_lines(self, src, dst, int linewidth=1, method='mean',
+                      out=None):
+        """Return the profiles of many scan lines computed in parallel.
+
+        Each profile is the same as the one returned by :meth:`profile_line`.
+        As profiles can have different lengths, they are stored in a 2D
+        array with as many columns as the longest profile and the end of
+        shorter profiles is filled with NaN.
+
+        :param src: The start points of the scan lines.
+        :type src: Array-like of shape (N, 2) as (row, column)
+        :param dst: The end points of the scan lines.
+        :type dst: Array-like of shape (N, 2) as (row, column)
+        :param int linewidth: Width of the scanlines (unit image pixel).
+        :param str method: 'mean' or 'sum' depending if we want to compute the
+            mean intensity along the line or the sum.
+        :param out: Optional C-contiguous float32 array of shape (N, L) with
+            L at least the length of the longest profile
+            in which to store the result.
+        :return: The intensity profiles along the scan lines as a (N, L)
+            array of float32.
+        """
+        cdef:
+            float[:, ::1] c_src = numpy.ascontiguousarray(
+                numpy.reshape(src, (-1, 2)), dtype=numpy.float32)
+            float[:, ::1] c_dst = numpy.ascontiguousarray(
+                numpy.reshape(dst, (-1, 2)), dtype=numpy.float32)
+            int[::1] lengths
+            float[:, ::1] result
+            float d_row, d_col, length
+            bint compute_mean = (method == 'mean')
+            Py_ssize_t nlines, i
+        nlines = c_src.shape[0]
+        assert c_dst.shape[0] == nlines
+
+        lengths = numpy.empty(nlines, dtype=numpy.int32)
+        for i in range(nlines):
+            d_row = c_dst[i, 0] - c_src[i, 0]
+            d_col = c_dst[i, 1] - c_src[i, 1]
+            if d_row == 0 and d_col == 0:
+                lengths[i] = 1
+            else:
+                length = sqrt(d_row * d_row + d_col * d_col)
+                lengths[i] = <int> ceil(length + 1)
+
+        max_length = numpy.max(lengths) if nlines > 0 else 0
+        if out is None:
+            out = numpy.empty((nlines, max_length), dtype=numpy.float32)
+        else:
+            assert out.shape[0] == nlines and out.shape[1] >= max_length
+        result = out
+        out[:] = numpy.nan
+
+        with nogil:
+            for i in prange(nlines, schedule='guided'):
+                if lengths[i] == 1:
+                    result[i, 0] = self.c_funct(c_src[i, 1], c_src[i, 0])
+                else:
+                    self.c_profile_line(c_src[i, 0], c_src[i, 1],
+                                        c_dst[i, 0], c_dst[i, 1],
+                                        lengths[i], linewidth, compute_mean,
+                                        &result[i, 0])
+        return out
@@ -27,7 +27,7 @@ Marching squares implementation based on a merge of segements and polygons.
 
 __authors__ = ["Almar Klein", "Jerome Kieffer", "Valentin Valls"]
 __license__ = "MIT"
-__date__ = "23/04/2018"
+__date__ = "19/10/2026"
 
 import numpy
 cimport numpy as cnumpy
@@ -93,6 +93,7 @@ cdef cppclass TileContext:
     int pos_y
     int dim_x
     int dim_y
+    cnumpy.float64_t level
 
     # Only used to find contours
     clist[PolygonDescription*] final_polygons
@@ -138,58 +139,115 @@ cdef class _MarchingSquaresAlgorithm(object):
         """
         Main method to execute the marching squares.
 
+        It must be called without the GIL.
+
         :param level: The level expected.
         """
+        self.marching_squares_many(&level, 1, &self._final_context)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef void marching_squares_many(self,
+                                    cnumpy.float64_t *levels,
+                                    int nb_levels,
+                                    TileContext **final_contexts) nogil:
+        """
+        Execute the marching squares for many levels.
+
+        The tiles of all the levels are processed together with OpenMP, then
+        the contexts of each level are reduced.
+
+        It must be called without the GIL.
+
+        :param levels: The levels expected.
+        :param nb_levels: Number of levels
+        :param final_contexts: Array receiving the resulting context of each
+            level
+        """
         cdef:
-            TileContext** contexts
+            TileContext*** contexts
             TileContext** valid_contexts
-            int nb_contexts, nb_valid_contexts
-            int i, j
-            TileContext* context
+            int* nb_valid_contexts
+            int nb_contexts, total_valid_contexts
+            int i, j, ilevel
             int dim_x, dim_y
 
-        contexts = self.create_contexts(level, &dim_x, &dim_y, &nb_valid_contexts)
+        contexts = <TileContext ***>libc.stdlib.malloc(nb_levels * sizeof(TileContext**))
+        nb_valid_contexts = <int *>libc.stdlib.malloc(nb_levels * sizeof(int))
+        total_valid_contexts = 0
+        for ilevel in xrange(nb_levels):
+            contexts[ilevel] = self.create_contexts(levels[ilevel], &dim_x, &dim_y, &nb_valid_contexts[ilevel])
+            total_valid_contexts += nb_valid_contexts[ilevel]
         nb_contexts = dim_x * dim_y
 
-        if nb_valid_contexts == 0:
-            # shortcut
-            self._final_context = new TileContext()
-            libc.stdlib.free(contexts)
-            return
-
         j = 0
-        valid_contexts = <TileContext **>libc.stdlib.malloc(nb_valid_contexts * sizeof(TileContext*))
-        for i in xrange(nb_contexts):
-            if contexts[i] != NULL:
-                valid_contexts[j] = contexts[i]
-                j += 1
+        valid_contexts = <TileContext **>libc.stdlib.malloc((total_valid_contexts + 1) * sizeof(TileContext*))
+        for ilevel in xrange(nb_levels):
+            for i in xrange(nb_contexts):
+                if contexts[ilevel][i] != NULL:
+                    valid_contexts[j] = contexts[ilevel][i]
+                    j += 1
 
         # openmp
-        for i in prange(nb_valid_contexts, nogil=True):
-            self.marching_squares_mp(valid_contexts[i], level)
+        for i in prange(total_valid_contexts):
+            self.marching_squares_mp(valid_contexts[i], valid_contexts[i].level)
+
+        if nb_levels == 1:
+            # Keep the parallel reduction of the single level
+            final_contexts[0] = self.reduce_contexts(dim_x, dim_y, contexts[0], nb_valid_contexts[0])
+        else:
+            for ilevel in prange(nb_levels, schedule='dynamic'):
+                final_contexts[ilevel] = self.reduce_contexts(dim_x, dim_y, contexts[ilevel], nb_valid_contexts[ilevel])
+
+        for ilevel in xrange(nb_levels):
+            libc.stdlib.free(contexts[ilevel])
+        libc.stdlib.free(contexts)
+        libc.stdlib.free(nb_valid_contexts)
+        libc.stdlib.free(valid_contexts)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef TileContext* reduce_contexts(self,
+                                      int dim_x,
+                                      int dim_y,
+                                      TileContext **contexts,
+                                      int nb_valid_contexts) nogil:
+        """
+        Merge together the processed contexts of a level.
+
+        :param dim_x: Number of contexts in the x dimension
+        :param dim_y: Number of contexts in the y dimension
+        :param contexts: Array of contexts, `NULL` for skipped tiles
+        :param nb_valid_contexts: Number of non `NULL` contexts
+        :return: The resulting context
+        """
+        cdef:
+            int i
+
+        if nb_valid_contexts == 0:
+            # shortcut
+            return new TileContext()
 
         if nb_valid_contexts == 1:
             # shortcut
-            self._final_context = valid_contexts[0]
-            libc.stdlib.free(valid_contexts)
-            libc.stdlib.free(contexts)
-            return
+            for i in xrange(dim_x * dim_y):
+                if contexts[i] != NULL:
+                    return contexts[i]
 
         if self._force_sequencial_reduction:
-            self.sequencial_reduction(nb_valid_contexts, valid_contexts)
+            return self.sequencial_reduction(dim_x * dim_y, contexts)
         # FIXME can only be used if compiled with openmp
         # elif copenmp.omp_get_num_threads() <= 1:
-        #     self._sequencial_reduction(nb_valid_contexts, valid_contexts)
+        #     return self._sequencial_reduction(dim_x * dim_y, contexts)
         else:
-            self.reduction_2d(dim_x, dim_y, contexts)
-
-        libc.stdlib.free(valid_contexts)
-        libc.stdlib.free(contexts)
+            return self.reduction_2d(dim_x, dim_y, contexts)
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
     @cython.cdivision(True)
-    cdef void reduction_2d(self, int dim_x, int dim_y, TileContext **contexts) nogil:
+    cdef TileContext* reduction_2d(self, int dim_x, int dim_y, TileContext **contexts) nogil:
         """
         Reduce the problem merging first neighbours together in a recursive
         process. Optimized with OpenMP.
@@ -197,6 +255,7 @@ cdef class _MarchingSquaresAlgorithm(object):
         :param dim_x: Number of contexts in the x dimension
         :param dim_y: Number of contexts in the y dimension
         :param contexts: Array of contexts
+        :return: The resulting context
         """
         cdef:
             int x1, y1, x2, y2, i1, i2
@@ -209,7 +268,7 @@ cdef class _MarchingSquaresAlgorithm(object):
             # It is needed to add a delta and the 'to'
             # Here is what we can use with Cython 0.28:
             #     for i in prange(0, dim_x, (delta + delta)):
-            for i1 in prange(0, dim_x + (delta + delta - 1), delta + delta, nogil=True):
+            for i1 in prange(0, dim_x + (delta + delta - 1), delta + delta):
                 x1 = i1
                 if x1 + delta < dim_x:
                     y1 = 0
@@ -221,7 +280,7 @@ cdef class _MarchingSquaresAlgorithm(object):
             # It is needed to add a delta and the 'to'
             # Here is what we can use with Cython 0.28:
             #     for i in prange(0, dim_y, (delta + delta)):
-            for i2 in prange(0, dim_y + (delta + delta - 1), delta + delta, nogil=True):
+            for i2 in prange(0, dim_y + (delta + delta - 1), delta + delta):
                 y2 = i2
                 if y2 + delta < dim_y:
                     x2 = 0
@@ -230,7 +289,7 @@ cdef class _MarchingSquaresAlgorithm(object):
                         x2 = x2 + delta + delta
             delta <<= 1
 
-        self._final_context = contexts[0]
+        return contexts[0]
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -264,23 +323,26 @@ cdef class _MarchingSquaresAlgorithm(object):
     @cython.boundscheck(False)
     @cython.wraparound(False)
     @cython.cdivision(True)
-    cdef void sequencial_reduction(self,
-                                   int nb_contexts,
-                                   TileContext **contexts) nogil:
+    cdef TileContext* sequencial_reduction(self,
+                                           int nb_contexts,
+                                           TileContext **contexts) nogil:
         """
         Reduce the problem sequencially without taking care of the topology
 
         :param nb_contexts: Number of contexts
         :param contexts: Array of contexts
+        :return: The resulting context
         """
         cdef:
             int i
+            TileContext *final_context
         # merge
-        self._final_context = new TileContext()
+        final_context = new TileContext()
         for i in xrange(nb_contexts):
             if contexts[i] != NULL:
-                self.merge_context(self._final_context, contexts[i])
+                self.merge_context(final_context, contexts[i])
                 del contexts[i]
+        return final_context
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -443,20 +505,22 @@ cdef class _MarchingSquaresAlgorithm(object):
         libc.string.memset(contexts, 0, context_size * sizeof(TileContext*))
 
         valid_contexts = 0
-        icontext = 0
         y = 0
         while y < self._dim_y - 1:
             x = 0
             while x < self._dim_x - 1:
+                # The last row or column of tiles can be skipped, so the index
+                # is computed from the tile location
+                icontext = (y // self._group_size) * context_dim_x + x // self._group_size
                 if self._use_minmax_cache:
                     if level < self._min_cache[icontext] or level > self._max_cache[icontext]:
-                        icontext += 1
                         x += self._group_size
                         continue
                 context = self.create_context(x, y, self._group_size, self._group_size)
+                if context != NULL:
+                    context.level = level
+                    valid_contexts += 1
                 contexts[icontext] = context
-                icontext += 1
-                valid_contexts += 1
                 x += self._group_size
             y += self._group_size
 
@@ -1261,6 +1325,10 @@ cdef class MarchingSquaresMergeImpl(object):
         :returns: An array of y-x coordinates.
         :rtype: numpy.ndarray
         """
+        cdef:
+            _MarchingSquaresPixels algo
+            cnumpy.float64_t level_c = level
+
         if self._use_minmax_cache and self._min_cache == NULL:
             self._create_minmax_cache()
 
@@ -1280,7 +1348,8 @@ cdef class MarchingSquaresMergeImpl(object):
         else:
             algo = self._pixels_algo
 
-        algo.marching_squares(level)
+        with nogil:
+            algo.marching_squares(level_c)
         pixels = algo.extract_pixels()
         return pixels
 
@@ -1295,9 +1364,71 @@ cdef class MarchingSquaresMergeImpl(object):
         :returns: A list of array containg y-x coordinates of points
         :rtype: List[numpy.ndarray]
         """
+        cdef:
+            _MarchingSquaresContours algo
+            cnumpy.float64_t level_c = level
+
+        if self._use_minmax_cache and self._min_cache == NULL:
+            self._create_minmax_cache()
+
+        algo = self._get_contours_algo()
+        with nogil:
+            algo.marching_squares(level_c)
+        polygons = algo.extract_polygons()
+        return polygons
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    def find_contours_many(self, levels):
+        """
+        Compute the lists of polygons of the iso contours at many `levels`.
+
+        The tiles of all the levels are processed together with OpenMP,
+        without the GIL, then the polygons of each level are merged.
+
+        The min/max cache is used if enabled for this object.
+
+        :param levels: Levels of the requested iso contours.
+        :type levels: List[float]
+        :returns: For each level, a list of array containg y-x coordinates of
+            points
+        :rtype: List[List[numpy.ndarray]]
+        """
+        cdef:
+            cnumpy.float64_t[::1] levels_c
+            TileContext **final_contexts
+            int nb_levels, i
+            _MarchingSquaresContours algo
+
+        levels_c = numpy.array(levels, dtype=numpy.float64).reshape(-1)
+        nb_levels = levels_c.shape[0]
+        if nb_levels == 0:
+            return []
+
         if self._use_minmax_cache and self._min_cache == NULL:
             self._create_minmax_cache()
 
+        algo = self._get_contours_algo()
+        final_contexts = <TileContext **>libc.stdlib.malloc(nb_levels * sizeof(TileContext*))
+        try:
+            with nogil:
+                algo.marching_squares_many(&levels_c[0], nb_levels, final_contexts)
+
+            result = []
+            for i in range(nb_levels):
+                algo._final_context = final_contexts[i]
+                result.append(algo.extract_polygons())
+        finally:
+            libc.stdlib.free(final_contexts)
+        return result
+
+    cdef _MarchingSquaresContours _get_contours_algo(self):
+        """Returns the implementation of the marching squares algorithm used
+        to find contours"""
+        cdef:
+            _MarchingSquaresContours algo
+
         if self._contours_algo is None:
             algo = _MarchingSquaresContours()
             algo._image_ptr = self._image_ptr
@@ -1311,9 +1442,4 @@ cdef class MarchingSquaresMergeImpl(object):
                 algo._min_cache = self._min_cache
                 algo._max_cache = self._max_cache
             self._contours_algo = algo
-        else:
-            algo = self._contours_algo
-
-        algo.marching_squares(level)
-        polygons = algo.extract_polygons()
-        return polygons
+        return self._contours_algo
@@ -25,7 +25,7 @@
 
 __authors__ = ["V. Valls"]
 __license__ = "MIT"
-__date__ = "18/04/2018"
+__date__ = "19/10/2026"
 
 import unittest
 import numpy
@@ -263,6 +263,59 @@ class TestMergeImplContours(unittest.TestCase):
         self.assertEqual(len(polygons), 11)
         self.assertEqual(self.count_closed_polygons(polygons), 3)
 
+    def test_image_many_levels(self):
+        # example from skimage
+        x, y = numpy.ogrid[-numpy.pi:numpy.pi:100j, -numpy.pi:numpy.pi:100j]
+        image = numpy.sin(numpy.exp((numpy.sin(x)**3 + numpy.cos(y)**2)))
+        mask = numpy.zeros(image.shape, dtype=numpy.int8)
+        mask[40:45, 20:70] = 1
+        levels = numpy.linspace(-0.8, 0.8, 9)
+        for group_size in (7, 50, 256):
+            ms = MarchingSquaresMergeImpl(image, mask, group_size=group_size)
+            for use_minmax_cache in (False, True):
+                result = MarchingSquaresMergeImpl(
+                    image, mask, group_size=group_size,
+                    use_minmax_cache=use_minmax_cache).find_contours_many(levels)
+                self.assertEqual(len(result), len(levels))
+                for level, polygons in zip(levels, result):
+                    expected = ms.find_contours(level)
+                    self.assertEqual(len(polygons), len(expected))
+                    for polygon, expected_polygon in zip(polygons, expected):
+                        self.assertTrue(numpy.array_equal(polygon, expected_polygon))
+
+    def test_minmax_cache_partial_tiles(self):
+        # image sizes where the last row and column of tiles are empty
+        for shape, group_size in (((65, 64), 7), ((129, 129), 64)):
+            y, x = numpy.mgrid[:shape[0], :shape[1]]
+            image = numpy.sin(x / 17.) * numpy.cos(y / 13.)
+            levels = numpy.linspace(-0.9, 0.9, 7)
+            ms = MarchingSquaresMergeImpl(image, group_size=group_size)
+            cached = MarchingSquaresMergeImpl(image, group_size=group_size,
+                                              use_minmax_cache=True)
+            result = cached.find_contours_many(levels)
+            for level, polygons in zip(levels, result):
+                expected = ms.find_contours(level)
+                self.assertEqual(len(cached.find_contours(level)), len(expected))
+                self.assertEqual(len(polygons), len(expected))
+
+    def test_image_many_levels_then_single_level(self):
+        x, y = numpy.ogrid[-numpy.pi:numpy.pi:100j, -numpy.pi:numpy.pi:100j]
+        image = numpy.sin(numpy.exp((numpy.sin(x)**3 + numpy.cos(y)**2)))
+        ms = MarchingSquaresMergeImpl(image, group_size=7)
+        expected = ms.find_contours(0.5)
+        ms.find_contours_many([-0.5, 0.5])
+        result = ms.find_contours(0.5)
+        self.assertEqual(len(result), len(expected))
+        for polygon, expected_polygon in zip(result, expected):
+            self.assertTrue(numpy.array_equal(polygon, expected_polygon))
+
+    def test_image_many_levels_empty(self):
+        image = numpy.array([[1.0, 1.0], [1.0, 2.0]])
+        ms = MarchingSquaresMergeImpl(image)
+        self.assertEqual(ms.find_contours_many([]), [])
+        result = ms.find_contours_many([0.5, 1.5, 3.0])
+        self.assertEqual([len(polygons) for polygons in result], [0, 1, 0])
+
 
 def suite():
     test_suite = unittest.TestSuite()
@@ -29,7 +29,7 @@ with the choice between 2 implementations: 'cpp' and 'opencl'.
 
 __authors__ = ["H. Payno"]
 __license__ = "MIT"
-__date__ = "04/05/2017"
+__date__ = "19/10/2026"
 
 
 import logging
@@ -38,7 +38,7 @@ from silx.math import medianfilter as medianfilter_cpp
 from silx.opencl import ocl as _ocl
 if _ocl is not None:
     from silx.opencl import medfilt as medfilt_opencl
-else:  # No OpenCL device or pyopencl not installed
+else:  # pyopencl not installed or disabled
     medfilt_opencl = None
 
 
@@ -86,7 +86,7 @@ def medfilt2d(image, kernel_size=3, engine='cpp'):
                                         kernel_size=kernel_size,
                                         conditional=False)
     elif engine == 'opencl':
-        if medfilt_opencl is None:
+        if medfilt_opencl is None or not _ocl:
             wrn = 'opencl median filter not available. '
             wrn += 'Launching cpp implementation.'
             _logger.warning(wrn)
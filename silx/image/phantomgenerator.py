@@ -22,10 +22,18 @@
 # THE SOFTWARE.
 #
 # ###########################################################################*/
+"""This module provides Shepp-Logan phantoms for tests and benchmarks.
+
+- :func:`phantom` generates 2D or 3D phantoms in memory.
+- :func:`phantom_to_hdf5` writes a 3D phantom slab by slab in a
+  dataset (e.g., a chunked HDF5 dataset) too large to fit in memory.
+
+Ellipsoids are only evaluated in their bounding box.
+"""
 
 __authors__ = ["N. Vigano", "H. Payno", "P. Paleo"]
 __license__ = "MIT"
-__date__ = "19/09/2017"
+__date__ = "19/10/2026"
 
 import numpy
 
@@ -74,87 +82,156 @@ class PhantomGenerator(object):
         """
         assert(ellipsoidID is None or (ellipsoidID >= 0 and ellipsoidID < len(PhantomGenerator.SHEPP_LOGAN)))
         if ellipsoidID is None:
-            area = PhantomGenerator._get2DPhantom(n,
-                                                  PhantomGenerator.SHEPP_LOGAN)
+            ellipsoids = PhantomGenerator.SHEPP_LOGAN
         else:
-            area = PhantomGenerator._get2DPhantom(n,
-                                                  [PhantomGenerator.SHEPP_LOGAN[ellipsoidID]])
+            ellipsoids = [PhantomGenerator.SHEPP_LOGAN[ellipsoidID]]
+        return phantom((n, n), ellipsoids, dtype=numpy.float64)
 
-        indices = numpy.abs(area) > 0
-        area[indices] = numpy.multiply(area[indices] + 0.1, 5)
-        return area / 100.0
 
-    @staticmethod
-    def _get2DPhantom(n, phantomSpec):
-        area = numpy.ndarray(shape=(n, n))
-        area.fill(0.)
-
-        count = 0
-        for ell in phantomSpec:
-            count = count+1
-            for x in range(n):
-                sumSquareXandY = PhantomGenerator._getSquareXandYsum(n, x, ell)
-                indices = sumSquareXandY <= 1
-                area[indices, x] = ell.mu
-        return area
+def _coordinates(size, start=0, stop=None):
+    """Returns normalized coordinates in [-1, 1[ of pixels along an axis
 
-    @staticmethod
-    def _getSquareXandYsum(n, x, ell):
-        supportX1 = numpy.ndarray(shape=(n, ))
-        supportX2 = numpy.ndarray(shape=(n, ))
-        support_consts = numpy.ndarray(shape=(n, ))
-
-        xScaled = float(2*x-n)/float(n)
-        xCos = xScaled * ell.cosAlpha
-        xSin = -xScaled * ell.sinAlpha
-        supportX1.fill(xCos)
-        supportX2.fill(xSin)
-
-        supportY1 = numpy.arange(n)
-        support_consts.fill(2.)
-        supportY1 = numpy.multiply(support_consts, supportY1)
-        support_consts.fill(n)
-        supportY1 = numpy.subtract(supportY1, support_consts)
-        support_consts.fill(n)
-        supportY1 = numpy.divide(supportY1, support_consts)
-        supportY2 = numpy.array(supportY1)
-
-        support_consts.fill(ell.sinAlpha)
-        supportY1 = numpy.add(supportX1,
-                              numpy.multiply(supportY1, support_consts))
-        support_consts.fill(ell.cosAlpha)
-        supportY2 = numpy.add(supportX2,
-                              numpy.multiply(supportY2, support_consts))
-
-        support_consts.fill(ell.x0)
-        supportY1 = numpy.subtract(supportY1, support_consts)
-        support_consts.fill(ell.y0)
-        supportY2 = numpy.subtract(supportY2, support_consts)
-
-        support_consts.fill(ell.a)
-        supportY1 = numpy.power((numpy.divide(supportY1, support_consts)),
-                                2)
-        support_consts.fill(ell.b)
-        supportY2 = numpy.power(numpy.divide(supportY2, support_consts),
-                                2)
-
-        return numpy.add(supportY1, supportY2)
+    :param int size: Number of pixels along the axis
+    :param int start: First pixel
+    :param int stop: End pixel (default: size)
+    :rtype: numpy.ndarray
+    """
+    if stop is None:
+        stop = size
+    return (2. * numpy.arange(start, stop) - size) / size
 
-    @staticmethod
-    def _getSquareZ(n, ell):
-        supportZ1 = numpy.arange(n)
-        support_consts = numpy.ndarray(shape=(n, ))
-        support_consts.fill(2.)
-        supportZ1 = numpy.multiply(support_consts, supportZ1)
-        support_consts.fill(n)
-        supportZ1 = numpy.subtract(supportZ1, support_consts)
-        support_consts.fill(n)
-        supportZ1 = numpy.divide(supportZ1, support_consts)
-
-        support_consts.fill(ell.z0)
-        supportZ1 = numpy.subtract(supportZ1, ell.z0)
-
-        support_consts.fill(ell.c)
-        return numpy.power(numpy.divide(supportZ1, support_consts),
-                           2)
 
+def _bounds(center, extent, size):
+    """Returns the range of pixels covering [center-extent, center+extent]
+
+    :param float center: Center in normalized coordinates
+    :param float extent: Half-length in normalized coordinates
+    :param int size: Number of pixels along the axis
+    :return: (start, stop) clipped to [0, size]
+    """
+    start = int(numpy.floor((center - extent + 1.) * size / 2.)) - 1
+    stop = int(numpy.ceil((center + extent + 1.) * size / 2.)) + 2
+    return max(start, 0), min(stop, size)
+
+
+def _fill_ellipsoids(out, shape, ellipsoids, first_slice=0):
+    """Draw ellipsoids in a 2D array or in slices of a 3D array.
+
+    :param numpy.ndarray out: Array to fill, either 2D or a slab of
+        consecutive slices of a 3D volume
+    :param shape: Shape of the whole phantom
+    :param ellipsoids: The ellipsoids to draw in order
+    :param int first_slice: Index of the first slice of out in the volume
+    """
+    height, width = shape[-2:]
+    for ell in ellipsoids:
+        # The phantom value inside an ellipsoid (see get2DPhantomSheppLogan)
+        value = 0. if ell.mu == 0 else (ell.mu + 0.1) * 5 / 100.0
+
+        # Bounding box of the rotated ellipse in the x, y plane
+        cos, sin = ell.cosAlpha, ell.sinAlpha
+        center_x = ell.x0 * cos - ell.y0 * sin
+        center_y = ell.x0 * sin + ell.y0 * cos
+        extent_x = numpy.sqrt((ell.a * cos) ** 2 + (ell.b * sin) ** 2)
+        extent_y = numpy.sqrt((ell.a * sin) ** 2 + (ell.b * cos) ** 2)
+        x_start, x_stop = _bounds(center_x, extent_x, width)
+        y_start, y_stop = _bounds(center_y, extent_y, height)
+        if x_start >= x_stop or y_start >= y_stop:
+            continue
+
+        x = _coordinates(width, x_start, x_stop)[numpy.newaxis, :]
+        y = _coordinates(height, y_start, y_stop)[:, numpy.newaxis]
+        distance = (numpy.power((x * cos + y * sin - ell.x0) / ell.a, 2) +
+                    numpy.power((- x * sin + y * cos - ell.y0) / ell.b, 2))
+
+        if len(shape) == 2:
+            inside = distance <= 1
+            out[y_start:y_stop, x_start:x_stop][inside] = value
+
+        else:
+            z_start, z_stop = _bounds(ell.z0, ell.c, shape[0])
+            z_start = max(z_start, first_slice)
+            z_stop = min(z_stop, first_slice + len(out))
+            if z_start >= z_stop:
+                continue
+            z = _coordinates(shape[0], z_start, z_stop)
+            distance_z = numpy.power((z - ell.z0) / ell.c, 2)
+            for index, dz in zip(range(z_start, z_stop), distance_z):
+                inside = distance + dz <= 1.
+                out[index - first_slice,
+                    y_start:y_stop, x_start:x_stop][inside] = value
+
+
+def phantom(shape, ellipsoids=None, out=None, dtype=numpy.float32):
+    """Generate a 2D or 3D phantom made of ellipsoids.
+
+    Each axis of the phantom is mapped to [-1, 1[.
+    Ellipsoids are drawn in order, the last ones overwriting the first ones.
+    The 2D phantom only uses the x and y parameters of the ellipsoids and
+    is the same as :meth:`PhantomGenerator.get2DPhantomSheppLogan`.
+
+    :param shape: Shape of the phantom: (height, width) or
+        (depth, height, width)
+    :param ellipsoids: List of :class:`PhantomGenerator._Ellipsoid` to draw.
+        Default: :attr:`PhantomGenerator.SHEPP_LOGAN`
+    :param numpy.ndarray out: Optional array of the given shape to fill
+        (e.g., a reused float32 buffer). It is reset to 0 first.
+    :param dtype: Type of the returned array if out is not provided
+    :return: The phantom
+    :rtype: numpy.ndarray
+    """
+    shape = tuple(shape)
+    assert len(shape) in (2, 3)
+    if ellipsoids is None:
+        ellipsoids = PhantomGenerator.SHEPP_LOGAN
+
+    if out is None:
+        out = numpy.zeros(shape, dtype=dtype)
+    else:
+        assert out.shape == shape
+        out[...] = 0
+    _fill_ellipsoids(out, shape, ellipsoids)
+    return out
+
+
+def phantom_to_hdf5(dataset, ellipsoids=None, slab_size=None):
+    """Write a 3D phantom slab by slab into a dataset.
+
+    This allows to generate large volumes which do not fit in memory:
+
+    >>> with h5py.File('phantom.h5', 'w') as h5file:
+    ...     dataset = h5file.create_dataset(
+    ...         'phantom', shape=(2048, 2048, 2048), dtype='float32',
+    ...         chunks=(32, 2048, 2048))
+    ...     phantom_to_hdf5(dataset)
+
+    :param dataset: 3D dataset supporting assignment of slices along the
+        first dimension (e.g., h5py.Dataset, numpy.ndarray)
+    :param ellipsoids: List of :class:`PhantomGenerator._Ellipsoid` to draw.
+        Default: :attr:`PhantomGenerator.SHEPP_LOGAN`
+    :param int slab_size: Number of slices written at once.
+        Default: The chunk size of the dataset along the first dimension if
+        any or about 2**24 voxels per slab.
+    :return: The dataset
+    """
+    shape = tuple(dataset.shape)
+    assert len(shape) == 3
+    if ellipsoids is None:
+        ellipsoids = PhantomGenerator.SHEPP_LOGAN
+
+    if slab_size is None:
+        chunks = getattr(dataset, 'chunks', None)
+        if chunks:
+            slab_size = chunks[0]
+        else:
+            slab_size = max(1, 2 ** 24 // (shape[1] * shape[2]))
+
+    dtype = getattr(dataset, 'dtype', numpy.float32)
+    slab = numpy.empty((slab_size,) + shape[1:], dtype=dtype)
+    for first_slice in range(0, shape[0], slab_size):
+        size = min(slab_size, shape[0] - first_slice)
+        buffer_ = slab[:size]
+        buffer_[...] = 0
+        _fill_ellipsoids(buffer_, shape, ellipsoids, first_slice)
+        dataset[first_slice:first_slice + size] = buffer_
+    return dataset
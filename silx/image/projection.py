@@ -1,6 +1,6 @@
 # coding: utf-8
 # /*##########################################################################
-# Copyright (C) 2017 European Synchrotron Radiation Facility
+# Copyright (C) 2017-2026 European Synchrotron Radiation Facility
 #
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the "Software"), to deal
@@ -22,4 +22,31 @@
 #
 # ############################################################################*/
 
-from silx.opencl.projection import *
+"""Tomographic projection.
+
+:class:`Projection` is the OpenCL implementation from
+:mod:`silx.opencl.projection` if an OpenCL device is available,
+and the CPU implementation from :mod:`silx.image.radon` otherwise.
+
+The implementation is selected when an instance is created, so that
+importing this module does not probe OpenCL devices.
+"""
+
+from silx.opencl import common as _common
+
+
+class Projection(object):
+    """Tomographic projection of slices.
+
+    Creating an instance returns a :class:`silx.opencl.projection.Projection`
+    if an OpenCL device is available and a
+    :class:`silx.image.radon.Projection` otherwise, see those classes for
+    the parameters.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        if _common.ocl:  # Probes OpenCL devices on first use
+            from silx.opencl.projection import Projection as implementation
+        else:
+            from silx.image.radon import Projection as implementation
+        return implementation(*args, **kwargs)
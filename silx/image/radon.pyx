@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+#
+#    Project: silx
+#             https://github.com/silx-kit/silx
+#
+#    Copyright (C) 2026  European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""CPU implementation of the tomographic projection and (filtered)
+backprojection.
+
+It provides :class:`Backprojection` and :class:`Projection` with the same
+API as their OpenCL counterparts in :mod:`silx.opencl.backprojection` and
+:mod:`silx.opencl.projection`, for machines without an OpenCL runtime.
+Stacks of sinograms (or slices) are processed at once: the Fourier filtering
+is vectorized with :mod:`numpy.fft` and the backprojection (resp. projection)
+runs in parallel over the rows of the slices (resp. the angles) with OpenMP.
+"""
+
+__authors__ = ["A. Mirone, P. Paleo"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+import logging
+import numpy
+
+cimport cython
+from cython.parallel import prange
+
+logger = logging.getLogger(__name__)
+
+
+def _nextpow2(n):
+    """Returns the smallest power of two larger or equal to n"""
+    return 1 << int(numpy.ceil(numpy.log2(n)))
+
+
+def ramlak_filter(fft_size):
+    """Returns the Ram-Lak filter designed in the spatial domain.
+
+    :param int fft_size: Size of the filter
+    :return: The real part of the filter in Fourier space, the size of
+        which is fft_size // 2 + 1 as for :func:`numpy.fft.rfft`
+    :rtype: numpy.ndarray
+    """
+    h = numpy.zeros(fft_size, dtype=numpy.float32)
+    L2 = fft_size // 2 + 1
+    h[0] = 1 / 4.
+    j = numpy.linspace(1, L2, L2 // 2, False)
+    h[1:L2:2] = -1. / (numpy.pi ** 2 * j ** 2)
+    h[L2:] = numpy.copy(h[1:L2 - 1][::-1])
+    return numpy.fft.rfft(h).real.astype(numpy.float32)
+
+
+def fourier_filter(sino, filter_=None, fft_size=None):
+    """Filter sinograms in Fourier space with a real filter.
+
+    :param sino: Sinogram(s) of shape (..., num_projs, num_bins)
+    :param filter_: Filter in Fourier space of size fft_size // 2 + 1.
+        Default: Ram-Lak filter.
+    :param fft_size: Size on which to perform the FFT.
+        May be larger than num_bins.
+    :return: Filtered sinogram(s) as float32
+    """
+    sino = numpy.asarray(sino)
+    assert sino.ndim >= 2
+    num_bins = sino.shape[-1]
+    if fft_size is None:
+        fft_size = _nextpow2(num_bins * 2 - 1)
+    else:
+        assert fft_size >= num_bins
+    if filter_ is None:
+        filter_ = ramlak_filter(fft_size)
+
+    # Linear convolution, real to complex FFTs of all rows in one call
+    sino_f = numpy.fft.rfft(sino, fft_size, axis=-1)
+    sino_f *= filter_
+    sino_filtered = numpy.fft.irfft(sino_f, fft_size, axis=-1)
+    return numpy.ascontiguousarray(sino_filtered[..., :num_bins],
+                                   dtype=numpy.float32)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def backproject(sinos, slices, cos_angles, sin_angles, axis_position):
+    """Backproject sinograms and add the result to slices.
+
+    Pixel (row, col) of a slice accumulates the linear interpolation of
+    each projection at detector position
+    ``axis + (col - axis) * cos(angle) - (row - axis) * sin(angle)``.
+
+    :param numpy.ndarray sinos:
+        (num_slices, num_projs, num_bins) C-contiguous float32 array
+    :param numpy.ndarray slices:
+        (num_slices, height, width) C-contiguous float32 array
+    :param numpy.ndarray cos_angles: Cosines of the angles as float64
+    :param numpy.ndarray sin_angles: Sines of the angles as float64
+    :param float axis_position: Position of the rotation axis in pixels
+    """
+    cdef float[:, :, ::1] c_sinos = sinos
+    cdef float[:, :, ::1] c_slices = slices
+    cdef double[::1] c_cos = cos_angles
+    cdef double[::1] c_sin = sin_angles
+    cdef double axis = axis_position
+    cdef int num_slices = c_sinos.shape[0]
+    cdef int num_projs = c_sinos.shape[1]
+    cdef int num_bins = c_sinos.shape[2]
+    cdef int height = c_slices.shape[1]
+    cdef int width = c_slices.shape[2]
+    cdef int index, slice_index, row, col, proj, xm
+    cdef float h, h_row, x, frac, cos_angle
+    cdef float * sino_row
+    cdef float * slice_row
+
+    assert c_slices.shape[0] == num_slices
+    assert c_cos.shape[0] >= num_projs and c_sin.shape[0] >= num_projs
+
+    with nogil:
+        for index in prange(num_slices * height, schedule='guided'):
+            slice_index = index // height
+            row = index % height
+            slice_row = &c_slices[slice_index, row, 0]
+            for proj in range(num_projs):
+                sino_row = &c_sinos[slice_index, proj, 0]
+                cos_angle = c_cos[proj]
+                h_row = axis - axis * cos_angle - (row - axis) * c_sin[proj]
+                for col in range(width):
+                    h = h_row + col * cos_angle
+                    if h < 0 or h >= num_bins:
+                        continue
+                    x = h if h < num_bins - 1 else num_bins - 1
+                    xm = <int> x
+                    frac = x - xm
+                    if frac == 0:
+                        slice_row[col] += sino_row[xm]
+                    else:
+                        slice_row[col] += (sino_row[xm] + frac *
+                                           (sino_row[xm + 1] - sino_row[xm]))
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def project(images, sinos, cos_angles, sin_angles,
+            axis_position, detector_axis_position):
+    """Project images and add the result to sinograms.
+
+    This is the adjoint of :func:`backproject`: each pixel is spread with
+    linear weights to the two detector bins around its position
+    ``detector_axis + (col - axis) * cos(angle) - (row - axis) * sin(angle)``.
+
+    :param numpy.ndarray images:
+        (num_slices, height, width) C-contiguous float32 array
+    :param numpy.ndarray sinos:
+        (num_slices, num_projs, num_bins) C-contiguous float32 array
+    :param numpy.ndarray cos_angles: Cosines of the angles as float64
+    :param numpy.ndarray sin_angles: Sines of the angles as float64
+    :param float axis_position: Position of the rotation axis in the images
+    :param float detector_axis_position:
+        Position of the rotation axis on the detector
+    """
+    cdef float[:, :, ::1] c_images = images
+    cdef float[:, :, ::1] c_sinos = sinos
+    cdef double[::1] c_cos = cos_angles
+    cdef double[::1] c_sin = sin_angles
+    cdef double axis = axis_position
+    cdef double detector_axis = detector_axis_position
+    cdef int num_slices = c_sinos.shape[0]
+    cdef int num_projs = c_sinos.shape[1]
+    cdef int num_bins = c_sinos.shape[2]
+    cdef int height = c_images.shape[1]
+    cdef int width = c_images.shape[2]
+    cdef int index, slice_index, row, col, proj, xm
+    cdef float h, h_row, x, frac, cos_angle
+    cdef float value
+    cdef float * sino_row
+    cdef float * image_row
+
+    assert c_images.shape[0] == num_slices
+    assert c_cos.shape[0] >= num_projs and c_sin.shape[0] >= num_projs
+
+    with nogil:
+        for index in prange(num_slices * num_projs, schedule='guided'):
+            slice_index = index // num_projs
+            proj = index % num_projs
+            sino_row = &c_sinos[slice_index, proj, 0]
+            cos_angle = c_cos[proj]
+            for row in range(height):
+                image_row = &c_images[slice_index, row, 0]
+                h_row = (detector_axis - axis * cos_angle -
+                         (row - axis) * c_sin[proj])
+                for col in range(width):
+                    h = h_row + col * cos_angle
+                    if h < 0 or h >= num_bins:
+                        continue
+                    value = image_row[col]
+                    x = h if h < num_bins - 1 else num_bins - 1
+                    xm = <int> x
+                    frac = x - xm
+                    if frac == 0:
+                        sino_row[xm] += value
+                    else:
+                        sino_row[xm] += (1. - frac) * value
+                        sino_row[xm + 1] += frac * value
+
+
+class Backprojection(object):
+    """A class for performing the (filtered) backprojection on the CPU.
+
+    The constructor has the same parameters as
+    :class:`silx.opencl.backprojection.Backprojection`. The OpenCL related
+    parameters are ignored.
+
+    :param sino_shape: Shape of the sinogram (num_projs, num_bins).
+    :param slice_shape: Optional, shape of the reconstructed slice. By
+                        default, it is a square slice where the dimension
+                        is the number of bins.
+    :param axis_position: Optional, axis position. Default is
+                          `(shape[1]-1)/2.0`.
+    :param angles: Optional, a list of custom angles in radian.
+    :param filter_name: Optional, name of the filter for FBP. Default is
+                        the Ram-Lak filter.
+    :param ctx: Ignored
+    :param devicetype: Ignored
+    :param platformid: Ignored
+    :param deviceid: Ignored
+    :param profile: Ignored
+    """
+
+    def __init__(self, sino_shape, slice_shape=None, axis_position=None,
+                 angles=None, filter_name=None, ctx=None, devicetype="all",
+                 platformid=None, deviceid=None, profile=False):
+        self.shape = sino_shape
+        self.num_bins = numpy.int32(sino_shape[1])
+        self.num_projs = numpy.int32(sino_shape[0])
+        self.angles = angles
+        if slice_shape is None:
+            self.slice_shape = (self.num_bins, self.num_bins)
+        else:
+            self.slice_shape = slice_shape
+        self.filter_name = filter_name if filter_name else "Ram-Lak"
+        if axis_position is not None:
+            self.axis_pos = numpy.float32(axis_position)
+        else:
+            self.axis_pos = numpy.float32((sino_shape[1] - 1.) / 2)
+        self.fft_size = _nextpow2(self.num_bins * 2 - 1)
+        self.compute_filter()
+        self.compute_angles()
+        self.filtered_sino = None
+
+    def compute_angles(self):
+        if self.angles is None:
+            self.angles = numpy.linspace(0, numpy.pi, self.num_projs, False)
+        self._cos = numpy.ascontiguousarray(numpy.cos(self.angles),
+                                            dtype=numpy.float64)
+        self._sin = numpy.ascontiguousarray(numpy.sin(self.angles),
+                                            dtype=numpy.float64)
+
+    def compute_filter(self):
+        """
+        Compute the filter for FBP
+        """
+        if self.filter_name == "Ram-Lak":
+            self.filter = ramlak_filter(self.fft_size)
+        else:
+            raise ValueError("Filter %s is not available" % self.filter_name)
+
+    def _check_sino(self, sino):
+        """Returns sinograms as a 3D array and whether input was 2D"""
+        sino = numpy.asarray(sino)
+        if sino.shape[-2:] != (self.num_projs, self.num_bins):
+            raise ValueError(
+                "Expected sinogram with (projs, bins) = (%d, %d)" %
+                (self.num_projs, self.num_bins))
+        if sino.ndim == 2:
+            return sino.reshape((1,) + sino.shape), True
+        elif sino.ndim == 3:
+            return sino, False
+        else:
+            raise ValueError("Expected a 2D sinogram or a 3D stack")
+
+    def backprojection(self, sino=None, dst=None):
+        """Perform the backprojection of sinogram(s)
+
+        :param sino: Sinogram (num_projs, num_bins) or stack of sinograms
+            (num_slices, num_projs, num_bins).
+            If not provided, the last filtered sinograms are backprojected.
+        :param dst: Optional C-contiguous float32 array in which to write
+            the result.
+        :return: Backprojection as a 2D slice or a stack of slices
+        """
+        if sino is None:
+            if self.filtered_sino is None:
+                raise RuntimeError("No sinogram to backproject")
+            sinos, is_2d = self.filtered_sino
+        else:
+            sinos, is_2d = self._check_sino(sino)
+            sinos = numpy.ascontiguousarray(sinos, dtype=numpy.float32)
+
+        shape = (len(sinos),) + tuple(self.slice_shape)
+        if dst is None:
+            res = numpy.zeros(shape, dtype=numpy.float32)
+        else:
+            res = dst.reshape(shape)
+            res[:] = 0
+        backproject(sinos, res, self._cos, self._sin, self.axis_pos)
+
+        if dst is not None:
+            return dst
+        return res[0] if is_2d else res
+
+    def filter_projections(self, sino, rescale=True):
+        """Filter the projections of sinogram(s) for the FBP.
+
+        The filtered sinograms are stored for the next call of
+        :meth:`backprojection` without sinogram.
+
+        :param sino: Sinogram or stack of sinograms to filter
+        :param rescale: if True (default), the sinogram is multiplied with
+                        (pi/n_projs)
+        :return: The filtered sinogram(s)
+        """
+        sinos, is_2d = self._check_sino(sino)
+        if rescale:
+            sinos = sinos * numpy.float32(numpy.pi / self.num_projs)
+        filtered = fourier_filter(sinos, filter_=self.filter,
+                                  fft_size=self.fft_size)
+        self.filtered_sino = filtered, is_2d
+        return filtered[0] if is_2d else filtered
+
+    def filtered_backprojection(self, sino):
+        """
+        Compute the filtered backprojection (FBP) on sinogram(s).
+
+        :param sino: sinogram (`numpy.ndarray`) in the format (projections,
+                     bins) or stack of sinograms in the format
+                     (slices, projections, bins)
+        :return: The reconstructed slice or stack of slices
+        """
+        self.filter_projections(sino)
+        return self.backprojection()
+
+    __call__ = filtered_backprojection
+
+
+class Projection(object):
+    """A class for performing a tomographic projection (Radon Transform) on
+    the CPU.
+
+    The constructor has the same parameters as
+    :class:`silx.opencl.projection.Projection`. The OpenCL related
+    parameters are ignored.
+    The projection is the adjoint of :meth:`Backprojection.backprojection`.
+
+    :param slice_shape: shape of the slice: (num_rows, num_columns).
+    :param angles: Either an integer number of angles, or a list of custom
+                   angles values in radian.
+    :param axis_position: Optional, axis position. Default is
+                          `(shape[1]-1)/2.0`.
+    :param detector_width: Optional, detector width in pixels.
+                           If detector_width > slice_shape[1], the
+                           projection data will be surrounded with zeros.
+    :param normalize: Optional, normalization. If set, the sinograms are
+                      multiplied by the factor pi/(2*nprojs).
+    :param ctx: Ignored
+    :param devicetype: Ignored
+    :param platformid: Ignored
+    :param deviceid: Ignored
+    :param profile: Ignored
+    """
+
+    def __init__(self, slice_shape, angles, axis_position=None,
+                 detector_width=None, normalize=False, ctx=None,
+                 devicetype="all", platformid=None, deviceid=None,
+                 profile=False):
+        self.shape = slice_shape
+        self.axis_pos = axis_position
+        self.angles = angles
+        self.dwidth = detector_width
+        self.normalize = normalize
+
+        # Default values
+        if self.axis_pos is None:
+            self.axis_pos = (self.shape[1] - 1) / 2.
+        if self.dwidth is None:
+            self.dwidth = self.shape[1]
+        if not(numpy.iterable(self.angles)):
+            if self.angles is None:
+                self.nprojs = self.shape[0]
+            else:
+                self.nprojs = self.angles
+            self.angles = numpy.linspace(start=0,
+                                         stop=numpy.pi,
+                                         num=self.nprojs,
+                                         endpoint=False).astype(numpy.float32)
+        else:
+            self.nprojs = len(self.angles)
+        # Center the slice on the detector
+        self.detector_axis_pos = self.axis_pos + (self.dwidth - self.shape[1]) / 2.
+        self._cos = numpy.ascontiguousarray(numpy.cos(self.angles),
+                                            dtype=numpy.float64)
+        self._sin = numpy.ascontiguousarray(numpy.sin(self.angles),
+                                            dtype=numpy.float64)
+
+    def projection(self, image, dst=None):
+        """Perform the projection of image(s)
+
+        :param image: Image to project or stack of images
+            (num_slices, num_rows, num_columns)
+        :param dst: Optional C-contiguous float32 array in which to write
+            the result.
+        :return: A sinogram or a stack of sinograms
+        """
+        image = numpy.asarray(image)
+        if tuple(image.shape[-2:]) != tuple(self.shape):
+            raise ValueError("Expected image(s) of shape %s" % (self.shape,))
+        is_2d = image.ndim == 2
+        images = numpy.ascontiguousarray(image.reshape((-1,) + image.shape[-2:]),
+                                         dtype=numpy.float32)
+
+        shape = (len(images), self.nprojs, self.dwidth)
+        if dst is None:
+            res = numpy.zeros(shape, dtype=numpy.float32)
+        else:
+            res = dst.reshape(shape)
+            res[:] = 0
+        project(images, res, self._cos, self._sin,
+                self.axis_pos, self.detector_axis_pos)
+        if self.normalize:
+            res *= numpy.float32(numpy.pi / (2 * self.nprojs))
+
+        if dst is not None:
+            return dst
+        return res[0] if is_2d else res
+
+    __call__ = projection
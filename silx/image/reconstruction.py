@@ -1,6 +1,6 @@
 # coding: utf-8
 # /*##########################################################################
-# Copyright (C) 2017 European Synchrotron Radiation Facility
+# Copyright (C) 2017-2026 European Synchrotron Radiation Facility
 #
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the "Software"), to deal
@@ -22,4 +22,41 @@
 #
 # ############################################################################*/
 
-from silx.opencl.reconstruction import *
+"""Tomographic reconstruction algorithms.
+
+Iterative algorithms are implemented in :mod:`silx.opencl.reconstruction`
+and require an OpenCL device. Without it, creating them raises a
+RuntimeError and only :class:`Backprojection` and :class:`Projection` are
+available, using the CPU implementation from :mod:`silx.image.radon`.
+
+Implementations are selected when an instance is created, so that
+importing this module does not probe OpenCL devices.
+"""
+
+from silx.opencl import common as _common
+from silx.image.backprojection import Backprojection
+from silx.image.projection import Projection
+
+
+class ReconstructionAlgorithm(object):
+    """Base class of iterative reconstruction algorithms.
+
+    Creating an instance returns the class of the same name from
+    :mod:`silx.opencl.reconstruction`, see it for the parameters.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        if not _common.ocl:  # Probes OpenCL devices on first use
+            raise RuntimeError("%s requires an OpenCL device" % cls.__name__)
+        from silx.opencl import reconstruction
+        return getattr(reconstruction, cls.__name__)(*args, **kwargs)
+
+
+class SIRT(ReconstructionAlgorithm):
+    """Simultaneous Iterative Reconstruction Technique,
+    see :class:`silx.opencl.reconstruction.SIRT`"""
+
+
+class TV(ReconstructionAlgorithm):
+    """Total Variation regularized reconstruction,
+    see :class:`silx.opencl.reconstruction.TV`"""
@@ -28,6 +28,8 @@
 - :func:`draw_line` function generates coordinates of a line in an image.
 - :func:`polygon_fill_mask` function generates a mask from a set of points
   defining a polygon.
+- :func:`fill_polygons`, :func:`fill_disks` and :func:`draw_lines` functions
+  draw many shapes at once in an existing mask.
 
 The :class:`Polygon` class provides checking if a point is inside a polygon.
 
@@ -37,13 +39,22 @@ for 2D coordinates.
 
 __authors__ = ["Jérôme Kieffer", "T. Vincent"]
 __license__ = "MIT"
-__date__ = "03/06/2016"
+__date__ = "19/10/2026"
 __status__ = "dev"
 
 
 cimport cython
+from cython.parallel import prange, parallel
 import numpy
 from libc.math cimport ceil, fabs
+from libc.stdlib cimport malloc, free, abs
+from libc.stdint cimport uint8_t, uint16_t, int32_t
+
+
+ctypedef fused mask_t:
+    uint8_t
+    uint16_t
+    int32_t
 
 
 cdef class Polygon(object):
@@ -293,3 +304,330 @@ def circle_fill(int crow, int ccol, float radius):
     rows, cols = numpy.where(coords.reshape(1, len_coords) +
                              coords.reshape(len_coords, 1) < radius ** 2)
     return rows + crow - i_radius, cols + ccol - i_radius
+
+
+def _prepare_mask(mask, nshapes, values, replace):
+    """Returns arguments for the functions drawing many shapes in a mask.
+
+    :param numpy.ndarray mask: The mask to update in place
+    :param int nshapes: Number of shapes to draw
+    :param values: Value or sequence of values for each shape
+    :param replace: Value of pixels to change or None for all pixels
+    :raises ValueError: If the mask is not supported or values or replace
+        are out of the range of the mask type
+    :return: (mask as 2D array of supported type, values as array of the
+        mask type, whether replace is used, replace value)
+    """
+    if not isinstance(mask, numpy.ndarray) or mask.ndim != 2:
+        raise ValueError("mask must be a 2D numpy.ndarray")
+    if not mask.flags.c_contiguous or not mask.flags.writeable:
+        raise ValueError("mask must be a writable C-contiguous array")
+
+    values = numpy.broadcast_to(values, (nshapes,))
+    use_replace = replace is not None
+    replace = 0 if replace is None else replace
+    if mask.dtype == numpy.bool_:
+        # Any non-zero value sets the pixel to True
+        mask = mask.view(numpy.uint8)
+        values = values.astype(bool)
+        replace = bool(replace)
+    elif mask.dtype not in (numpy.uint8, numpy.uint16, numpy.int32):
+        raise ValueError("Unsupported mask dtype: %s" % mask.dtype)
+
+    info = numpy.iinfo(mask.dtype)
+    min_value, max_value = info.min, info.max
+    for value in numpy.append(values, replace):
+        if not min_value <= value <= max_value:
+            raise ValueError("Value %s out of range of the mask [%d, %d]" %
+                             (value, min_value, max_value))
+    values = numpy.ascontiguousarray(values, dtype=mask.dtype)
+    return mask, values, use_replace, replace
+
+
+@cython.cdivision(True)
+@cython.wraparound(False)
+@cython.boundscheck(False)
+def _fill_polygons(mask_t[:, ::1] mask,
+                   float[:, ::1] vertices,
+                   int[::1] offsets,
+                   int[::1] row_min,
+                   int[::1] row_max,
+                   mask_t[::1] values,
+                   bint use_replace,
+                   mask_t replace):
+    """Scanline fill of polygons in a mask, see :func:`fill_polygons`"""
+    cdef int height = mask.shape[0]
+    cdef int width = mask.shape[1]
+    cdef int npolygons = offsets.shape[0] - 1
+    cdef int max_nvert = 0
+    cdef int first_row = height, last_row = 0
+    cdef int row, col, index, polygon, start, stop, count, i, j
+    cdef int xinters, col_start, col_end
+    cdef float pt1x, pt1y, pt2x, pt2y
+    cdef int * intersections
+
+    for polygon in range(npolygons):
+        max_nvert = max(max_nvert, offsets[polygon + 1] - offsets[polygon])
+        first_row = min(first_row, row_min[polygon])
+        last_row = max(last_row, row_max[polygon])
+
+    with nogil, parallel():
+        intersections = <int *> malloc(max(max_nvert, 1) * sizeof(int))
+        for row in prange(first_row, last_row, schedule='guided'):
+            # Polygons are drawn in order so that last ones are on top
+            for polygon in range(npolygons):
+                if row < row_min[polygon] or row >= row_max[polygon]:
+                    continue
+
+                # Collect intersections of the polygon edges with the row
+                # as in Polygon.make_mask
+                start = offsets[polygon]
+                stop = offsets[polygon + 1]
+                count = 0
+                pt1x = vertices[stop - 1, 1]
+                pt1y = vertices[stop - 1, 0]
+                for index in range(start, stop):
+                    pt2x = vertices[index, 1]
+                    pt2y = vertices[index, 0]
+                    if ((pt1y <= row and row < pt2y) or
+                            (pt2y <= row and row < pt1y)):
+                        # Intersection casted to int so that ]x, x+1] => x
+                        xinters = (<int>ceil(pt1x + (row - pt1y) *
+                                   (pt2x - pt1x) / (pt2y - pt1y))) - 1
+                        # Insertion sort
+                        j = count
+                        while j > 0 and intersections[j - 1] > xinters:
+                            intersections[j] = intersections[j - 1]
+                            j = j - 1
+                        intersections[j] = xinters
+                        count = count + 1
+                    pt1x, pt1y = pt2x, pt2y
+
+                # Pixels ]x0, x1] between pairs of intersections are inside
+                for i in range(0, count - 1, 2):
+                    col_start = max(intersections[i] + 1, 0)
+                    col_end = min(intersections[i + 1] + 1, width)
+                    for col in range(col_start, col_end):
+                        if not use_replace or mask[row, col] == replace:
+                            mask[row, col] = values[polygon]
+        free(intersections)
+
+
+def fill_polygons(mask, polygons, values=1, replace=None):
+    """Fill many polygons in an existing mask.
+
+    Polygons are drawn in order, so the last ones are drawn on top of
+    the first ones. Each polygon is rasterized as with
+    :func:`polygon_fill_mask`, rows being processed in parallel and only
+    within the bounding box of the polygons.
+
+    :param numpy.ndarray mask: 2D C-contiguous mask of bool, uint8, uint16
+        or int32 updated in place.
+    :param polygons: Sequence of Nx2 arrays of polygon corners as (row, col)
+    :param values: The value to set in the polygons or a sequence of values,
+        one for each polygon (default: 1)
+    :param replace: If not None, only pixels of the mask with this value are
+        changed (e.g., values=0 and replace=level to unmask a level).
+    :raises ValueError: If values or replace do not fit in the mask type
+    :return: The mask
+    :rtype: numpy.ndarray
+    """
+    polygons = [numpy.asarray(polygon, dtype=numpy.float32).reshape(-1, 2)
+                for polygon in polygons]
+    polygons = [polygon for polygon in polygons if len(polygon) > 0]
+    target, values, use_replace, replace = _prepare_mask(
+        mask, len(polygons), values, replace)
+    if len(polygons) == 0:
+        return mask
+
+    height = target.shape[0]
+    vertices = numpy.ascontiguousarray(numpy.concatenate(polygons))
+    offsets = numpy.zeros(len(polygons) + 1, dtype=numpy.int32)
+    offsets[1:] = numpy.cumsum([len(polygon) for polygon in polygons])
+    # Bounding boxes of polygons as in Polygon.make_mask
+    row_min = numpy.array(
+        [max(int(min(polygon[:, 0])), 0) for polygon in polygons],
+        dtype=numpy.int32)
+    row_max = numpy.array(
+        [min(int(max(polygon[:, 0])) + 1, height) for polygon in polygons],
+        dtype=numpy.int32)
+
+    _fill_polygons(target, vertices, offsets, row_min, row_max,
+                   values, use_replace, replace)
+    return mask
+
+
+@cython.wraparound(False)
+@cython.boundscheck(False)
+def _fill_disks(mask_t[:, ::1] mask,
+                int[:, ::1] centers,
+                float[::1] radii,
+                mask_t[::1] values,
+                bint use_replace,
+                mask_t replace):
+    """Fill disks in a mask, see :func:`fill_disks`"""
+    cdef int height = mask.shape[0]
+    cdef int width = mask.shape[1]
+    cdef int ndisks = centers.shape[0]
+    cdef int first_row = height, last_row = 0
+    cdef int row, col, disk, i_radius, i_ceil, drow, dcol
+    cdef float radius, radius2
+
+    for disk in range(ndisks):
+        radius = fabs(radii[disk])
+        first_row = min(first_row, max(0, centers[disk, 0] - <int> radius))
+        last_row = max(last_row, min(
+            height, centers[disk, 0] + <int> ceil(radius) + 1))
+
+    with nogil:
+        for row in prange(first_row, last_row, schedule='guided'):
+            # Disks are drawn in order so that last ones are on top
+            for disk in range(ndisks):
+                # Same points as circle_fill
+                radius = fabs(radii[disk])
+                i_radius = <int> radius
+                i_ceil = <int> ceil(radius)
+                drow = row - centers[disk, 0]
+                if drow < - i_radius or drow > i_ceil:
+                    continue
+                radius2 = radius * radius
+                for dcol in range(max(- i_radius, - centers[disk, 1]),
+                                  min(i_ceil + 1, width - centers[disk, 1])):
+                    if <float> (drow * drow + dcol * dcol) < radius2:
+                        col = centers[disk, 1] + dcol
+                        if not use_replace or mask[row, col] == replace:
+                            mask[row, col] = values[disk]
+
+
+def fill_disks(mask, centers, radii, values=1, replace=None):
+    """Fill many disks in an existing mask.
+
+    Disks are drawn in order, so the last ones are drawn on top of
+    the first ones. Each disk contains the same pixels as
+    :func:`circle_fill`, rows being processed in parallel.
+
+    :param numpy.ndarray mask: 2D C-contiguous mask of bool, uint8, uint16
+        or int32 updated in place.
+    :param centers: Nx2 array of int coordinates of the centers (row, col)
+    :param radii: Radius of the disks or sequence of N radii
+    :param values: The value to set in the disks or a sequence of values,
+        one for each disk (default: 1)
+    :param replace: If not None, only pixels of the mask with this value are
+        changed.
+    :raises ValueError: If values or replace do not fit in the mask type
+    :return: The mask
+    :rtype: numpy.ndarray
+    """
+    centers = numpy.ascontiguousarray(
+        numpy.reshape(centers, (-1, 2)), dtype=numpy.int32)
+    radii = numpy.ascontiguousarray(
+        numpy.broadcast_to(radii, (len(centers),)), dtype=numpy.float32)
+    target, values, use_replace, replace = _prepare_mask(
+        mask, len(centers), values, replace)
+    if len(centers) > 0:
+        _fill_disks(target, centers, radii, values, use_replace, replace)
+    return mask
+
+
+@cython.wraparound(False)
+@cython.boundscheck(False)
+def _draw_lines(mask_t[:, ::1] mask,
+                int[:, ::1] lines,
+                int[::1] widths,
+                mask_t[::1] values,
+                bint use_replace,
+                mask_t replace):
+    """Draw lines in a mask, see :func:`draw_lines`"""
+    cdef int height = mask.shape[0]
+    cdef int width = mask.shape[1]
+    cdef int line, row0, col0, row1, col1, line_width
+    cdef int drow, dcol, invert_coords
+    cdef int db, da, delta, b, a, step_a, step_b
+    cdef int index, offset, row, col
+    cdef mask_t value
+
+    with nogil:
+        for line in range(lines.shape[0]):
+            row0, col0 = lines[line, 0], lines[line, 1]
+            row1, col1 = lines[line, 2], lines[line, 3]
+            line_width = max(widths[line], 1)
+            value = values[line]
+
+            # Same Bresenham algorithm as draw_line
+            dcol = abs(col1 - col0)
+            drow = abs(row1 - row0)
+            invert_coords = dcol < drow
+
+            if dcol == 0 and drow == 0:
+                if 0 <= row0 < height and 0 <= col0 < width:
+                    if not use_replace or mask[row0, col0] == replace:
+                        mask[row0, col0] = value
+                continue
+
+            if not invert_coords:
+                da = dcol
+                db = drow
+                step_a = 1 if col1 > col0 else -1
+                step_b = 1 if row1 > row0 else -1
+                a = col0
+                b = row0
+            else:
+                da = drow
+                db = dcol
+                step_a = 1 if row1 > row0 else -1
+                step_b = 1 if col1 > col0 else -1
+                a = row0
+                b = col0
+
+            b -= (line_width - 1) // 2
+            delta = 2 * db - da
+            for index in range(da + 1):
+                for offset in range(line_width):
+                    if not invert_coords:
+                        row, col = b + offset, a
+                    else:
+                        row, col = a, b + offset
+                    if 0 <= row < height and 0 <= col < width:
+                        if not use_replace or mask[row, col] == replace:
+                            mask[row, col] = value
+
+                if delta >= 0:  # M2: Move by step_a + step_b
+                    b += step_b
+                    delta -= 2 * da
+                # else M1: Move by step_a
+
+                a += step_a
+                delta += 2 * db
+
+
+def draw_lines(mask, starts, ends, widths=1, values=1, replace=None):
+    """Draw many lines in an existing mask.
+
+    Lines are drawn in order with the same pixels as :func:`draw_line`.
+
+    :param numpy.ndarray mask: 2D C-contiguous mask of bool, uint8, uint16
+        or int32 updated in place.
+    :param starts: Nx2 array of int coordinates of start points (row, col)
+    :param ends: Nx2 array of int coordinates of end points (row, col)
+    :param widths: Thickness of the lines in pixels or a sequence of N
+        thicknesses (default: 1)
+    :param values: The value to set on the lines or a sequence of values,
+        one for each line (default: 1)
+    :param replace: If not None, only pixels of the mask with this value are
+        changed.
+    :raises ValueError: If values or replace do not fit in the mask type
+    :return: The mask
+    :rtype: numpy.ndarray
+    """
+    starts = numpy.reshape(starts, (-1, 2))
+    ends = numpy.reshape(ends, (-1, 2))
+    assert len(starts) == len(ends)
+    lines = numpy.ascontiguousarray(numpy.concatenate((starts, ends), axis=1),
+                                    dtype=numpy.int32)
+    widths = numpy.ascontiguousarray(
+        numpy.broadcast_to(widths, (len(lines),)), dtype=numpy.int32)
+    target, values, use_replace, replace = _prepare_mask(
+        mask, len(lines), values, replace)
+    if len(lines) > 0:
+        _draw_lines(target, lines, widths, values, use_replace, replace)
+    return mask
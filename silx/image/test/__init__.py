@@ -25,13 +25,15 @@
 
 __authors__ = ["J. Kieffer"]
 __license__ = "MIT"
-__date__ = "17/04/2018"
+__date__ = "19/10/2026"
 
 import unittest
 from . import test_bilinear
 from . import test_shapes
 from . import test_medianfilter
 from . import test_tomography
+from . import test_radon
+from . import test_phantomgenerator
 from ..marchingsquares.test import suite as marchingsquares_suite
 
 
@@ -42,5 +44,7 @@ def suite():
     test_suite.addTest(test_medianfilter.suite())
     test_suite.addTest(test_shapes.suite())
     test_suite.addTest(test_tomography.suite())
+    test_suite.addTest(test_radon.suite())
+    test_suite.addTest(test_phantomgenerator.suite())
     test_suite.addTest(marchingsquares_suite())
     return test_suite
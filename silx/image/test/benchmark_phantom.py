@@ -0,0 +1,160 @@
+# coding: utf-8
+# /*##########################################################################
+# Copyright (C) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Benchmarks of phantom generation, and of reconstruction and isosurface
+extraction using phantoms as input data"""
+
+__authors__ = ["P. Paleo"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from silx.image import radon
+from silx.image.phantomgenerator import phantom, phantom_to_hdf5
+from silx.math.marchingcubes import MarchingCubes, marching_cubes_slabs
+
+_logger = logging.getLogger(__name__)
+_logger.setLevel(logging.DEBUG)
+
+
+class BenchmarkPhantom(unittest.TestCase):
+    """Benchmark phantom generation and its use as input data"""
+
+    SIZES = 128, 256
+    """Size of the phantom along each dimension"""
+
+    NSLICES = 4
+    """Number of slices of the phantom reconstructed"""
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def _phantom_file(self, size):
+        """Write a size**3 phantom to a HDF5 file and return its name"""
+        filename = os.path.join(self.tempdir, 'phantom%d.h5' % size)
+        with h5py.File(filename, 'w') as h5file:
+            dataset = h5file.create_dataset(
+                'phantom', shape=(size, size, size), dtype='float32',
+                chunks=(min(size, 32), size, size))
+            start = time.time()
+            phantom_to_hdf5(dataset)
+            _logger.info('%d^3 phantom to HDF5: %.3f s',
+                         size, time.time() - start)
+        return filename
+
+    def test_generation(self):
+        """Benchmark 2D and 3D phantom generation in memory"""
+        for size in self.SIZES:
+            start = time.time()
+            image = phantom((4 * size, 4 * size))
+            duration_2d = time.time() - start
+
+            start = time.time()
+            volume = phantom((size, size, size))
+            duration_3d = time.time() - start
+
+            out = numpy.empty_like(volume)
+            start = time.time()
+            phantom((size, size, size), out=out)
+            duration_out = time.time() - start
+
+            _logger.info('%d^2 phantom %.3f s\t%d^3 phantom %.3f s'
+                         '\t%d^3 phantom in buffer %.3f s',
+                         4 * size, duration_2d, size, duration_3d,
+                         size, duration_out)
+            self.assertTrue(numpy.array_equal(volume, out))
+            self.assertGreater(image.max(), 0)
+
+    def test_reconstruction(self):
+        """Benchmark projection and reconstruction of phantom slices"""
+        for size in self.SIZES:
+            volume = phantom((size, size, size))
+            slices = volume[size // 2 - self.NSLICES:
+                            size // 2 + self.NSLICES:2]
+            projection = radon.Projection((size, size), size)
+            backprojection = radon.Backprojection((size, size))
+
+            start = time.time()
+            sinos = projection(slices)
+            projection_duration = time.time() - start
+
+            start = time.time()
+            result = backprojection.filtered_backprojection(sinos)
+            fbp_duration = time.time() - start
+
+            _logger.info('%d slices %dx%d: projection %.3f s\tFBP %.3f s',
+                         len(slices), size, size,
+                         projection_duration, fbp_duration)
+            self.assertEqual(result.shape, slices.shape)
+
+    @unittest.skipIf(h5py is None, "h5py is not available")
+    def test_isosurface(self):
+        """Benchmark isosurface extraction of a phantom from a HDF5 file
+        by slabs and from memory"""
+        for size in self.SIZES:
+            filename = self._phantom_file(size)
+            with h5py.File(filename, 'r') as h5file:
+                dataset = h5file['phantom']
+
+                start = time.time()
+                vertices, normals, indices = marching_cubes_slabs(
+                    dataset, isolevel=0.005)
+                slabs_duration = time.time() - start
+
+                start = time.time()
+                mc = MarchingCubes(dataset[()], isolevel=0.005)
+                memory_duration = time.time() - start
+
+            _logger.info('%d^3 isosurface: HDF5 slabs %.3f s\t'
+                         'memory %.3f s\t%d triangles',
+                         size, slabs_duration, memory_duration, len(indices))
+            self.assertTrue(numpy.array_equal(indices, mc.get_indices()))
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(
+        BenchmarkPhantom))
+    return test_suite
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,126 @@
+# coding: utf-8
+# /*##########################################################################
+# Copyright (C) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Benchmark of the CPU filtered backprojection versus the OpenCL one
+running on a CPU device (e.g., pocl)"""
+
+__authors__ = ["P. Paleo"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import logging
+import time
+import unittest
+
+import numpy
+
+from silx.image import radon
+from silx.opencl.common import ocl
+
+try:
+    import mako
+except ImportError:
+    mako = None
+
+if ocl is not None:
+    from silx.opencl import backprojection as ocl_backprojection
+
+_logger = logging.getLogger(__name__)
+_logger.setLevel(logging.DEBUG)
+
+
+class BenchmarkBackprojection(unittest.TestCase):
+    """Benchmark the filtered backprojection of a stack of sinograms"""
+
+    SIZES = 256, 512
+    """Number of detector bins"""
+
+    NSLICES = 4
+
+    def _sinograms(self, size):
+        nprojs = size
+        image = numpy.zeros((size, size), dtype=numpy.float32)
+        image[size // 4:size // 2, size // 3:3 * size // 4] = 1
+        sino = radon.Projection(image.shape, nprojs)(image)
+        return numpy.array([sino] * self.NSLICES)
+
+    def _measure(self, function, sinos):
+        start = time.time()
+        result = [function(sino) for sino in sinos]
+        return time.time() - start, numpy.array(result)
+
+    @unittest.skipUnless(ocl and mako, "pyopencl is missing")
+    def test_cpu_vs_opencl(self):
+        """Compare the CPU implementation with OpenCL on a CPU device"""
+        for size in self.SIZES:
+            sinos = self._sinograms(size)
+            try:
+                ocl_fbp = ocl_backprojection.Backprojection(
+                    sinos.shape[1:], devicetype="CPU")
+            except Exception as e:
+                self.skipTest("No OpenCL CPU device available: %s" % e)
+            cpu_fbp = radon.Backprojection(sinos.shape[1:])
+
+            ocl_duration, ocl_result = self._measure(
+                ocl_fbp.filtered_backprojection, sinos)
+            cpu_duration, cpu_result = self._measure(
+                cpu_fbp.filtered_backprojection, sinos)
+
+            start = time.time()
+            stack_result = cpu_fbp.filtered_backprojection(sinos)
+            stack_duration = time.time() - start
+
+            _logger.info(
+                '%dx%d: OpenCL CPU %.3f s\tCPU %.3f s\tCPU stack %.3f s',
+                size, size, ocl_duration, cpu_duration, stack_duration)
+            self.assertTrue(numpy.allclose(stack_result, cpu_result))
+            self.assertLess(numpy.abs(ocl_result - cpu_result).mean(), 1e-2)
+
+    def test_cpu(self):
+        """Benchmark the CPU implementation slice by slice and by stack"""
+        for size in self.SIZES:
+            sinos = self._sinograms(size)
+            fbp = radon.Backprojection(sinos.shape[1:])
+            duration, result = self._measure(fbp.filtered_backprojection,
+                                             sinos)
+
+            start = time.time()
+            stack_result = fbp.filtered_backprojection(sinos)
+            stack_duration = time.time() - start
+
+            _logger.info('%dx%d: CPU %.3f s\tCPU stack %.3f s',
+                         size, size, duration, stack_duration)
+            self.assertTrue(numpy.allclose(stack_result, result))
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(
+        BenchmarkBackprojection))
+    return test_suite
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(defaultTest='suite')
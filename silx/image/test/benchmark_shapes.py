@@ -0,0 +1,135 @@
+# coding: utf-8
+# /*##########################################################################
+# Copyright (C) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Benchmark of drawing many shapes in a mask at once versus shape by shape
+as done by the mask tools widget"""
+
+__authors__ = ["T. Vincent"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import logging
+import time
+import unittest
+
+import numpy
+
+from silx.image import shapes
+
+_logger = logging.getLogger(__name__)
+_logger.setLevel(logging.DEBUG)
+
+
+class BenchmarkShapes(unittest.TestCase):
+    """Benchmark drawing hundreds of ROIs in a large label mask"""
+
+    SHAPE = 4096, 4096
+
+    NSHAPES = 100, 500
+
+    def setUp(self):
+        self.random = numpy.random.RandomState(0)
+
+    def _benchmark(self, name, per_shape, batched):
+        """Run and compare per shape and batched drawing"""
+        ref_mask = numpy.zeros(self.SHAPE, dtype=numpy.uint16)
+        start = time.time()
+        per_shape(ref_mask)
+        per_shape_duration = time.time() - start
+
+        mask = numpy.zeros(self.SHAPE, dtype=numpy.uint16)
+        start = time.time()
+        batched(mask)
+        batched_duration = time.time() - start
+
+        _logger.info('%s\tper shape %.3f s\tbatched %.3f s\tx%.1f',
+                     name, per_shape_duration, batched_duration,
+                     per_shape_duration / batched_duration)
+        self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+    def test_polygons(self):
+        for nshapes in self.NSHAPES:
+            centers = self.random.uniform(0, self.SHAPE[0], (nshapes, 1, 2))
+            polygons = centers + self.random.uniform(-200, 200, (nshapes, 6, 2))
+
+            def per_shape(mask):
+                for index, polygon in enumerate(polygons):
+                    mask[shapes.polygon_fill_mask(
+                        polygon, self.SHAPE).astype(bool)] = index + 1
+
+            def batched(mask):
+                shapes.fill_polygons(mask, polygons,
+                                     numpy.arange(1, nshapes + 1))
+
+            self._benchmark('%d polygons' % nshapes, per_shape, batched)
+
+    def test_disks(self):
+        for nshapes in self.NSHAPES:
+            centers = self.random.randint(100, self.SHAPE[0] - 100,
+                                          (nshapes, 2))
+            radii = self.random.uniform(5, 100, nshapes)
+
+            def per_shape(mask):
+                for index, ((row, col), radius) in enumerate(
+                        zip(centers, radii)):
+                    rows, cols = shapes.circle_fill(row, col, radius)
+                    mask[rows, cols] = index + 1
+
+            def batched(mask):
+                shapes.fill_disks(mask, centers, radii,
+                                  numpy.arange(1, nshapes + 1))
+
+            self._benchmark('%d disks' % nshapes, per_shape, batched)
+
+    def test_lines(self):
+        for nshapes in self.NSHAPES:
+            starts = self.random.randint(0, self.SHAPE[0], (nshapes, 2))
+            ends = self.random.randint(0, self.SHAPE[0], (nshapes, 2))
+
+            def per_shape(mask):
+                for index, (start, end) in enumerate(zip(starts, ends)):
+                    rows, cols = shapes.draw_line(
+                        start[0], start[1], end[0], end[1], 3)
+                    valid = numpy.logical_and(
+                        numpy.logical_and(rows >= 0, rows < self.SHAPE[0]),
+                        numpy.logical_and(cols >= 0, cols < self.SHAPE[1]))
+                    mask[rows[valid], cols[valid]] = index + 1
+
+            def batched(mask):
+                shapes.draw_lines(mask, starts, ends, 3,
+                                  numpy.arange(1, nshapes + 1))
+
+            self._benchmark('%d lines' % nshapes, per_shape, batched)
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(
+        BenchmarkShapes))
+    return test_suite
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(defaultTest='suite')
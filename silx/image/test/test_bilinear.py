@@ -24,7 +24,7 @@
 
 __authors__ = ["J. Kieffer"]
 __license__ = "MIT"
-__date__ = "02/08/2016"
+__date__ = "19/10/2026"
 
 import unittest
 import numpy
@@ -131,6 +131,54 @@ class TestBilinear(unittest.TestCase):
         self.assertLess(abs(res_ver - expected_profile).max(), 1e-5,
                         "correct vertical profile")
 
+    def test_map_out(self):
+        N = 50
+        y, x = numpy.mgrid[:N, :N]
+        img = numpy.random.random((N, N))
+        b = BilinearImage(img)
+        out = numpy.empty((N, N), dtype=numpy.float32)
+        res = b.map_coordinates((y + 0.25, x + 0.5), out=out)
+        self.assertIs(res, out)
+        self.assertTrue(numpy.array_equal(
+            res, b.map_coordinates((y + 0.25, x + 0.5))))
+
+        out = numpy.empty((N, N), dtype=numpy.float32, order="F")
+        with self.assertRaises(ValueError):
+            b.map_coordinates((y + 0.25, x + 0.5), out=out)
+
+    def test_profile_lines(self):
+        N = 100
+        numpy.random.seed(0)
+        img = numpy.random.random((N, N + 20))
+        b = BilinearImage(img)
+        src = numpy.random.uniform(-10, N + 10, (50, 2))
+        dst = numpy.random.uniform(-10, N + 10, (50, 2))
+        dst[0] = src[0]  # Single point profile
+        for linewidth in (1, 4):
+            for method in ('mean', 'sum'):
+                profiles = b.profile_lines(src, dst, linewidth, method)
+                for index, (start, end) in enumerate(zip(src, dst)):
+                    if index == 0:
+                        ref = [b(start)]
+                    else:
+                        ref = b.profile_line(start, end, linewidth, method)
+                    length = len(ref)
+                    self.assertTrue(numpy.array_equal(
+                        profiles[index, :length], ref))
+                    self.assertTrue(
+                        numpy.all(numpy.isnan(profiles[index, length:])))
+
+        # Radial profiles with a preallocated output
+        angles = numpy.linspace(0, 2 * numpy.pi, 36, endpoint=False)
+        center = numpy.array((N / 2., N / 2.))
+        ends = center + 40 * numpy.transpose((numpy.sin(angles),
+                                              numpy.cos(angles)))
+        out = numpy.empty((36, 50), dtype=numpy.float32)
+        res = b.profile_lines([center] * 36, ends, out=out)
+        self.assertIs(res, out)
+        self.assertTrue(numpy.array_equal(
+            res[3, :41], b.profile_line(center, ends[3])))
+
 
 def suite():
     testsuite = unittest.TestSuite()
@@ -139,4 +187,6 @@ def suite():
     testsuite.addTest(TestBilinear("test_map"))
     testsuite.addTest(TestBilinear("test_profile_grad"))
     testsuite.addTest(TestBilinear("test_profile_gaus"))
+    testsuite.addTest(TestBilinear("test_map_out"))
+    testsuite.addTest(TestBilinear("test_profile_lines"))
     return testsuite
@@ -0,0 +1,127 @@
+# coding: utf-8
+# /*##########################################################################
+#
+# Copyright (c) 2016 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Tests for phantom generation"""
+
+__authors__ = ["P. Paleo"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from silx.image.phantomgenerator import PhantomGenerator, phantom, \
+    phantom_to_hdf5
+
+
+def _reference(shape, ellipsoids):
+    """Evaluate ellipsoids over the whole grid"""
+    coords = [(2. * numpy.arange(size) - size) / size for size in shape]
+    if len(shape) == 2:
+        y, x = numpy.meshgrid(*coords, indexing='ij')
+        z = None
+    else:
+        z, y, x = numpy.meshgrid(*coords, indexing='ij')
+    result = numpy.zeros(shape)
+    for ell in ellipsoids:
+        distance = (
+            numpy.power((x * ell.cosAlpha + y * ell.sinAlpha - ell.x0) /
+                        ell.a, 2) +
+            numpy.power((- x * ell.sinAlpha + y * ell.cosAlpha - ell.y0) /
+                        ell.b, 2))
+        if z is not None:
+            distance = distance + numpy.power((z - ell.z0) / ell.c, 2)
+        result[distance <= 1] = (ell.mu + 0.1) * 5 / 100.0
+    return result
+
+
+class TestPhantom(unittest.TestCase):
+    """Tests of phantom and phantom_to_hdf5"""
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_2d(self):
+        for size in (1, 15, 64, 100):
+            ref = _reference((size, size), PhantomGenerator.SHEPP_LOGAN)
+            result = PhantomGenerator.get2DPhantomSheppLogan(size)
+            self.assertEqual(result.dtype, numpy.float64)
+            self.assertTrue(numpy.array_equal(result, ref))
+
+            result = PhantomGenerator.get2DPhantomSheppLogan(size, 4)
+            ref = _reference((size, size), PhantomGenerator.SHEPP_LOGAN[4:5])
+            self.assertTrue(numpy.array_equal(result, ref))
+
+        result = phantom((40, 60))
+        self.assertEqual(result.dtype, numpy.float32)
+        self.assertTrue(numpy.array_equal(
+            result,
+            _reference((40, 60), PhantomGenerator.SHEPP_LOGAN).astype(
+                numpy.float32)))
+
+    def test_3d(self):
+        shape = 30, 40, 50
+        ref = _reference(shape, PhantomGenerator.SHEPP_LOGAN)
+        out = numpy.ones(shape, dtype=numpy.float64)
+        result = phantom(shape, out=out)
+        self.assertIs(result, out)
+        self.assertTrue(numpy.array_equal(result, ref))
+
+        volume = numpy.ones(shape, dtype=numpy.float64)
+        phantom_to_hdf5(volume, slab_size=7)
+        self.assertTrue(numpy.array_equal(volume, ref))
+
+    @unittest.skipIf(h5py is None, "h5py is not available")
+    def test_hdf5(self):
+        shape = 33, 32, 32
+        filename = os.path.join(self.tempdir, 'phantom.h5')
+        with h5py.File(filename, 'w') as h5file:
+            dataset = h5file.create_dataset(
+                'phantom', shape=shape, dtype='float32', chunks=(8, 32, 32))
+            phantom_to_hdf5(dataset)
+            self.assertTrue(numpy.array_equal(dataset[()], phantom(shape)))
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestPhantom))
+    return test_suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,194 @@
+# coding: utf-8
+# /*##########################################################################
+# Copyright (C) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Tests of the CPU projection and backprojection"""
+
+__authors__ = ["P. Paleo"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import unittest
+import numpy
+
+from silx.image import radon
+
+
+def _disks(size):
+    """Returns an image of 2 disks"""
+    y, x = numpy.mgrid[:size, :size]
+    image = ((x - 0.45 * size) ** 2 + (y - 0.55 * size) ** 2 <
+             (0.25 * size) ** 2).astype(numpy.float32)
+    image[(x - 0.3 * size) ** 2 + (y - 0.3 * size) ** 2 <
+          (0.1 * size) ** 2] += 0.5
+    return image
+
+
+def _inscribed_circle(size, radius, center=None):
+    """Returns the mask of a circle in a square image"""
+    y, x = numpy.ogrid[:size, :size]
+    if center is None:
+        center = (size - 1) / 2.
+    return (x - center) ** 2 + (y - center) ** 2 < radius ** 2
+
+
+class TestBackprojection(unittest.TestCase):
+    """Tests of the CPU Backprojection"""
+
+    def setUp(self):
+        self.size = 64
+        self.nprojs = 90
+        numpy.random.seed(0)
+        self.sino = numpy.random.random(
+            (self.nprojs, self.size)).astype(numpy.float32)
+
+    def reference_backprojection(self, sino, angles, axis):
+        """Backprojection computed with numpy"""
+        y, x = numpy.mgrid[:self.size, :self.size]
+        result = numpy.zeros((self.size, self.size))
+        for projection, angle in zip(sino, angles):
+            h = axis + (x - axis) * numpy.cos(angle) - (y - axis) * numpy.sin(angle)
+            h = numpy.clip(h, 0, self.size - 1)
+            result += numpy.interp(h, numpy.arange(self.size), projection)
+        return result
+
+    def test_backprojection(self):
+        """Compare plain backprojection with a reference in the inscribed
+        circle"""
+        for axis_position in (None, 30.25):
+            backprojection = radon.Backprojection(
+                self.sino.shape, axis_position=axis_position)
+            result = backprojection.backprojection(self.sino)
+            self.assertEqual(result.shape, (self.size, self.size))
+
+            ref = self.reference_backprojection(
+                self.sino, backprojection.angles, backprojection.axis_pos)
+            # Compare where the backprojection is not truncated
+            axis = backprojection.axis_pos
+            radius = min(axis, self.size - 1 - axis) - 1
+            mask = _inscribed_circle(self.size, radius, center=axis)
+            self.assertTrue(numpy.allclose(result[mask], ref[mask],
+                                           rtol=1e-4))
+
+    def test_stack(self):
+        """Test backprojection of a stack of sinograms"""
+        backprojection = radon.Backprojection(self.sino.shape)
+        sinos = numpy.array((self.sino, 2 * self.sino, self.sino[::-1]))
+        result = backprojection.filtered_backprojection(sinos)
+        self.assertEqual(result.shape, (3, self.size, self.size))
+        for sino, slice_ in zip(sinos, result):
+            self.assertTrue(numpy.array_equal(
+                slice_, backprojection.filtered_backprojection(sino)))
+
+        dst = numpy.empty((3, self.size, self.size), dtype=numpy.float32)
+        self.assertIs(backprojection.backprojection(sinos, dst=dst), dst)
+        self.assertTrue(numpy.array_equal(
+            dst, backprojection.backprojection(sinos)))
+
+        with self.assertRaises(ValueError):
+            backprojection.filtered_backprojection(self.sino[:, 1:])
+
+    def test_fourier_filter(self):
+        """Compare batched fourier_filter with a complex FFT convolution"""
+        fft_size = 128
+        h = numpy.zeros(fft_size)
+        h[0] = 1 / 4.
+        j = numpy.arange(1, fft_size // 2, 2)
+        h[j] = -1. / (numpy.pi * j) ** 2
+        h[fft_size - j] = h[j]
+        ref = numpy.fft.ifft(numpy.fft.fft(self.sino, fft_size) *
+                             numpy.fft.fft(h)).real[:, :self.size]
+
+        result = radon.fourier_filter(self.sino, fft_size=fft_size)
+        self.assertTrue(numpy.allclose(result, ref, atol=1e-5))
+
+        result = radon.fourier_filter(numpy.array((self.sino, self.sino)))
+        self.assertTrue(numpy.allclose(result[1], ref, atol=1e-5))
+
+    def test_fbp(self):
+        """Reconstruct a phantom from its projection"""
+        size = 128
+        phantom = _disks(size)
+        sino = radon.Projection(phantom.shape, 180)(phantom)
+        result = radon.Backprojection(sino.shape)(sino)
+
+        mask = _inscribed_circle(size, 0.45 * size)
+        error = numpy.abs(result - phantom)[mask]
+        self.assertLess(error.mean(), 0.05)
+
+
+class TestProjection(unittest.TestCase):
+    """Tests of the CPU Projection"""
+
+    def test_adjoint(self):
+        """Test that projection is the adjoint of backprojection"""
+        size, nprojs = 48, 60
+        numpy.random.seed(0)
+        image = numpy.random.random((size, size)).astype(numpy.float32)
+        sino = numpy.random.random((nprojs, size)).astype(numpy.float32)
+        angles = numpy.linspace(0, numpy.pi, nprojs, False)
+
+        for axis_position in (None, 20.5):
+            projected = radon.Projection(
+                image.shape, angles, axis_position=axis_position)(image)
+            backprojected = radon.Backprojection(
+                sino.shape, axis_position=axis_position,
+                angles=angles).backprojection(sino)
+            self.assertAlmostEqual(
+                numpy.sum(projected * sino, dtype=numpy.float64) /
+                numpy.sum(image * backprojected, dtype=numpy.float64),
+                1., places=5)
+
+    def test_projection(self):
+        """Test projections along the axes and options"""
+        size = 32
+        image = numpy.zeros((size, size), dtype=numpy.float32)
+        image[10:20, 5:15] = 1
+
+        projection = radon.Projection(image.shape, (0., numpy.pi / 2))
+        sino = projection.projection(image)
+        self.assertEqual(sino.shape, (2, size))
+        self.assertTrue(numpy.allclose(sino[0], image.sum(axis=0)))
+        self.assertTrue(numpy.allclose(sino[1], image.sum(axis=1)[::-1]))
+
+        # Detector wider than the slice, stack of images
+        projection = radon.Projection(
+            image.shape, (0., numpy.pi / 2), detector_width=size + 10,
+            normalize=True)
+        sinos = projection.projection(numpy.array((image, 2 * image)))
+        self.assertEqual(sinos.shape, (2, 2, size + 10))
+        self.assertTrue(numpy.allclose(
+            sinos[1, 0, 5:-5], image.sum(axis=0) * numpy.pi / 2))
+        self.assertTrue(numpy.allclose(sinos[0], sinos[1] / 2))
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    for testClass in (TestBackprojection, TestProjection):
+        test_suite.addTest(
+            unittest.defaultTestLoader.loadTestsFromTestCase(testClass))
+    return test_suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
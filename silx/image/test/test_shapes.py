@@ -27,7 +27,7 @@
 
 __authors__ = ["T. Vincent"]
 __license__ = "MIT"
-__date__ = "17/01/2018"
+__date__ = "19/10/2026"
 
 
 import logging
@@ -320,9 +320,116 @@ class TestCircleFill(ParametricTestCase):
                 self.assertTrue(is_equal)
 
 
+class TestFillMany(ParametricTestCase):
+    """Tests for drawing many shapes in a mask"""
+
+    SHAPE = 60, 70
+
+    def setUp(self):
+        self.random = numpy.random.RandomState(0)
+
+    def test_fill_polygons(self):
+        """Test fill_polygons against polygon_fill_mask"""
+        polygons = [self.random.uniform(-10, 80, (nvert, 2))
+                    for nvert in (3, 4, 5, 8, 12) * 4]
+        polygons.append([(1, 1), (4, 3), (1, 5), (2, 3)])
+        values = numpy.arange(1, len(polygons) + 1)
+
+        for dtype in (numpy.bool_, numpy.uint8, numpy.uint16, numpy.int32):
+            with self.subTest(dtype=dtype):
+                ref_mask = numpy.zeros(self.SHAPE, dtype=dtype)
+                for polygon, value in zip(polygons, values):
+                    ref_mask[shapes.polygon_fill_mask(
+                        polygon, self.SHAPE).astype(bool)] = value
+
+                mask = numpy.zeros(self.SHAPE, dtype=dtype)
+                result = shapes.fill_polygons(mask, polygons, values)
+                self.assertIs(result, mask)
+                self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+    def test_fill_disks(self):
+        """Test fill_disks against circle_fill"""
+        centers = self.random.randint(-5, 75, (30, 2))
+        radii = self.random.uniform(0.5, 15, 30)
+        radii[0] = 2  # Integer radius
+
+        ref_mask = numpy.zeros(self.SHAPE, dtype=numpy.uint16)
+        for index, ((row, col), radius) in enumerate(zip(centers, radii)):
+            rows, cols = shapes.circle_fill(row, col, radius)
+            inside = numpy.logical_and(
+                numpy.logical_and(rows >= 0, rows < self.SHAPE[0]),
+                numpy.logical_and(cols >= 0, cols < self.SHAPE[1]))
+            ref_mask[rows[inside], cols[inside]] = index + 1
+
+        mask = numpy.zeros(self.SHAPE, dtype=numpy.uint16)
+        shapes.fill_disks(mask, centers, radii, numpy.arange(1, 31))
+        self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+    def test_draw_lines(self):
+        """Test draw_lines against draw_line"""
+        starts = self.random.randint(-10, 80, (30, 2))
+        ends = self.random.randint(-10, 80, (30, 2))
+        ends[0] = starts[0]  # Single point
+        widths = self.random.randint(1, 6, 30)
+
+        ref_mask = numpy.zeros(self.SHAPE, dtype=numpy.int32)
+        for index, (start, end, width) in enumerate(zip(starts, ends, widths)):
+            rows, cols = shapes.draw_line(
+                start[0], start[1], end[0], end[1], width)
+            inside = numpy.logical_and(
+                numpy.logical_and(rows >= 0, rows < self.SHAPE[0]),
+                numpy.logical_and(cols >= 0, cols < self.SHAPE[1]))
+            ref_mask[rows[inside], cols[inside]] = index + 1
+
+        mask = numpy.zeros(self.SHAPE, dtype=numpy.int32)
+        shapes.draw_lines(mask, starts, ends, widths, numpy.arange(1, 31))
+        self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+    def test_replace(self):
+        """Test unmasking a level with replace"""
+        mask = numpy.zeros(self.SHAPE, dtype=numpy.uint8)
+        mask[:, :30] = 1
+        mask[:, 30:] = 2
+        ref_mask = mask.copy()
+        ref_mask[10:20, 10:40][ref_mask[10:20, 10:40] == 1] = 0
+
+        shapes.fill_polygons(
+            mask, [[(10, 10), (20, 10), (20, 40), (10, 40)]],
+            values=0, replace=1)
+        self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+    def test_errors(self):
+        """Test unsupported masks"""
+        with self.assertRaises(ValueError):
+            shapes.fill_disks(numpy.zeros(self.SHAPE, dtype=numpy.float32),
+                              [(1, 1)], 1)
+        with self.assertRaises(ValueError):
+            shapes.fill_disks(numpy.zeros(self.SHAPE)[:, ::2], [(1, 1)], 1)
+
+    def test_values_out_of_range(self):
+        """Test values which do not fit in the mask type"""
+        mask = numpy.zeros(self.SHAPE, dtype=numpy.uint8)
+        with self.assertRaises(ValueError):
+            shapes.fill_polygons(mask, [[(1, 1), (5, 1), (5, 5)]], 300)
+        with self.assertRaises(ValueError):
+            shapes.fill_disks(mask, [(1, 1), (5, 5)], 1, values=[1, -1])
+        with self.assertRaises(ValueError):
+            shapes.draw_lines(mask, [(1, 1)], [(5, 5)], values=1, replace=256)
+        self.assertFalse(numpy.any(mask))
+
+        mask = numpy.zeros(self.SHAPE, dtype=bool)
+        shapes.fill_disks(mask, [(5, 5)], 1, values=300)
+        self.assertEqual(mask.view(numpy.uint8)[5, 5], 1)
+
+        mask = numpy.zeros(self.SHAPE, dtype=numpy.int32)
+        shapes.fill_disks(mask, [(5, 5)], 1, values=2**31 - 1)
+        self.assertEqual(mask[5, 5], 2**31 - 1)
+
+
 def suite():
     test_suite = unittest.TestSuite()
-    for testClass in (TestPolygonFill, TestDrawLine, TestCircleFill):
+    for testClass in (TestPolygonFill, TestDrawLine, TestCircleFill,
+                      TestFillMany):
         test_suite.addTest(
             unittest.defaultTestLoader.loadTestsFromTestCase(testClass))
     return test_suite
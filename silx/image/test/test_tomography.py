@@ -28,12 +28,13 @@ Tests that the functions of tomography are valid
 
 __authors__ = ["H. Payno"]
 __license__ = "MIT"
-__date__ = "12/09/2017"
+__date__ = "19/10/2026"
 
 import unittest
 import numpy
 from silx.test.utils import utilstest
 from silx.image import tomography
+from silx.image import radon
 
 class TestTomography(unittest.TestCase):
     """
@@ -54,9 +55,79 @@ class TestTomography(unittest.TestCase):
         self.assertTrue(numpy.isclose(centerTrueData, 256, rtol=0.01))
 
 
+class TestTomographyBatch(unittest.TestCase):
+    """Tests of the batched CoR estimation and histogram percentiles"""
+
+    def setUp(self):
+        size = 128
+        y, x = numpy.mgrid[:size, :size]
+        image = ((x - 50) ** 2 + (y - 70) ** 2 < 15 ** 2).astype(numpy.float32)
+        image[(x - 80) ** 2 + (y - 40) ** 2 < 8 ** 2] += 1
+        self.sinos = numpy.array(
+            [radon.Projection(image.shape, 181, axis_position=axis)(image)
+             for axis in (60., 62.5, 64., 66.)]) + 0.01
+
+    def testCalcCenterCorrBatch(self):
+        ref = [tomography.calc_center_corr(sino) for sino in self.sinos]
+        for chunk_size in (None, 1, 3):
+            centers = tomography.calc_center_corr_batch(
+                self.sinos, chunk_size=chunk_size)
+            self.assertTrue(numpy.array_equal(centers, ref))
+
+        ref = [tomography.calc_center_corr(sino, fullrot=True)
+               for sino in self.sinos]
+        centers = tomography.calc_center_corr_batch(self.sinos, fullrot=True)
+        self.assertTrue(numpy.array_equal(centers, ref))
+
+    def testCalcCenterCentroidBatch(self):
+        ref = [tomography.calc_center_centroid(sino) for sino in self.sinos]
+        centers = tomography.calc_center_centroid_batch(self.sinos)
+        self.assertTrue(numpy.allclose(centers, ref, atol=1e-3))
+        self.assertTrue(numpy.allclose(centers, (60., 62.5, 64., 66.),
+                                       atol=0.1))
+
+    def testAggregateCenters(self):
+        center = tomography.aggregate_centers(
+            (10., 10.5, 9.5, 10.2, 50., numpy.nan))
+        self.assertAlmostEqual(center, 10.05)
+        self.assertEqual(tomography.aggregate_centers((3., 3., 4.)), 3.)
+        self.assertTrue(numpy.isnan(tomography.aggregate_centers(())))
+
+    def testHistogramPercentile(self):
+        numpy.random.seed(0)
+        data = numpy.random.normal(size=(1000, 100))
+        nbins = 1000
+        ref = numpy.percentile(data, (0, 2, 50, 98, 100))
+        result = tomography.histogram_percentile(
+            data, (0, 2, 50, 98, 100), nbins)
+        bin_width = (data.max() - data.min()) / nbins
+        self.assertTrue(numpy.all(numpy.abs(result - ref) <= bin_width))
+
+        # Sparse data: order statistics around a rank in different bins
+        data = numpy.array([1., 1., 1., 1., 100.])
+        percentiles = (0, 50, 80, 98, 100)
+        result = tomography.histogram_percentile(data, percentiles, nbins)
+        bin_width = (data.max() - data.min()) / nbins
+        self.assertTrue(numpy.all(numpy.abs(
+            result - numpy.percentile(data, percentiles)) <= bin_width))
+
+        # Skewed data
+        data = numpy.random.exponential(size=10000) ** 3
+        percentiles = (0, 0.001, 0.1, 2, 50, 98, 99.999, 100)
+        result = tomography.histogram_percentile(data, percentiles, nbins)
+        bin_width = (data.max() - data.min()) / nbins
+        self.assertTrue(numpy.all(numpy.abs(
+            result - numpy.percentile(data, percentiles)) <= bin_width))
+
+        image = numpy.arange(100.).reshape(10, 10)
+        result = tomography.rescale_intensity(image, nbins=100)
+        self.assertTrue(numpy.allclose(
+            result, tomography.rescale_intensity(image), atol=1.))
+
+
 def suite():
     test_suite = unittest.TestSuite()
-    for testClass in (TestTomography, ):
+    for testClass in (TestTomography, TestTomographyBatch):
         test_suite.addTest(
             unittest.defaultTestLoader.loadTestsFromTestCase(testClass))
     return test_suite
@@ -27,21 +27,67 @@ This module contains utilitary functions for tomography
 
 __author__ = ["P. Paleo"]
 __license__ = "MIT"
-__date__ = "12/09/2017"
+__date__ = "19/10/2026"
 
 
 import numpy as np
 from math import pi
-from silx.math.fit import leastsq
+from silx.math.fit import leastsq, leastsq_batch
 
 
-def rescale_intensity(img, from_subimg=None, percentiles=None):
+def histogram_percentile(data, percentiles, nbins=4096):
+    """
+    Compute percentiles of data from its histogram.
+
+    This avoids the partial sort of :func:`numpy.percentile`.
+    As with its default linear interpolation, a percentile is interpolated
+    between the two order statistics around its rank.
+    Each of them is located in its histogram bin through the cumulative
+    histogram and estimated assuming values are evenly spread within the
+    bin, so the result is within the width of a bin,
+    i.e., (data.max() - data.min()) / nbins, of :func:`numpy.percentile`.
+
+    :param numpy.ndarray data: Data from which to compute percentiles
+    :param percentiles: Sequence of percentiles in [0, 100]
+    :param int nbins: Number of bins of the histogram
+    :return: The percentiles of the data
+    :rtype: numpy.ndarray
+    """
+    data = np.asarray(data)
+    percentiles = np.asarray(percentiles, dtype=np.float64)
+    dmin, dmax = data.min(), data.max()
+    if dmin == dmax:
+        return np.full(percentiles.shape, dmin, dtype=np.float64)
+
+    hist, edges = np.histogram(data, bins=nbins, range=(dmin, dmax))
+    cdf = np.cumsum(hist)
+    bin_width = edges[1] - edges[0]
+
+    def order_statistic(rank):
+        """Estimate the values of given (integer) ranks in sorted data"""
+        indices = np.minimum(np.searchsorted(cdf, rank, side='right'), nbins - 1)
+        position = rank - (cdf[indices] - hist[indices])
+        return edges[indices] + (position + 0.5) / hist[indices] * bin_width
+
+    # Rank of the percentile as in numpy.percentile linear interpolation
+    ranks = percentiles / 100. * (data.size - 1)
+    lower = np.floor(ranks)
+    upper = np.minimum(lower + 1, data.size - 1)
+    lower_values = order_statistic(lower)
+    upper_values = order_statistic(upper)
+    return lower_values + (ranks - lower) * (upper_values - lower_values)
+
+
+def rescale_intensity(img, from_subimg=None, percentiles=None, nbins=None):
     """
     clamp intensity into the [2, 98] percentiles
 
     :param img:
     :param from_subimg:
     :param percentiles:
+    :param int nbins: If provided, percentiles are computed from a
+        histogram with nbins bins (see :func:`histogram_percentile`),
+        which is faster than the default exact computation.
     :return: the rescale intensity
     """
     if percentiles is None:
@@ -50,7 +96,10 @@ def rescale_intensity(img, from_subimg=None, percentiles=None):
         assert type(percentiles) in (tuple, list)
         assert(len(percentiles) == 2)
     data = from_subimg if from_subimg is not None else img
-    imin, imax = np.percentile(data, percentiles)
+    if nbins is None:
+        imin, imax = np.percentile(data, percentiles)
+    else:
+        imin, imax = histogram_percentile(data, percentiles, nbins)
     res = np.clip(img, imin, imax)
     return res
 
@@ -95,6 +144,78 @@ def calc_center_corr(sino, fullrot=False, props=1):
         return (n_d + corr_argsorted) / 2.
 
 
+def calc_center_corr_batch(sinos, fullrot=False, chunk_size=None):
+    """
+    Compute a guess of the Center of Rotation (CoR) of each sinogram of a
+    stack with the method of :func:`calc_center_corr`.
+
+    The correlations of a chunk of sinograms are computed with a single call
+    to real FFTs, the projections being copied in a buffer reused for all
+    the chunks.
+
+    :param sinos: Stack of sinograms (n_sinos, n_a, n_d) as a numpy.ndarray
+                  or a h5py.Dataset
+    :param bool fullrot: optional. If False (default), the scan is assumed to
+                         be [0, 180).
+                         If True, the scan is assumed to be [0, 380).
+    :param int chunk_size: optional. Number of sinograms processed at once.
+                           Default: All sinograms.
+    :return: The guess of the CoR of each sinogram
+    :rtype: numpy.ndarray
+    """
+    n_s, n_a, n_d = sinos.shape
+    first = 0
+    last = n_a - 1 if not(fullrot) else n_a // 2
+    if chunk_size is None:
+        chunk_size = n_s
+    chunk_size = max(1, min(chunk_size, n_s))
+
+    buffer_ = np.empty((2, chunk_size, n_d), dtype=np.float64)
+    centers = np.empty(n_s, dtype=np.float64)
+    for start in range(0, n_s, chunk_size):
+        stop = min(start + chunk_size, n_s)
+        proj1 = buffer_[0, :stop - start]
+        proj2 = buffer_[1, :stop - start]
+        proj1[:] = sinos[start:stop, first, :]
+        proj2[:] = sinos[start:stop, last, :]
+        proj2[:] = proj2[:, ::-1]
+
+        # Compute the correlations in the Fourier domain
+        projs_f = np.fft.rfft(buffer_[:, :stop - start], 2 * n_d, axis=-1)
+        corr = np.abs(np.fft.irfft(projs_f[0] * projs_f[1].conj(),
+                                   2 * n_d, axis=-1))
+
+        pos = np.argmax(corr, axis=-1)
+        pos[pos > n_d // 2] -= n_d
+        centers[start:stop] = (n_d + pos) / 2.
+    return centers
+
+
+def aggregate_centers(centers, threshold=3.):
+    """
+    Robust aggregation of the CoR guesses of many sinograms.
+
+    Guesses farther from the median than threshold times the scaled median
+    absolute deviation are considered as outliers and discarded.
+
+    :param centers: Sequence of CoR guesses. Non-finite values are ignored.
+    :param float threshold: Outliers rejection threshold
+    :return: The mean of the guesses which are not outliers
+    :rtype: float
+    """
+    centers = np.asarray(centers, dtype=np.float64)
+    centers = centers[np.isfinite(centers)]
+    if centers.size == 0:
+        return float('nan')
+    median = np.median(centers)
+    # 1.4826 scales the MAD to the standard deviation of a normal law
+    mad = 1.4826 * np.median(np.abs(centers - median))
+    if mad == 0:
+        return float(median)
+    inliers = centers[np.abs(centers - median) <= threshold * mad]
+    return float(np.mean(inliers))
+
+
 def _sine_function(t, offset, amplitude, phase):
     """
     Helper function for calc_center_centroid
@@ -157,3 +278,39 @@ def calc_center_centroid(sino):
                       left_derivative=False,
                       max_iter=100)
     return popt[0]
+
+
+def calc_center_centroid_batch(sinos):
+    """
+    Compute a guess of the Center of Rotation (CoR) of each sinogram of a
+    stack with the method of :func:`calc_center_centroid`.
+
+    The centroids of all projections are computed at once and the sine
+    functions are fitted simultaneously with
+    :func:`silx.math.fit.leastsq_batch`.
+
+    :param numpy.ndarray sinos: Stack of sinograms (n_sinos, n_a, n_d)
+    :return: The guess of the CoR of each sinogram
+    :rtype: numpy.ndarray
+    """
+    sinos = np.asarray(sinos)
+    n_s, n_a, n_d = sinos.shape
+    # Compute the centroids of all the projections of all the sinograms
+    i = np.arange(n_d)
+    centroids = np.dot(sinos, i) / np.sum(sinos, axis=2)
+
+    angles = np.linspace(0, n_a, n_a, True)
+    cmax, cmin = centroids.max(axis=1), centroids.min(axis=1)
+    p0 = np.empty((n_s, 3), dtype=np.float64)
+    p0[:, 0] = (cmax + cmin) / 2.
+    p0[:, 1] = (cmax - cmin) / 2.
+    p0[:, 2] = 1.1
+
+    popt, _, _ = leastsq_batch(model=_sine_function,
+                               xdata=angles,
+                               ydata=centroids,
+                               p0=p0,
+                               constraints=np.zeros((3, 3)),
+                               model_deriv=_sine_function_derivative,
+                               max_iter=100)
+    return popt[:, 0]
@@ -0,0 +1,411 @@
+# coding: utf-8
+# /*##########################################################################
+#
+# Copyright (c) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""This module provides a CPU implementation of the CBF byte offset
+compression/decompression.
+
+It provides the same API as :class:`silx.opencl.codec.byte_offset.ByteOffset`
+without requiring an OpenCL runtime.
+Computations release the GIL and use OpenMP: a single stream is compressed
+in parallel by chunks and :meth:`ByteOffset.decode_many` decompresses
+many frames in parallel.
+
+Example:
+
+>>> import numpy
+>>> from silx.io.byte_offset import ByteOffset
+>>> data = numpy.arange(1000, dtype=numpy.int32) ** 2
+>>> codec = ByteOffset(dec_size=data.size)
+>>> compressed = codec.encode(data)
+>>> numpy.array_equal(codec.decode(compressed), data)
+True
+"""
+
+__authors__ = ["T. Vincent"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+cimport cython
+from cython.parallel import prange
+from libc.stdint cimport (int8_t, uint8_t, int16_t, int32_t, uint32_t,
+                          int64_t, intptr_t)
+import numpy
+
+
+_CHUNK_SIZE = 65536
+"""Number of values compressed by each thread at once"""
+
+
+cdef inline int32_t _compressed_size(int32_t diff) nogil:
+    """Returns the number of bytes used to store a difference"""
+    if -128 < diff < 128:
+        return 1
+    elif -32768 < diff < 32768:
+        return 3
+    else:
+        return 7
+
+
+cdef inline int32_t _difference(const int32_t *data, Py_ssize_t index) nogil:
+    """Returns the difference with the previous value (with wrap-around)"""
+    if index == 0:
+        return data[0]
+    else:
+        return <int32_t> (<uint32_t> data[index] - <uint32_t> data[index - 1])
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int64_t _encoded_size(const int32_t *data,
+                           Py_ssize_t start,
+                           Py_ssize_t stop) nogil:
+    """Returns the number of bytes needed to compress data[start:stop]"""
+    cdef Py_ssize_t index
+    cdef int64_t size = 0
+    for index in range(start, stop):
+        size += _compressed_size(_difference(data, index))
+    return size
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _encode(const int32_t *data,
+                  Py_ssize_t start,
+                  Py_ssize_t stop,
+                  int8_t *output) nogil:
+    """Compress data[start:stop] in output"""
+    cdef Py_ssize_t index
+    cdef int32_t diff
+    cdef uint32_t udiff
+    for index in range(start, stop):
+        diff = _difference(data, index)
+        udiff = <uint32_t> diff
+        if -128 < diff < 128:
+            output[0] = <int8_t> diff
+            output += 1
+        elif -32768 < diff < 32768:
+            output[0] = -128
+            output[1] = <int8_t> (udiff & 0xff)
+            output[2] = <int8_t> ((udiff >> 8) & 0xff)
+            output += 3
+        else:
+            output[0] = -128
+            output[1] = 0
+            output[2] = -128
+            output[3] = <int8_t> (udiff & 0xff)
+            output[4] = <int8_t> ((udiff >> 8) & 0xff)
+            output[5] = <int8_t> ((udiff >> 16) & 0xff)
+            output[6] = <int8_t> ((udiff >> 24) & 0xff)
+            output += 7
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _decode(const int8_t *raw,
+                        Py_ssize_t raw_size,
+                        int32_t *out_int,
+                        float *out_float,
+                        Py_ssize_t dec_size) nogil:
+    """Decompress a stream in either out_int or out_float.
+
+    Decompression stops when dec_size values are decoded or at the end
+    of the stream, including a truncated exception.
+    If out_int and out_float are both NULL, values are only counted.
+
+    :return: The number of decoded values
+    """
+    cdef Py_ssize_t position = 0
+    cdef Py_ssize_t count = 0
+    cdef int32_t delta
+    cdef int16_t delta16
+    cdef uint32_t value = 0
+    cdef const uint8_t *bytes = <const uint8_t *> raw
+
+    while position < raw_size and count < dec_size:
+        delta = raw[position]
+        position += 1
+        if delta == -128:
+            if position + 2 > raw_size:
+                break
+            delta16 = <int16_t> (bytes[position] | (bytes[position + 1] << 8))
+            position += 2
+            if delta16 == -32768:
+                if position + 4 > raw_size:
+                    break
+                delta = <int32_t> (<uint32_t> bytes[position] |
+                                   (<uint32_t> bytes[position + 1] << 8) |
+                                   (<uint32_t> bytes[position + 2] << 16) |
+                                   (<uint32_t> bytes[position + 3] << 24))
+                position += 4
+            else:
+                delta = delta16
+        value += <uint32_t> delta
+        if out_int != NULL:
+            out_int[count] = <int32_t> value
+        elif out_float != NULL:
+            out_float[count] = <float> <int32_t> value
+        count += 1
+    return count
+
+
+def _as_stream(raw):
+    """Returns a compressed stream as a contiguous 1D array of int8"""
+    if isinstance(raw, (bytes, bytearray)):
+        return numpy.frombuffer(raw, dtype=numpy.int8)
+    raw = numpy.ascontiguousarray(raw).reshape(-1)
+    if raw.itemsize != 1:
+        raise ValueError("Compressed stream must be an array of bytes")
+    return raw.view(numpy.int8)
+
+
+def _check_output(out, shape):
+    """Check a user provided output array for decompression"""
+    assert out.shape == shape, "out must be of shape %s" % (shape,)
+    assert out.dtype in (numpy.int32, numpy.float32)
+    assert out.flags["C_CONTIGUOUS"] and out.flags["WRITEABLE"]
+
+
+class ByteOffset(object):
+    """Perform the byte offset compression/decompression on the CPU
+
+    This class has the same interface as
+    :class:`silx.opencl.codec.byte_offset.ByteOffset` but uses
+    numpy arrays instead of pyopencl arrays.
+
+    :param int raw_size:
+        Size of the raw stream for decompression.
+        Not used, kept for compatibility with the OpenCL implementation.
+    :param int dec_size:
+        Size of the decompression output array.
+        If None, :meth:`decode` decompresses the whole stream.
+    """
+
+    def __init__(self, raw_size=None, dec_size=None):
+        self.raw_size = -1 if raw_size is None else int(raw_size)
+        self.dec_size = None if dec_size is None else int(dec_size)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def decode(self, raw, as_float=False, out=None):
+        """Decompress a byte offset compressed stream.
+
+        Values of out beyond the end of the stream are set to 0.
+
+        :param raw: The compressed data as a 1D numpy array of char or bytes.
+        :param bool as_float: True to decompress as float32,
+                              False (default) to decompress as int32
+        :param numpy.ndarray out: C-contiguous array of int32 or float32
+            of size dec_size in which to place the result.
+        :return: The decompressed data as a 1D numpy array.
+        :rtype: numpy.ndarray
+        """
+        cdef const int8_t[::1] c_raw = _as_stream(raw)
+        cdef Py_ssize_t raw_size = c_raw.shape[0]
+        cdef Py_ssize_t dec_size
+        cdef Py_ssize_t count
+        cdef int32_t[::1] out_int
+        cdef float[::1] out_float
+        cdef int32_t *int_ptr = NULL
+        cdef float *float_ptr = NULL
+
+        if raw_size == 0:
+            c_raw = numpy.zeros((1,), dtype=numpy.int8)  # Get a valid pointer
+
+        if out is not None:
+            dec_size = out.size
+            if self.dec_size is not None:
+                _check_output(out, (self.dec_size,))
+            else:
+                _check_output(out, (dec_size,))
+        else:
+            if self.dec_size is not None:
+                dec_size = self.dec_size
+            else:
+                with nogil:
+                    dec_size = _decode(&c_raw[0], raw_size, NULL, NULL,
+                                       raw_size)
+            out = numpy.empty((dec_size,),
+                              dtype=numpy.float32 if as_float else numpy.int32)
+
+        if dec_size == 0:
+            return out
+
+        if out.dtype == numpy.float32:
+            out_float = out
+            float_ptr = &out_float[0]
+        else:
+            out_int = out
+            int_ptr = &out_int[0]
+
+        with nogil:
+            count = _decode(&c_raw[0], raw_size, int_ptr, float_ptr, dec_size)
+        out[count:] = 0
+        return out
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def decode_many(self, raws, as_float=False, out=None):
+        """Decompress many frames in parallel.
+
+        :param raws: Sequence of compressed streams
+            (1D numpy arrays of char or bytes)
+        :param bool as_float: True to decompress as float32,
+                              False (default) to decompress as int32
+        :param numpy.ndarray out: C-contiguous array of int32 or float32
+            of shape (number of frames, dec_size) in which to store the result.
+        :return: The decompressed frames as a 2D numpy array
+        :rtype: numpy.ndarray
+        """
+        assert self.dec_size is not None, \
+            "dec_size is a mandatory ByteOffset init argument for decode_many"
+
+        raws = [_as_stream(raw) for raw in raws]
+        shape = len(raws), self.dec_size
+        if out is None:
+            out = numpy.empty(shape, dtype=numpy.float32 if as_float else numpy.int32)
+        else:
+            _check_output(out, shape)
+        if len(raws) == 0 or self.dec_size == 0:
+            return out
+
+        # Streams are read in place through their addresses
+        cdef intptr_t[::1] addresses = numpy.array(
+            [raw.ctypes.data for raw in raws], dtype=numpy.intp)
+        cdef int64_t[::1] sizes = numpy.array(
+            [raw.size for raw in raws], dtype=numpy.int64)
+        cdef int64_t[::1] counts = numpy.empty((len(raws),), dtype=numpy.int64)
+        cdef Py_ssize_t nframes = len(raws)
+        cdef Py_ssize_t dec_size = self.dec_size
+        cdef Py_ssize_t index
+        cdef int32_t[:, ::1] out_int
+        cdef float[:, ::1] out_float
+        cdef bint use_float = out.dtype == numpy.float32
+
+        if use_float:
+            out_float = out
+            for index in prange(nframes, nogil=True, schedule='dynamic'):
+                counts[index] = _decode(<const int8_t *> addresses[index],
+                                        sizes[index],
+                                        NULL, &out_float[index, 0], dec_size)
+        else:
+            out_int = out
+            for index in prange(nframes, nogil=True, schedule='dynamic'):
+                counts[index] = _decode(<const int8_t *> addresses[index],
+                                        sizes[index],
+                                        &out_int[index, 0], NULL, dec_size)
+
+        for index in range(nframes):
+            out[index, counts[index]:] = 0
+        return out
+
+    __call__ = decode
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def encode(self, data, out=None):
+        """Compress data to CBF.
+
+        :param data: The data to compress as a numpy array of int32.
+        :param numpy.ndarray out:
+            numpy array of int8 in which to store the result.
+            The array should be large enough to store the compressed data.
+        :return: The compressed data as a numpy array of int8.
+                 If out is provided, this is a view of its beginning with
+                 the exact size of the compressed data.
+        :rtype: numpy.ndarray
+        :raises ValueError: if out array is not large enough
+        """
+        cdef const int32_t[::1] c_data = numpy.ascontiguousarray(
+            data, dtype=numpy.int32).reshape(-1)
+        cdef Py_ssize_t size = c_data.shape[0]
+        cdef Py_ssize_t chunk_size = _CHUNK_SIZE
+        cdef Py_ssize_t nchunks = (size + chunk_size - 1) // chunk_size
+        chunk_offsets = numpy.zeros((nchunks + 1,), dtype=numpy.int64)
+        cdef int64_t[::1] offsets = chunk_offsets
+        cdef int8_t[::1] c_out
+        cdef Py_ssize_t chunk
+
+        if size == 0:
+            return numpy.zeros((0,), dtype=numpy.int8) if out is None else out[:0]
+
+        for chunk in prange(nchunks, nogil=True):
+            offsets[chunk + 1] = _encoded_size(
+                &c_data[0], chunk * chunk_size,
+                min((chunk + 1) * chunk_size, size))
+        numpy.cumsum(chunk_offsets, out=chunk_offsets)
+        byte_count = offsets[nchunks]
+
+        if out is None:
+            out = numpy.empty((byte_count,), dtype=numpy.int8)
+        elif out.size < byte_count:
+            raise ValueError(
+                "Provided output buffer is not large enough: "
+                "requires %d bytes, got %d" % (byte_count, out.size))
+        else:
+            out = out.reshape(-1)[:byte_count]
+        c_out = out
+
+        for chunk in prange(nchunks, nogil=True):
+            _encode(&c_data[0], chunk * chunk_size,
+                    min((chunk + 1) * chunk_size, size),
+                    &c_out[offsets[chunk]])
+        return out
+
+    def encode_to_bytes(self, data):
+        """Compresses data to CBF and returns compressed data as bytes.
+
+        :param data: The data to compress as a numpy array of int32.
+        :return: The compressed data as bytes.
+        :rtype: bytes
+        """
+        return self.encode(data).tobytes()
+
+
+def decode(raw, dec_size=None, as_float=False, out=None):
+    """Decompress a byte offset compressed stream.
+
+    See :meth:`ByteOffset.decode`.
+
+    :param raw: The compressed data as a 1D numpy array of char or bytes.
+    :param int dec_size: Number of values to decompress,
+        default: the whole stream.
+    :param bool as_float: True to decompress as float32,
+                          False (default) to decompress as int32
+    :param numpy.ndarray out: Array in which to place the result.
+    :rtype: numpy.ndarray
+    """
+    return ByteOffset(dec_size=dec_size).decode(raw, as_float=as_float, out=out)
+
+
+def encode(data, out=None):
+    """Compress data to CBF byte offset.
+
+    See :meth:`ByteOffset.encode`.
+
+    :param data: The data to compress as a numpy array of int32.
+    :param numpy.ndarray out: Array of int8 in which to store the result.
+    :rtype: numpy.ndarray
+    """
+    return ByteOffset().encode(data, out=out)
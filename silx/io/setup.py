@@ -28,7 +28,7 @@
 
 __authors__ = ["P. Knobel", "V.A. Sole"]
 __license__ = "MIT"
-__date__ = "03/10/2016"
+__date__ = "19/10/2026"
 
 import os
 import sys
@@ -78,6 +78,12 @@ def configuration(parent_package='', top_path=None):
                          define_macros=define_macros,
                          include_dirs=[os.path.join('specfile', 'include')],
                          language='c')
+
+    config.add_extension('byte_offset',
+                         sources=['byte_offset.pyx'],
+                         extra_link_args=['-fopenmp'],
+                         extra_compile_args=['-fopenmp'],
+                         language='c')
     return config
 
 
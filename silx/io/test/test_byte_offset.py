@@ -0,0 +1,155 @@
+# coding: utf-8
+# /*##########################################################################
+# Copyright (C) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Tests of the CPU CBF byte offset codec"""
+
+__authors__ = ["T. Vincent"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import struct
+import unittest
+
+import numpy
+
+from ..byte_offset import ByteOffset, decode, encode
+
+
+def _reference_encode(data):
+    """Straightforward byte offset compression used as reference"""
+    stream = []
+    previous = 0
+    for value in numpy.asarray(data, dtype=numpy.int64).ravel():
+        diff = (int(value) - previous + 2 ** 31) % 2 ** 32 - 2 ** 31
+        previous = int(value)
+        if -128 < diff < 128:
+            stream.append(struct.pack("<b", diff))
+        elif -32768 < diff < 32768:
+            stream.append(struct.pack("<bh", -128, diff))
+        else:
+            stream.append(struct.pack("<bhi", -128, -32768, diff))
+    return b"".join(stream)
+
+
+class TestByteOffset(unittest.TestCase):
+    """Tests of silx.io.byte_offset"""
+
+    def setUp(self):
+        self.data = numpy.array(
+            [0, 1, -1, 127, 0, -127, 128, -128, 200, 32767, 0, -32767,
+             -32768, 40000, -40000, 2 ** 31 - 1, -2 ** 31, 5],
+            dtype=numpy.int32)
+
+    def test_encode(self):
+        """Compare compression with the reference implementation"""
+        codec = ByteOffset()
+        compressed = codec.encode(self.data)
+        self.assertEqual(compressed.dtype, numpy.int8)
+        self.assertEqual(compressed.tobytes(), _reference_encode(self.data))
+        self.assertEqual(codec.encode_to_bytes(self.data),
+                         _reference_encode(self.data))
+
+        # Large enough to be compressed by several chunks
+        data = numpy.random.poisson(100, 200000).astype(numpy.int32)
+        data[::1000] = 100000
+        self.assertEqual(encode(data).tobytes(), _reference_encode(data))
+
+    def test_encode_out(self):
+        """Compress into a provided array"""
+        expected = _reference_encode(self.data)
+        out = numpy.zeros((len(expected) + 10,), dtype=numpy.int8)
+        result = encode(self.data, out=out)
+        self.assertEqual(result.size, len(expected))
+        self.assertTrue(numpy.shares_memory(result, out))
+        self.assertEqual(out[:len(expected)].tobytes(), expected)
+
+        with self.assertRaises(ValueError):
+            encode(self.data, out=numpy.zeros((10,), dtype=numpy.int8))
+
+        self.assertEqual(encode(numpy.array([], dtype=numpy.int32)).size, 0)
+
+    def test_decode(self):
+        """Decompress as int32 and float32"""
+        compressed = _reference_encode(self.data)
+        codec = ByteOffset(dec_size=self.data.size)
+        result = codec.decode(numpy.frombuffer(compressed, dtype=numpy.int8))
+        self.assertEqual(result.dtype, numpy.int32)
+        self.assertTrue(numpy.array_equal(result, self.data))
+
+        result = codec(compressed, as_float=True)
+        self.assertEqual(result.dtype, numpy.float32)
+        self.assertTrue(numpy.array_equal(result, self.data.astype(numpy.float32)))
+
+        # Whole stream when dec_size is not provided
+        self.assertTrue(numpy.array_equal(decode(compressed), self.data))
+
+    def test_decode_sizes(self):
+        """Decompress with a dec_size different from the stream length"""
+        compressed = _reference_encode(self.data)
+        result = decode(compressed, dec_size=5)
+        self.assertTrue(numpy.array_equal(result, self.data[:5]))
+
+        out = numpy.full((self.data.size + 3,), -1, dtype=numpy.int32)
+        result = decode(compressed, out=out)
+        self.assertIs(result, out)
+        self.assertTrue(numpy.array_equal(result[:self.data.size], self.data))
+        self.assertTrue(numpy.all(result[self.data.size:] == 0))
+
+        # Truncated exception at the end of the stream
+        result = decode(compressed[:-2])
+        self.assertTrue(numpy.array_equal(result, self.data[:-1]))
+
+        self.assertEqual(decode(b"").size, 0)
+
+    def test_decode_many(self):
+        """Decompress many frames at once"""
+        frames = numpy.random.poisson(100, (10, 1000)).astype(numpy.int32)
+        frames[:, ::100] = -70000
+        raws = [encode(frame) for frame in frames]
+        raws[3] = raws[3][:50]  # Truncated frame
+        codec = ByteOffset(dec_size=frames.shape[1])
+
+        result = codec.decode_many(raws)
+        self.assertEqual(result.shape, frames.shape)
+        for index, raw in enumerate(raws):
+            self.assertTrue(numpy.array_equal(result[index], codec.decode(raw)))
+        self.assertTrue(numpy.array_equal(result[:3], frames[:3]))
+
+        out = numpy.empty(frames.shape, dtype=numpy.float32)
+        result = codec.decode_many(raws, out=out)
+        self.assertIs(result, out)
+        self.assertTrue(numpy.array_equal(result[4:], frames[4:]))
+
+        self.assertEqual(codec.decode_many([]).shape, (0, frames.shape[1]))
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestByteOffset))
+    return test_suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -27,13 +27,13 @@
 
 __authors__ = ["T. Vincent"]
 __license__ = "MIT"
-__date__ = "16/05/2018"
+__date__ = "19/10/2026"
 
 
 cimport cython
 from cython.parallel import prange
 cimport numpy as cnumpy
-from libc.math cimport frexp, sqrt
+from libc.math cimport frexp, pow, sqrt
 from .math_compatibility cimport asinh, isnan, isfinite, lrint, INFINITY, NAN
 
 import logging
@@ -88,6 +88,16 @@ ctypedef fused image_types:
 ctypedef double (*scale_function)(double) nogil
 
 
+DEF EQUALIZATION_NB_BINS = 4096
+"""Number of bins of the histogram used for histogram equalization"""
+
+DEF EQUALIZATION_CHUNK_SIZE = 65536
+"""Minimum number of data elements per thread when computing the histogram"""
+
+DEF EQUALIZATION_MAX_CHUNKS = 32
+"""Maximum number of partial histograms computed in parallel"""
+
+
 # Normalization
 
 
@@ -152,7 +162,9 @@ cdef image_types[:, ::1] compute_cmap(
            double normalized_vmin,
            double normalized_vmax,
            image_types[::1] nan_color,
-           scale_function scale_func):
+           scale_function scale_func,
+           double gamma,
+           double[::1] cdf):
     """Apply colormap to data.
 
     :param data: Input data
@@ -161,12 +173,19 @@ cdef image_types[:, ::1] compute_cmap(
     :param normalized_vmax: Normalized upper bound of the colormap range
     :param nan_color: Color to use for NaN value
     :param scale_func: The function to use to scale data
+    :param gamma: Exponent applied to data normalized to [0, 1]
+        (1 to disable gamma correction)
+    :param cdf: Cumulative distribution function sampled on
+        :data:`EQUALIZATION_NB_BINS` bins in [vmin, vmax] used for
+        histogram equalization or None to disable it
     :return: Data converted to colors
     """
     cdef image_types[:, ::1] output
-    cdef double scale, value
+    cdef double scale, value, normalized
+    cdef double bin_scale = 0.
     cdef int length, nb_channels, nb_colors
-    cdef int channel, index, lut_index
+    cdef int channel, index, lut_index, bin_index
+    cdef int nb_bins = 0
 
     nb_colors = <int> colors.shape[0]
     nb_channels = <int> colors.shape[1]
@@ -180,6 +199,11 @@ cdef image_types[:, ::1] compute_cmap(
     else:
         scale = nb_colors / (normalized_vmax - normalized_vmin)
 
+    if cdf is not None:
+        nb_bins = <int> cdf.shape[0]
+        if normalized_vmin != normalized_vmax:
+            bin_scale = nb_bins / (normalized_vmax - normalized_vmin)
+
     with nogil:
         for index in prange(length):
             value = scale_func(<double> data[index])
@@ -194,6 +218,18 @@ cdef image_types[:, ::1] compute_cmap(
                 lut_index = 0
             elif value >= normalized_vmax:
                 lut_index = nb_colors - 1
+            elif nb_bins > 0:  # Histogram equalization
+                bin_index = <int>((value - normalized_vmin) * bin_scale)
+                if bin_index >= nb_bins:
+                    bin_index = nb_bins - 1
+                lut_index = <int>(cdf[bin_index] * nb_colors)
+                if lut_index >= nb_colors:
+                    lut_index = nb_colors - 1
+            elif gamma != 1.:  # Gamma correction
+                normalized = (value - normalized_vmin) * scale / nb_colors
+                lut_index = <int>(pow(normalized, gamma) * nb_colors)
+                if lut_index >= nb_colors:
+                    lut_index = nb_colors - 1
             else:
                 lut_index = <int>((value - normalized_vmin) * scale)
                 # Index can overflow of 1
@@ -215,7 +251,9 @@ cdef image_types[:, ::1] compute_cmap_with_lut(
                double normalized_vmin,
                double normalized_vmax,
                image_types[::1] nan_color,
-               scale_function scale_func):
+               scale_function scale_func,
+               double gamma,
+               double[::1] cdf):
     """Convert data to colors using look-up table to speed the process.
 
     Only supports data of types: uint8, uint16, int8, int16.
@@ -226,6 +264,9 @@ cdef image_types[:, ::1] compute_cmap_with_lut(
     :param normalized_vmax: Normalized upper bound of the colormap range
     :param nan_color: Color to use for NaN values
     :param scale_func: The function to use for scaling data
+    :param gamma: Exponent of the gamma correction
+    :param cdf: Cumulative distribution function for histogram equalization
+        or None
     :return: The generated image
     """
     cdef image_types[:, ::1] output
@@ -256,7 +297,7 @@ cdef image_types[:, ::1] compute_cmap_with_lut(
     values = numpy.arange(type_min, type_max + 1, dtype=numpy.float64)
     lut = compute_cmap(
         values, colors, normalized_vmin, normalized_vmax,
-        nan_color, scale_func)
+        nan_color, scale_func, gamma, cdf)
 
     output = numpy.empty((length, nb_channels), dtype=colors_dtype)
 
@@ -270,6 +311,68 @@ cdef image_types[:, ::1] compute_cmap_with_lut(
     return output
 
 
+@cython.wraparound(False)
+@cython.boundscheck(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef double[::1] compute_equalization_cdf(data_types[:] data,
+                                          double vmin,
+                                          double vmax):
+    """Compute the cumulative distribution function of data in [vmin, vmax].
+
+    Partial histograms of chunks of data are computed in parallel
+    and then summed.
+    Values outside [vmin, vmax] and NaNs are ignored.
+
+    :param data: Input data
+    :param vmin: Lower bound of the histogram range
+    :param vmax: Upper bound of the histogram range
+    :return: The CDF sampled on :data:`EQUALIZATION_NB_BINS` bins,
+        scaled so that the first non-empty bin is 0 and the last one is 1.
+    """
+    cdef cnumpy.int32_t[:, ::1] histograms
+    cdef double value, bin_scale
+    cdef int length, nb_chunks, chunk_size
+    cdef int chunk, start, end, index, bin_index
+    cdef int nb_bins = EQUALIZATION_NB_BINS
+
+    length = <int> data.size
+    nb_chunks = max(1, min(EQUALIZATION_MAX_CHUNKS,
+                           length // EQUALIZATION_CHUNK_SIZE))
+    chunk_size = (length + nb_chunks - 1) // nb_chunks
+
+    if vmin == vmax:
+        bin_scale = 0.
+    else:
+        bin_scale = nb_bins / (vmax - vmin)
+
+    histograms = numpy.zeros((nb_chunks, nb_bins), dtype=numpy.int32)
+
+    with nogil:
+        for chunk in prange(nb_chunks):
+            start = chunk * chunk_size
+            end = min(start + chunk_size, length)
+            for index in range(start, end):
+                value = <double> data[index]
+                if value >= vmin and value <= vmax:  # Also filters NaNs
+                    bin_index = <int>((value - vmin) * bin_scale)
+                    if bin_index >= nb_bins:
+                        bin_index = nb_bins - 1
+                    histograms[chunk, bin_index] += 1
+
+    cumulated = numpy.cumsum(
+        numpy.sum(histograms, axis=0, dtype=numpy.float64))
+    total = cumulated[nb_bins - 1]
+    nonzero = numpy.nonzero(cumulated)[0]
+    if len(nonzero) == 0 or total == cumulated[nonzero[0]]:
+        # No data or all data in a single bin
+        return numpy.zeros((nb_bins,), dtype=numpy.float64)
+
+    cdf_min = cumulated[nonzero[0]]
+    cdf = (cumulated - cdf_min) / (total - cdf_min)
+    return numpy.ascontiguousarray(numpy.clip(cdf, 0., 1.))
+
+
 @cython.wraparound(False)
 @cython.boundscheck(False)
 @cython.nonecheck(False)
@@ -279,7 +382,8 @@ def _cmap(data_types[:] data,
           str normalization,
           double vmin,
           double vmax,
-          image_types[::1] nan_color):
+          image_types[::1] nan_color,
+          double gamma):
     """Implementation of colormap.
 
     Use :func:`cmap`.
@@ -290,12 +394,20 @@ def _cmap(data_types[:] data,
     :param vmin: Lower bound of the colormap range
     :param vmax: Upper bound of the colormap range
     :param nan_color: Color to use for NaN value.
+    :param gamma: Exponent of the 'gamma' normalization
     :return: The generated image
     """
     cdef double normalized_vmin, normalized_vmax
     cdef scale_function scale_func
+    cdef double[::1] cdf = None
 
-    if normalization == 'linear':
+    if normalization == 'gamma':
+        if gamma <= 0. or not isfinite(gamma):
+            raise ValueError('Unsupported gamma %f' % gamma)
+    else:
+        gamma = 1.
+
+    if normalization in ('linear', 'gamma', 'equalized'):
         scale_func = linear_scale
     elif normalization == 'log':
         scale_func = fast_log10
@@ -312,16 +424,19 @@ def _cmap(data_types[:] data,
     if not isfinite(normalized_vmin) or not isfinite(normalized_vmax):
         raise ValueError('Colormap range is not valid')
 
+    if normalization == 'equalized':
+        cdf = compute_equalization_cdf(data, normalized_vmin, normalized_vmax)
+
     # Proxy for calling the right implementation depending on data type
     if data_types in lut_types:  # Use LUT implementation
         output = compute_cmap_with_lut(
             data, colors, normalized_vmin, normalized_vmax,
-            nan_color, scale_func)
+            nan_color, scale_func, gamma, cdf)
 
     elif data_types in default_types:  # Use default implementation
         output = compute_cmap(
             data, colors, normalized_vmin, normalized_vmax,
-            nan_color, scale_func)
+            nan_color, scale_func, gamma, cdf)
 
     else:
         raise ValueError('Unsupported data type')
@@ -334,7 +449,8 @@ def cmap(data,
          double vmin,
          double vmax,
          normalization='linear',
-         nan_color=None):
+         nan_color=None,
+         double gamma=2.):
     """Convert data to colors with provided colors look-up table.
 
     :param numpy.ndarray data: The input data
@@ -348,9 +464,13 @@ def cmap(data,
         - 'log'
         - 'arcsinh'
         - 'sqrt'
+        - 'gamma': Data linearly normalized to [0, 1] raised to `gamma`
+        - 'equalized': Histogram equalization computed on data in
+          [vmin, vmax]
 
     :param nan_color: Color to use for NaN value.
         Default: A color with all channels set to 0
+    :param float gamma: Exponent used by the 'gamma' normalization
     :return: Array of colors. The shape of the
         returned array is that of data array + the last dimension of colors.
         The dtype of the returned array is that of the colors array.
@@ -383,7 +503,7 @@ def cmap(data,
         data.reshape(-1),
         colors.reshape(-1, nb_channels),
         str(normalization),
-        vmin, vmax, nan_color)
+        vmin, vmax, nan_color, gamma)
     image.shape = data.shape + (nb_channels,)
 
     return image
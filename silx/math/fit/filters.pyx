@@ -40,6 +40,13 @@ Smoothing functions:
     - :func:`smooth2d`
     - :func:`smooth3d`
 
+Processing of many spectra in parallel:
+---------------------------------------
+
+    - :func:`strip_batch`
+    - :func:`snip1d_batch`
+    - :func:`smooth1d_batch`
+
 References:
 -----------
 
@@ -60,7 +67,7 @@ API documentation:
 
 __authors__ = ["P. Knobel"]
 __license__ = "MIT"
-__date__ = "15/05/2017"
+__date__ = "19/10/2026"
 
 import logging
 import numpy
@@ -68,6 +75,7 @@ import numpy
 _logger = logging.getLogger(__name__)
 
 cimport cython
+from cython.parallel import prange
 cimport silx.math.fit.filters_wrapper as filters_wrapper
 
 
@@ -414,3 +422,159 @@ def smooth3d(data):
     filters_wrapper.smooth3d(&data_c[0], nx, ny, nz)
 
     return numpy.asarray(data_c).reshape(data_shape)
+
+
+def _batch_arrays(data, out, copy_data):
+    """Prepare the arrays used by the batch filters.
+
+    :param data: Array of spectra, the last axis being the channels
+    :param out: Optional output array
+    :param bool copy_data: True to copy data to the output array
+    :return: (copy of the input as 2D float64 C-contiguous array or None,
+        output array, 2D view of the output array)
+    """
+    data = numpy.asarray(data)
+    if data.ndim < 1 or data.size == 0:
+        raise ValueError("data must be a non-empty array")
+    data_shape = data.shape
+
+    if out is None:
+        out = numpy.empty(data_shape, dtype=numpy.float64)
+    elif (not isinstance(out, numpy.ndarray) or
+            out.dtype != numpy.float64 or
+            out.shape != data_shape or
+            not out.flags.c_contiguous or
+            not out.flags.writeable):
+        raise ValueError("out must be a writable C-contiguous float64 " +
+                         "array with the same shape as data")
+
+    if copy_data:
+        numpy.copyto(out, data, casting='unsafe')
+        input_2d = None
+    else:
+        input_2d = numpy.array(data, copy=True, dtype=numpy.float64,
+                               order='C').reshape(-1, data_shape[-1])
+    return input_2d, out, out.reshape(-1, data_shape[-1])
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def strip_batch(data, w=1, niterations=1000, factor=1.0, anchors=None,
+                out=None):
+    """Extract the background of many spectra using the strip algorithm.
+
+    This is equivalent to applying :func:`strip` to each spectrum, the
+    spectra being processed in parallel.
+
+    :param data: Array of spectra. The strip filter is applied along the last
+        axis, e.g. on each row of a (N, channels) array.
+    :type data: numpy.ndarray
+    :param w: Strip width
+    :param niterations: number of iterations
+    :param factor: scaling factor applied to the average of ``y(i-w)`` and
+        ``y(i+w)`` before comparing to ``y(i)``
+    :param anchors: Array of anchors, indices of channels that will not be
+          modified during the stripping procedure (same for all spectra).
+    :param out: Optional C-contiguous float64 array with the same shape
+        as data where to store the result. It can be data itself.
+    :return: Data with peaks stripped away (``out`` if provided)
+    :rtype: numpy.ndarray
+    """
+    cdef:
+        double[:, ::1] input_c
+        double[:, ::1] output_c
+        long[::1] anchors_c
+        long len_anchors
+        long nchannels
+        long niter_c = niterations
+        int w_c = w
+        double factor_c = factor
+        Py_ssize_t index
+
+    input_2d, out, output_2d = _batch_arrays(data, out, False)
+    input_c = input_2d
+    output_c = output_2d
+    nchannels = output_2d.shape[1]
+
+    if anchors is not None and len(anchors):
+        anchors_c = numpy.array(anchors,
+                                copy=False,
+                                dtype=numpy.int_,
+                                order='C')
+        len_anchors = anchors_c.size
+    else:
+        anchors_c = numpy.empty(shape=(1,),
+                                dtype=numpy.int_)
+        len_anchors = 0
+
+    for index in prange(input_c.shape[0], nogil=True, schedule='dynamic'):
+        filters_wrapper.strip(&input_c[index, 0], nchannels,
+                              factor_c, niter_c, w_c,
+                              &anchors_c[0], len_anchors,
+                              &output_c[index, 0])
+
+    return out
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def snip1d_batch(data, snip_width, out=None):
+    """Estimate the baseline (background) of many spectra by clipping peaks.
+
+    This is equivalent to applying :func:`snip1d` to each spectrum, the
+    spectra being processed in parallel.
+
+    :param data: Array of spectra. The SNIP filter is applied along the last
+        axis, e.g. on each row of a (N, channels) array.
+    :type data: numpy.ndarray
+    :param int snip_width: Width of the snip operator, in number of samples.
+    :param out: Optional C-contiguous float64 array with the same shape
+        as data where to store the result. It can be data itself.
+    :return: Baseline of the spectra (``out`` if provided)
+    :rtype: numpy.ndarray
+    """
+    cdef:
+        double[:, ::1] data_c
+        int nchannels
+        int snip_width_c = snip_width
+        Py_ssize_t index
+
+    _, out, output_2d = _batch_arrays(data, out, True)
+    data_c = output_2d
+    nchannels = output_2d.shape[1]
+
+    for index in prange(data_c.shape[0], nogil=True, schedule='dynamic'):
+        filters_wrapper.snip1d(&data_c[index, 0], nchannels, snip_width_c)
+
+    return out
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def smooth1d_batch(data, out=None):
+    """Simple smoothing of many spectra.
+
+    This is equivalent to applying :func:`smooth1d` to each spectrum, the
+    spectra being processed in parallel.
+
+    :param data: Array of spectra. The smoothing is applied along the last
+        axis, e.g. on each row of a (N, channels) array.
+    :type data: numpy.ndarray
+    :param out: Optional C-contiguous float64 array with the same shape
+        as data where to store the result. It can be data itself.
+    :return: Smoothed data (``out`` if provided)
+    :rtype: numpy.ndarray(dtype=numpy.float64)
+    """
+    cdef:
+        double[:, ::1] data_c
+        int nchannels
+        Py_ssize_t index
+
+    _, out, output_2d = _batch_arrays(data, out, True)
+    data_c = output_2d
+    nchannels = output_2d.shape[1]
+
+    for index in prange(data_c.shape[0], nogil=True, schedule='static'):
+        filters_wrapper.smooth1d(&data_c[index, 0], nchannels)
+
+    return out
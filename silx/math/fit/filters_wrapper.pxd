@@ -24,11 +24,11 @@
 
 __authors__ = ["P. Knobel"]
 __license__ = "MIT"
-__date__ = "22/06/2016"
+__date__ = "19/10/2026"
 
 cimport cython
 
-cdef extern from "filters.h":
+cdef extern from "filters.h" nogil:
     void snip1d(double *data,
                 int size,
                 int width)
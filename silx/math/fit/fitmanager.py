@@ -55,7 +55,7 @@ from . import bgtheories
 
 __authors__ = ["V.A. Sole", "P. Knobel"]
 __license__ = "MIT"
-__date__ = "16/01/2017"
+__date__ = "19/10/2026"
 
 _logger = logging.getLogger(__name__)
 
@@ -224,7 +224,8 @@ class FitManager(object):
     def addtheory(self, name, theory=None,
                   function=None, parameters=None,
                   estimate=None, configure=None, derivative=None,
-                  description=None, pymca_legacy=False):
+                  description=None, pymca_legacy=False,
+                  derivative_theory_parameters=False):
         """Add a new theory to dictionary :attr:`theories`.
 
         You can pass a name and a :class:`FitTheory` object as arguments, or
@@ -256,6 +257,8 @@ class FitManager(object):
             :attr:`silx.math.fit.fittheory.FitTheory.config_widget`
         :param bool pymca_legacy: See documentation for
             :attr:`silx.math.fit.fittheory.FitTheory.pymca_legacy`
+        :param bool derivative_theory_parameters: See documentation for
+            :attr:`silx.math.fit.fittheory.FitTheory.derivative_theory_parameters`
         """
         if theory is not None:
             self.theories[name] = theory
@@ -268,7 +271,8 @@ class FitManager(object):
                 estimate=estimate,
                 configure=configure,
                 derivative=derivative,
-                pymca_legacy=pymca_legacy
+                pymca_legacy=pymca_legacy,
+                derivative_theory_parameters=derivative_theory_parameters
             )
 
         else:
@@ -824,6 +828,13 @@ class FitManager(object):
 
         ywork = self.ydata
 
+        theory = self.theories[self.selectedtheory]
+        if theory.derivative is None:
+            model_deriv = None
+        elif theory.derivative_theory_parameters:
+            model_deriv = self.fitfunction_derivative
+        else:  # Derivative of the fit function including the background
+            model_deriv = theory.derivative
 
         try:
             params, covariance_matrix, infodict = leastsq(
@@ -831,7 +842,7 @@ class FitManager(object):
                     self.xdata, ywork, param_val,
                     sigma=self.sigmay,
                     constraints=param_constraints,
-                    model_deriv=self.theories[self.selectedtheory].derivative,
+                    model_deriv=model_deriv,
                     full_output=True, left_derivative=True)
         except LinAlgError:
             self.state = 'Fit failed'
@@ -886,6 +897,43 @@ class FitManager(object):
 
         return result
 
+    def fitfunction_derivative(self, x, pars, index):
+        """Derivative of :meth:`fitfunction` with respect to ``pars[index]``
+        for theories whose
+        :attr:`~silx.math.fit.fittheory.FitTheory.derivative_theory_parameters`
+        is set.
+
+        The derivative function of the selected theory is called with the
+        theory parameters only (background parameters excluded).
+        Derivatives with respect to background parameters are computed
+        numerically.
+
+        :param x: Independent variable where the derivative is calculated.
+        :param pars: Sequence of all fit parameters (background parameters
+            first, then the peak function parameters).
+        :param int index: Index of the parameter in ``pars``
+        :return: Derivative of the fit function at each ``x`` value.
+        """
+        if self.selectedbg is not None:
+            nb_bg_pars = len(self.bgtheories[self.selectedbg].parameters)
+        else:
+            nb_bg_pars = 0
+
+        if index >= nb_bg_pars:
+            derivative = self.theories[self.selectedtheory].derivative
+            return derivative(x, pars[nb_bg_pars:], index - nb_bg_pars)
+
+        # background parameter: central finite difference
+        bgfun = self.bgtheories[self.selectedbg].function
+        bg_pars = numpy.array(pars[0:nb_bg_pars], dtype=numpy.float64)
+        delta = (bg_pars[index] + numpy.equal(bg_pars[index], 0.0)) * \
+            numpy.sqrt(numpy.finfo(numpy.float64).eps)
+        bg_pars[index] += delta
+        f1 = bgfun(x, self.ydata, *bg_pars)
+        bg_pars[index] -= 2 * delta
+        f2 = bgfun(x, self.ydata, *bg_pars)
+        return (numpy.asarray(f1) - numpy.asarray(f2)) / (2.0 * delta)
+
     def estimate_bkg(self, x, y):
         """Estimate background parameters using the function defined in
         the current fit configuration.
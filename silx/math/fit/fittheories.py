@@ -93,7 +93,7 @@ _logger = logging.getLogger(__name__)
 
 __authors__ = ["V.A. Sole", "P. Knobel"]
 __license__ = "MIT"
-__date__ = "15/05/2017"
+__date__ = "19/10/2026"
 
 
 DEFAULT_CONFIG = {
@@ -198,6 +198,23 @@ class FitTheories(object):
                                        gaussian_term=g_term, st_term=st_term,
                                        lt_term=lt_term, step_term=step_term)
 
+    def ahypermet_derivative(self, x, pars, index):
+        """
+        Wrapping of :func:`silx.math.fit.functions.sum_ahypermet_derivative`
+        without the tail flags in the function signature.
+
+        The active terms are defined by `self.config['HypermetTails']`,
+        as in :meth:`ahypermet`.
+        """
+        g_term = self.config['HypermetTails'] & 1
+        st_term = (self.config['HypermetTails'] >> 1) & 1
+        lt_term = (self.config['HypermetTails'] >> 2) & 1
+        step_term = (self.config['HypermetTails'] >> 3) & 1
+        return functions.sum_ahypermet_derivative(
+                x, pars, index,
+                gaussian_term=g_term, st_term=st_term,
+                lt_term=lt_term, step_term=step_term)
+
     def poly(self, x, *pars):
         """Order n polynomial.
         The order of the polynomial is defined by the number of
@@ -1216,36 +1233,48 @@ THEORY = OrderedDict((
                   function=functions.sum_gauss,
                   parameters=('Height', 'Position', 'FWHM'),
                   estimate=fitfuns.estimate_height_position_fwhm,
+                  derivative=functions.sum_gauss_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Lorentz',
         FitTheory(description='Lorentzian functions',
                   function=functions.sum_lorentz,
                   parameters=('Height', 'Position', 'FWHM'),
                   estimate=fitfuns.estimate_height_position_fwhm,
+                  derivative=functions.sum_lorentz_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Area Gaussians',
         FitTheory(description='Gaussian functions (area)',
                   function=functions.sum_agauss,
                   parameters=('Area', 'Position', 'FWHM'),
                   estimate=fitfuns.estimate_agauss,
+                  derivative=functions.sum_agauss_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Area Lorentz',
         FitTheory(description='Lorentzian functions (area)',
                   function=functions.sum_alorentz,
                   parameters=('Area', 'Position', 'FWHM'),
                   estimate=fitfuns.estimate_alorentz,
+                  derivative=functions.sum_alorentz_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Pseudo-Voigt Line',
         FitTheory(description='Pseudo-Voigt functions',
                   function=functions.sum_pvoigt,
                   parameters=('Height', 'Position', 'FWHM', 'Eta'),
                   estimate=fitfuns.estimate_pvoigt,
+                  derivative=functions.sum_pvoigt_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Area Pseudo-Voigt',
         FitTheory(description='Pseudo-Voigt functions (area)',
                   function=functions.sum_apvoigt,
                   parameters=('Area', 'Position', 'FWHM', 'Eta'),
                   estimate=fitfuns.estimate_apvoigt,
+                  derivative=functions.sum_apvoigt_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Split Gaussian',
         FitTheory(description='Asymmetric gaussian functions',
@@ -1253,12 +1282,16 @@ THEORY = OrderedDict((
                   parameters=('Height', 'Position', 'LowFWHM',
                               'HighFWHM'),
                   estimate=fitfuns.estimate_splitgauss,
+                  derivative=functions.sum_splitgauss_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Split Lorentz',
         FitTheory(description='Asymmetric lorentzian functions',
                   function=functions.sum_splitlorentz,
                   parameters=('Height', 'Position', 'LowFWHM', 'HighFWHM'),
                   estimate=fitfuns.estimate_splitgauss,
+                  derivative=functions.sum_splitlorentz_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Split Pseudo-Voigt',
         FitTheory(description='Asymmetric pseudo-Voigt functions',
@@ -1266,6 +1299,8 @@ THEORY = OrderedDict((
                   parameters=('Height', 'Position', 'LowFWHM',
                               'HighFWHM', 'Eta'),
                   estimate=fitfuns.estimate_splitpvoigt,
+                  derivative=functions.sum_splitpvoigt_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     ('Step Down',
         FitTheory(description='Step down function',
@@ -1297,6 +1332,8 @@ THEORY = OrderedDict((
                   parameters=('G_Area', 'Position', 'FWHM', 'ST_Area',
                               'ST_Slope', 'LT_Area', 'LT_Slope', 'Step_H'),
                   estimate=fitfuns.estimate_ahypermet,
+                  derivative=fitfuns.ahypermet_derivative,
+                  derivative_theory_parameters=True,
                   configure=fitfuns.configure)),
     # ('Periodic Gaussians',
     #     FitTheory(description='Periodic gaussian functions',
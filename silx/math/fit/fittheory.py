@@ -30,7 +30,7 @@ models.
 
 __authors__ = ["P. Knobel"]
 __license__ = "MIT"
-__date__ = "09/08/2016"
+__date__ = "19/10/2026"
 
 
 class FitTheory(object):
@@ -48,7 +48,8 @@ class FitTheory(object):
     """
     def __init__(self, function, parameters,
                  estimate=None, configure=None, derivative=None,
-                 description=None, pymca_legacy=False, is_background=False):
+                 description=None, pymca_legacy=False, is_background=False,
+                 derivative_theory_parameters=False):
         """
         :param function function: Actual function. See documentation for
             :attr:`function`.
@@ -67,6 +68,9 @@ class FitTheory(object):
         :param bool is_background: Flag to indicate that the theory is a
             background theory. This has implications regarding the function's
             signature, as explained in the documentation for :attr:`function`.
+        :param bool derivative_theory_parameters: Flag to indicate that
+            :attr:`derivative` only takes the parameters of :attr:`function`.
+            See documentation for :attr:`derivative_theory_parameters`
         """
         self.function = function
         """Regular fit functions must have the signature ``f(x, *params) -> y``,
@@ -128,7 +132,22 @@ class FitTheory(object):
         ``model_deriv(xdata, parameters, index)``, where parameters is a
         sequence with the current values of the fitting parameters, index is
         the fitting parameter index for which the the derivative has to be
-        provided in the supplied array of xdata points."""
+        provided in the supplied array of xdata points.
+
+        When used by :class:`silx.math.fit.fitmanager.FitManager`, the
+        parameters are all the fit parameters (background parameters first)
+        and the index is relative to them, unless
+        :attr:`derivative_theory_parameters` is set."""
+
+        self.derivative_theory_parameters = derivative_theory_parameters
+        """This attribute can be set to *True* to indicate that
+        :attr:`derivative` is the derivative of :attr:`function` alone.
+
+        :class:`silx.math.fit.fitmanager.FitManager` then calls it with the
+        parameters of :attr:`function` only (background parameters are not
+        included) and an index relative to them, and derives the background
+        numerically. This is the case of the theories of
+        :mod:`silx.math.fit.fittheories`."""
 
         self.description = description
         """Optional description string for this particular fit theory."""
@@ -46,6 +46,23 @@ List of fit functions:
     - :func:`sum_ahypermet`
     - :func:`sum_fastahypermet`
 
+Derivatives of fit functions with respect to one of their parameters,
+usable as ``model_deriv`` in :func:`silx.math.fit.leastsq`:
+
+    - :func:`sum_gauss_derivative`
+    - :func:`sum_agauss_derivative`
+    - :func:`sum_splitgauss_derivative`
+
+    - :func:`sum_apvoigt_derivative`
+    - :func:`sum_pvoigt_derivative`
+    - :func:`sum_splitpvoigt_derivative`
+
+    - :func:`sum_lorentz_derivative`
+    - :func:`sum_alorentz_derivative`
+    - :func:`sum_splitlorentz_derivative`
+
+    - :func:`sum_ahypermet_derivative`
+
 Full documentation:
 -------------------
 
@@ -53,7 +70,7 @@ Full documentation:
 
 __authors__ = ["P. Knobel"]
 __license__ = "MIT"
-__date__ = "16/08/2017"
+__date__ = "19/10/2026"
 
 import logging
 import numpy
@@ -938,6 +955,265 @@ def sum_fastahypermet(x, *params,
     return numpy.asarray(y_c).reshape(x.shape)
 
 
+ctypedef int (*derivative_function_t)(double*, int, double*, int, int, double*)
+
+
+cdef _sum_derivative(derivative_function_t function, x, parameters, int index,
+                     int nb_params):
+    """Call a C function computing the derivative of a sum of functions
+    with respect to ``parameters[index]``.
+
+    :param function: C derivative function
+    :param x: Independent variable where the derivative is calculated
+    :param parameters: Sequence of all the parameters of the sum of functions
+    :param int index: Index of the parameter
+    :param int nb_params: Number of parameters of a single function
+    :return: Array of derivative values at each ``x`` coordinate
+    """
+    cdef:
+        double[::1] x_c
+        double[::1] params_c
+        double[::1] y_c
+
+    if not len(parameters):
+        raise IndexError("No parameters specified. " +
+                         "At least %d parameters are required." % nb_params)
+
+    x = numpy.asarray(x)
+    x_c = numpy.array(x,
+                      copy=False,
+                      dtype=numpy.float64,
+                      order='C').reshape(-1)
+    params_c = numpy.array(parameters,
+                           copy=False,
+                           dtype=numpy.float64,
+                           order='C').reshape(-1)
+    y_c = numpy.empty(shape=(x.size,),
+                      dtype=numpy.float64)
+
+    status = function(&x_c[0], x.size,
+                      &params_c[0], params_c.size,
+                      index, &y_c[0])
+
+    if status:
+        raise IndexError("Wrong number of parameters for function " +
+                         "or parameter index out of range")
+
+    return numpy.asarray(y_c).reshape(x.shape)
+
+
+def sum_gauss_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_gauss` with respect to
+    ``parameters[index]``.
+
+    This function has the signature expected by
+    :func:`silx.math.fit.leastsq` for its ``model_deriv`` argument.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of gaussian parameters (length must be a
+        multiple of 3): *(height1, centroid1, fwhm1, height2, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_gauss_derivative,
+                           x, parameters, index, 3)
+
+
+def sum_agauss_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_agauss` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of gaussian parameters (length must be a
+        multiple of 3): *(area1, centroid1, fwhm1, area2, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_agauss_derivative,
+                           x, parameters, index, 3)
+
+
+def sum_splitgauss_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_splitgauss` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of gaussian parameters (length must be a
+        multiple of 4): *(height1, centroid1, fwhm11, fwhm21, height2, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_splitgauss_derivative,
+                           x, parameters, index, 4)
+
+
+def sum_apvoigt_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_apvoigt` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of pseudo-Voigt parameters (length must be a
+        multiple of 4): *(area1, centroid1, fwhm1, eta1, area2, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_apvoigt_derivative,
+                           x, parameters, index, 4)
+
+
+def sum_pvoigt_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_pvoigt` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of pseudo-Voigt parameters (length must be a
+        multiple of 4): *(height1, centroid1, fwhm1, eta1, height2, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_pvoigt_derivative,
+                           x, parameters, index, 4)
+
+
+def sum_splitpvoigt_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_splitpvoigt` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of pseudo-Voigt parameters (length must be a
+        multiple of 5): *(height1, centroid1, fwhm11, fwhm21, eta1, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_splitpvoigt_derivative,
+                           x, parameters, index, 5)
+
+
+def sum_lorentz_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_lorentz` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of Lorentz parameters (length must be a
+        multiple of 3): *(height1, centroid1, fwhm1, height2, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_lorentz_derivative,
+                           x, parameters, index, 3)
+
+
+def sum_alorentz_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_alorentz` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of Lorentz parameters (length must be a
+        multiple of 3): *(area1, centroid1, fwhm1, area2, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_alorentz_derivative,
+                           x, parameters, index, 3)
+
+
+def sum_splitlorentz_derivative(x, parameters, index):
+    """Return the derivative of :func:`sum_splitlorentz` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of Lorentz parameters (length must be a
+        multiple of 4): *(height1, centroid1, fwhm11, fwhm21, height2, ...)*
+    :param int index: Index of the parameter in ``parameters``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    return _sum_derivative(functions_wrapper.sum_splitlorentz_derivative,
+                           x, parameters, index, 4)
+
+
+def sum_ahypermet_derivative(x, parameters, index,
+                             gaussian_term=True, st_term=True, lt_term=True,
+                             step_term=True):
+    """Return the derivative of :func:`sum_ahypermet` with respect to
+    ``parameters[index]``.
+
+    :param x: Independent variable where the derivative is calculated
+    :type x: numpy.ndarray
+    :param parameters: Array of hypermet parameters (length must be a
+        multiple of 8):
+        *(area1, position1, fwhm1, st_area_r1, st_slope_r1, lt_area_r1,
+        lt_slope_r1, step_height_r1...)*
+    :param int index: Index of the parameter in ``parameters``
+    :param gaussian_term: If ``True``, enable gaussian term. Default ``True``
+    :param st_term: If ``True``, enable short tail term. Default ``True``
+    :param lt_term: If ``True``, enable long tail term. Default ``True``
+    :param step_term: If ``True``, enable step term. Default ``True``
+    :return: Array of derivative values at each ``x`` coordinate
+    :raise: IndexError if the number of parameters or the index is wrong
+    """
+    cdef:
+        double[::1] x_c
+        double[::1] params_c
+        double[::1] y_c
+
+    if not len(parameters):
+        raise IndexError("No parameters specified. " +
+                         "At least 8 parameters are required.")
+
+    # Sum binary flags to activate various terms of the equation
+    tail_flags = 1 if gaussian_term else 0
+    if st_term:
+        tail_flags += 2
+    if lt_term:
+        tail_flags += 4
+    if step_term:
+        tail_flags += 8
+
+    x = numpy.asarray(x)
+    x_c = numpy.array(x,
+                      copy=False,
+                      dtype=numpy.float64,
+                      order='C').reshape(-1)
+    params_c = numpy.array(parameters,
+                           copy=False,
+                           dtype=numpy.float64,
+                           order='C').reshape(-1)
+    y_c = numpy.empty(shape=(x.size,),
+                      dtype=numpy.float64)
+
+    status = functions_wrapper.sum_ahypermet_derivative(&x_c[0],
+                            x.size,
+                            &params_c[0],
+                            params_c.size,
+                            index,
+                            &y_c[0],
+                            tail_flags)
+
+    if status:
+        raise IndexError("Wrong number of parameters for function " +
+                         "or parameter index out of range")
+
+    return numpy.asarray(y_c).reshape(x.shape)
+
+
 def atan_stepup(x, a, b, c):
     """
     Step up function using an inverse tangent.
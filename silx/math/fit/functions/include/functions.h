@@ -26,6 +26,7 @@
 
 /* Helper functions */
 int test_params(int len_params, int len_params_one_function, char* fun_name, char* param_names);
+int test_deriv_index(int index, int len_params, char* fun_name);
 double myerfc(double x);
 double myerf(double x);
 int erfc_array(double* x, int len_x, double* y);
@@ -65,4 +66,20 @@ int sum_slit(double* x, int len_x, double* pslit, int len_pslit, double* y);
 int sum_ahypermet(double* x, int len_x, double* phypermet, int len_phypermet, double* y, int tail_flags);
 int sum_fastahypermet(double* x, int len_x, double* phypermet, int len_phypermet, double* y, int tail_flags);
 
+/* Derivatives of fit functions with respect to one parameter */
+int sum_gauss_derivative(double* x, int len_x, double* pgauss, int len_pgauss, int index, double* y);
+int sum_agauss_derivative(double* x, int len_x, double* pgauss, int len_pgauss, int index, double* y);
+int sum_splitgauss_derivative(double* x, int len_x, double* pgauss, int len_pgauss, int index, double* y);
+
+int sum_apvoigt_derivative(double* x, int len_x, double* pvoigt, int len_pvoigt, int index, double* y);
+int sum_pvoigt_derivative(double* x, int len_x, double* pvoigt, int len_pvoigt, int index, double* y);
+int sum_splitpvoigt_derivative(double* x, int len_x, double* pvoigt, int len_pvoigt, int index, double* y);
+
+int sum_lorentz_derivative(double* x, int len_x, double* plorentz, int len_plorentz, int index, double* y);
+int sum_alorentz_derivative(double* x, int len_x, double* plorentz, int len_plorentz, int index, double* y);
+int sum_splitlorentz_derivative(double* x, int len_x, double* plorentz, int len_plorentz, int index, double* y);
+
+int sum_ahypermet_derivative(double* x, int len_x, double* phypermet, int len_phypermet,
+                             int index, double* y, int tail_flags);
+
 #endif /* #define FITFUNCTIONS_H */
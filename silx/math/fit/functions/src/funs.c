@@ -1234,6 +1234,508 @@ int sum_fastahypermet(double* x, int len_x, double* phypermet, int len_phypermet
     return(0);
 }
 
+/*  Derivatives of the fit functions
+
+    The following functions compute the partial derivative of a sum of
+    functions with respect to one of its parameters, so they can be used
+    as ``model_deriv`` in a least-squares fit instead of finite differences.
+    Only the peak the parameter belongs to is evaluated, and the same
+    cut-off values as in the functions themselves are applied.
+*/
+
+/* Identifiers of the parameter used by peak_derivative */
+#define DERIV_HEIGHT    0
+#define DERIV_CENTROID  1
+#define DERIV_FWHM      2
+#define DERIV_FWHM1     3
+#define DERIV_FWHM2     4
+#define DERIV_ETA       5
+
+/*  peak_derivative
+    Derivative of a single peak eta * L(x) + (1 - eta) * G(x) with respect
+    to one of its parameters.
+
+    Parameters:
+    -----------
+
+        - x: Independant variable where the derivative is calculated.
+        - len_x: Number of elements in the x array.
+        - height: Peak amplitude, or peak area if area_normalized is set.
+        - centroid: Peak x-coordinate.
+        - fwhm1: Full-width at half maximum for x <= centroid.
+        - fwhm2: Full-width at half maximum for x > centroid.
+        - eta: Lorentz factor (0 for a gaussian, 1 for a Lorentzian).
+        - area_normalized: If non zero, height is the area of the peak.
+        - gauss_cutoff: Gaussian term is 0 when (x - centroid) / sigma is
+          larger than this value.
+        - wrt: Identifier of the parameter (DERIV_HEIGHT, ...)
+        - y: Output array. Must have memory allocated for the same number
+          of elements as x (len_x).
+*/
+static void peak_derivative(double* x, int len_x, double height, double centroid,
+                            double fwhm1, double fwhm2, double eta,
+                            int area_normalized, double gauss_cutoff,
+                            int wrt, double* y)
+{
+    int j, gauss_flag, lorentz_flag;
+    double inv_two_sqrt_two_log2, sqrt2PI;
+    double x_minus_centroid, fwhm, sigma, dhelp, g, g_height, l, l_height, gterm, lterm;
+
+    inv_two_sqrt_two_log2 = 1.0 / (2.0 * sqrt(2.0 * LOG2));
+    sqrt2PI = sqrt(2.0*M_PI);
+
+    /* Skip terms that do not contribute */
+    gauss_flag = (eta != 1.0) || (wrt == DERIV_ETA);
+    lorentz_flag = (eta != 0.0) || (wrt == DERIV_ETA);
+
+    for (j=0; j<len_x;  j++) {
+        y[j] = 0.;
+        x_minus_centroid = x[j] - centroid;
+        if (x_minus_centroid > 0) {
+            if (wrt == DERIV_FWHM1) {
+                continue;
+            }
+            fwhm = fwhm2;
+        }
+        else {
+            if (wrt == DERIV_FWHM2) {
+                continue;
+            }
+            fwhm = fwhm1;
+        }
+
+        /* Gaussian term */
+        gterm = 0.;
+        if (gauss_flag) {
+            sigma = fwhm * inv_two_sqrt_two_log2;
+            dhelp = x_minus_centroid / sigma;
+            if (dhelp <= gauss_cutoff) {
+                g = exp(-0.5 * dhelp * dhelp);
+                g_height = area_normalized ? height / (sigma * sqrt2PI) : height;
+                switch (wrt) {
+                    case DERIV_HEIGHT:
+                        gterm = area_normalized ? g / (sigma * sqrt2PI) : g;
+                        break;
+                    case DERIV_CENTROID:
+                        gterm = g_height * g * dhelp / sigma;
+                        break;
+                    case DERIV_ETA:
+                        gterm = g_height * g;
+                        break;
+                    default:
+                        gterm = g_height * g * (dhelp * dhelp - area_normalized) / fwhm;
+                }
+            }
+        }
+
+        /* Lorentzian term */
+        lterm = 0.;
+        if (lorentz_flag) {
+            dhelp = x_minus_centroid / (0.5 * fwhm);
+            l = 1.0 / (1.0 + (dhelp * dhelp));
+            l_height = area_normalized ? height / (0.5 * M_PI * fwhm) : height;
+            switch (wrt) {
+                case DERIV_HEIGHT:
+                    lterm = area_normalized ? l / (0.5 * M_PI * fwhm) : l;
+                    break;
+                case DERIV_CENTROID:
+                    lterm = l_height * 2.0 * dhelp * l * l / (0.5 * fwhm);
+                    break;
+                case DERIV_ETA:
+                    lterm = l_height * l;
+                    break;
+                default:
+                    lterm = l_height * l * (2.0 * dhelp * dhelp * l - area_normalized) / fwhm;
+            }
+        }
+
+        if (wrt == DERIV_ETA) {
+            y[j] = lterm - gterm;
+        }
+        else {
+            y[j] = eta * lterm + (1.0 - eta) * gterm;
+        }
+    }
+}
+
+/*  test_deriv_index
+    Check the parameter index given to a derivative function.
+    Return 0 if the index is in the range [0, len_params), else print an
+    error message and return 1.
+*/
+int test_deriv_index(int index, int len_params, char* fun_name)
+{
+    if (index < 0 || index >= len_params) {
+        printf("[%s]Error: Parameter index %d out of range [0, %d)\n",
+               fun_name, index, len_params);
+        return(1);
+    }
+    return(0);
+}
+
+/*  sum_gauss_derivative
+    Derivative of a sum of gaussian functions defined by
+    (height, centroid, fwhm) with respect to the parameter
+    pgauss[index] (see sum_gauss).
+
+    Parameters:
+    -----------
+
+        - x: Independant variable where the derivative is calculated.
+        - len_x: Number of elements in the x array.
+        - pgauss: Array of gaussian parameters:
+          (height1, centroid1, fwhm1, height2, centroid2, fwhm2,...)
+        - len_pgauss: Number of elements in the pgauss array. Must be
+          a multiple of 3.
+        - index: Index of the parameter in pgauss.
+        - y: Output array. Must have memory allocated for the same number
+          of elements as x (len_x).
+*/
+int sum_gauss_derivative(double* x, int len_x, double* pgauss, int len_pgauss, int index, double* y)
+{
+    int i, wrt;
+
+    if (test_params(len_pgauss, 3, "sum_gauss_derivative", "height, centroid, fwhm") ||
+        test_deriv_index(index, len_pgauss, "sum_gauss_derivative")) {
+        return(1);
+    }
+
+    i = index / 3;
+    wrt = index % 3;
+    peak_derivative(x, len_x, pgauss[3*i], pgauss[3*i+1], pgauss[3*i+2], pgauss[3*i+2],
+                    0.0, 0, 20, wrt, y);
+    return(0);
+}
+
+/*  sum_agauss_derivative
+    Derivative of a sum of gaussian functions defined by
+    (area, centroid, fwhm) with respect to the parameter
+    pgauss[index] (see sum_agauss).
+*/
+int sum_agauss_derivative(double* x, int len_x, double* pgauss, int len_pgauss, int index, double* y)
+{
+    int i, wrt;
+
+    if (test_params(len_pgauss, 3, "sum_agauss_derivative", "area, centroid, fwhm") ||
+        test_deriv_index(index, len_pgauss, "sum_agauss_derivative")) {
+        return(1);
+    }
+
+    i = index / 3;
+    wrt = index % 3;
+    peak_derivative(x, len_x, pgauss[3*i], pgauss[3*i+1], pgauss[3*i+2], pgauss[3*i+2],
+                    0.0, 1, 35, wrt, y);
+    return(0);
+}
+
+/*  sum_splitgauss_derivative
+    Derivative of a sum of split gaussian functions defined by
+    (height, centroid, fwhm1, fwhm2) with respect to the parameter
+    pgauss[index] (see sum_splitgauss).
+*/
+int sum_splitgauss_derivative(double* x, int len_x, double* pgauss, int len_pgauss, int index, double* y)
+{
+    int i, wrt;
+    int wrt_ids[4] = {DERIV_HEIGHT, DERIV_CENTROID, DERIV_FWHM1, DERIV_FWHM2};
+
+    if (test_params(len_pgauss, 4, "sum_splitgauss_derivative", "height, centroid, fwhm1, fwhm2") ||
+        test_deriv_index(index, len_pgauss, "sum_splitgauss_derivative")) {
+        return(1);
+    }
+
+    i = index / 4;
+    wrt = wrt_ids[index % 4];
+    peak_derivative(x, len_x, pgauss[4*i], pgauss[4*i+1], pgauss[4*i+2], pgauss[4*i+3],
+                    0.0, 0, 20, wrt, y);
+    return(0);
+}
+
+/*  sum_apvoigt_derivative
+    Derivative of a sum of pseudo-Voigt functions defined by
+    (area, centroid, fwhm, eta) with respect to the parameter
+    pvoigt[index] (see sum_apvoigt).
+*/
+int sum_apvoigt_derivative(double* x, int len_x, double* pvoigt, int len_pvoigt, int index, double* y)
+{
+    int i, wrt;
+    int wrt_ids[4] = {DERIV_HEIGHT, DERIV_CENTROID, DERIV_FWHM, DERIV_ETA};
+
+    if (test_params(len_pvoigt, 4, "sum_apvoigt_derivative", "area, centroid, fwhm, eta") ||
+        test_deriv_index(index, len_pvoigt, "sum_apvoigt_derivative")) {
+        return(1);
+    }
+
+    i = index / 4;
+    wrt = wrt_ids[index % 4];
+    peak_derivative(x, len_x, pvoigt[4*i], pvoigt[4*i+1], pvoigt[4*i+2], pvoigt[4*i+2],
+                    pvoigt[4*i+3], 1, 35, wrt, y);
+    return(0);
+}
+
+/*  sum_pvoigt_derivative
+    Derivative of a sum of pseudo-Voigt functions defined by
+    (height, centroid, fwhm, eta) with respect to the parameter
+    pvoigt[index] (see sum_pvoigt).
+*/
+int sum_pvoigt_derivative(double* x, int len_x, double* pvoigt, int len_pvoigt, int index, double* y)
+{
+    int i, wrt;
+    int wrt_ids[4] = {DERIV_HEIGHT, DERIV_CENTROID, DERIV_FWHM, DERIV_ETA};
+
+    if (test_params(len_pvoigt, 4, "sum_pvoigt_derivative", "height, centroid, fwhm, eta") ||
+        test_deriv_index(index, len_pvoigt, "sum_pvoigt_derivative")) {
+        return(1);
+    }
+
+    i = index / 4;
+    wrt = wrt_ids[index % 4];
+    peak_derivative(x, len_x, pvoigt[4*i], pvoigt[4*i+1], pvoigt[4*i+2], pvoigt[4*i+2],
+                    pvoigt[4*i+3], 0, 35, wrt, y);
+    return(0);
+}
+
+/*  sum_splitpvoigt_derivative
+    Derivative of a sum of split pseudo-Voigt functions defined by
+    (height, centroid, fwhm1, fwhm2, eta) with respect to the parameter
+    pvoigt[index] (see sum_splitpvoigt).
+*/
+int sum_splitpvoigt_derivative(double* x, int len_x, double* pvoigt, int len_pvoigt, int index, double* y)
+{
+    int i, wrt;
+    int wrt_ids[5] = {DERIV_HEIGHT, DERIV_CENTROID, DERIV_FWHM1, DERIV_FWHM2, DERIV_ETA};
+
+    if (test_params(len_pvoigt, 5, "sum_splitpvoigt_derivative", "height, centroid, fwhm1, fwhm2, eta") ||
+        test_deriv_index(index, len_pvoigt, "sum_splitpvoigt_derivative")) {
+        return(1);
+    }
+
+    i = index / 5;
+    wrt = wrt_ids[index % 5];
+    peak_derivative(x, len_x, pvoigt[5*i], pvoigt[5*i+1], pvoigt[5*i+2], pvoigt[5*i+3],
+                    pvoigt[5*i+4], 0, 35, wrt, y);
+    return(0);
+}
+
+/*  sum_lorentz_derivative
+    Derivative of a sum of Lorentz functions defined by
+    (height, centroid, fwhm) with respect to the parameter
+    plorentz[index] (see sum_lorentz).
+*/
+int sum_lorentz_derivative(double* x, int len_x, double* plorentz, int len_plorentz, int index, double* y)
+{
+    int i, wrt;
+
+    if (test_params(len_plorentz, 3, "sum_lorentz_derivative", "height, centroid, fwhm") ||
+        test_deriv_index(index, len_plorentz, "sum_lorentz_derivative")) {
+        return(1);
+    }
+
+    i = index / 3;
+    wrt = index % 3;
+    peak_derivative(x, len_x, plorentz[3*i], plorentz[3*i+1], plorentz[3*i+2], plorentz[3*i+2],
+                    1.0, 0, 0, wrt, y);
+    return(0);
+}
+
+/*  sum_alorentz_derivative
+    Derivative of a sum of Lorentz functions defined by
+    (area, centroid, fwhm) with respect to the parameter
+    plorentz[index] (see sum_alorentz).
+*/
+int sum_alorentz_derivative(double* x, int len_x, double* plorentz, int len_plorentz, int index, double* y)
+{
+    int i, wrt;
+
+    if (test_params(len_plorentz, 3, "sum_alorentz_derivative", "area, centroid, fwhm") ||
+        test_deriv_index(index, len_plorentz, "sum_alorentz_derivative")) {
+        return(1);
+    }
+
+    i = index / 3;
+    wrt = index % 3;
+    peak_derivative(x, len_x, plorentz[3*i], plorentz[3*i+1], plorentz[3*i+2], plorentz[3*i+2],
+                    1.0, 1, 0, wrt, y);
+    return(0);
+}
+
+/*  sum_splitlorentz_derivative
+    Derivative of a sum of split Lorentz functions defined by
+    (height, centroid, fwhm1, fwhm2) with respect to the parameter
+    plorentz[index] (see sum_splitlorentz).
+*/
+int sum_splitlorentz_derivative(double* x, int len_x, double* plorentz, int len_plorentz, int index, double* y)
+{
+    int i, wrt;
+    int wrt_ids[4] = {DERIV_HEIGHT, DERIV_CENTROID, DERIV_FWHM1, DERIV_FWHM2};
+
+    if (test_params(len_plorentz, 4, "sum_splitlorentz_derivative", "height, centroid, fwhm1, fwhm2") ||
+        test_deriv_index(index, len_plorentz, "sum_splitlorentz_derivative")) {
+        return(1);
+    }
+
+    i = index / 4;
+    wrt = wrt_ids[index % 4];
+    peak_derivative(x, len_x, plorentz[4*i], plorentz[4*i+1], plorentz[4*i+2], plorentz[4*i+3],
+                    1.0, 0, 0, wrt, y);
+    return(0);
+}
+
+/*  sum_ahypermet_derivative
+    Derivative of a sum of hypermet functions defined by
+    (area, position, fwhm, st_area_r, st_slope_r, lt_area_r, lt_slope_r,
+    step_height_r) with respect to the parameter phypermet[index]
+    (see sum_ahypermet).
+
+    Parameters:
+    -----------
+
+        - x: Independant variable where the derivative is calculated.
+        - len_x: Number of elements in the x array.
+        - phypermet: Array of hypermet function parameters:
+          *(area1, position1, fwhm1, st_area_r1, st_slope_r1, lt_area_r1,
+          lt_slope_r1, step_height_r1, ...)*
+        - len_phypermet: Number of elements in the phypermet array. Must be
+          a multiple of 8.
+        - index: Index of the parameter in phypermet.
+        - y: Output array. Must have memory allocated for the same number
+          of elements as x (len_x).
+        - tail_flags: sum of binary flags to activate the various terms of the
+          function (see sum_ahypermet)
+*/
+int sum_ahypermet_derivative(double* x, int len_x, double* phypermet, int len_phypermet,
+                             int index, double* y, int tail_flags)
+{
+    int i, j, k, t;
+    int g_term_flag, tail_term_flags[2], step_term_flag;
+    double c2, g, sigma, height, sigma_sqrt2, sqrt2PI, sqrtPI, inv_2_sqrt_2_log2;
+    double x_minus_position, epsilon, erfc_exp, erfc_step;
+    double area, position, fwhm, tail_area_r, tail_slope_r, step_height_r;
+
+    if (test_params(len_phypermet, 8, "sum_ahypermet_derivative",
+                    "height, centroid, fwhm, st_area_r, st_slope_r, lt_area_r, lt_slope_r, step_height_r") ||
+        test_deriv_index(index, len_phypermet, "sum_ahypermet_derivative")) {
+        return(1);
+    }
+
+    g_term_flag         = tail_flags & 1;
+    tail_term_flags[0]  = (tail_flags>>1) & 1;
+    tail_term_flags[1]  = (tail_flags>>2) & 1;
+    step_term_flag      = (tail_flags>>3) & 1;
+
+    /* Initialize output array */
+    for (j=0; j<len_x;  j++) {
+        y[j] = 0.;
+    }
+
+    /* define epsilon to compare floating point values with 0. */
+    epsilon = 0.00000000001;
+
+    sqrt2PI= sqrt(2.0 * M_PI);
+    sqrtPI = sqrt(M_PI);
+    inv_2_sqrt_2_log2 = 1.0 / (2.0 * sqrt(2.0 * LOG2));
+
+    i = index / 8;
+    k = index % 8;
+
+    area = phypermet[8*i];
+    position = phypermet[8*i+1];
+    fwhm = phypermet[8*i+2];
+    step_height_r = phypermet[8*i+7];
+
+    sigma = fwhm * inv_2_sqrt_2_log2;
+    height = area / (sigma * sqrt2PI);
+
+    /* Prevent division by 0 */
+    if (sigma == 0) {
+        printf("fwhm must not be equal to 0");
+        return(1);
+    }
+    sigma_sqrt2 = sigma * 1.4142135623730950488;
+
+    for (j=0; j<len_x;  j++) {
+        x_minus_position = x[j] - position;
+        c2 = (0.5 * x_minus_position * x_minus_position) / (sigma * sigma);
+        g = exp(-c2);
+
+        /* gaussian term: height * g */
+        if (g_term_flag) {
+            switch (k) {
+                case 0:
+                    y[j] += g / (sigma * sqrt2PI);
+                    break;
+                case 1:
+                    y[j] += height * g * x_minus_position / (sigma * sigma);
+                    break;
+                case 2:
+                    y[j] += height * g * (2.0 * c2 - 1.0) / fwhm;
+                    break;
+            }
+        }
+
+        /* st (t=0) and lt (t=1) terms:
+           area * tail_area_r * 0.5 * erfc(w) * exp(0.5 * (sigma / tail_slope_r)**2 + x_minus_position / tail_slope_r) / tail_slope_r
+           with w = x_minus_position / sigma_sqrt2 + 0.5 * sigma_sqrt2 / tail_slope_r.
+           exp(-w * w) * exp(0.5 * (sigma / tail_slope_r)**2 + x_minus_position / tail_slope_r) is equal to g */
+        for (t=0; t<2; t++) {
+            /* parameters of this tail are at indices 3, 4 (st) or 5, 6 (lt) */
+            if (!tail_term_flags[t] || (k > 2 && k != 3 + 2*t && k != 4 + 2*t)) {
+                continue;
+            }
+            tail_area_r = phypermet[8*i + 3 + 2*t];
+            tail_slope_r = phypermet[8*i + 4 + 2*t];
+            if (fabs(tail_slope_r) <= epsilon) {
+                continue;
+            }
+            erfc_exp = 0.5 * erfc((x_minus_position/sigma_sqrt2) + 0.5 * sigma_sqrt2 / tail_slope_r) * \
+                       exp(0.5 * (sigma / tail_slope_r) * (sigma / tail_slope_r) + \
+                           (x_minus_position / tail_slope_r));
+            if (k == 0) {
+                y[j] += tail_area_r * erfc_exp / tail_slope_r;
+            }
+            else if (k == 1) {
+                y[j] += (area * tail_area_r / tail_slope_r) * \
+                        (g / (sqrtPI * sigma_sqrt2) - erfc_exp / tail_slope_r);
+            }
+            else if (k == 2) {
+                y[j] += (area * tail_area_r / tail_slope_r) * (sigma / fwhm) * \
+                        (g * (x_minus_position / sigma - sigma / tail_slope_r) / (sqrtPI * sigma_sqrt2) + \
+                         erfc_exp * sigma / (tail_slope_r * tail_slope_r));
+            }
+            else if (k == 3 + 2*t) {
+                y[j] += area * erfc_exp / tail_slope_r;
+            }
+            else {
+                y[j] += (area * tail_area_r / tail_slope_r) * \
+                        (g * sigma_sqrt2 / (2.0 * sqrtPI * tail_slope_r * tail_slope_r) - \
+                         erfc_exp * (1.0 / tail_slope_r + \
+                                     sigma * sigma / (tail_slope_r * tail_slope_r * tail_slope_r) + \
+                                     x_minus_position / (tail_slope_r * tail_slope_r)));
+            }
+        }
+
+        /* step term: step_height_r * height * 0.5 * erfc(x_minus_position / sigma_sqrt2) */
+        if (step_term_flag) {
+            erfc_step = 0.5 * erfc(x_minus_position / sigma_sqrt2);
+            switch (k) {
+                case 0:
+                    y[j] += step_height_r * erfc_step / (sigma * sqrt2PI);
+                    break;
+                case 1:
+                    y[j] += step_height_r * height * g / (sqrtPI * sigma_sqrt2);
+                    break;
+                case 2:
+                    y[j] += step_height_r * (height / fwhm) * \
+                            (x_minus_position * g / (sqrtPI * sigma_sqrt2) - erfc_step);
+                    break;
+                case 7:
+                    y[j] += height * erfc_step;
+                    break;
+            }
+        }
+    }
+    return(0);
+}
+
 void pileup(double* x, long len_x, double* ret, int input2, double zero, double gain)
 {
     //int    input2=0;
@@ -34,7 +34,7 @@ This module is a refactored version of PyMca Gefit.py module.
 """
 __authors__ = ["V.A. Sole"]
 __license__ = "MIT"
-__date__ = "15/05/2017"
+__date__ = "19/10/2026"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
 
 import numpy
@@ -124,6 +124,8 @@ def leastsq(model, xdata, ydata, p0, sigma=None,
         It will be called as model_deriv(xdata, parameters, index) where parameters is a sequence with the current
         values of the fitting parameters, index is the fitting parameter index for which the the derivative has
         to be provided in the supplied array of xdata points.
+        Parameters tied to a fitted parameter by a CFACTOR, CDELTA or CSUM
+        constraint contribute to its derivative.
     :type model_deriv: *optional*, None or callable
 
 
@@ -559,6 +561,8 @@ def chisq_alpha_beta(model, parameters, x, y, weight, constraints=None,
         It will be called as model_deriv(xdata, parameters, index) where parameters is a sequence with the current
         values of the fitting parameters, index is the fitting parameter index for which the the derivative has
         to be provided in the supplied array of xdata points.
+        Parameters tied to a fitted parameter by a CFACTOR, CDELTA or CSUM
+        constraint contribute to its derivative.
     :type model_deriv: *optional*, None or callable
 
 
@@ -658,6 +662,9 @@ def chisq_alpha_beta(model, parameters, x, y, weight, constraints=None,
         pwork [free_index[i]] = fitparam [i]
     if n_free == 0:
         raise ValueError("No free parameters to fit")
+    if model_deriv is not None:
+        # derivatives are computed with the constraints applied
+        pderiv = numpy.array(_get_parameters(pwork.tolist(), constraints))
     function_calls = 0
     if not left_derivative:
         if last_evaluation is not None:
@@ -689,7 +696,20 @@ def chisq_alpha_beta(model, parameters, x, y, weight, constraints=None,
             #removed I resize outside the loop:
             #help0 = numpy.resize(help0, (1, nr))
         else:
-            help0 = model_deriv(x, pwork, free_index[i])
+            help0 = model_deriv(x, pderiv, free_index[i])
+            # parameters tied to this one also vary with it (chain rule)
+            if constraints is not None:
+                for j in range(n_param):
+                    if constraints[j][0] not in [CFACTOR, CDELTA, CSUM] or \
+                       int(constraints[j][1]) != free_index[i]:
+                        continue
+                    if constraints[j][0] == CFACTOR:
+                        factor = constraints[j][2]
+                    elif constraints[j][0] == CDELTA:
+                        factor = 1.0
+                    else:
+                        factor = -1.0
+                    help0 = help0 + factor * model_deriv(x, pderiv, j)
             help0 = help0 * derivfactor[i]
 
         if i == 0:
@@ -739,6 +759,373 @@ def chisq_alpha_beta(model, parameters, x, y, weight, constraints=None,
         return chisq, alpha, beta
 
 
+def leastsq_batch(model, xdata, ydata, p0, sigma=None,
+                  constraints=None, model_deriv=None, epsfcn=None,
+                  deltachi=None, full_output=False, max_iter=100,
+                  vectorized=True, batch_size=None, nprocesses=None):
+    """
+    Fit many independent curves sharing the same model and x axis
+    with a Levenberg-Marquardt algorithm.
+
+    All the curves are processed simultaneously: the model is evaluated
+    for all the curves in a single call (if ``vectorized`` is True) and the
+    small normal-equation systems of all the curves are solved in bulk.
+    Each curve has its own damping factor and convergence criterion.
+
+    Non-finite values of ``ydata`` and ``sigma`` are ignored.
+
+    :param model: callable
+        The model function, f(x, ...). It must take the independent
+        variable as the first argument and the parameters to fit as
+        separate remaining arguments.
+        If ``vectorized`` is True, each parameter is provided as an array
+        of shape (n, 1) (one row per curve) and the returned value must be
+        broadcastable to an array of shape (n, M).
+        Otherwise, it is called once per curve with scalar parameters as
+        for :func:`leastsq`.
+    :param xdata: An M-length sequence.
+        The independent variable where the data is measured.
+        It is shared by all the curves.
+    :param ydata: 2D array of shape (N, M): one curve per row.
+    :param p0: Initial guess for the parameters, either a P-length
+        sequence shared by all the curves or a (N, P) array.
+    :param sigma: None, M-length sequence or (N, M) array of the
+        uncertainties on ydata. If None, the uncertainties are assumed to be 1.
+    :param constraints:
+        None or 2D sequence of dimension (P, 3) with the same meaning as
+        for :func:`leastsq`. The constraints are shared by all the curves.
+        Only CFREE, CPOSITIVE and CFIXED are supported.
+    :param model_deriv:
+        None (default) or function providing the derivatives of the fitting
+        function respect to the fitted parameters.
+        It is called as model_deriv(xdata, parameters, index) where
+        parameters is a sequence of the current values of the parameters.
+        With ``vectorized`` True, ``parameters[i]`` is an array of shape
+        (n, 1) and the result must be broadcastable to (n, M).
+    :param float epsfcn: Parameter variation used to compute numerical
+        derivatives (see :func:`leastsq`).
+    :param float deltachi: Minimum relative change in chisq (in percent)
+        to continue the fit of a curve. Default is 0.1 %.
+    :param bool full_output: True to also return a dictionary of optional
+        outputs.
+    :param int max_iter: Maximum number of iterations (default is 100)
+    :param bool vectorized: True (default) if the model (and model_deriv)
+        can evaluate many curves in a single call, False to call it once
+        per curve.
+    :param int batch_size: Number of curves fitted together.
+        Default: All the curves if nprocesses is None, else the number of
+        curves is evenly split between processes.
+    :param int nprocesses: If not None, the number of processes of the
+        :class:`multiprocessing.Pool` used to fit batches concurrently.
+        In this case model and model_deriv must be picklable
+        (e.g., functions defined at the module level).
+    :return: Returns a tuple of length 3 (or 4 if full_output is True)
+        with the content:
+
+         ``popt``: (N, P) array
+           Optimal values of the parameters of each curve.
+         ``uncertainties``: (N, P) array
+           Uncertainties on the optimal parameters computed from the
+           diagonal of the covariance matrix of the free parameters.
+           Fixed parameters are given a 100 % uncertainty as in
+           :func:`leastsq`.
+         ``chisq``: N-length array
+           The chi square of each curve.
+         ``infodict``: dict
+           a dictionary of optional outputs with the keys:
+
+            ``reduced_chisq``
+                The chi square of each curve divided by its number of
+                degrees of freedom
+            ``niter``
+                The number of iterations performed for each curve
+            ``nfev``
+                The number of model function calls
+    """
+    ydata = numpy.array(ydata, dtype=numpy.float64, copy=False)
+    if ydata.ndim == 1:
+        ydata = ydata.reshape(1, -1)
+    elif ydata.ndim != 2:
+        raise ValueError("ydata must be a 2D array of curves")
+    ncurves = ydata.shape[0]
+
+    p0 = numpy.array(p0, dtype=numpy.float64, copy=False)
+    if p0.ndim == 1:
+        p0 = numpy.tile(p0, (ncurves, 1))
+    elif p0.shape[0] != ncurves:
+        raise ValueError("p0 must be a P-length sequence or a (N, P) array")
+
+    if sigma is not None:
+        sigma = numpy.array(sigma, dtype=numpy.float64, copy=False)
+        sigma = numpy.broadcast_to(sigma, ydata.shape)
+
+    kwargs = dict(constraints=constraints,
+                  model_deriv=model_deriv,
+                  epsfcn=epsfcn,
+                  deltachi=deltachi,
+                  max_iter=max_iter,
+                  vectorized=vectorized)
+
+    if batch_size is None:
+        if nprocesses is None:
+            batch_size = ncurves
+        else:
+            batch_size = (ncurves + nprocesses - 1) // nprocesses
+    batch_size = max(1, int(batch_size))
+
+    tasks = []
+    for start in range(0, ncurves, batch_size):
+        end = min(start + batch_size, ncurves)
+        tasks.append((model, xdata, ydata[start:end], p0[start:end],
+                      None if sigma is None else sigma[start:end], kwargs))
+
+    if nprocesses is None or len(tasks) <= 1:
+        results = [_leastsq_batch_task(task) for task in tasks]
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes=nprocesses)
+        try:
+            results = pool.map(_leastsq_batch_task, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    popt = numpy.concatenate([result[0] for result in results])
+    uncertainties = numpy.concatenate([result[1] for result in results])
+    chisq = numpy.concatenate([result[2] for result in results])
+
+    if not full_output:
+        return popt, uncertainties, chisq
+    else:
+        ddict = {}
+        ddict["reduced_chisq"] = numpy.concatenate(
+            [result[3]["reduced_chisq"] for result in results])
+        ddict["niter"] = numpy.concatenate(
+            [result[3]["niter"] for result in results])
+        ddict["nfev"] = sum(result[3]["nfev"] for result in results)
+        return popt, uncertainties, chisq, ddict
+
+
+def _leastsq_batch_task(args):
+    """Unpack arguments of :func:`_leastsq_batch` for multiprocessing"""
+    model, xdata, ydata, p0, sigma, kwargs = args
+    return _leastsq_batch(model, xdata, ydata, p0, sigma, **kwargs)
+
+
+def _leastsq_batch(model, xdata, ydata, p0, sigma, constraints=None,
+                   model_deriv=None, epsfcn=None, deltachi=None,
+                   max_iter=100, vectorized=True):
+    """Fit a batch of curves in a single process.
+
+    See :func:`leastsq_batch` for the description of the parameters.
+
+    :return: (popt, uncertainties, chisq, infodict)
+    """
+    if deltachi is None:
+        deltachi = 0.001
+    if epsfcn is None:
+        epsfcn = numpy.finfo(numpy.float64).eps
+    else:
+        epsfcn = max(epsfcn, numpy.finfo(numpy.float64).eps)
+
+    ncurves, nparameters = p0.shape
+
+    # Shared constraints: get free and positive parameters
+    free_index = []
+    positive = []
+    if constraints is None:
+        free_index = list(range(nparameters))
+        positive = [False] * nparameters
+    else:
+        for i in range(nparameters):
+            code = constraints[i][0]
+            if hasattr(code, "upper"):
+                code = {"FREE": CFREE,
+                        "POSITIVE": CPOSITIVE,
+                        "FIXED": CFIXED}.get(code.upper(), code)
+            if code in (CFREE, CPOSITIVE):
+                free_index.append(i)
+                positive.append(code == CPOSITIVE)
+            elif code != CFIXED:
+                raise ValueError(
+                    "Unsupported constraint %s for batch fitting" %
+                    constraints[i][0])
+    n_free = len(free_index)
+    if n_free == 0:
+        raise ValueError("No free parameters to fit")
+    free_index = numpy.array(free_index)
+    positive = numpy.array(positive, dtype=bool)
+
+    # Ignore non-finite data by setting their weight to 0
+    if sigma is None:
+        weight = numpy.ones(ydata.shape, dtype=numpy.float64)
+    else:
+        weight = 1.0 / (sigma + numpy.equal(sigma, 0))
+        weight = weight * weight
+    invalid = numpy.logical_not(numpy.isfinite(ydata))
+    invalid |= numpy.logical_not(numpy.isfinite(weight))
+    if numpy.any(invalid):
+        ydata = numpy.where(invalid, 0., ydata)
+        weight = numpy.where(invalid, 0., weight)
+    ndof = numpy.sum(numpy.logical_not(invalid), axis=1) - n_free
+
+    function_calls = [0]
+
+    def evaluate(parameters):
+        """Evaluate the model for all curves of parameters"""
+        function_calls[0] += 1
+        if vectorized:
+            result = model(xdata, *parameters.T[:, :, numpy.newaxis])
+            return numpy.array(
+                numpy.broadcast_to(result, (len(parameters), ydata.shape[1])),
+                dtype=numpy.float64)
+        else:
+            return numpy.array([numpy.ravel(model(xdata, *p))
+                                for p in parameters])
+
+    def derivatives(parameters, yfit):
+        """Return the (n, n_free, M) derivatives for curves of parameters"""
+        deriv = numpy.empty((len(parameters), n_free, ydata.shape[1]),
+                            dtype=numpy.float64)
+        for i, index in enumerate(free_index):
+            if model_deriv is not None:
+                if vectorized:
+                    deriv[:, i] = model_deriv(
+                        xdata, parameters.T[:, :, numpy.newaxis], index)
+                else:
+                    deriv[:, i] = [numpy.ravel(model_deriv(xdata, p, index))
+                                   for p in parameters]
+            else:
+                delta = (parameters[:, index] +
+                         numpy.equal(parameters[:, index], 0.0)) * \
+                    numpy.sqrt(epsfcn)
+                pwork = parameters.copy()
+                pwork[:, index] += delta
+                deriv[:, i] = (evaluate(pwork) - yfit) / delta[:, numpy.newaxis]
+        return deriv
+
+    parameters = p0.copy()
+    parameters[:, free_index[positive]] = abs(
+        parameters[:, free_index[positive]])
+    yfit = evaluate(parameters)
+    chisq = numpy.sum(weight * (ydata - yfit) ** 2, axis=1)
+    flambda = numpy.full((ncurves,), 0.001)
+    niter = numpy.zeros((ncurves,), dtype=numpy.int64)
+    alpha0 = numpy.zeros((ncurves, n_free, n_free), dtype=numpy.float64)
+    identity = numpy.identity(n_free)
+
+    active = numpy.arange(ncurves)
+    for _iteration in range(max_iter):
+        if len(active) == 0:
+            break
+        niter[active] += 1
+
+        # Curvature matrix alpha and beta of active curves
+        deriv = derivatives(parameters[active], yfit[active])
+        weighted_deriv = deriv * weight[active][:, numpy.newaxis, :]
+        alpha = numpy.einsum('nim,njm->nij', weighted_deriv, deriv)
+        beta = numpy.einsum('nim,nm->ni', weighted_deriv,
+                            ydata[active] - yfit[active])
+        alpha0[active] = alpha
+
+        # Damping loop of curves which have not improved yet
+        pending = numpy.arange(len(active))
+        finished = numpy.zeros((len(active),), dtype=bool)
+        while len(pending) > 0:
+            curves = active[pending]
+            damped = alpha[pending] * (
+                1.0 + flambda[curves, numpy.newaxis, numpy.newaxis] * identity)
+            deltapar = _solve_batch(damped, beta[pending])
+
+            newpar = parameters[curves].copy()
+            newpar[:, free_index] += deltapar
+            newpar[:, free_index[positive]] = abs(
+                newpar[:, free_index[positive]])
+            newfit = evaluate(newpar)
+            newchisq = numpy.sum(weight[curves] * (ydata[curves] - newfit) ** 2,
+                                 axis=1)
+            absdeltachi = chisq[curves] - newchisq
+            # NaN steps (e.g. singular matrix) are handled as failure
+            improved = absdeltachi >= 0
+
+            # Failed curves: increase damping
+            failed = curves[~improved]
+            flambda[failed] *= 10.0
+            stalled = flambda[failed] > 1000
+            finished[pending[~improved][stalled]] = True
+
+            # Improved curves: update and check convergence
+            accepted = curves[improved]
+            parameters[accepted] = newpar[improved]
+            yfit[accepted] = newfit[improved]
+            lastdeltachi = 100 * (absdeltachi[improved] /
+                                  (newchisq[improved] + (newchisq[improved] == 0)))
+            converged = numpy.logical_and(
+                niter[accepted] >= 2,
+                numpy.logical_or(lastdeltachi < deltachi,
+                                 absdeltachi[improved] < numpy.sqrt(epsfcn)))
+            finished[pending[improved][converged]] = True
+            chisq[accepted] = newchisq[improved]
+            flambda[accepted] /= 10.0
+
+            pending = pending[~improved][~stalled]
+
+        active = active[~finished]
+
+    # Uncertainties from the covariance matrix of the free parameters
+    cov = _inv_batch(alpha0)
+    uncertainties = parameters.copy()  # 100 % uncertainty on fixed ones
+    uncertainties[:, free_index] = numpy.sqrt(
+        abs(numpy.diagonal(cov, axis1=1, axis2=2)))
+
+    ddict = {}
+    ddict["reduced_chisq"] = chisq / numpy.maximum(ndof, 1)
+    ddict["niter"] = niter
+    ddict["nfev"] = function_calls[0]
+    return parameters, uncertainties, chisq, ddict
+
+
+def _solve_batch(alpha, beta):
+    """Solve a stack of linear systems alpha x = beta.
+
+    Systems which cannot be solved lead to NaN solutions.
+
+    :param numpy.ndarray alpha: (n, P, P) matrices
+    :param numpy.ndarray beta: (n, P) vectors
+    :rtype: numpy.ndarray
+    """
+    try:
+        return numpy.linalg.solve(alpha, beta[..., numpy.newaxis])[..., 0]
+    except LinAlgError:
+        result = numpy.full(beta.shape, numpy.nan)
+        for i in range(len(alpha)):
+            try:
+                result[i] = numpy.linalg.solve(alpha[i], beta[i])
+            except LinAlgError:
+                pass
+        return result
+
+
+def _inv_batch(alpha):
+    """Invert a stack of matrices.
+
+    Matrices which cannot be inverted lead to NaN inverses.
+
+    :param numpy.ndarray alpha: (n, P, P) matrices
+    :rtype: numpy.ndarray
+    """
+    try:
+        return numpy.linalg.inv(alpha)
+    except LinAlgError:
+        result = numpy.full(alpha.shape, numpy.nan)
+        for i in range(len(alpha)):
+            try:
+                result[i] = inv(alpha[i])
+            except LinAlgError:
+                _logger.debug("Singular curvature matrix for curve %d", i)
+        return result
+
+
 def _get_parameters(parameters, constraints):
     """
     Apply constraints to input parameters.
@@ -27,7 +27,7 @@ analysis.
 
 __authors__ = ["P. Knobel"]
 __license__ = "MIT"
-__date__ = "15/05/2017"
+__date__ = "19/10/2026"
 
 import logging
 import numpy
@@ -37,7 +37,8 @@ from silx.math.fit import filters
 _logger = logging.getLogger(__name__)
 
 cimport cython
-from libc.stdlib cimport free
+from cython.parallel import prange
+from libc.stdlib cimport calloc, free
 
 cimport silx.math.fit.peaks_wrapper as peaks_wrapper
 
@@ -131,6 +132,113 @@ def peak_search(y, fwhm, sensitivity=3.5,
         return list(zip(peaks, relevances))
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def peak_search_batch(data, fwhm, sensitivity=3.5,
+                      begin_index=None, end_index=None):
+    """Find peaks in many curves.
+
+    This runs the peak search of :func:`peak_search` on every curve along
+    the last axis of ``data``. Curves are processed in parallel, without
+    holding the GIL. The number of peaks per curve is not limited.
+
+    The result is returned in compressed sparse row format: the peaks of
+    curve ``i`` are ``indices[offsets[i]:offsets[i+1]]`` and their
+    relevances are ``relevances[offsets[i]:offsets[i+1]]``.
+    Curves are numbered in C order over all leading dimensions of ``data``.
+
+    :param data: Array of curves, the last dimension being the samples
+    :type data: numpy.ndarray
+    :param fwhm: Estimated full width at half maximum of the typical peaks we
+        are interested in (expressed in number of samples)
+    :param sensitivity: Threshold factor used for peak detection. Only peaks
+        with amplitudes higher than ``σ * sensitivity`` - where ``σ`` is the
+        standard deviation of the noise - qualify as peaks.
+    :param begin_index: Index of the first sample of the region of interest
+         in each curve. If ``None``, start from the first sample.
+    :param end_index: Index of the last sample of the region of interest in
+        each curve. If ``None``, process until the last sample.
+    :return: ``(offsets, indices, relevances)`` arrays. ``offsets`` has
+        one more element than the number of curves, ``indices`` holds the
+        peak indices as integers and ``relevances`` the peak relevances.
+    :rtype: tuple of numpy.ndarray
+    :raise: ``MemoryError`` if the memory for the peaks of a curve could
+        not be allocated.
+    """
+    cdef:
+        double[:, ::1] data_c
+        long long[::1] counts_c
+        long long[::1] offsets_c
+        long long[::1] indices_c
+        double[::1] relevances_c
+        double **peaks_c
+        double **curve_relevances_c
+        Py_ssize_t i, j, nspectra
+        long nchannels, begin_c, end_c, count
+        long long offset
+        double fwhm_c, sensitivity_c
+
+    # seek modifies its input, work on a copy
+    data = numpy.array(data, copy=True, dtype=numpy.float64, order='C')
+    if data.ndim == 0 or data.shape[data.ndim - 1] == 0:
+        raise ValueError("Curves must have at least one sample")
+    nchannels = data.shape[data.ndim - 1]
+    data_c = data.reshape(-1, nchannels)
+    nspectra = data_c.shape[0]
+
+    begin_c = 0 if begin_index is None else begin_index
+    end_c = nchannels - 1 if end_index is None else end_index
+    fwhm_c = fwhm
+    sensitivity_c = sensitivity
+
+    counts = numpy.zeros((nspectra,), dtype=numpy.int64)
+    counts_c = counts
+
+    # Output buffers of each curve are allocated and grown by seek
+    peaks_c = <double **> calloc(max(nspectra, 1), sizeof(double *))
+    curve_relevances_c = <double **> calloc(max(nspectra, 1),
+                                            sizeof(double *))
+    if peaks_c == NULL or curve_relevances_c == NULL:
+        free(peaks_c)
+        free(curve_relevances_c)
+        raise MemoryError("Failed to allocate memory for output arrays")
+
+    try:
+        for i in prange(nspectra, nogil=True, schedule='dynamic'):
+            counts_c[i] = peaks_wrapper.seek(begin_c, end_c, nchannels,
+                                             fwhm_c, sensitivity_c, 0,
+                                             &data_c[i, 0],
+                                             &peaks_c[i],
+                                             &curve_relevances_c[i])
+
+        # A negative count means that memory allocation failed
+        if nspectra > 0 and counts.min() < 0:
+            raise MemoryError("Failed to allocate memory for output arrays")
+
+        offsets = numpy.zeros((nspectra + 1,), dtype=numpy.int64)
+        numpy.cumsum(counts, out=offsets[1:])
+        indices = numpy.empty((offsets[nspectra],), dtype=numpy.int64)
+        relevances = numpy.empty((offsets[nspectra],), dtype=numpy.float64)
+        offsets_c = offsets
+        indices_c = indices
+        relevances_c = relevances
+
+        for i in prange(nspectra, nogil=True, schedule='static'):
+            offset = offsets_c[i]
+            count = counts_c[i]
+            for j in range(count):
+                indices_c[offset + j] = <long long> peaks_c[i][j]
+                relevances_c[offset + j] = curve_relevances_c[i][j]
+    finally:
+        for i in range(nspectra):
+            free(peaks_c[i])
+            free(curve_relevances_c[i])
+        free(peaks_c)
+        free(curve_relevances_c)
+
+    return offsets, indices, relevances
+
+
 def guess_fwhm(y):
     """Return the full-width at half maximum for the largest peak in
     the data array.
@@ -117,7 +117,7 @@ long seek(long begin_index,
 
     /* What comes now is specific to MCA spectra ... */
     lld = 0;
-    while (data[lld] == 0) {
+    while (lld < nsamples && data[lld] == 0) {
         lld++;
     }
     lld = lld + (int) (0.5 * fwhm);
@@ -25,7 +25,7 @@
 
 __authors__ = ["P. Knobel"]
 __license__ = "MIT"
-__date__ = "22/06/2016"
+__date__ = "19/10/2026"
 
 
 import os.path
@@ -61,7 +61,9 @@ def configuration(parent_package='', top_path=None):
     config.add_extension('filters',
                          sources=filt_src,
                          include_dirs=filt_inc,
-                         language='c')
+                         language='c',
+                         extra_link_args=['-fopenmp'],
+                         extra_compile_args=['-fopenmp'])
 
     # =====================================
     # peaks
@@ -73,6 +75,8 @@ def configuration(parent_package='', top_path=None):
     config.add_extension('peaks',
                          sources=peaks_src,
                          include_dirs=peaks_inc,
+                         extra_link_args=['-fopenmp'],
+                         extra_compile_args=['-fopenmp'],
                          language='c')
     # =====================================
     # =====================================
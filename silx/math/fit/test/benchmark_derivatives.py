@@ -0,0 +1,164 @@
+# coding: utf-8
+# /*##########################################################################
+# Copyright (C) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Benchmarks of analytical derivatives of fit functions versus numerical
+derivatives in :func:`silx.math.fit.leastsq`"""
+
+from __future__ import division
+
+__authors__ = ["P. Knobel"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import logging
+import time
+import unittest
+
+import numpy
+
+from silx.math.fit import functions
+from silx.math.fit.leastsq import chisq_alpha_beta, leastsq, CFREE, CFIXED
+
+_logger = logging.getLogger(__name__)
+_logger.setLevel(logging.DEBUG)
+
+
+def _hypermet(x, *params):
+    return functions.sum_ahypermet(x, *params)
+
+
+class BenchmarkDerivatives(unittest.TestCase):
+    """Benchmark of the Levenberg-Marquardt iteration cost with analytical
+    and numerical derivatives"""
+
+    NPEAKS = 1, 5, 20
+
+    SIZE = 2000
+
+    FUNCTIONS = (
+        ('gauss', functions.sum_gauss,
+         functions.sum_gauss_derivative, (1000., 0., 30.), 3),
+        ('lorentz', functions.sum_lorentz,
+         functions.sum_lorentz_derivative, (1000., 0., 30.), 3),
+        ('pvoigt', functions.sum_pvoigt,
+         functions.sum_pvoigt_derivative, (1000., 0., 30., 0.3), 4),
+        ('ahypermet', _hypermet,
+         functions.sum_ahypermet_derivative,
+         (30000., 0., 30., 0.05, 5., 0.02, 10., 0.002), 3),
+    )
+    """Benchmarked functions: name, function, derivative, parameters of one
+    peak and number of parameters of each peak to fit (the others are fixed)"""
+
+    def _parameters(self, peak_params, npeaks):
+        """Return parameters of npeaks peaks evenly spread over the x range"""
+        params = []
+        for i in range(npeaks):
+            peak = list(peak_params)
+            peak[1] = (i + 0.5) * self.SIZE / npeaks
+            params += peak
+        return numpy.array(params)
+
+    def test_benchmark_iteration(self):
+        """Benchmark the cost of one iteration (chisq, alpha and beta
+        computation) with left and right numerical derivatives and with
+        analytical derivatives"""
+        x = numpy.arange(self.SIZE, dtype=numpy.float64)
+        weight = numpy.ones_like(x)
+        for name, function, derivative, peak_params, _ in self.FUNCTIONS:
+            for npeaks in self.NPEAKS:
+                params = self._parameters(peak_params, npeaks)
+                y = function(x, *params)
+                start_params = params * 1.01
+
+                start = time.time()
+                numerical = chisq_alpha_beta(function, start_params,
+                                             x, y, weight,
+                                             left_derivative=True)
+                numerical_duration = time.time() - start
+
+                start = time.time()
+                analytical = chisq_alpha_beta(function, start_params,
+                                              x, y, weight,
+                                              model_deriv=derivative)
+                analytical_duration = time.time() - start
+
+                _logger.info(
+                    '%s-%d peaks\tnumerical %.2f ms\tanalytical %.2f ms\tx%.2f',
+                    name, npeaks,
+                    1000 * numerical_duration, 1000 * analytical_duration,
+                    numerical_duration / analytical_duration)
+
+                alpha = numerical[1]
+                self.assertTrue(numpy.allclose(
+                    alpha, analytical[1],
+                    rtol=1e-3, atol=1e-6 * numpy.abs(alpha).max()))
+
+    def test_benchmark_fit(self):
+        """Benchmark complete fits with numerical and analytical
+        derivatives"""
+        x = numpy.arange(self.SIZE, dtype=numpy.float64)
+        for name, function, derivative, peak_params, nfree in self.FUNCTIONS:
+            for npeaks in self.NPEAKS:
+                params = self._parameters(peak_params, npeaks)
+                y = function(x, *params)
+                start_params = params * 1.01
+                constraints = []
+                for i in range(len(params)):
+                    if i % len(peak_params) < nfree:
+                        constraints.append([CFREE, 0, 0])
+                    else:
+                        start_params[i] = params[i]
+                        constraints.append([CFIXED, 0, 0])
+
+                durations = []
+                results = []
+                for model_deriv in (None, derivative):
+                    start = time.time()
+                    fitted, cov, info = leastsq(function, x, y, start_params,
+                                                constraints=constraints,
+                                                model_deriv=model_deriv,
+                                                left_derivative=True,
+                                                full_output=True)
+                    durations.append(time.time() - start)
+                    results.append(fitted)
+
+                _logger.info(
+                    '%s-%d peaks fit\tnumerical %.2f ms\tanalytical %.2f ms\tx%.2f',
+                    name, npeaks, 1000 * durations[0], 1000 * durations[1],
+                    durations[0] / durations[1])
+
+                self.assertTrue(numpy.allclose(results[0], results[1],
+                                               rtol=1e-5))
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(BenchmarkDerivatives))
+    return test_suite
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(defaultTest='suite')
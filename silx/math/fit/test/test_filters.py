@@ -122,7 +122,71 @@ class TestSmooth(unittest.TestCase):
                                        expected_smooth[i, j])
 
 
-test_cases = (TestSmooth,)
+class TestBatch(unittest.TestCase):
+    """Test that batch filters give the same results as the 1D filters
+    applied to each spectrum"""
+    def setUp(self):
+        x = numpy.arange(1000)
+        self.spectra = numpy.array(
+            [functions.sum_gauss(x, 100, 200 + 10 * i, 15, 50, 700, 30) +
+             0.05 * x + 10 for i in range(20)])
+        self.spectra = add_relative_noise(self.spectra, 5.)
+
+    def testStripBatch(self):
+        expected = numpy.array([filters.strip(y, w=2, niterations=500)
+                                for y in self.spectra])
+        result = filters.strip_batch(self.spectra, w=2, niterations=500)
+        self.assertTrue(numpy.array_equal(result, expected))
+
+        anchors = [150, 400]
+        expected = numpy.array([filters.strip(y, w=2, niterations=500,
+                                              anchors=anchors)
+                                for y in self.spectra])
+        result = filters.strip_batch(self.spectra, w=2, niterations=500,
+                                     anchors=anchors)
+        self.assertTrue(numpy.array_equal(result, expected))
+
+    def testSnip1dBatch(self):
+        expected = numpy.array([filters.snip1d(y, 30)
+                                for y in self.spectra])
+        result = filters.snip1d_batch(self.spectra, 30)
+        self.assertTrue(numpy.array_equal(result, expected))
+
+    def testSmooth1dBatch(self):
+        expected = numpy.array([filters.smooth1d(y) for y in self.spectra])
+        # 3D stack of spectra
+        stack = self.spectra.reshape(4, 5, -1)
+        result = filters.smooth1d_batch(stack)
+        self.assertEqual(result.shape, stack.shape)
+        self.assertTrue(numpy.array_equal(result.reshape(20, -1), expected))
+
+    def testOutput(self):
+        expected = filters.snip1d_batch(self.spectra, 30)
+
+        out = numpy.zeros_like(self.spectra)
+        result = filters.snip1d_batch(self.spectra, 30, out=out)
+        self.assertIs(result, out)
+        self.assertTrue(numpy.array_equal(out, expected))
+
+        # in-place
+        data = numpy.array(self.spectra)
+        filters.snip1d_batch(data, 30, out=data)
+        self.assertTrue(numpy.array_equal(data, expected))
+
+        data = numpy.array(self.spectra)
+        expected = filters.strip_batch(data, niterations=100)
+        filters.strip_batch(data, niterations=100, out=data)
+        self.assertTrue(numpy.array_equal(data, expected))
+
+        with self.assertRaises(ValueError):
+            filters.smooth1d_batch(self.spectra,
+                                   out=numpy.zeros((20, 10)))
+        with self.assertRaises(ValueError):
+            filters.smooth1d_batch(self.spectra,
+                                   out=numpy.zeros((20, 1000), numpy.float32))
+
+
+test_cases = (TestSmooth, TestBatch)
 
 
 def suite():
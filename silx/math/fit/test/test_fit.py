@@ -220,6 +220,29 @@ class Test_leastsq(unittest.TestCase):
                                                       fittedpar[i])
             self.assertTrue(test_condition, msg)
 
+    def testTiedParametersAnalyticalDerivative(self):
+        CFACTOR = 4
+        CDELTA = 5
+        parameters_actual = [10.5, 2, 10000.0, 20., 150, 5000, 900., 300]
+        x = numpy.arange(10000.)
+        y = self.gauss(x, *parameters_actual)
+        parameters_estimate = [0.0, 1.0, 9000.0, 25., 140, 4500, 905, 280]
+        constraints = [[0, 0, 0]] * len(parameters_actual)
+        constraints[2] = [CFACTOR, 5, 2]
+        constraints[6] = [CDELTA, 3, 880]
+
+        results = []
+        for model_deriv in [None, self.gauss_derivative]:
+            fittedpar, cov, infodict = self.instance(self.gauss, x, y,
+                                                     parameters_estimate,
+                                                     constraints=constraints,
+                                                     model_deriv=model_deriv,
+                                                     full_output=True)
+            self.assertTrue(numpy.allclose(parameters_actual, fittedpar))
+            results.append(infodict["niter"])
+        # analytical and numerical derivatives follow the same path
+        self.assertEqual(results[0], results[1])
+
     def testUnconstrainedFitAnalyticalDerivative(self):
         parameters_actual = [10.5, 2, 1000.0, 20., 15]
         x = numpy.arange(10000.)
@@ -372,7 +395,128 @@ class Test_leastsq(unittest.TestCase):
                                        parameters_estimate[i])
 
 
-test_cases = (Test_leastsq,)
+def _batch_gauss(x, background, height, center, fwhm):
+    """Gaussian on a constant background, vectorized over curves"""
+    dummy = 2.3548200450309493 * (x - center) / fwhm
+    return background + height * numpy.exp(-0.5 * dummy * dummy)
+
+
+def _batch_gauss_derivative(x, params, idx):
+    """Analytical derivatives of :func:`_batch_gauss`"""
+    background, height, center, fwhm = params
+    dummy = 2.3548200450309493 * (x - center) / fwhm
+    peak = numpy.exp(-0.5 * dummy * dummy)
+    if idx == 0:
+        return numpy.ones_like(peak)
+    if idx == 1:
+        return peak
+    if idx == 2:
+        return height * peak * dummy * 2.3548200450309493 / fwhm
+    return height * peak * dummy * dummy / fwhm
+
+
+class Test_leastsq_batch(unittest.TestCase):
+    """
+    Unit tests of the leastsq_batch function.
+    """
+
+    def setUp(self):
+        from silx.math.fit import leastsq, leastsq_batch
+        self.leastsq = leastsq
+        self.instance = leastsq_batch
+
+        numpy.random.seed(0)
+        self.x = numpy.arange(200.)
+        ncurves = 50
+        self.parameters_actual = numpy.column_stack((
+            numpy.random.uniform(1., 5., ncurves),
+            numpy.random.uniform(500., 1000., ncurves),
+            numpy.random.uniform(90., 110., ncurves),
+            numpy.random.uniform(15., 25., ncurves)))
+        self.y = _batch_gauss(self.x, *self.parameters_actual.T[:, :, None])
+        self.parameters_estimate = [2., 700., 100., 20.]
+
+    def testUnconstrainedFit(self):
+        popt, uncertainties, chisq = self.instance(
+            _batch_gauss, self.x, self.y, self.parameters_estimate)
+        self.assertEqual(popt.shape, self.parameters_actual.shape)
+        self.assertEqual(uncertainties.shape, self.parameters_actual.shape)
+        self.assertEqual(chisq.shape, (len(self.y),))
+        self.assertTrue(numpy.allclose(popt, self.parameters_actual))
+
+    def testVsLeastsq(self):
+        """Compare with curve by curve fit on noisy data"""
+        y = numpy.random.poisson(self.y).astype(numpy.float64)
+        sigma = numpy.sqrt(numpy.maximum(y, 1))
+        popt, uncertainties, chisq, infodict = self.instance(
+            _batch_gauss, self.x, y, self.parameters_estimate,
+            sigma=sigma, full_output=True)
+
+        for i in range(0, len(y), 10):
+            fittedpar, cov, ddict = self.leastsq(
+                _batch_gauss, self.x, y[i], self.parameters_estimate,
+                sigma=sigma[i], full_output=True)
+            self.assertTrue(numpy.allclose(popt[i], fittedpar))
+            self.assertTrue(numpy.allclose(uncertainties[i],
+                                           ddict["uncertainties"]))
+            self.assertAlmostEqual(chisq[i], ddict["chisq"])
+            self.assertEqual(infodict["niter"][i], ddict["niter"])
+
+    def testNotVectorizedDerivative(self):
+        def model(x, *params):
+            return _batch_gauss(x, *params)
+
+        def model_deriv(x, params, idx):
+            return _batch_gauss_derivative(x, params, idx)
+
+        popt, uncertainties, chisq = self.instance(
+            model, self.x, self.y[:5], self.parameters_estimate,
+            model_deriv=model_deriv, vectorized=False)
+        self.assertTrue(numpy.allclose(popt, self.parameters_actual[:5]))
+
+    def testConstraints(self):
+        constraints = [[0, 0, 0], [1, 0, 0], [3, 0, 0], [0, 0, 0]]
+        parameters_estimate = numpy.array(self.parameters_actual)
+        parameters_estimate[:, (0, 1, 3)] *= 0.9
+        popt, uncertainties, chisq = self.instance(
+            _batch_gauss, self.x, self.y, parameters_estimate,
+            constraints=constraints,
+            model_deriv=_batch_gauss_derivative)
+        self.assertTrue(numpy.allclose(popt, self.parameters_actual))
+        # FIXED parameters have 100% uncertainty
+        self.assertTrue(numpy.array_equal(uncertainties[:, 2], popt[:, 2]))
+
+        with self.assertRaises(ValueError):
+            self.instance(_batch_gauss, self.x, self.y, parameters_estimate,
+                          constraints=[[4, 0, 1]] * 4)
+
+    def testDataWithNaN(self):
+        y = numpy.array(self.y)
+        y[:, ::7] = numpy.nan
+        popt, uncertainties, chisq = self.instance(
+            _batch_gauss, self.x, y, self.parameters_estimate)
+        self.assertTrue(numpy.allclose(popt, self.parameters_actual))
+
+    def testSingularCurvature(self):
+        from silx.math.fit.leastsq import _inv_batch
+        alpha = numpy.array([numpy.diag([2., 4.]), numpy.ones((2, 2)),
+                             [[2., 1.], [1., 2.]]])
+        cov = _inv_batch(alpha)
+        self.assertTrue(numpy.all(numpy.isnan(cov[1])))
+        self.assertTrue(numpy.allclose(cov[[0, 2]],
+                                       numpy.linalg.inv(alpha[[0, 2]])))
+
+    def testProcessPool(self):
+        reference = self.instance(
+            _batch_gauss, self.x, self.y, self.parameters_estimate)
+        result = self.instance(
+            _batch_gauss, self.x, self.y, self.parameters_estimate,
+            nprocesses=2, batch_size=16)
+        for array, ref_array in zip(result, reference):
+            self.assertTrue(numpy.allclose(array, ref_array))
+
+
+test_cases = (Test_leastsq, Test_leastsq_batch)
 
 def suite():
     loader = unittest.defaultTestLoader
@@ -167,6 +167,66 @@ class TestFitmanager(unittest.TestCase):
             self.assertAlmostEqual(_order_of_magnitude(param["estimation"]),
                                    _order_of_magnitude(p[i]))
 
+    def testFitFunctionDerivative(self):
+        """Test the derivative of the fit function (background + theory)
+        used by FitManager with the analytical derivatives of fittheories"""
+        x = numpy.arange(1000).astype(numpy.float)
+        p = [1000, 100., 250,
+             255, 650., 45]
+        y = 2.65 * x + 13 + sum_gauss(x, *p)
+
+        fit = fitmanager.FitManager()
+        fit.setdata(x=x, y=y)
+        fit.loadtheories(fittheories)
+        fit.loadbgtheories(bgtheories)
+        fit.settheory('Gaussians')
+        fit.setbackground('Linear')
+
+        pars = numpy.array([13, 2.65] + p)
+        for index in range(len(pars)):
+            delta = 1e-6 * abs(pars[index])
+            p_plus = pars.copy()
+            p_plus[index] += delta
+            p_minus = pars.copy()
+            p_minus[index] -= delta
+            expected = (fit.fitfunction(x, *p_plus) -
+                        fit.fitfunction(x, *p_minus)) / (2 * delta)
+            derivative = fit.fitfunction_derivative(x, pars, index)
+            self.assertTrue(numpy.allclose(derivative, expected,
+                                           rtol=1e-5, atol=1e-5))
+
+    def testLegacyDerivative(self):
+        """Test that custom derivatives get all parameters by default"""
+        x = numpy.arange(100).astype(numpy.float64)
+        y = 0.5 * x ** 2 + 3. * x + 20.
+        calls = []
+
+        def myderiv(x_, parameters, index):
+            calls.append((len(parameters), index))
+            if len(parameters) == 3:  # constant background first
+                if index == 0:
+                    return numpy.ones_like(x_)
+                index -= 1
+            return x_ ** (2 - index)
+
+        for flag, npars in ((False, 3), (True, 2)):
+            fit = fitmanager.FitManager()
+            fit.setdata(x=x, y=y)
+            fit.loadbgtheories(bgtheories)
+            fit.addtheory("parabola", function=lambda x_, a, b: a * x_ ** 2 + b * x_,
+                          parameters=["A", "B"],
+                          estimate=lambda x_, y_: ((1., 1.), ((0, 0, 0), (0, 0, 0))),
+                          derivative=myderiv,
+                          derivative_theory_parameters=flag)
+            fit.settheory("parabola")
+            fit.setbackground("Constant")
+            fit.estimate()
+            del calls[:]
+            params, sigmas, infodict = fit.runfit()
+            self.assertTrue(numpy.allclose(params, (20., 0.5, 3.)))
+            self.assertTrue(calls)
+            self.assertTrue(all(n == npars for n, _index in calls))
+
     def testLoadCustomFitFunction(self):
         """Test FitManager using a custom fit function defined in an external
         file and imported with FitManager.loadtheories"""
@@ -33,7 +33,7 @@ from silx.math.fit import functions
 
 __authors__ = ["P. Knobel"]
 __license__ = "MIT"
-__date__ = "21/07/2016"
+__date__ = "19/10/2026"
 
 class Test_functions(unittest.TestCase):
     """
@@ -244,6 +244,77 @@ class Test_functions(unittest.TestCase):
                         1)
 
 
+class Test_derivatives(unittest.TestCase):
+    """
+    Compare analytical derivatives of fit functions with respect to their
+    parameters to central finite differences.
+    """
+    def setUp(self):
+        # avoid sampling the centroids, where split functions are not
+        # differentiable
+        self.x = numpy.linspace(-20.05, 29.95, 501)
+
+    def _check(self, function, derivative, params, **kw):
+        params = numpy.array(params, dtype=numpy.float64)
+        for index in range(len(params)):
+            delta = 1e-6 * max(abs(params[index]), 1.)
+            p_plus = params.copy()
+            p_plus[index] += delta
+            p_minus = params.copy()
+            p_minus[index] -= delta
+            expected = (function(self.x, *p_plus, **kw) -
+                        function(self.x, *p_minus, **kw)) / (2 * delta)
+            result = derivative(self.x, params, index, **kw)
+            self.assertEqual(result.shape, self.x.shape)
+            scale = max(numpy.max(numpy.abs(expected)), 1e-12)
+            self.assertLess(numpy.max(numpy.abs(result - expected)) / scale,
+                            1e-5, "parameter index %d" % index)
+
+    def testGauss(self):
+        self._check(functions.sum_gauss, functions.sum_gauss_derivative,
+                    [10, 2, 4, 5, 8, 3])
+        self._check(functions.sum_agauss, functions.sum_agauss_derivative,
+                    [10, 2, 4, 5, 8, 3])
+        self._check(functions.sum_splitgauss,
+                    functions.sum_splitgauss_derivative,
+                    [10, 2, 4, 6, 5, 8, 3, 2])
+
+    def testLorentz(self):
+        self._check(functions.sum_lorentz, functions.sum_lorentz_derivative,
+                    [10, 2, 4, 5, 8, 3])
+        self._check(functions.sum_alorentz,
+                    functions.sum_alorentz_derivative,
+                    [10, 2, 4, 5, 8, 3])
+        self._check(functions.sum_splitlorentz,
+                    functions.sum_splitlorentz_derivative,
+                    [10, 2, 4, 6, 5, 8, 3, 2])
+
+    def testPVoigt(self):
+        self._check(functions.sum_pvoigt, functions.sum_pvoigt_derivative,
+                    [10, 2, 4, .3, 5, 8, 3, .7])
+        self._check(functions.sum_apvoigt,
+                    functions.sum_apvoigt_derivative,
+                    [10, 2, 4, .3, 5, 8, 3, .7])
+        self._check(functions.sum_splitpvoigt,
+                    functions.sum_splitpvoigt_derivative,
+                    [10, 2, 4, 6, .3, 5, 8, 3, 2, .7])
+
+    def testAHypermet(self):
+        params = [1000, 2, 4, 0.05, 0.5, 0.02, 10, 0.002,
+                  500, 10, 3, 0.1, 0.7, 0.05, 5, 0.003]
+        self._check(functions.sum_ahypermet,
+                    functions.sum_ahypermet_derivative, params)
+        self._check(functions.sum_ahypermet,
+                    functions.sum_ahypermet_derivative, params,
+                    st_term=False, step_term=False)
+
+    def testWrongIndex(self):
+        with self.assertRaises(IndexError):
+            functions.sum_gauss_derivative(self.x, [1, 2, 3], 3)
+        with self.assertRaises(IndexError):
+            functions.sum_pvoigt_derivative(self.x, [1, 2, 3], 0)
+
+
 def _numerical_derivative(f, x, params=[], delta_factor=0.0001):
     """Compute the numerical derivative of ``f`` for all values of ``x``.
 
@@ -258,7 +329,7 @@ def _numerical_derivative(f, x, params=[], delta_factor=0.0001):
 
     return (y_plus - y_minus) / (2 * deltax)
 
-test_cases = (Test_functions,)
+test_cases = (Test_functions, Test_derivatives)
 
 def suite():
     loader = unittest.defaultTestLoader
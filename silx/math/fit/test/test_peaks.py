@@ -132,7 +132,51 @@ class Test_peak_search(unittest.TestCase):
                 self.assertLess(abs(found_peak_index - theoretical_peak_index), 25)
 
 
-test_cases = (Test_peak_search,)
+class Test_peak_search_batch(unittest.TestCase):
+    """
+    Unit tests of peak_search_batch
+    """
+    def setUp(self):
+        x = numpy.arange(2000)
+        self.data = numpy.array(
+            [functions.sum_gauss(x, 100, 300 + 10 * i, 30,
+                                 60, 900, 30,
+                                 80, 1500 - 10 * i, 30) + 5
+             for i in range(12)]).reshape(3, 4, 2000)
+
+    def testSameAsPeakSearch(self):
+        offsets, indices, relevances = peaks.peak_search_batch(self.data,
+                                                               fwhm=30)
+        self.assertEqual(offsets.shape, (13,))
+        self.assertEqual(offsets[0], 0)
+        self.assertEqual(offsets[-1], len(indices))
+        self.assertEqual(len(indices), len(relevances))
+
+        for i, y in enumerate(self.data.reshape(12, 2000)):
+            expected = peaks.peak_search(y, fwhm=30, relevance_info=True)
+            self.assertEqual(offsets[i + 1] - offsets[i], 3)
+            self.assertEqual(
+                list(indices[offsets[i]:offsets[i + 1]]),
+                [int(index) for index, _ in expected])
+            self.assertTrue(numpy.array_equal(
+                relevances[offsets[i]:offsets[i + 1]],
+                [relevance for _, relevance in expected]))
+
+    def testManyPeaks(self):
+        """More than 100 peaks in a curve"""
+        x = numpy.arange(20000)
+        params = []
+        for i in range(300):
+            params += [100, 30 + 60 * i, 8]
+        y = functions.sum_gauss(x, *params)
+        data = numpy.array([y, numpy.zeros_like(y), y])
+        offsets, indices, relevances = peaks.peak_search_batch(data, fwhm=8)
+        self.assertEqual(list(offsets), [0, 300, 300, 600])
+        self.assertTrue(numpy.all(
+            numpy.abs(indices[:300] - numpy.array(params[1::3])) <= 1))
+
+
+test_cases = (Test_peak_search, Test_peak_search_batch)
 
 def suite():
     loader = unittest.defaultTestLoader
@@ -25,17 +25,25 @@
 """This module provides marching cubes implementation.
 
 It provides a :class:`MarchingCubes` class allowing to build an isosurface
-from data provided as a 3D data set or slice by slice.
+from data provided as a 3D data set or slice by slice, and
+:func:`marching_cubes_slabs` to build an isosurface of a large dataset
+(e.g., a h5py.Dataset) by processing slabs of slices concurrently.
 """
 
 __authors__ = ["T. Vincent"]
 __license__ = "MIT"
-__date__ = "16/08/2017"
+__date__ = "19/10/2026"
 
 
+import collections
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
 import numpy
 cimport numpy as cnumpy
 cimport cython
+from libc.string cimport memcpy
+from libcpp.vector cimport vector as std_vector
 
 cimport silx.math.mc as mc
 
@@ -244,3 +252,183 @@ cdef class MarchingCubes:
         """
         return numpy.array(self.c_mc.indices,
                            dtype=numpy.uint32).reshape(-1, 3)
+
+
+cdef _vector_to_array(std_vector[float] * vector):
+    """Copy a std::vector of float to a (N, 3) numpy.ndarray"""
+    cdef cnumpy.ndarray[cnumpy.float32_t, ndim=1] array = numpy.empty(
+        vector.size(), dtype=numpy.float32)
+    if vector.size() > 0:
+        memcpy(&array[0], vector.data(), vector.size() * sizeof(float))
+    return array.reshape(-1, 3)
+
+
+def _slice_edges(previous, current, isolevel):
+    """Returns the edges of a slice which hold a vertex.
+
+    Edges are given in the order process_slice creates vertices, i.e.,
+    for each point of the slice: the edges along width and height
+    in the slice plane and the edge along depth from the previous slice.
+
+    :param numpy.ndarray previous: Sampled previous slice of float32
+    :param numpy.ndarray current: Sampled current slice of float32
+    :param numpy.float32 isolevel: Iso-level of the isosurface
+    :return: (height, width, 3) array of bool
+    """
+    below = current <= isolevel
+    edges = numpy.zeros(current.shape + (3,), dtype=numpy.bool_)
+    edges[:, :-1, 0] = below[:, :-1] ^ below[:, 1:]
+    edges[:-1, :, 1] = below[:-1] ^ below[1:]
+    edges[:, :, 2] = below ^ (previous <= isolevel)
+    return edges
+
+
+def _process_slab(data, start, stop, isolevel, invert_normals, sampling):
+    """Compute the isosurface of slices [start, stop[ of a dataset.
+
+    The vertices lying in the plane of the first slice are the same as the
+    vertices lying in the plane of the last slice of the previous slab.
+
+    :param data: 3D dataset supporting slicing along the first dimension
+    :param int start: Index of the first slice of the slab
+    :param int stop: Index after the last slice of the slab
+    :param numpy.float32 isolevel: Iso-level of the isosurface
+    :param bool invert_normals: See :class:`MarchingCubes`
+    :param sampling: Sampling along each dimension (depth, height, width)
+    :return: vertices, normals and indices of the slab and the indices
+        of the vertices lying in the plane of the last slice
+    """
+    slab = numpy.ascontiguousarray(data[start:stop], dtype='=f4')
+    cdef float[:, :, ::1] c_slab = slab
+    cdef unsigned int depth_sampling = sampling[0]
+    cdef unsigned int height = slab.shape[1]
+    cdef unsigned int width = slab.shape[2]
+    cdef unsigned int nb_slices = (slab.shape[0] - 1) // depth_sampling
+    cdef unsigned int index, first_slice = start
+    cdef size_t size = <size_t> height * width * depth_sampling
+    cdef float * c_data = &c_slab[0, 0, 0]
+
+    cdef MarchingCubes result = MarchingCubes(
+        isolevel=isolevel, invert_normals=invert_normals, sampling=sampling)
+    cdef mc.MarchingCubes[float, float] * c_mc = result.c_mc
+
+    with nogil:
+        c_mc.set_slice_size(height, width)
+        # Store depth coordinates of vertices in the whole dataset
+        c_mc.depth = first_slice
+        for index in range(nb_slices):
+            c_mc.process_slice(c_data + index * size,
+                               c_data + (index + 1) * size)
+        c_mc.finish_process()
+
+    vertices = _vector_to_array(&c_mc.vertices)
+    normals = _vector_to_array(&c_mc.normals)
+    indices = numpy.array(c_mc.indices, dtype=numpy.uint32)
+
+    # Find vertices of the last slice plane among the vertices created by
+    # the last call to process_slice
+    edges = _slice_edges(
+        slab[(nb_slices - 1) * depth_sampling, ::sampling[1], ::sampling[2]],
+        slab[nb_slices * depth_sampling, ::sampling[1], ::sampling[2]],
+        isolevel)
+    edges = edges.ravel()
+    positions = numpy.cumsum(edges) - 1 + (len(vertices) - edges.sum())
+    edges[2::3] = False
+    return vertices, normals, indices, positions[edges]
+
+
+def marching_cubes_slabs(data, isolevel, invert_normals=True,
+                         sampling=(1, 1, 1), slab_size=None,
+                         nb_threads=None):
+    """Compute the isosurface of a 3D dataset by slabs of slices.
+
+    Slabs are read from the dataset and processed concurrently in a pool
+    of threads, with at most twice as many slabs as threads in memory.
+    Vertices shared by consecutive slabs are merged, so the result is the
+    same as with :class:`MarchingCubes`.
+
+    Example with a HDF5 dataset:
+
+    >>> with h5py.File('volume.h5', 'r') as h5file:
+    ...     vertices, normals, indices = marching_cubes_slabs(
+    ...         h5file['volume'], isolevel=1.)
+
+    :param data: 3D dataset supporting slicing along the first dimension
+        (e.g., numpy.ndarray, h5py.Dataset)
+    :param float isolevel: The value for which to generate the isosurface
+    :param bool invert_normals:
+        True (default) for normals oriented in direction of gradient descent
+    :param sampling: Sampling along each dimension (depth, height, width)
+    :param int slab_size: Number of slices (after sampling) in each slab.
+        Default: About 2**24 data points per slab.
+    :param int nb_threads: Number of threads used to process slabs.
+        Default: The number of CPUs.
+    :return: vertices, normals and indices arrays as returned by
+        :class:`MarchingCubes`
+    :rtype: List[numpy.ndarray]
+    """
+    assert len(data.shape) == 3
+    depth, height, width = data.shape
+    isolevel = numpy.float32(isolevel)
+    sampling = tuple(int(step) for step in sampling)
+    if slab_size is None:
+        slab_size = 2**24 // max(1, height * width * sampling[0])
+    slab_size = max(1, int(slab_size)) * sampling[0]
+    if nb_threads is None:
+        nb_threads = multiprocessing.cpu_count()
+
+    slabs = [(start, min(start + slab_size + 1, depth))
+             for start in range(0, depth - sampling[0], slab_size)]
+    nb_slabs = len(slabs)
+
+    vertices, normals, indices = [], [], []
+    nb_vertices = 0
+    previous_plane = numpy.zeros((0,), dtype=numpy.int64)
+
+    if nb_slabs > 1 and nb_threads > 1:
+        pool = ThreadPool(nb_threads)
+        max_pending = 2 * nb_threads
+    else:
+        pool = None
+        max_pending = 1
+
+    try:
+        pending = collections.deque()
+        for _ in range(nb_slabs):
+            while len(pending) < max_pending and slabs:
+                start, stop = slabs.pop(0)
+                args = data, start, stop, isolevel, invert_normals, sampling
+                if pool is None:
+                    pending.append(_process_slab(*args))
+                else:
+                    pending.append(pool.apply_async(_process_slab, args))
+
+            result = pending.popleft()
+            if pool is not None:
+                result = result.get()
+            slab_vertices, slab_normals, slab_indices, last_plane = result
+
+            # Skip vertices of the first slice plane, which are the same
+            # as the ones of the last slice plane of the previous slab
+            nb_skipped = len(previous_plane)
+            nb_new = len(slab_vertices) - nb_skipped
+            vertex_indices = numpy.concatenate((
+                previous_plane,
+                numpy.arange(nb_vertices, nb_vertices + nb_new)))
+
+            vertices.append(slab_vertices[nb_skipped:])
+            normals.append(slab_normals[nb_skipped:])
+            indices.append(vertex_indices[slab_indices].astype(numpy.uint32))
+            previous_plane = vertex_indices[last_plane]
+            nb_vertices += nb_new
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    if not vertices:
+        return (numpy.zeros((0, 3), dtype=numpy.float32),
+                numpy.zeros((0, 3), dtype=numpy.float32),
+                numpy.zeros((0, 3), dtype=numpy.uint32))
+    return (numpy.concatenate(vertices),
+            numpy.concatenate(normals),
+            numpy.concatenate(indices).reshape(-1, 3))
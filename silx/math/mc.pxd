@@ -32,13 +32,13 @@ cdef extern from "mc.hpp":
         void process(FloatIn * data,
                      unsigned int depth,
                      unsigned int height,
-                     unsigned int width) except +
+                     unsigned int width) nogil except +
         void set_slice_size(unsigned int height,
-                            unsigned int width)
+                            unsigned int width) nogil
         void process_slice(FloatIn * slice0,
-                           FloatIn * slice1) except +
-        void finish_process()
-        void reset()
+                           FloatIn * slice1) nogil except +
+        void finish_process() nogil
+        void reset() nogil
 
         unsigned int depth
         unsigned int height
@@ -24,7 +24,8 @@
 
 __authors__ = ["H. Payno"]
 __license__ = "MIT"
-__date__ = "02/05/2017"
+__date__ = "19/10/2026"
 
 
-from .medianfilter import (medfilt, medfilt1d, medfilt2d)
+from .medianfilter import (medfilt, medfilt1d, medfilt2d, medfilt3d,
+                           medfilt_stack)
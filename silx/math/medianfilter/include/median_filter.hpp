@@ -23,7 +23,7 @@
 # ###########################################################################*/
 // __authors__ = ["H. Payno"]
 // __license__ = "MIT"
-// __date__ = "10/02/2017"
+// __date__ = "19/10/2026"
 
 #ifndef MEDIAN_FILTER
 #define MEDIAN_FILTER
@@ -35,6 +35,7 @@
 #include <iostream>
 #include <cmath>
 #include <cfloat>
+#include <limits>
 
 /* Needed for pytohn2.7 on Windows... */
 #ifndef INFINITY
@@ -267,4 +268,387 @@ void median_filter(
     }
 }
 
+
+// return the index into 0, (length_max - 1) of index for the given mode
+// or -1 if the index is outside of the data (shrink and constant modes)
+inline int border_index(int index, int length_max, MODE mode){
+    if (index >= 0 && index < length_max){
+        return index;
+    }
+    switch(mode){
+        case NEAREST:
+            return std::min(std::max(index, 0), length_max - 1);
+        case REFLECT:
+            return reflect(index, length_max);
+        case MIRROR:
+            // deal with 1d case
+            if (length_max == 1){
+                return 0;
+            }
+            return mirror(index, length_max);
+        default:
+            return -1;
+    }
+}
+
+
+// Histogram of integer values, of at most 16 bits, used to compute
+// the median of a sliding window.
+//
+// Counts are stored at two levels: a fine level with one bin per value
+// and a coarse level with one bin per group of fine bins.
+// The median is tracked incrementally: it only moves by a few bins when
+// the window slides on smooth data, and the coarse level allows to skip
+// empty regions of the fine level.
+template<typename T>
+class SlidingHistogram{
+public:
+    SlidingHistogram():
+        fine(NB_FINE, 0),
+        coarse(NB_COARSE, 0),
+        count(0),
+        median_bin(0),
+        below(0){}
+
+    inline void add(T value){
+        int bin = to_bin(value);
+        fine[bin]++;
+        coarse[bin >> FINE_BITS]++;
+        count++;
+        if (bin < median_bin){
+            below++;
+        }
+    }
+
+    inline void remove(T value){
+        int bin = to_bin(value);
+        fine[bin]--;
+        coarse[bin >> FINE_BITS]--;
+        count--;
+        if (bin < median_bin){
+            below--;
+        }
+    }
+
+    inline int size() const{
+        return count;
+    }
+
+    // Return the value of rank count / 2 in the window: in event of an even
+    // number of values the highest of the 2 central values is returned,
+    // as for the median function.
+    // The histogram must not be empty.
+    T median(){
+        const int rank = count / 2;
+        // Move down until there are at most rank values below the median bin
+        while (below > rank){
+            int coarse_bin = median_bin >> FINE_BITS;
+            if ((median_bin & FINE_MASK) == 0 &&
+                    below - coarse[coarse_bin - 1] > rank){
+                // Skip the whole coarse bin below
+                below -= coarse[coarse_bin - 1];
+                median_bin -= FINE_SIZE;
+            }else{
+                median_bin--;
+                below -= fine[median_bin];
+            }
+        }
+        // Move up until the value of the given rank is in the median bin
+        while (below + fine[median_bin] <= rank){
+            int coarse_bin = median_bin >> FINE_BITS;
+            if ((median_bin & FINE_MASK) == 0 &&
+                    below + coarse[coarse_bin] <= rank){
+                // Skip the whole coarse bin
+                below += coarse[coarse_bin];
+                median_bin += FINE_SIZE;
+            }else{
+                below += fine[median_bin];
+                median_bin++;
+            }
+        }
+        return from_bin(median_bin);
+    }
+
+    // Return the minimum and maximum values of the window.
+    // The histogram must not be empty.
+    void getMinMax(T& min, T& max) const{
+        int coarse_bin = 0;
+        while (coarse[coarse_bin] == 0){
+            coarse_bin++;
+        }
+        int bin = coarse_bin << FINE_BITS;
+        while (fine[bin] == 0){
+            bin++;
+        }
+        min = from_bin(bin);
+
+        coarse_bin = NB_COARSE - 1;
+        while (coarse[coarse_bin] == 0){
+            coarse_bin--;
+        }
+        bin = ((coarse_bin + 1) << FINE_BITS) - 1;
+        while (fine[bin] == 0){
+            bin--;
+        }
+        max = from_bin(bin);
+    }
+
+private:
+    static const int NB_BITS = 8 * sizeof(T);
+    static const int FINE_BITS = NB_BITS / 2;
+    static const int FINE_SIZE = 1 << FINE_BITS;
+    static const int FINE_MASK = FINE_SIZE - 1;
+    static const int NB_FINE = 1 << NB_BITS;
+    static const int NB_COARSE = NB_FINE >> FINE_BITS;
+
+    inline static int to_bin(T value){
+        return static_cast<int>(value) -
+            static_cast<int>(std::numeric_limits<T>::min());
+    }
+
+    inline static T from_bin(int bin){
+        return static_cast<T>(
+            bin + static_cast<int>(std::numeric_limits<T>::min()));
+    }
+
+    std::vector<int> fine;
+    std::vector<int> coarse;
+    int count;
+    int median_bin;  // Current guess of the bin of the median
+    int below;  // Number of values in bins lower than median_bin
+};
+
+
+// Add (sign > 0) or remove (sign < 0) one column of the window to the
+// histogram
+template<typename T>
+inline void update_column(
+    SlidingHistogram<T>& histogram,
+    const T* input,
+    int width,
+    const int* row_indices,  // Indices of the rows of the window
+    int kernel_height,
+    int column_index,
+    MODE mode,
+    T cval,
+    int sign) {
+
+    for(int i=0; i < kernel_height; i++){
+        T value;
+        int row_index = row_indices[i];
+        if (row_index < 0 || column_index < 0){
+            if (mode == CONSTANT){
+                value = cval;
+            }else{  // SHRINK: ignore values out of the image
+                continue;
+            }
+        }else{
+            value = input[row_index * width + column_index];
+        }
+        if (sign > 0){
+            histogram.add(value);
+        }else{
+            histogram.remove(value);
+        }
+    }
+}
+
+
+// Median filter of rows y_pixel_range_min to y_pixel_range_max of an
+// image of integers of at most 16 bits, using a sliding histogram
+// (Huang's algorithm).
+//
+// The window histogram is updated by one column when moving from one pixel
+// to the next one, so the cost per pixel is proportional to the kernel
+// height rather than to the kernel area.
+// Results are the same as with median_filter.
+template<typename T>
+void median_filter_histogram(
+    const T* input,
+    T* output,
+    int* kernel_dim,        // two values : 0:height, 1:width
+    int* image_dim,         // two values : 0:height, 1:width
+    int y_pixel_range_min,
+    int y_pixel_range_max,
+    bool conditional,
+    int pMode,
+    T cval) {
+
+    assert(kernel_dim[0] > 0);
+    assert(kernel_dim[1] > 0);
+    assert(image_dim[0] > 0);
+    assert(image_dim[1] > 0);
+    assert(y_pixel_range_min >= 0);
+    assert(y_pixel_range_max < image_dim[0]);
+    // kernel odd assertion
+    assert((kernel_dim[0] - 1)%2 == 0);
+    assert((kernel_dim[1] - 1)%2 == 0);
+
+    const int halfKernel_x = (kernel_dim[1] - 1) / 2;
+    const int halfKernel_y = (kernel_dim[0] - 1) / 2;
+    const int height = image_dim[0];
+    const int width = image_dim[1];
+
+    MODE mode = static_cast<MODE>(pMode);
+
+    // Indices of the columns of the image for window columns
+    // from -halfKernel_x to width + halfKernel_x - 1
+    std::vector<int> column_indices(width + 2 * halfKernel_x);
+    for(int x=0; x < width + 2 * halfKernel_x; x++){
+        column_indices[x] = border_index(x - halfKernel_x, width, mode);
+    }
+
+    std::vector<int> row_indices(kernel_dim[0]);
+    SlidingHistogram<T> histogram;
+
+    for(int y_pixel=y_pixel_range_min; y_pixel <= y_pixel_range_max; y_pixel++){
+        for(int i=0; i < kernel_dim[0]; i++){
+            row_indices[i] = border_index(y_pixel - halfKernel_y + i, height, mode);
+        }
+
+        // Window of the first pixel of the row
+        for(int x=0; x < kernel_dim[1]; x++){
+            update_column(histogram, input, width, &row_indices[0], kernel_dim[0],
+                          column_indices[x], mode, cval, 1);
+        }
+
+        for(int x_pixel=0; x_pixel < width; x_pixel++){
+            if (x_pixel > 0){
+                // Slide the window by one column
+                update_column(histogram, input, width, &row_indices[0], kernel_dim[0],
+                              column_indices[x_pixel - 1], mode, cval, -1);
+                update_column(histogram, input, width, &row_indices[0], kernel_dim[0],
+                              column_indices[x_pixel + 2 * halfKernel_x], mode, cval, 1);
+            }
+
+            const T currentPixelValue = input[width * y_pixel + x_pixel];
+            if (conditional == true){
+                T min = 0;
+                T max = 0;
+                histogram.getMinMax(min, max);
+                if ((currentPixelValue == max) || (currentPixelValue == min)){
+                    output[width * y_pixel + x_pixel] = histogram.median();
+                }else{
+                    output[width * y_pixel + x_pixel] = currentPixelValue;
+                }
+            }else{
+                output[width * y_pixel + x_pixel] = histogram.median();
+            }
+        }
+
+        // Empty the histogram for the next row
+        for(int x=width - 1; x < width + 2 * halfKernel_x; x++){
+            update_column(histogram, input, width, &row_indices[0], kernel_dim[0],
+                          column_indices[x], mode, cval, -1);
+        }
+    }
+}
+
+
+// Median filter of the row y_pixel of the frame z_pixel of a 3D volume
+// with a 3D kernel.
+// A stack of 2D median filtered frames is obtained with a kernel depth of 1.
+template<typename T>
+void median_filter_3d(
+    const T* input,
+    T* output,
+    int* kernel_dim,        // three values : 0:depth, 1:height, 2:width
+    int* image_dim,         // three values : 0:depth, 1:height, 2:width
+    int z_pixel,            // the frame to process
+    int y_pixel,            // the row to process
+    bool conditional,
+    int pMode,
+    T cval) {
+
+    assert(kernel_dim[0] > 0);
+    assert(kernel_dim[1] > 0);
+    assert(kernel_dim[2] > 0);
+    assert(z_pixel >= 0);
+    assert(z_pixel < image_dim[0]);
+    assert(y_pixel >= 0);
+    assert(y_pixel < image_dim[1]);
+    // kernel odd assertion
+    assert((kernel_dim[0] - 1)%2 == 0);
+    assert((kernel_dim[1] - 1)%2 == 0);
+    assert((kernel_dim[2] - 1)%2 == 0);
+
+    const int halfKernel_x = (kernel_dim[2] - 1) / 2;
+    const int halfKernel_y = (kernel_dim[1] - 1) / 2;
+    const int halfKernel_z = (kernel_dim[0] - 1) / 2;
+    const int width = image_dim[2];
+    const long frame_size = static_cast<long>(image_dim[1]) * width;
+
+    MODE mode = static_cast<MODE>(pMode);
+
+    // Offsets in input of the rows of the window (-1 if out of the volume)
+    std::vector<long> row_offsets(kernel_dim[0] * kernel_dim[1]);
+    for(int i=0; i < kernel_dim[0]; i++){
+        int index_z = border_index(z_pixel - halfKernel_z + i, image_dim[0], mode);
+        for(int j=0; j < kernel_dim[1]; j++){
+            int index_y = border_index(y_pixel - halfKernel_y + j, image_dim[1], mode);
+            if (index_z < 0 || index_y < 0){
+                row_offsets[i * kernel_dim[1] + j] = -1;
+            }else{
+                row_offsets[i * kernel_dim[1] + j] = index_z * frame_size + index_y * width;
+            }
+        }
+    }
+
+    // init buffer
+    std::vector<T> window_values(kernel_dim[0] * kernel_dim[1] * kernel_dim[2]);
+
+    const long row_offset = z_pixel * frame_size + static_cast<long>(y_pixel) * width;
+
+    for(int x_pixel=0; x_pixel < width; x_pixel++){
+        typename std::vector<T>::iterator it = window_values.begin();
+
+        // fill the vector
+        for(int win_x = x_pixel - halfKernel_x; win_x <= x_pixel + halfKernel_x; win_x++){
+            int index_x = border_index(win_x, width, mode);
+            for(size_t row=0; row < row_offsets.size(); row++){
+                T value;
+                if (index_x < 0 || row_offsets[row] < 0){
+                    if (mode == CONSTANT){
+                        value = cval;
+                    }else{  // SHRINK: ignore values out of the volume
+                        continue;
+                    }
+                }else{
+                    value = input[row_offsets[row] + index_x];
+                }
+                if (value == value) {  // Ignore NaNs
+                    *it = value;
+                    ++it;
+                }
+            }
+        }
+
+        //window_size can be smaller than kernel size in shrink mode or if there is NaNs
+        int window_size = std::distance(window_values.begin(), it);
+
+        if (window_size == 0) {
+            // Window is empty, this is the case when all values are NaNs
+            output[row_offset + x_pixel] = NAN;
+
+        } else {
+            // apply the median value if needed for this pixel
+            const T currentPixelValue = input[row_offset + x_pixel];
+            if (conditional == true){
+                typename std::vector<T>::iterator window_end = window_values.begin() + window_size;
+                T min = 0;
+                T max = 0;
+                getMinMax(window_values, min, max, window_end);
+                // NaNs are propagated through unchanged
+                if ((currentPixelValue == max) || (currentPixelValue == min)){
+                    output[row_offset + x_pixel] = median<T>(window_values, window_size);
+                }else{
+                    output[row_offset + x_pixel] = currentPixelValue;
+                }
+            }else{
+                output[row_offset + x_pixel] = median<T>(window_values, window_size);
+            }
+        }
+    }
+}
+
 #endif // MEDIAN_FILTER
@@ -38,5 +38,25 @@ cdef extern from "median_filter.hpp":
                                       bool conditional,
                                       T cval) nogil;
 
+    cdef extern void median_filter_histogram[T](const T* image,
+                                                T* output,
+                                                int* kernel_dim,
+                                                int* image_dim,
+                                                int y_pixel_range_min,
+                                                int y_pixel_range_max,
+                                                bool conditional,
+                                                int mode,
+                                                T cval) nogil;
+
+    cdef extern void median_filter_3d[T](const T* image,
+                                         T* output,
+                                         int* kernel_dim,
+                                         int* image_dim,
+                                         int z_pixel,
+                                         int y_pixel,
+                                         bool conditional,
+                                         int mode,
+                                         T cval) nogil;
+
     cdef extern int reflect(int index, int length_max);
     cdef extern int mirror(int index, int length_max);
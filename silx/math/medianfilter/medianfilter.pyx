@@ -22,12 +22,12 @@
 # THE SOFTWARE.
 #
 # ###########################################################################*/
-"""This module provides median filter function for 1D and 2D arrays.
+"""This module provides median filter function for 1D, 2D and 3D arrays.
 """
 
 __authors__ = ["H. Payno", "J. Kieffer"]
 __license__ = "MIT"
-__date__ = "02/05/2017"
+__date__ = "19/10/2026"
 
 
 from cython.parallel import prange
@@ -42,10 +42,21 @@ import numbers
 ctypedef unsigned long uint64
 ctypedef unsigned int uint32
 ctypedef unsigned short uint16
+ctypedef unsigned char uint8
 
 
 MODES = {'nearest': 0, 'reflect': 1, 'mirror': 2, 'shrink': 3, 'constant': 4}
 
+HISTOGRAM_NB_CHUNKS = 64
+"""Number of blocks of rows processed in parallel by the sliding histogram
+median filter. Each block uses its own histogram."""
+
+HISTOGRAM_MIN_KERNEL_SIZE = 25
+"""Minimal number of pixels in the kernel to use the sliding histogram
+median filter for int16 and uint16 data (see benchmark_histogram.py).
+Smaller kernels are faster with the generic implementation for data
+spread over the whole 16 bits range."""
+
 
 def medfilt1d(data,
               kernel_size=3,
@@ -111,6 +122,40 @@ def medfilt2d(image,
     return medfilt(image, kernel_size, conditional, mode, cval)
 
 
+def medfilt3d(data,
+              kernel_size=3,
+              bool conditional=False,
+              mode='nearest',
+              cval=0):
+    """Function computing the median filter of the given input with a 3D
+    kernel.
+
+    Not-a-Number (NaN) float values are ignored.
+    If the window only contains NaNs, it evaluates to NaN.
+
+    In event of an even number of valid values in the window (either
+    because of NaN values or on volume border in shrink mode),
+    the highest of the 2 central sorted values is taken.
+
+    To filter each frame of a stack of images independently,
+    use :func:`medfilt_stack`.
+
+    :param numpy.ndarray data: the array for which we want to apply
+        the median filter. Should be 3d.
+    :param kernel_size: the dimension of the kernel.
+    :type kernel_size: an int or a tuple or a list of
+        (kernel_depth, kernel_height, kernel_width)
+    :param bool conditional: True if we want to apply a conditional median
+        filtering.
+    :param str mode: the algorithm used to determine how values at borders
+        are determined: 'nearest', 'reflect', 'mirror', 'shrink', 'constant'
+    :param cval: Value used outside borders in 'constant' mode
+
+    :returns: the array with the median value for each voxel.
+    """
+    return medfilt(data, kernel_size, conditional, mode, cval)
+
+
 def medfilt(data,
             kernel_size=3,
             bool conditional=False,
@@ -127,11 +172,17 @@ def medfilt(data,
     because of NaN values or on image border in shrink mode),
     the highest of the 2 central sorted values is taken.
 
+    For uint8 data, and int16 and uint16 data with kernels of at least
+    :data:`HISTOGRAM_MIN_KERNEL_SIZE` pixels, the median is computed with a
+    sliding histogram of the window values, which is much faster for large
+    kernels.
+
     :param numpy.ndarray data: the array for which we want to apply
-        the median filter. Should be 1d or 2d.
+        the median filter. Should be 1d, 2d or 3d.
     :param kernel_size: the dimension of the kernel.
     :type kernel_size: For 1D should be an int for 2D should be a tuple or
-        a list of (kernel_height, kernel_width)
+        a list of (kernel_height, kernel_width), for 3D a tuple or a list of
+        (kernel_depth, kernel_height, kernel_width)
     :param bool conditional: True if we want to apply a conditional median
         filtering.
     :param str mode: the algorithm used to determine how values at borders
@@ -144,9 +195,9 @@ def medfilt(data,
         err = 'Requested mode %s is unknown.' % mode
         raise ValueError(err)
 
-    if data.ndim > 2:
+    if data.ndim > 3:
         raise ValueError(
-            "Invalid data shape. Dimension of the array should be 1 or 2")
+            "Invalid data shape. Dimension of the array should be 1, 2 or 3")
 
     # Handle case of scalar kernel size
     if isinstance(kernel_size, numbers.Integral):
@@ -154,6 +205,18 @@ def medfilt(data,
 
     assert len(kernel_size) == data.ndim
 
+    if data.ndim == 3:
+        output_buffer = numpy.zeros_like(data)
+        check(data, output_buffer)
+        medfilterfc = _get_median_filter_3d(data.dtype)
+        medfilterfc(input_buffer=data,
+                    output_buffer=output_buffer,
+                    kernel_size=numpy.array(kernel_size, dtype=numpy.int32),
+                    conditional=conditional,
+                    mode=MODES[mode],
+                    cval=cval)
+        return output_buffer
+
     # Convert 1D arrays to 2D
     reshaped = False
     if len(data.shape) == 1:
@@ -166,6 +229,7 @@ def medfilt(data,
     check(data, output_buffer)
 
     ker_dim = numpy.array(kernel_size, dtype=numpy.int32)
+    use_histogram = numpy.prod(ker_dim) >= HISTOGRAM_MIN_KERNEL_SIZE
 
     if data.dtype == numpy.float64:
         medfilterfc = _median_filter_float64
@@ -180,9 +244,17 @@ def medfilt(data,
     elif data.dtype == numpy.uint32:
         medfilterfc = _median_filter_uint32
     elif data.dtype == numpy.int16:
-        medfilterfc = _median_filter_int16
+        if use_histogram:
+            medfilterfc = _median_filter_histogram_int16
+        else:
+            medfilterfc = _median_filter_int16
     elif data.dtype == numpy.uint16:
-        medfilterfc = _median_filter_uint16
+        if use_histogram:
+            medfilterfc = _median_filter_histogram_uint16
+        else:
+            medfilterfc = _median_filter_uint16
+    elif data.dtype == numpy.uint8:
+        medfilterfc = _median_filter_histogram_uint8
     else:
         raise ValueError("%s type is not managed by the median filter" % data.dtype)
 
@@ -199,6 +271,122 @@ def medfilt(data,
     return output_buffer
 
 
+def medfilt_stack(data,
+                  kernel_size=3,
+                  bool conditional=False,
+                  mode='nearest',
+                  cval=0,
+                  output=None,
+                  block_size=None):
+    """Apply a 2D median filter on each frame of a stack of images.
+
+    Frames are filtered in parallel, by blocks of ``block_size`` frames.
+    Only one block of frames is loaded in memory at a time, so ``data`` and
+    ``output`` can be memory-mapped arrays or HDF5 datasets larger than
+    the available memory.
+
+    See :func:`medfilt2d` for the description of the filter.
+
+    :param data: 3D array-like of images, the first dimension being
+        the frames. It must provide ``shape`` and ``dtype`` attributes and
+        support slicing along the first dimension.
+    :param kernel_size: the dimension of the kernel.
+    :type kernel_size: an int or a tuple or a list of
+        (kernel_height, kernel_width)
+    :param bool conditional: True if we want to apply a conditional median
+        filtering.
+    :param str mode: the algorithm used to determine how values at borders
+        are determined: 'nearest', 'reflect', 'mirror', 'shrink', 'constant'
+    :param cval: Value used outside borders in 'constant' mode
+    :param output: 3D array-like where to write the result, with the same
+        shape and dtype as ``data``. It must not share memory with ``data``.
+        If ``None`` (default), a new numpy array is allocated.
+    :param int block_size: Number of frames processed at once.
+        If ``None`` (default), all frames are processed at once.
+    :returns: the array with the median value for each pixel (``output``
+        if provided)
+    :raise ValueError: if parameters are not valid
+    """
+    if mode not in MODES:
+        err = 'Requested mode %s is unknown.' % mode
+        raise ValueError(err)
+
+    if len(data.shape) != 3:
+        raise ValueError(
+            "Invalid data shape. Dimension of the array should be 3")
+
+    if isinstance(kernel_size, numbers.Integral):
+        kernel_size = [kernel_size] * 2
+    if len(kernel_size) != 2:
+        raise ValueError("kernel_size must be an int or a pair of int")
+    ker_dim = numpy.array([1] + list(kernel_size), dtype=numpy.int32)
+
+    dtype = numpy.dtype(data.dtype)
+    medfilterfc = _get_median_filter_3d(dtype)
+
+    if output is None:
+        output = numpy.empty(data.shape, dtype=dtype)
+    else:
+        if tuple(output.shape) != tuple(data.shape):
+            raise ValueError("output must have the same shape as data")
+        if numpy.dtype(output.dtype) != dtype:
+            raise ValueError("output must have the same dtype as data")
+        if (isinstance(data, numpy.ndarray) and
+                isinstance(output, numpy.ndarray) and
+                numpy.may_share_memory(data, output)):
+            raise ValueError("output must not share memory with data")
+
+    # Write directly into output when possible
+    write_in_output = (isinstance(output, numpy.ndarray) and
+                       output.flags['C_CONTIGUOUS'])
+
+    nb_frames = data.shape[0]
+    if block_size is None:
+        block_size = max(nb_frames, 1)
+
+    for start in range(0, nb_frames, block_size):
+        stop = min(start + block_size, nb_frames)
+        input_buffer = numpy.ascontiguousarray(data[start:stop], dtype=dtype)
+        if write_in_output:
+            output_buffer = output[start:stop]
+        else:
+            output_buffer = numpy.empty_like(input_buffer)
+
+        medfilterfc(input_buffer=input_buffer,
+                    output_buffer=output_buffer,
+                    kernel_size=ker_dim,
+                    conditional=conditional,
+                    mode=MODES[mode],
+                    cval=cval)
+
+        if not write_in_output:
+            output[start:stop] = output_buffer
+
+    return output
+
+
+def _get_median_filter_3d(dtype):
+    """Returns the 3D median filter implementation for the given dtype
+
+    :param numpy.dtype dtype:
+    :raise ValueError: if the type is not supported
+    """
+    functions = {
+        numpy.dtype(numpy.float64): _median_filter_3d_float64,
+        numpy.dtype(numpy.float32): _median_filter_3d_float32,
+        numpy.dtype(numpy.int64): _median_filter_3d_int64,
+        numpy.dtype(numpy.uint64): _median_filter_3d_uint64,
+        numpy.dtype(numpy.int32): _median_filter_3d_int32,
+        numpy.dtype(numpy.uint32): _median_filter_3d_uint32,
+        numpy.dtype(numpy.int16): _median_filter_3d_int16,
+        numpy.dtype(numpy.uint16): _median_filter_3d_uint16,
+        numpy.dtype(numpy.uint8): _median_filter_3d_uint8,
+    }
+    if dtype not in functions:
+        raise ValueError("%s type is not managed by the median filter" % dtype)
+    return functions[dtype]
+
+
 def check(input_buffer, output_buffer):
     """Simple check on the two buffers to make sure we can apply the median filter
     """
@@ -208,11 +396,11 @@ def check(input_buffer, output_buffer):
     if (output_buffer.flags['C_CONTIGUOUS'] is False):
         raise ValueError('<output_buffer> must be a C_CONTIGUOUS numpy array.')
 
-    if not (len(input_buffer.shape) <= 2):
-        raise ValueError('<input_buffer> dimension must mo higher than 2.')
+    if not (len(input_buffer.shape) <= 3):
+        raise ValueError('<input_buffer> dimension must mo higher than 3.')
 
-    if not (len(output_buffer.shape) <= 2):
-        raise ValueError('<output_buffer> dimension must mo higher than 2.')
+    if not (len(output_buffer.shape) <= 3):
+        raise ValueError('<output_buffer> dimension must mo higher than 3.')
 
     if not(input_buffer.dtype == output_buffer.dtype):
         raise ValueError('input buffer and output_buffer must be of the same type')
@@ -494,3 +682,488 @@ def _median_filter_uint16(
                                                 conditional,
                                                 mode,
                                                 cval)
+
+
+######### sliding histogram median filter for integers of at most 16 bits #####
+# The histogram of the window is updated column by column while moving along
+# a row, so the cost per pixel grows with the kernel height only.
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_histogram_uint8(
+      cnumpy.uint8_t[:, ::1] input_buffer not None,
+      cnumpy.uint8_t[:, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.uint8_t cval):
+
+    cdef:
+        int chunk = 0
+        int chunk_height
+        int nb_chunks
+        int[2] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    chunk_height = (buffer_shape[0] + HISTOGRAM_NB_CHUNKS - 1) // HISTOGRAM_NB_CHUNKS
+    nb_chunks = (buffer_shape[0] + chunk_height - 1) // chunk_height
+
+    for chunk in prange(nb_chunks, nogil=True, schedule='dynamic'):
+            median_filter.median_filter_histogram[uint8](
+                <uint8*> & input_buffer[0, 0],
+                <uint8*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                chunk * chunk_height,
+                min((chunk + 1) * chunk_height, buffer_shape[0]) - 1,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_histogram_int16(
+      cnumpy.int16_t[:, ::1] input_buffer not None,
+      cnumpy.int16_t[:, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.int16_t cval):
+
+    cdef:
+        int chunk = 0
+        int chunk_height
+        int nb_chunks
+        int[2] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    chunk_height = (buffer_shape[0] + HISTOGRAM_NB_CHUNKS - 1) // HISTOGRAM_NB_CHUNKS
+    nb_chunks = (buffer_shape[0] + chunk_height - 1) // chunk_height
+
+    for chunk in prange(nb_chunks, nogil=True, schedule='dynamic'):
+            median_filter.median_filter_histogram[short](
+                <short*> & input_buffer[0, 0],
+                <short*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                chunk * chunk_height,
+                min((chunk + 1) * chunk_height, buffer_shape[0]) - 1,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_histogram_uint16(
+      cnumpy.uint16_t[:, ::1] input_buffer not None,
+      cnumpy.uint16_t[:, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.uint16_t cval):
+
+    cdef:
+        int chunk = 0
+        int chunk_height
+        int nb_chunks
+        int[2] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    chunk_height = (buffer_shape[0] + HISTOGRAM_NB_CHUNKS - 1) // HISTOGRAM_NB_CHUNKS
+    nb_chunks = (buffer_shape[0] + chunk_height - 1) // chunk_height
+
+    for chunk in prange(nb_chunks, nogil=True, schedule='dynamic'):
+            median_filter.median_filter_histogram[uint16](
+                <uint16*> & input_buffer[0, 0],
+                <uint16*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                chunk * chunk_height,
+                min((chunk + 1) * chunk_height, buffer_shape[0]) - 1,
+                conditional,
+                mode,
+                cval)
+
+
+######### median filter of 3D volumes and of stacks of 2D frames #############
+# A kernel depth of 1 filters each frame independently. Frames and rows are
+# processed in parallel.
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_float32(
+      float[:, :, ::1] input_buffer not None,
+      float[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      float cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    for row in prange(nb_rows, nogil=True):
+            median_filter.median_filter_3d[float](
+                <float*> & input_buffer[0, 0, 0],
+                <float*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                row // buffer_shape[1],
+                row % buffer_shape[1],
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_float64(
+      double[:, :, ::1] input_buffer not None,
+      double[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      double cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    for row in prange(nb_rows, nogil=True):
+            median_filter.median_filter_3d[double](
+                <double*> & input_buffer[0, 0, 0],
+                <double*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                row // buffer_shape[1],
+                row % buffer_shape[1],
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_int64(
+      cnumpy.int64_t[:, :, ::1] input_buffer not None,
+      cnumpy.int64_t[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.int64_t cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    for row in prange(nb_rows, nogil=True):
+            median_filter.median_filter_3d[long](
+                <long*> & input_buffer[0, 0, 0],
+                <long*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                row // buffer_shape[1],
+                row % buffer_shape[1],
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_uint64(
+      cnumpy.uint64_t[:, :, ::1] input_buffer not None,
+      cnumpy.uint64_t[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.uint64_t cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    for row in prange(nb_rows, nogil=True):
+            median_filter.median_filter_3d[uint64](
+                <uint64*> & input_buffer[0, 0, 0],
+                <uint64*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                row // buffer_shape[1],
+                row % buffer_shape[1],
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_int32(
+      cnumpy.int32_t[:, :, ::1] input_buffer not None,
+      cnumpy.int32_t[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.int32_t cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    for row in prange(nb_rows, nogil=True):
+            median_filter.median_filter_3d[int](
+                <int*> & input_buffer[0, 0, 0],
+                <int*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                row // buffer_shape[1],
+                row % buffer_shape[1],
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_uint32(
+      cnumpy.uint32_t[:, :, ::1] input_buffer not None,
+      cnumpy.uint32_t[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.uint32_t cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    for row in prange(nb_rows, nogil=True):
+            median_filter.median_filter_3d[uint32](
+                <uint32*> & input_buffer[0, 0, 0],
+                <uint32*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                row // buffer_shape[1],
+                row % buffer_shape[1],
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_int16(
+      cnumpy.int16_t[:, :, ::1] input_buffer not None,
+      cnumpy.int16_t[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.int16_t cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int chunk = 0
+        int chunk_height
+        int nb_chunks
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] != 1:
+        for row in prange(nb_rows, nogil=True):
+                median_filter.median_filter_3d[short](
+                    <short*> & input_buffer[0, 0, 0],
+                    <short*> & output_buffer[0, 0, 0],
+                    <int*>&kernel_size[0],
+                    <int*>buffer_shape,
+                    row // buffer_shape[1],
+                    row % buffer_shape[1],
+                    conditional,
+                    mode,
+                    cval)
+        return
+
+    # 2D filtering of each frame: use the sliding histogram on blocks of
+    # rows of each frame
+    chunk_height = (nb_rows + HISTOGRAM_NB_CHUNKS - 1) // HISTOGRAM_NB_CHUNKS
+    chunk_height = min(max(chunk_height, 1), buffer_shape[1])
+    nb_chunks = (buffer_shape[1] + chunk_height - 1) // chunk_height
+
+    for chunk in prange(buffer_shape[0] * nb_chunks, nogil=True,
+                        schedule='dynamic'):
+            median_filter.median_filter_histogram[short](
+                <short*> & input_buffer[chunk // nb_chunks, 0, 0],
+                <short*> & output_buffer[chunk // nb_chunks, 0, 0],
+                <int*>&kernel_size[1],
+                <int*>&buffer_shape[1],
+                (chunk % nb_chunks) * chunk_height,
+                min((chunk % nb_chunks + 1) * chunk_height,
+                    buffer_shape[1]) - 1,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_uint16(
+      cnumpy.uint16_t[:, :, ::1] input_buffer not None,
+      cnumpy.uint16_t[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.uint16_t cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int chunk = 0
+        int chunk_height
+        int nb_chunks
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] != 1:
+        for row in prange(nb_rows, nogil=True):
+                median_filter.median_filter_3d[uint16](
+                    <uint16*> & input_buffer[0, 0, 0],
+                    <uint16*> & output_buffer[0, 0, 0],
+                    <int*>&kernel_size[0],
+                    <int*>buffer_shape,
+                    row // buffer_shape[1],
+                    row % buffer_shape[1],
+                    conditional,
+                    mode,
+                    cval)
+        return
+
+    # 2D filtering of each frame: use the sliding histogram on blocks of
+    # rows of each frame
+    chunk_height = (nb_rows + HISTOGRAM_NB_CHUNKS - 1) // HISTOGRAM_NB_CHUNKS
+    chunk_height = min(max(chunk_height, 1), buffer_shape[1])
+    nb_chunks = (buffer_shape[1] + chunk_height - 1) // chunk_height
+
+    for chunk in prange(buffer_shape[0] * nb_chunks, nogil=True,
+                        schedule='dynamic'):
+            median_filter.median_filter_histogram[uint16](
+                <uint16*> & input_buffer[chunk // nb_chunks, 0, 0],
+                <uint16*> & output_buffer[chunk // nb_chunks, 0, 0],
+                <int*>&kernel_size[1],
+                <int*>&buffer_shape[1],
+                (chunk % nb_chunks) * chunk_height,
+                min((chunk % nb_chunks + 1) * chunk_height,
+                    buffer_shape[1]) - 1,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_3d_uint8(
+      cnumpy.uint8_t[:, :, ::1] input_buffer not None,
+      cnumpy.uint8_t[:, :, ::1] output_buffer not None,
+      cnumpy.int32_t[::1] kernel_size not None,
+      bool conditional,
+      int mode,
+      cnumpy.uint8_t cval):
+
+    cdef:
+        int row = 0
+        int nb_rows = input_buffer.shape[0] * input_buffer.shape[1]
+        int chunk = 0
+        int chunk_height
+        int nb_chunks
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] != 1:
+        for row in prange(nb_rows, nogil=True):
+                median_filter.median_filter_3d[uint8](
+                    <uint8*> & input_buffer[0, 0, 0],
+                    <uint8*> & output_buffer[0, 0, 0],
+                    <int*>&kernel_size[0],
+                    <int*>buffer_shape,
+                    row // buffer_shape[1],
+                    row % buffer_shape[1],
+                    conditional,
+                    mode,
+                    cval)
+        return
+
+    # 2D filtering of each frame: use the sliding histogram on blocks of
+    # rows of each frame
+    chunk_height = (nb_rows + HISTOGRAM_NB_CHUNKS - 1) // HISTOGRAM_NB_CHUNKS
+    chunk_height = min(max(chunk_height, 1), buffer_shape[1])
+    nb_chunks = (buffer_shape[1] + chunk_height - 1) // chunk_height
+
+    for chunk in prange(buffer_shape[0] * nb_chunks, nogil=True,
+                        schedule='dynamic'):
+            median_filter.median_filter_histogram[uint8](
+                <uint8*> & input_buffer[chunk // nb_chunks, 0, 0],
+                <uint8*> & output_buffer[chunk // nb_chunks, 0, 0],
+                <int*>&kernel_size[1],
+                <int*>&buffer_shape[1],
+                (chunk % nb_chunks) * chunk_height,
+                min((chunk % nb_chunks + 1) * chunk_height,
+                    buffer_shape[1]) - 1,
+                conditional,
+                mode,
+                cval)
@@ -0,0 +1,109 @@
+# coding: utf-8
+# /*##########################################################################
+# Copyright (C) 2017 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Benchmark of the sliding histogram median filter used for 8 and 16 bits
+integers versus the generic implementation"""
+
+__authors__ = ["H. Payno"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+import logging
+from timeit import Timer
+
+import numpy
+import numpy.random
+
+from silx.math.medianfilter import medianfilter
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class BenchmarkHistogramMedianFilter(object):
+    """Simple benchmark of the median filter of uint16 images with the
+    sliding histogram and with the generic implementation"""
+
+    NB_ITER = 3
+
+    def __init__(self, imageWidth, kernels):
+        # Detector-like data and data covering the full uint16 range
+        self.images = {
+            'poisson': (1000 + numpy.random.poisson(
+                100, size=(imageWidth, imageWidth))).astype(numpy.uint16),
+            'uniform': numpy.random.randint(
+                0, 65536, size=(imageWidth, imageWidth)).astype(numpy.uint16)
+        }
+        self.kernels = kernels
+
+        self.run()
+
+    def run(self):
+        self.execTime = {}
+        for kernel in self.kernels:
+            self.execTime[kernel] = self.bench(kernel)
+
+    def bench(self, width):
+        kernel_size = numpy.array((width, width), dtype=numpy.int32)
+        mode = medianfilter.MODES['nearest']
+
+        execTime = {}
+        for name, image in self.images.items():
+            output = numpy.zeros_like(image)
+
+            def execGeneric():
+                medianfilter._median_filter_uint16(
+                    image, output, kernel_size, False, mode, 0)
+
+            def execHistogram():
+                medianfilter._median_filter_histogram_uint16(
+                    image, output, kernel_size, False, mode, 0)
+
+            for engine, function in (('generic', execGeneric),
+                                     ('histogram', execHistogram)):
+                key = '%s %s' % (engine, name)
+                t = Timer(function)
+                execTime[key] = t.timeit(self.NB_ITER) / self.NB_ITER
+                logger.info('exec time %s (kernel size = %s) is %s',
+                            key, width, execTime[key])
+        return execTime
+
+    def getExecTimeFor(self, id):
+        res = []
+        for k in self.kernels:
+            res.append(self.execTime[k][id])
+        return res
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    kernels = [3, 5, 7, 11, 15, 21, 31]
+    benchmark = BenchmarkHistogramMedianFilter(imageWidth=1000,
+                                               kernels=kernels)
+    for name in ('poisson', 'uniform'):
+        generic = benchmark.getExecTimeFor('generic %s' % name)
+        histogram = benchmark.getExecTimeFor('histogram %s' % name)
+        print('%s data' % name)
+        for kernel, t_generic, t_histogram in zip(kernels, generic, histogram):
+            print('kernel %2d: generic %.3fs, histogram %.3fs, speed-up x%.1f'
+                  % (kernel, t_generic, t_histogram, t_generic / t_histogram))
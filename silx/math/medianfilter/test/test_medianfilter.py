@@ -25,13 +25,18 @@
 
 __authors__ = ["H. Payno"]
 __license__ = "MIT"
-__date__ = "17/01/2018"
+__date__ = "19/10/2026"
 
+import os
+import shutil
+import tempfile
 import unittest
 import numpy
 from silx.math.medianfilter import medfilt2d, medfilt1d
+from silx.math.medianfilter import medfilt3d, medfilt_stack
 from silx.math.medianfilter.medianfilter import reflect, mirror
 from silx.math.medianfilter.medianfilter import MODES as silx_mf_modes
+from silx.math.medianfilter import medianfilter
 from silx.utils.testutils import ParametricTestCase
 try:
     import scipy
@@ -585,9 +590,9 @@ class TestGeneralExecution(ParametricTestCase):
         filter
         """
         for mode in silx_mf_modes:
-            for testType in [numpy.float32, numpy.float64, numpy.int16,
-                             numpy.uint16, numpy.int32, numpy.int64,
-                             numpy.uint64]:
+            for testType in [numpy.float32, numpy.float64, numpy.uint8,
+                             numpy.int16, numpy.uint16, numpy.int32,
+                             numpy.int64, numpy.uint64]:
                 with self.subTest(mode=mode, type=testType):
                     data = (numpy.random.rand(10, 10) * 65000).astype(testType)
                     out = medfilt2d(image=data,
@@ -647,6 +652,144 @@ class TestGeneralExecution(ParametricTestCase):
                     numpy.any(out_isnan[numpy.logical_not(nan_mask)]))
 
 
+class TestHistogramEngine(ParametricTestCase):
+    """Test the sliding histogram median filter used for uint8, int16 and
+    uint16 data against the generic implementation used for int32 data"""
+
+    def setUp(self):
+        # Use the histogram engine whatever the kernel size
+        self._min_kernel_size = medianfilter.HISTOGRAM_MIN_KERNEL_SIZE
+        medianfilter.HISTOGRAM_MIN_KERNEL_SIZE = 0
+
+    def tearDown(self):
+        medianfilter.HISTOGRAM_MIN_KERNEL_SIZE = self._min_kernel_size
+
+    def testVsGeneric(self):
+        numpy.random.seed(0)
+        kernels = (3, (1, 5), (5, 3), 7, 15)
+        for dtype in (numpy.uint8, numpy.int16, numpy.uint16):
+            info = numpy.iinfo(dtype)
+            full_range = numpy.random.randint(
+                info.min, int(info.max) + 1, size=(23, 31)).astype(dtype)
+            narrow_range = numpy.random.randint(
+                0, 10, size=(23, 31)).astype(dtype)
+            for data in (full_range, narrow_range):
+                for mode in silx_mf_modes:
+                    for kernel in kernels:
+                        for conditional in (False, True):
+                            with self.subTest(dtype=dtype, mode=mode,
+                                              kernel=kernel,
+                                              conditional=conditional):
+                                result = medfilt2d(data, kernel, conditional,
+                                                   mode, cval=5)
+                                expected = medfilt2d(data.astype(numpy.int32),
+                                                     kernel, conditional,
+                                                     mode, cval=5)
+                                self.assertEqual(result.dtype, dtype)
+                                self.assertTrue(
+                                    numpy.array_equal(result, expected))
+
+    def test1D(self):
+        data = numpy.array([4, 0, 12, 1, 65535, 3, 3, 8], dtype=numpy.uint16)
+        for mode in silx_mf_modes:
+            with self.subTest(mode=mode):
+                result = medfilt1d(data, 5, mode=mode)
+                expected = medfilt1d(data.astype(numpy.int32), 5, mode=mode)
+                self.assertTrue(numpy.array_equal(result, expected))
+
+    def testEngineSelection(self):
+        medianfilter.HISTOGRAM_MIN_KERNEL_SIZE = self._min_kernel_size
+        numpy.random.seed(0)
+        data = numpy.random.randint(0, 65536, size=(23, 31)).astype(numpy.uint16)
+        for kernel in (3, (1, 5), (5, 5), 7):
+            with self.subTest(kernel=kernel):
+                result = medfilt2d(data, kernel)
+                expected = medfilt2d(data.astype(numpy.int32), kernel)
+                self.assertTrue(numpy.array_equal(result, expected))
+
+
+class TestMedianFilterStack(ParametricTestCase):
+    """Test the median filter of 3D arrays and of stacks of images"""
+
+    def setUp(self):
+        numpy.random.seed(0)
+        self.data = numpy.random.randint(0, 1000, size=(7, 15, 17))
+
+    def testStackVsMedfilt2d(self):
+        for dtype in (numpy.float32, numpy.float64, numpy.int32,
+                      numpy.uint8, numpy.uint16):
+            data = self.data.astype(dtype)
+            for mode in silx_mf_modes:
+                for conditional in (False, True):
+                    with self.subTest(dtype=dtype, mode=mode,
+                                      conditional=conditional):
+                        expected = numpy.array(
+                            [medfilt2d(frame, (3, 5), conditional, mode, 7)
+                             for frame in data])
+                        result = medfilt_stack(data, (3, 5), conditional,
+                                               mode, 7, block_size=3)
+                        self.assertEqual(result.dtype, data.dtype)
+                        self.assertTrue(numpy.array_equal(result, expected))
+
+                        # Same as a 3D filter with a kernel depth of 1
+                        result = medfilt3d(data, (1, 3, 5), conditional,
+                                           mode, 7)
+                        self.assertTrue(numpy.array_equal(result, expected))
+
+    def testOutput(self):
+        data = self.data.astype(numpy.float32)
+        expected = medfilt_stack(data, 3)
+
+        output = numpy.zeros_like(data)
+        result = medfilt_stack(data, 3, output=output, block_size=2)
+        self.assertIs(result, output)
+        self.assertTrue(numpy.array_equal(output, expected))
+
+        # Not contiguous output
+        output = numpy.zeros((7, 15, 34), dtype=numpy.float32)[:, :, ::2]
+        medfilt_stack(data, 3, output=output, block_size=2)
+        self.assertTrue(numpy.array_equal(output, expected))
+
+        with self.assertRaises(ValueError):
+            medfilt_stack(data, 3, output=data)
+        with self.assertRaises(ValueError):
+            medfilt_stack(data, 3, output=numpy.zeros_like(self.data))
+
+    def testMemoryMapped(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            data = numpy.memmap(os.path.join(tmpdir, 'data.raw'),
+                                dtype=numpy.uint16, mode='w+',
+                                shape=self.data.shape)
+            data[:] = self.data
+            output = numpy.memmap(os.path.join(tmpdir, 'output.raw'),
+                                  dtype=numpy.uint16, mode='w+',
+                                  shape=self.data.shape)
+            medfilt_stack(data, 5, output=output, block_size=2)
+            expected = medfilt_stack(self.data.astype(numpy.uint16), 5)
+            self.assertTrue(numpy.array_equal(output, expected))
+            del data, output
+        finally:
+            shutil.rmtree(tmpdir)
+
+    @unittest.skipUnless(scipy is not None, "scipy not available")
+    def testMedfilt3dVsScipy(self):
+        data = self.data.astype(numpy.float64)
+        for mode in _getScipyAndSilxCommonModes():
+            with self.subTest(mode=mode):
+                result = medfilt3d(data, 3, mode=mode)
+                expected = scipy.ndimage.median_filter(
+                    data, size=3, mode=mode)
+                self.assertTrue(numpy.array_equal(result, expected))
+
+    def testMedfilt3dNaNs(self):
+        data = numpy.ones((3, 3, 3), dtype=numpy.float32)
+        data[1, 1, 1] = 10.
+        data[0] = numpy.nan
+        result = medfilt3d(data, 3)
+        self.assertTrue(numpy.all(result == 1.))
+
+
 def _getScipyAndSilxCommonModes():
     """return the mode which are comparable between silx and scipy"""
     modes = silx_mf_modes.copy()
@@ -726,6 +869,8 @@ def suite():
     test_suite = unittest.TestSuite()
     for test in [TestGeneralExecution,
                  TestVsScipy,
+                 TestHistogramEngine,
+                 TestMedianFilterStack,
                  TestMedianFilterNearest,
                  TestMedianFilterReflect,
                  TestMedianFilterMirror,
@@ -179,10 +179,97 @@ class TestColormap(ParametricTestCase):
                     self._test(data, colors, vmin, vmax, normalization, None)
 
 
+class TestColormapNormalizations(ParametricTestCase):
+    """Test 'gamma' and 'equalized' normalizations of colormap.cmap"""
+
+    def setUp(self):
+        self.colors = numpy.zeros((256, 4), dtype=numpy.uint8)
+        self.colors[:, 0] = numpy.arange(len(self.colors))
+        self.colors[:, 3] = 255
+
+    @staticmethod
+    def ref_indices(data, nb_colors, vmin, vmax, normalization, gamma):
+        """Reference implementation of gamma and equalized LUT indices
+
+        :param numpy.ndarray data: Data to convert (without NaN)
+        :param int nb_colors: Number of colors of the LUT
+        :param float vmin: Lower bound of the colormap range
+        :param float vmax: Upper bound of the colormap range
+        :param str normalization: 'gamma' or 'equalized'
+        :param float gamma: Exponent of gamma normalization
+        """
+        data = numpy.array(data, dtype=numpy.float64)
+        normalized = numpy.clip((data - vmin) / (vmax - vmin), 0., 1.)
+        if normalization == 'gamma':
+            normalized = normalized ** gamma
+        else:
+            nb_bins = 4096
+            inrange = data[numpy.logical_and(data >= vmin, data <= vmax)]
+            bins = numpy.clip(((inrange - vmin) * (nb_bins / (vmax - vmin))).astype(int),
+                              0, nb_bins - 1)
+            cumulated = numpy.cumsum(numpy.bincount(bins, minlength=nb_bins))
+            cdf_min = cumulated[numpy.nonzero(cumulated)[0][0]]
+            cdf = numpy.clip(
+                (cumulated - cdf_min) / (cumulated[-1] - cdf_min), 0., 1.)
+            bins = numpy.clip(((data - vmin) * (nb_bins / (vmax - vmin))).astype(int),
+                              0, nb_bins - 1)
+            normalized = cdf[bins]
+            normalized[data <= vmin] = 0.
+            normalized[data >= vmax] = 1.
+        return numpy.clip((normalized * nb_colors).astype(int),
+                          0, nb_colors - 1)
+
+    def test(self):
+        """Test gamma and equalized normalizations for different dtypes"""
+        numpy.random.seed(0)
+        for normalization in ('gamma', 'equalized'):
+            for dtype in ('uint8', 'int16', 'uint16', 'int32', 'float32', 'float64'):
+                with self.subTest(dtype=dtype, normalization=normalization):
+                    data = (numpy.random.random((64, 64)) ** 3 * 200).astype(dtype)
+                    image = colormap.cmap(
+                        data, self.colors, 10, 150, normalization, gamma=0.5)
+                    ref = self.ref_indices(
+                        data, len(self.colors), 10, 150, normalization, 0.5)
+                    self.assertEqual(image.shape, data.shape + (4,))
+                    self.assertTrue(numpy.array_equal(image[..., 0], ref))
+
+    def test_equalized_large(self):
+        """Test equalization with more data than a histogram chunk"""
+        data = numpy.arange(1000000, dtype=numpy.float64)
+        image = colormap.cmap(data, self.colors, 0, 999999, 'equalized')
+        ref = self.ref_indices(data, len(self.colors), 0, 999999, 'equalized', 1.)
+        self.assertTrue(numpy.array_equal(image[..., 0], ref))
+        # Uniform distribution: equalization is almost linear
+        counts = numpy.bincount(image[..., 0], minlength=256)
+        self.assertLessEqual(counts.max() - counts.min(), 2)
+
+    def test_not_finite(self):
+        """Test gamma and equalized normalizations with NaN and inf"""
+        data = numpy.array((numpy.nan, -numpy.inf, numpy.inf, 1., 5.))
+        for normalization in ('gamma', 'equalized'):
+            with self.subTest(normalization=normalization):
+                image = colormap.cmap(
+                    data, self.colors, 1, 10, normalization, (1, 2, 3, 4))
+                self.assertTrue(numpy.array_equal(image[0], (1, 2, 3, 4)))
+                self.assertEqual(image[1, 0], 0)
+                self.assertEqual(image[2, 0], 255)
+                self.assertEqual(image[3, 0], 0)
+
+    def test_errors(self):
+        """Test raising exception for bad gamma"""
+        data = numpy.arange(10, dtype=numpy.float64)
+        for gamma in (0., -1., float('nan'), float('inf')):
+            with self.subTest(gamma=gamma):
+                with self.assertRaises(ValueError):
+                    colormap.cmap(data, self.colors, 1, 10, 'gamma', gamma=gamma)
+
+
 def suite():
     test_suite = unittest.TestSuite()
     test_suite.addTest(
         unittest.defaultTestLoader.loadTestsFromTestCase(TestColormap))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(
+        TestColormapNormalizations))
     return test_suite
 
 
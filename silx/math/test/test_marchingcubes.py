@@ -27,12 +27,20 @@ from __future__ import division
 
 __authors__ = ["T. Vincent"]
 __license__ = "MIT"
-__date__ = "17/01/2018"
+__date__ = "19/10/2026"
 
+import os
+import shutil
+import tempfile
 import unittest
 
 import numpy
 
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
 from silx.utils.testutils import ParametricTestCase
 
 from silx.math import marchingcubes
@@ -173,6 +181,58 @@ class TestMarchingCubes(ParametricTestCase):
                                     result.get_indices(),
                                     atol=0., rtol=0.)
 
+    def assertSameIsosurface(self, result, ref_result):
+        """Assert that 2 isosurfaces are the same"""
+        for array, ref_array in zip(result, ref_result):
+            self.assertTrue(numpy.array_equal(array, ref_array))
+
+    def test_slabs(self):
+        """Test marching_cubes_slabs against MarchingCubes"""
+        numpy.random.seed(0)
+        data = numpy.random.random((23, 17, 13)).astype(numpy.float32)
+        isolevel = 0.5
+
+        for sampling in ((1, 1, 1), (2, 1, 3), (3, 2, 2)):
+            ref_result = marchingcubes.MarchingCubes(
+                data, isolevel, sampling=sampling)
+            for slab_size in (1, 4, None):
+                for nb_threads in (1, 3):
+                    with self.subTest(sampling=sampling,
+                                      slab_size=slab_size,
+                                      nb_threads=nb_threads):
+                        result = marchingcubes.marching_cubes_slabs(
+                            data, isolevel,
+                            sampling=sampling,
+                            slab_size=slab_size,
+                            nb_threads=nb_threads)
+                        self.assertSameIsosurface(result, ref_result)
+
+        # No isosurface
+        vertices, normals, indices = marchingcubes.marching_cubes_slabs(
+            data, 2.)
+        self.assertEqual(vertices.shape, (0, 3))
+        self.assertEqual(normals.shape, (0, 3))
+        self.assertEqual(indices.shape, (0, 3))
+
+    @unittest.skipIf(h5py is None, "h5py is not available")
+    def test_slabs_hdf5(self):
+        """Test marching_cubes_slabs with a HDF5 dataset"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'volume.h5')
+            z, y, x = numpy.ogrid[-1:1:20j, -1:1:30j, -1:1:25j]
+            data = z**2 + y**2 + x**2
+            with h5py.File(filename, 'w') as h5file:
+                h5file['volume'] = data
+
+            ref_result = marchingcubes.MarchingCubes(data, 0.5)
+            with h5py.File(filename, 'r') as h5file:
+                result = marchingcubes.marching_cubes_slabs(
+                    h5file['volume'], 0.5, slab_size=3, nb_threads=2)
+            self.assertSameIsosurface(result, ref_result)
+        finally:
+            shutil.rmtree(tmpdir)
+
 
 test_cases = (TestMarchingCubes,)
 
@@ -33,6 +33,12 @@
 
 For more processing functions, see the silx.math and silx.image packages.
 
+``ocl`` is None if pyopencl is not installed or is disabled with
+SILX_OPENCL=0. Otherwise, it is an :class:`~silx.opencl.common.OpenCL`
+instance which probes devices on first use and evaluates to False when no
+device is available: check ``if ocl:`` rather than ``if ocl is not None:``
+before using OpenCL.
+
 See silx documentation: http://www.silx.org/doc/silx/latest/
 """
 
@@ -40,7 +46,7 @@ __author__ = "Jerome Kieffer"
 __contact__ = "Jerome.Kieffer@ESRF.eu"
 __license__ = "MIT"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "15/03/2017"
+__date__ = "19/10/2026"
 __status__ = "stable"
 
 import logging
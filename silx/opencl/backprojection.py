@@ -29,7 +29,7 @@ from __future__ import absolute_import, print_function, with_statement, division
 
 __authors__ = ["A. Mirone, P. Paleo"]
 __license__ = "MIT"
-__date__ = "19/01/2018"
+__date__ = "19/10/2026"
 
 import logging
 import numpy
@@ -72,23 +72,18 @@ def _idivup(a, b):
 def fourier_filter(sino, filter_=None, fft_size=None):
     """Simple numpy based implementation of fourier space filter
     
-    :param sino: of shape shape = (num_projs, num_bins)
+    :param sino: of shape shape = (num_projs, num_bins), or a stack of
+                 sinograms of shape (num_slices, num_projs, num_bins)
     :param filter: filter function to apply in fourier space
     :fft_size: size on which perform the fft. May be larger than the sino array 
     :return: filtered sinogram
     """
-    assert sino.ndim == 2
-    num_projs, num_bins = sino.shape
+    assert sino.ndim in (2, 3)
+    num_bins = sino.shape[-1]
     if fft_size is None:
         fft_size = nextpow2(num_bins * 2 - 1)
     else:
         assert fft_size >= num_bins
-    if fft_size == num_bins:
-        sino_zeropadded = sino.astype(numpy.float32)
-    else:
-        sino_zeropadded = numpy.zeros((num_projs, fft_size),
-                                      dtype=numpy.complex64)
-        sino_zeropadded[:, :num_bins] = sino.astype(numpy.float32)
 
     if filter_ is None:
         h = numpy.zeros(fft_size, dtype=numpy.float32)
@@ -102,7 +97,7 @@ def fourier_filter(sino, filter_=None, fft_size=None):
     # Linear convolution
     sino_f = numpy.fft.fft(sino, fft_size)
     sino_f = sino_f * filter_
-    sino_filtered = numpy.fft.ifft(sino_f)[:, :num_bins].real
+    sino_filtered = numpy.fft.ifft(sino_f)[..., :num_bins].real
     # Send the filtered sinogram to device
     return numpy.ascontiguousarray(sino_filtered.real, dtype=numpy.float32)
 
@@ -115,7 +110,7 @@ class Backprojection(OpenclProcessing):
 
     def __init__(self, sino_shape, slice_shape=None, axis_position=None,
                  angles=None, filter_name=None, ctx=None, devicetype="all",
-                 platformid=None, deviceid=None, profile=False):
+                 platformid=None, deviceid=None, profile=False, session=None):
         """Constructor of the OpenCL (filtered) backprojection
 
         :param sino_shape: shape of the sinogram. The sinogram is in the format
@@ -139,6 +134,7 @@ class Backprojection(OpenclProcessing):
         :param profile: switch on profiling to be able to profile at the kernel
                         level, store profiling elements (makes code slightly
                         slower)
+        :param session: OpenclSession sharing context, queue and memory pool
         """
         # OS X enforces a workgroup size of 1 when the kernel has
         # synchronization barriers if sys.platform.startswith('darwin'):
@@ -147,7 +143,7 @@ class Backprojection(OpenclProcessing):
 
         OpenclProcessing.__init__(self, ctx=ctx, devicetype=devicetype,
                                   platformid=platformid, deviceid=deviceid,
-                                  profile=profile)
+                                  profile=profile, session=session)
         self.shape = sino_shape
 
         self.num_bins = numpy.int32(sino_shape[1])
@@ -192,6 +188,8 @@ class Backprojection(OpenclProcessing):
             })
         self.d_sino = self.cl_mem["d_sino"]  # shorthand
         self.compute_angles()
+        self.upload_queue = None  # Created by filtered_backprojection_volume
+        self._volume_slots = None
 
         self.local_mem = 256 * 3 * _sizeof(numpy.float32)  # constant for all image sizes
         OpenclProcessing.compile_kernels(self, self.kernel_files)
@@ -224,7 +222,11 @@ class Backprojection(OpenclProcessing):
         """
         Allocate the texture for the sinogram.
         """
-        self.d_sino_tex = pyopencl.Image(
+        self.d_sino_tex = self._create_texture()
+
+    def _create_texture(self):
+        """Returns a new texture of the shape of the sinogram"""
+        return pyopencl.Image(
                                         self.ctx,
                                         mf.READ_ONLY | mf.USE_HOST_PTR,
                                         pyopencl.ImageFormat(
@@ -316,7 +318,7 @@ class Backprojection(OpenclProcessing):
                                        region=self.shape[::-1]
                                        )
             what = "transfer filtered sino H->D texture"
-        return EventDescription(what, ev)
+        return EventDescription(what, ev, sino2.nbytes)
 
     def transfer_device_to_texture(self, d_sino):
         if self.is_cpu:
@@ -340,53 +342,67 @@ class Backprojection(OpenclProcessing):
             what = "transfer filtered sino D->D texture"
         return EventDescription(what, ev)
 
+    def _enqueue_backprojection(self, queue, d_sino_ref, d_slice, wait_for=None):
+        """Enqueue the backprojection kernel.
+
+        :param queue: Command queue on which to enqueue the kernel
+        :param d_sino_ref: Sinogram as a texture, or a buffer on CPU devices
+        :param d_slice: Buffer of shape dimrec_shape receiving the slice
+        :param wait_for: Optional list of events to wait for
+        :return: The kernel event
+        """
+        kernel_args = (
+            self.num_projs,  # num of projections (int32)
+            self.num_bins,  # num of bins (int32)
+            self.axis_pos,  # axis position (float32)
+            d_slice,  # d_slice (__global float32*)
+            d_sino_ref,  # d_sino (__read_only image2d_t or float*)
+            numpy.float32(0),  # gpu_offset_x (float32)
+            numpy.float32(0),  # gpu_offset_y (float32)
+            self.cl_mem["d_cos"],  # d_cos (__global float32*)
+            self.cl_mem["d_sin"],  # d_sin (__global float32*)
+            self.cl_mem["d_axes"],  # d_axis  (__global float32*)
+            self._get_local_mem()  # shared mem (__local float32*)
+        )
+        if self.is_cpu:
+            kernel_to_call = self.kernels.backproj_cpu_kernel
+        else:
+            kernel_to_call = self.kernels.backproj_kernel
+        return kernel_to_call(queue, self.ndrange, self.wg, *kernel_args,
+                              wait_for=wait_for)
+
     def backprojection(self, sino=None, dst=None):
         """Perform the backprojection on an input sinogram
 
         :param sino: sinogram. If provided, it returns the plain backprojection.
+                     It can be a numpy array or a pyopencl array of float32
+                     in the same context (e.g., from the same OpenclSession).
         :param dst: destination (pyopencl.Array). If provided, the result will be written in this array.
         :return: backprojection of sinogram
         """
         events = []
         with self.sem:
 
-            if sino is not None:  # assuming numpy.ndarray
+            if isinstance(sino, parray.Array):
+                if sino.shape != tuple(self.shape) or sino.dtype != numpy.float32:
+                    raise ValueError("Expected float32 sinogram of shape %s" % (tuple(self.shape),))
+                event = self.transfer_device_to_texture(sino.data)
+                if event is not None:
+                    events.append(event)
+            elif sino is not None:  # assuming numpy.ndarray
                 events.append(self.transfer_to_texture(sino))
-            # Prepare arguments for the kernel call
             if self.is_cpu:
                 d_sino_ref = self.d_sino
             else:
                 d_sino_ref = self.d_sino_tex
-            kernel_args = (
-                self.num_projs,  # num of projections (int32)
-                self.num_bins,  # num of bins (int32)
-                self.axis_pos,  # axis position (float32)
-                self.cl_mem["_d_slice"],  # d_slice (__global float32*)
-                d_sino_ref,  # d_sino (__read_only image2d_t or float*)
-                numpy.float32(0),  # gpu_offset_x (float32)
-                numpy.float32(0),  # gpu_offset_y (float32)
-                self.cl_mem["d_cos"],  # d_cos (__global float32*)
-                self.cl_mem["d_sin"],  # d_sin (__global float32*)
-                self.cl_mem["d_axes"],  # d_axis  (__global float32*)
-                self._get_local_mem()  # shared mem (__local float32*)
-            )
-            # Call the kernel
-            if self.is_cpu:
-                kernel_to_call = self.kernels.backproj_cpu_kernel
-            else:
-                kernel_to_call = self.kernels.backproj_kernel
-            event_bpj = kernel_to_call(
-                self.queue,
-                self.ndrange,
-                self.wg,
-                *kernel_args
-            )
+            event_bpj = self._enqueue_backprojection(
+                self.queue, d_sino_ref, self.cl_mem["_d_slice"])
             if dst is None:
                 self.slice[:] = 0
                 events.append(EventDescription("backprojection", event_bpj))
                 ev = pyopencl.enqueue_copy(self.queue, self.slice,
                                            self.cl_mem["_d_slice"])
-                events.append(EventDescription("copy D->H result", ev))
+                events.append(EventDescription("copy D->H result", ev, self.slice.nbytes))
                 ev.wait()
                 res = numpy.copy(self.slice)
                 if self.dimrec_shape[0] > self.slice_shape[0] or self.dimrec_shape[1] > self.slice_shape[1]:
@@ -478,11 +494,129 @@ class Backprojection(OpenclProcessing):
         Compute the filtered backprojection (FBP) on a sinogram.
 
         :param sino: sinogram (`numpy.ndarray`) in the format (projections,
-                     bins)
+                     bins). A pyopencl array is copied back to the host
+                     since filtering is performed with numpy.
         """
+        if isinstance(sino, parray.Array):
+            sino = sino.get()
 
         self.filter_projections(sino)
         res = self.backprojection()
         return res
 
+    def _get_volume_slots(self):
+        """Returns the two sets of buffers used alternately by
+        :meth:`filtered_backprojection_volume`.
+
+        The first set uses the buffers of single slice reconstruction.
+
+        :return: list of 2 dicts with keys:
+            "sino" (texture or buffer on CPU devices), "slice" (device
+            buffer) and "host" (numpy array receiving the slice)
+        """
+        if self._volume_slots is None:
+            self.allocate_buffers([
+                BufferDescription("_d_slice_1", numpy.prod(self.dimrec_shape), numpy.float32, mf.READ_WRITE),
+                BufferDescription("d_sino_1", self.num_projs * self.num_bins, numpy.float32, mf.READ_WRITE),
+            ])
+            if self.is_cpu:
+                sinos = self.d_sino, self.cl_mem["d_sino_1"]
+            else:
+                sinos = self.d_sino_tex, self._create_texture()
+            self._volume_slots = [
+                {"sino": sinos[0], "slice": self.cl_mem["_d_slice"]},
+                {"sino": sinos[1], "slice": self.cl_mem["_d_slice_1"]}]
+            for slot in self._volume_slots:
+                slot["host"] = numpy.zeros(self.dimrec_shape, dtype=numpy.float32)
+        return self._volume_slots
+
+    def filtered_backprojection_volume(self, sinos, out=None, batch_size=16):
+        """Compute the filtered backprojection of a stack of sinograms.
+
+        Sinograms are read and filtered on the host by batches while the
+        device backprojects the previous ones.
+        Sinograms are uploaded on a second command queue into two sets of
+        buffers used alternately, so that the upload of slice N+1 runs
+        while slice N is backprojected and slice N-1 is copied back.
+
+        :param sinos: Stack of sinograms of shape (slices, projections, bins)
+            as a numpy array, a memory-mapped array or a h5py dataset.
+        :param out: Array or dataset of shape (slices,) + slice_shape
+            in which to store the reconstructed slices.
+            Default: a new float32 numpy array.
+        :param int batch_size: Number of sinograms read and filtered at once
+        :return: The reconstructed slices (out if provided)
+        """
+        nslices = len(sinos)
+        if tuple(sinos.shape[1:]) != (self.num_projs, self.num_bins):
+            raise ValueError("Expected sinograms with (projs, bins) = (%d, %d)" % (self.num_projs, self.num_bins))
+        shape = (nslices,) + tuple(self.slice_shape)
+        if out is None:
+            out = numpy.empty(shape, dtype=numpy.float32)
+        elif tuple(out.shape) != shape:
+            raise ValueError("out must be of shape %s" % (shape,))
+        if nslices == 0:
+            return out
+
+        slots = self._get_volume_slots()
+        if self.upload_queue is None:
+            if self.profile:
+                self.upload_queue = pyopencl.CommandQueue(
+                    self.ctx,
+                    properties=pyopencl.command_queue_properties.PROFILING_ENABLE)
+            else:
+                self.upload_queue = pyopencl.CommandQueue(self.ctx)
+
+        height, width = self.slice_shape
+        events = []
+        pending = [None, None]  # (slice index, read back event, sinogram) per slot
+        sino_used = [None, None]  # Last kernel reading each sinogram
+
+        def retrieve(index):
+            """Wait for the slice using a slot and store it in out"""
+            if pending[index] is not None:
+                slice_index, evt, _sino = pending[index]
+                evt.wait()
+                out[slice_index] = slots[index]["host"][:height, :width]
+                pending[index] = None
+
+        for start in range(0, nslices, batch_size):
+            batch = numpy.asarray(sinos[start:start + batch_size], dtype=numpy.float32)
+            batch = fourier_filter(batch * numpy.float32(numpy.pi / self.num_projs),
+                                   filter_=self.filter, fft_size=self.fft_size)
+            for offset, sino in enumerate(batch):
+                index = (start + offset) % 2
+                retrieve(index)
+                slot = slots[index]
+                wait_for = None if sino_used[index] is None else [sino_used[index]]
+                with self.sem:
+                    if self.is_cpu:
+                        evt = pyopencl.enqueue_copy(
+                            self.upload_queue, slot["sino"], sino,
+                            is_blocking=False, wait_for=wait_for)
+                    else:
+                        evt = pyopencl.enqueue_copy(
+                            self.upload_queue, slot["sino"], sino,
+                            origin=(0, 0), region=self.shape[::-1],
+                            is_blocking=False, wait_for=wait_for)
+                    events.append(EventDescription("transfer filtered sino H->D", evt, sino.nbytes))
+                    self.upload_queue.flush()
+
+                    evt = self._enqueue_backprojection(
+                        self.queue, slot["sino"], slot["slice"], wait_for=[evt])
+                    events.append(EventDescription("backprojection", evt))
+                    sino_used[index] = evt
+
+                    evt = pyopencl.enqueue_copy(self.queue, slot["host"], slot["slice"],
+                                                is_blocking=False)
+                    events.append(EventDescription("copy D->H result", evt, slot["host"].nbytes))
+                    self.queue.flush()
+                pending[index] = start + offset, evt, sino
+
+        for index in (nslices % 2, (nslices + 1) % 2):
+            retrieve(index)
+        if self.profile:
+            self.events += events
+        return out
+
     __call__ = filtered_backprojection
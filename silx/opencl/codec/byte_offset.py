@@ -37,7 +37,7 @@ __authors__ = ["Jérôme Kieffer"]
 __contact__ = "jerome.kieffer@esrf.eu"
 __license__ = "MIT"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "11/10/2018"
+__date__ = "19/10/2026"
 __status__ = "production"
 
 
@@ -58,7 +58,7 @@ if pyopencl:
         from pyopencl.algorithm import GenericScanKernel
         from pyopencl.scan import GenericDebugScanKernel
 else:
-    logger.warning("No PyOpenCL, no byte-offset, please see fabio")
+    logger.warning("No PyOpenCL, no byte-offset, please see silx.io.byte_offset")
 
 
 class ByteOffset(OpenclProcessing):
@@ -77,10 +77,11 @@ class ByteOffset(OpenclProcessing):
     def __init__(self, raw_size=None, dec_size=None,
                  ctx=None, devicetype="all",
                  platformid=None, deviceid=None,
-                 block_size=None, profile=False):
+                 block_size=None, profile=False, session=None):
         OpenclProcessing.__init__(self, ctx=ctx, devicetype=devicetype,
                                   platformid=platformid, deviceid=deviceid,
-                                  block_size=block_size, profile=profile)
+                                  block_size=block_size, profile=profile,
+                                  session=session)
         if self.block_size is None:
             self.block_size = self.device.max_work_group_size
         wg = self.block_size
@@ -110,6 +111,7 @@ class ByteOffset(OpenclProcessing):
             ]
 
         self.allocate_buffers(buffers, use_array=True)
+        self.upload_queue = None  # Queue for uploads of decode_many
 
         self.compile_kernels([os.path.join("codec", "byte_offset")])
         self.kernels.__setattr__("scan", self._init_double_scan())
@@ -143,6 +145,136 @@ class ByteOffset(OpenclProcessing):
                                          output_statement=output_statement)
         return knl
 
+    def _resize_raw_buffers(self, raw_size):
+        """Make sure buffers used for decompression are large enough
+
+        :param int raw_size: Size of the compressed stream
+        """
+        if raw_size > self.padded_raw_size:
+            wg = self.block_size
+            self.raw_size = int(raw_size)
+            self.padded_raw_size = (self.raw_size + wg - 1) & ~(wg - 1)
+            logger.info("increase raw buffer size to %s", self.padded_raw_size)
+            buffers = {
+                       "raw": pyopencl.array.empty(self.queue, self.padded_raw_size, dtype=numpy.int8),
+                       "mask": pyopencl.array.empty(self.queue, self.padded_raw_size, dtype=numpy.int32),
+                       "exceptions": pyopencl.array.empty(self.queue, self.padded_raw_size, dtype=numpy.int32),
+                       "values": pyopencl.array.empty(self.queue, self.padded_raw_size, dtype=numpy.int32),
+                      }
+            self.cl_mem.update(buffers)
+
+    def _decode_buffers(self, slot, dtype):
+        """Returns the device buffers used to decompress a frame.
+
+        Slot 0 uses the buffers of :meth:`decode`, other slots have their own
+        buffers allocated on first use, to process frames concurrently.
+
+        :param int slot: Index of the set of buffers
+        :param dtype: numpy.int32 or numpy.float32 for the output
+        :return: dict of pyopencl arrays: raw, mask, values, exceptions,
+                 counter and out.
+        """
+        out_name = "data_float" if dtype == numpy.float32 else "data_int"
+        if slot == 0:
+            names = {"raw": "raw", "mask": "mask", "values": "values",
+                     "exceptions": "exceptions", "counter": "counter",
+                     "out": out_name}
+        else:
+            names = {"raw": "raw_%d" % slot,
+                     "mask": "mask_%d" % slot,
+                     "values": "values_%d" % slot,
+                     "exceptions": "exceptions_%d" % slot,
+                     "counter": "counter_%d" % slot,
+                     "out": "%s_%d" % (out_name, slot)}
+            sizes = {"raw": (self.padded_raw_size, numpy.int8),
+                     "mask": (self.padded_raw_size, numpy.int32),
+                     "values": (self.padded_raw_size, numpy.int32),
+                     "exceptions": (self.padded_raw_size, numpy.int32),
+                     "counter": (1, numpy.int32),
+                     "out": (self.dec_size, dtype)}
+            for key, name in names.items():
+                size, buffer_dtype = sizes[key]
+                if self.cl_mem.get(name) is None or self.cl_mem[name].size < size:
+                    self.cl_mem[name] = pyopencl.array.empty(self.queue, int(size),
+                                                             dtype=buffer_dtype)
+        return dict((key, self.cl_mem[name]) for key, name in names.items())
+
+    def _enqueue_decode(self, buffers, len_raw, out, wait_for=None):
+        """Enqueue kernels decompressing a stream already copied to the device.
+
+        The number of exceptions is read back to launch the kernel treating
+        them, so this waits for the exceptions to be marked.
+
+        :param dict buffers: Device buffers as returned by :meth:`_decode_buffers`
+        :param numpy.int32 len_raw: Size of the compressed stream
+        :param pyopencl.array out: Output array of int32 or float32
+        :param wait_for: Events to wait for before reading the raw buffer
+        :return: (list of EventDescription, last event using the raw buffer)
+        """
+        wg = self.block_size
+        events = []
+        evt = self.kernels.fill_int_mem(self.queue, (self.padded_raw_size,), (wg,),
+                                        buffers["mask"].data,
+                                        numpy.int32(self.padded_raw_size),
+                                        numpy.int32(0),
+                                        numpy.int32(0))
+        events.append(EventDescription("memset mask", evt))
+        evt = self.kernels.fill_int_mem(self.queue, (1,), (1,),
+                                        buffers["counter"].data,
+                                        numpy.int32(1),
+                                        numpy.int32(0),
+                                        numpy.int32(0))
+        events.append(EventDescription("memset counter", evt))
+        evt = self.kernels.mark_exceptions(self.queue, (self.padded_raw_size,), (wg,),
+                                           buffers["raw"].data,
+                                           len_raw,
+                                           numpy.int32(self.raw_size),
+                                           buffers["mask"].data,
+                                           buffers["values"].data,
+                                           buffers["counter"].data,
+                                           buffers["exceptions"].data,
+                                           wait_for=wait_for)
+        events.append(EventDescription("mark exceptions", evt))
+        raw_evt = evt
+        nb_exceptions = numpy.empty(1, dtype=numpy.int32)
+        evt = pyopencl.enqueue_copy(self.queue, nb_exceptions, buffers["counter"].data,
+                                    is_blocking=False)
+        events.append(EventDescription("copy counter D -> H", evt))
+        evt.wait()
+        nbexc = int(nb_exceptions[0])
+        if nbexc == 0:
+            logger.info("nbexc %i", nbexc)
+        else:
+            evt = self.kernels.treat_exceptions(self.queue, (nbexc,), (1,),
+                                                buffers["raw"].data,
+                                                len_raw,
+                                                buffers["mask"].data,
+                                                buffers["exceptions"].data,
+                                                buffers["values"].data
+                                                )
+            events.append(EventDescription("treat_exceptions", evt))
+            raw_evt = evt
+
+        evt = self.kernels.scan(buffers["values"],
+                                buffers["mask"],
+                                queue=self.queue,
+                                size=int(len_raw),
+                                wait_for=(evt,))
+        events.append(EventDescription("double scan", evt))
+        if out.dtype == numpy.float32:
+            copy_results = self.kernels.copy_result_float
+        else:
+            copy_results = self.kernels.copy_result_int
+        evt = copy_results(self.queue, (self.padded_raw_size,), (wg,),
+                           buffers["values"].data,
+                           buffers["mask"].data,
+                           len_raw,
+                           self.dec_size,
+                           out.data
+                           )
+        events.append(EventDescription("copy_results", evt))
+        return events, raw_evt
+
     def decode(self, raw, as_float=False, out=None):
         """This function actually performs the decompression by calling the kernels
 
@@ -159,94 +291,92 @@ class ByteOffset(OpenclProcessing):
         events = []
         with self.sem:
             len_raw = numpy.int32(len(raw))
-            if len_raw > self.padded_raw_size:
-                wg = self.block_size
-                self.raw_size = int(len(raw))
-                self.padded_raw_size = (self.raw_size + wg - 1) & ~(wg - 1)
-                logger.info("increase raw buffer size to %s", self.padded_raw_size)
-                buffers = {
-                           "raw": pyopencl.array.empty(self.queue, self.padded_raw_size, dtype=numpy.int8),
-                           "mask": pyopencl.array.empty(self.queue, self.padded_raw_size, dtype=numpy.int32),
-                           "exceptions": pyopencl.array.empty(self.queue, self.padded_raw_size, dtype=numpy.int32),
-                           "values": pyopencl.array.empty(self.queue, self.padded_raw_size, dtype=numpy.int32),
-                          }
-                self.cl_mem.update(buffers)
-            else:
-                wg = self.block_size
-
-            evt = pyopencl.enqueue_copy(self.queue, self.cl_mem["raw"].data,
+            self._resize_raw_buffers(len_raw)
+            buffers = self._decode_buffers(0, numpy.float32 if as_float else numpy.int32)
+            if out is None:
+                out = buffers["out"]
+
+            evt = pyopencl.enqueue_copy(self.queue, buffers["raw"].data,
                                         raw,
                                         is_blocking=False)
-            events.append(EventDescription("copy raw H -> D", evt))
-            evt = self.kernels.fill_int_mem(self.queue, (self.padded_raw_size,), (wg,),
-                                            self.cl_mem["mask"].data,
-                                            numpy.int32(self.padded_raw_size),
-                                            numpy.int32(0),
-                                            numpy.int32(0))
-            events.append(EventDescription("memset mask", evt))
-            evt = self.kernels.fill_int_mem(self.queue, (1,), (1,),
-                                            self.cl_mem["counter"].data,
-                                            numpy.int32(1),
-                                            numpy.int32(0),
-                                            numpy.int32(0))
-            events.append(EventDescription("memset counter", evt))
-            evt = self.kernels.mark_exceptions(self.queue, (self.padded_raw_size,), (wg,),
-                                               self.cl_mem["raw"].data,
-                                               len_raw,
-                                               numpy.int32(self.raw_size),
-                                               self.cl_mem["mask"].data,
-                                               self.cl_mem["values"].data,
-                                               self.cl_mem["counter"].data,
-                                               self.cl_mem["exceptions"].data)
-            events.append(EventDescription("mark exceptions", evt))
-            nb_exceptions = numpy.empty(1, dtype=numpy.int32)
-            evt = pyopencl.enqueue_copy(self.queue, nb_exceptions, self.cl_mem["counter"].data,
-                                        is_blocking=False)
-            events.append(EventDescription("copy counter D -> H", evt))
-            evt.wait()
-            nbexc = int(nb_exceptions[0])
-            if nbexc == 0:
-                logger.info("nbexc %i", nbexc)
-            else:
-                evt = self.kernels.treat_exceptions(self.queue, (nbexc,), (1,),
-                                                    self.cl_mem["raw"].data,
-                                                    len_raw,
-                                                    self.cl_mem["mask"].data,
-                                                    self.cl_mem["exceptions"].data,
-                                                    self.cl_mem["values"].data
-                                                    )
-                events.append(EventDescription("treat_exceptions", evt))
-
-            #self.cl_mem["copy_values"] = self.cl_mem["values"].copy()
-            #self.cl_mem["copy_mask"] = self.cl_mem["mask"].copy()
-            evt = self.kernels.scan(self.cl_mem["values"],
-                                    self.cl_mem["mask"],
-                                    queue=self.queue,
-                                    size=int(len_raw),
-                                    wait_for=(evt,))
-            events.append(EventDescription("double scan", evt))
-            #evt.wait()
-            if out is not None:
-                if out.dtype == numpy.float32:
-                    copy_results = self.kernels.copy_result_float
-                else:
-                    copy_results = self.kernels.copy_result_int
-            else:
-                if as_float:
-                    out = self.cl_mem["data_float"]
-                    copy_results = self.kernels.copy_result_float
+            events.append(EventDescription("copy raw H -> D", evt, raw.nbytes))
+            events += self._enqueue_decode(buffers, len_raw, out)[0]
+            if self.profile:
+                self.events += events
+        return out
+
+    def decode_many(self, raws, as_float=False, out=None):
+        """Decompress many frames, overlapping transfers and computation.
+
+        Compressed streams are uploaded on a second command queue into two
+        sets of buffers used alternately, so that the upload of frame N+1
+        runs while frame N is decompressed and frame N-1 is copied back to
+        the host.
+
+        :param raws: Sequence of compressed streams (1D numpy arrays of char)
+        :param bool as_float: True to decompress as float32,
+                              False (default) to decompress as int32
+        :param numpy.ndarray out: C-contiguous host array of int32 or float32
+            of shape (number of frames, dec_size) in which to store the result.
+        :return: The decompressed frames as a 2D numpy array
+        :rtype: numpy.ndarray
+        """
+        assert self.dec_size is not None, \
+            "dec_size is a mandatory ByteOffset init argument for decompression"
+
+        raws = [numpy.ascontiguousarray(raw) for raw in raws]
+        shape = len(raws), int(self.dec_size)
+        if out is None:
+            out = numpy.empty(shape, dtype=numpy.float32 if as_float else numpy.int32)
+        else:
+            assert out.shape == shape, "out must be of shape %s" % (shape,)
+            assert out.dtype in (numpy.int32, numpy.float32)
+            assert out.flags["C_CONTIGUOUS"]
+        if len(raws) == 0:
+            return out
+
+        events = []
+        with self.sem:
+            self._resize_raw_buffers(max(len(raw) for raw in raws))
+            slots = [self._decode_buffers(slot, out.dtype) for slot in range(2)]
+            if self.upload_queue is None:
+                if self.profile:
+                    self.upload_queue = pyopencl.CommandQueue(
+                        self.ctx,
+                        properties=pyopencl.command_queue_properties.PROFILING_ENABLE)
                 else:
-                    out = self.cl_mem["data_int"]
-                    copy_results = self.kernels.copy_result_int
-            evt = copy_results(self.queue, (self.padded_raw_size,), (wg,),
-                               self.cl_mem["values"].data,
-                               self.cl_mem["mask"].data,
-                               len_raw,
-                               self.dec_size,
-                               out.data
-                               )
-            events.append(EventDescription("copy_results", evt))
-            #evt.wait()
+                    self.upload_queue = pyopencl.CommandQueue(self.ctx)
+
+            uploads = [None] * len(raws)
+            raw_used = [None, None]  # Last events reading each raw buffer
+
+            def upload(index):
+                """Enqueue the copy of a raw stream on the upload queue"""
+                slot = slots[index % 2]
+                wait_for = raw_used[index % 2]
+                evt = pyopencl.enqueue_copy(self.upload_queue, slot["raw"].data,
+                                            raws[index],
+                                            is_blocking=False,
+                                            wait_for=None if wait_for is None else [wait_for])
+                events.append(EventDescription("copy raw H -> D", evt, raws[index].nbytes))
+                uploads[index] = evt
+
+            upload(0)
+            self.upload_queue.flush()
+            for index, raw in enumerate(raws):
+                slot = slots[index % 2]
+                if index + 1 < len(raws):
+                    upload(index + 1)
+                    self.upload_queue.flush()
+                decode_events, raw_used[index % 2] = self._enqueue_decode(
+                    slot, numpy.int32(len(raw)), slot["out"],
+                    wait_for=[uploads[index]])
+                events += decode_events
+                evt = pyopencl.enqueue_copy(self.queue, out[index], slot["out"].data,
+                                            is_blocking=False)
+                events.append(EventDescription("copy result D -> H", evt, out[index].nbytes))
+                self.queue.flush()
+            self.queue.finish()
             if self.profile:
                 self.events += events
         return out
@@ -362,7 +492,7 @@ class ByteOffset(OpenclProcessing):
 
                 evt = pyopencl.enqueue_copy(
                     self.queue, d_data.data, data, is_blocking=False)
-                events.append(EventDescription("copy data H -> D", evt))
+                events.append(EventDescription("copy data H -> D", evt, data.nbytes))
 
             # Make sure compressed array exists and is large enough
             compressed_size = d_data.size * 7
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#    Project: Byte-offset decompression in OpenCL
+#             https://github.com/silx-kit/silx
+#
+#    Copyright (C) 2013-2018  European Synchrotron Radiation Facility,
+#                             Grenoble, France
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Benchmark of byte-offset decompression throughput
+"""
+
+from __future__ import division, print_function
+
+__authors__ = ["Jérôme Kieffer"]
+__contact__ = "jerome.kieffer@esrf.eu"
+__license__ = "MIT"
+__copyright__ = "2026 European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "19/10/2026"
+
+import time
+import logging
+import numpy
+from silx.opencl.common import ocl, pyopencl
+from silx.opencl.codec import byte_offset
+import unittest
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+@unittest.skipUnless(ocl and pyopencl, "PyOpenCl is missing")
+class BenchmarkByteOffset(unittest.TestCase):
+    """Compare frame by frame and pipelined decompression throughput"""
+
+    SHAPES = (1679, 1475), (2167, 2070)
+    """Pilatus 6M and Eiger 4M frames"""
+
+    NFRAMES = 50
+
+    DEVICETYPES = "CPU", "GPU"
+
+    def _frames(self, codec, shape):
+        """Returns compressed Poisson frames with a few exceptions"""
+        raws = []
+        for index in range(4):
+            frame = numpy.random.poisson(100, shape).astype(numpy.int32)
+            frame.flat[numpy.random.randint(0, frame.size, 100)] = 100000
+            raws.append(codec.encode(frame).get())
+        return [raws[index % len(raws)] for index in range(self.NFRAMES)]
+
+    def test_throughput(self):
+        for devicetype in self.DEVICETYPES:
+            if ocl.select_device(devicetype) is None:
+                logger.info("No %s device available", devicetype)
+                continue
+            for shape in self.SHAPES:
+                size = numpy.prod(shape)
+                codec = byte_offset.ByteOffset(dec_size=size, devicetype=devicetype)
+                raws = self._frames(codec, shape)
+                out = numpy.empty((len(raws), size), dtype=numpy.int32)
+                codec.decode_many(raws[:2], out=out[:2])  # Warm-up
+
+                start = time.time()
+                for index, raw in enumerate(raws):
+                    out[index] = codec.decode(raw).get()
+                frame_duration = time.time() - start
+
+                start = time.time()
+                result = codec.decode_many(raws, out=out)
+                many_duration = time.time() - start
+
+                logger.info("%s %s: decode %.1f frames/s\tdecode_many %.1f frames/s",
+                            devicetype, shape,
+                            len(raws) / frame_duration, len(raws) / many_duration)
+                self.assertIs(result, out)
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(BenchmarkByteOffset))
+    return test_suite
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(defaultTest="suite")
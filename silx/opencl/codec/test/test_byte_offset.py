@@ -37,7 +37,7 @@ __authors__ = ["Jérôme Kieffer"]
 __contact__ = "jerome.kieffer@esrf.eu"
 __license__ = "MIT"
 __copyright__ = "2013 European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "10/11/2017"
+__date__ = "19/10/2026"
 
 import sys
 import time
@@ -112,6 +112,41 @@ class TestByteOffset(unittest.TestCase):
         self.assertEqual(delta_cy, 0, "Checks fabio works")
         self.assertEqual(delta_cl, 0, "Checks opencl works")
 
+    def test_decode_many(self):
+        """
+        tests the pipelined decompression of many frames
+        """
+        shape = (91, 97)
+        size = numpy.prod(shape)
+        refs, raws = [], []
+        for nexcept in (0, 229, 1000, 12):
+            ref, raw = self._create_test_data(shape=shape, nexcept=nexcept)
+            refs.append(ref.ravel())
+            raws.append(raw)
+        refs = numpy.array(refs)
+
+        try:
+            bo = byte_offset.ByteOffset(dec_size=size, profile=True)
+        except (RuntimeError, pyopencl.RuntimeError) as err:
+            logger.warning(err)
+            if sys.platform == "darwin":
+                raise unittest.SkipTest("Byte-offset decompression is known to be buggy on MacOS-CPU")
+            else:
+                raise err
+
+        res = bo.decode_many(raws)
+        self.assertEqual(res.dtype, numpy.int32)
+        self.assertTrue(numpy.array_equal(res, refs))
+
+        out = numpy.zeros((len(raws), size), dtype=numpy.float32)
+        res = bo.decode_many(raws, out=out)
+        self.assertIs(res, out)
+        self.assertTrue(numpy.array_equal(res, refs))
+
+        # Single frame decompression still works after decode_many
+        self.assertTrue(numpy.array_equal(bo.decode(raws[1]).get(), refs[1]))
+        bo.log_profile()
+
     def test_many_decompress(self, ntest=10):
         """
         tests the byte offset decompression on GPU, many images to ensure there 
@@ -309,6 +344,7 @@ def suite():
     test_suite = unittest.TestSuite()
     test_suite.addTest(TestByteOffset("test_decompress"))
     test_suite.addTest(TestByteOffset("test_many_decompress"))
+    test_suite.addTest(TestByteOffset("test_decode_many"))
     test_suite.addTest(TestByteOffset("test_encode"))
     test_suite.addTest(TestByteOffset("test_encode_to_array"))
     test_suite.addTest(TestByteOffset("test_encode_to_bytes"))
@@ -34,13 +34,19 @@ __author__ = "Jerome Kieffer"
 __contact__ = "Jerome.Kieffer@ESRF.eu"
 __license__ = "MIT"
 __copyright__ = "2012-2017 European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "20/09/2018"
+__date__ = "19/10/2026"
 __status__ = "stable"
 __all__ = ["ocl", "pyopencl", "mf", "release_cl_buffers", "allocate_cl_buffers",
            "measure_workgroup_size", "kernel_workgroup_size"]
 
 import os
+import glob
+import json
+import socket
+import hashlib
 import logging
+import tempfile
+import threading
 
 import numpy
 
@@ -276,59 +282,267 @@ def _is_nvidia_gpu(vendor, devtype):
     return (vendor == "NVIDIA Corporation") and (devtype == "GPU")
 
 
+def _probe_platforms():
+    """Enumerate OpenCL platforms and devices through pyopencl.
+
+    This initializes all OpenCL drivers, which can take seconds.
+
+    :return: List of :class:`Platform` with their devices
+    """
+    platforms = []
+    for idx, platform in enumerate(pyopencl.get_platforms()):
+        pypl = Platform(platform.name, platform.vendor, platform.version, platform.extensions, idx)
+        for idd, device in enumerate(platform.get_devices()):
+            ####################################################
+            # Nvidia does not report int64 atomics (we are using) ...
+            # this is a hack around as any nvidia GPU with double-precision supports int64 atomics
+            ####################################################
+            extensions = device.extensions
+            if (pypl.vendor == "NVIDIA Corporation") and ('cl_khr_fp64' in extensions):
+                            extensions += ' cl_khr_int64_base_atomics cl_khr_int64_extended_atomics'
+            try:
+                devtype = pyopencl.device_type.to_string(device.type).upper()
+            except ValueError:
+                # pocl does not describe itself as a CPU !
+                devtype = "CPU"
+            if len(devtype) > 3:
+                devtype = devtype[:3]
+            if _is_nvidia_gpu(pypl.vendor, devtype) and "compute_capability_major_nv" in dir(device):
+                comput_cap = device.compute_capability_major_nv, device.compute_capability_minor_nv
+                flop_core = NVIDIA_FLOP_PER_CORE.get(comput_cap, min(NVIDIA_FLOP_PER_CORE.values()))
+            elif (pypl.vendor == "Advanced Micro Devices, Inc.") and (devtype == "GPU"):
+                flop_core = AMD_FLOP_PER_CORE
+            elif devtype == "CPU":
+                flop_core = FLOP_PER_CORE.get(devtype, 1)
+            else:
+                flop_core = 1
+            workgroup = device.max_work_group_size
+            if (devtype == "CPU") and (pypl.vendor == "Apple"):
+                logger.info("For Apple's OpenCL on CPU: Measuring actual valid max_work_goup_size.")
+                workgroup = _measure_workgroup_size(device, fast=True)
+            if (devtype == "GPU") and os.environ.get("GPU") == "False":
+                # Environment variable to disable GPU devices
+                continue
+            pydev = Device(device.name, devtype, device.version, device.driver_version, extensions,
+                           device.global_mem_size, bool(device.available), device.max_compute_units,
+                           device.max_clock_frequency, flop_core, idd, workgroup)
+            pypl.add_device(pydev)
+        platforms.append(pypl)
+    return platforms
+
+
+def _get_cache_directory():
+    """Returns the directory where OpenCL related information is cached.
+
+    It is defined by the SILX_OPENCL_CACHE environment variable, default
+    is silx/opencl in the user cache directory. Setting SILX_OPENCL_CACHE
+    to 0 disables the cache.
+
+    :return: The directory or None if the cache is disabled
+    :rtype: Union[str,None]
+    """
+    directory = os.environ.get("SILX_OPENCL_CACHE")
+    if directory in ["0", "False"]:
+        return None
+    if not directory:
+        base = os.environ.get("XDG_CACHE_HOME")
+        if not base:
+            base = os.path.join(os.path.expanduser("~"), ".cache")
+        directory = os.path.join(base, "silx", "opencl")
+    return directory
+
+
+def _icd_configuration():
+    """Returns a hash of the installed OpenCL drivers configuration.
+
+    This covers the host, the pyopencl version, the ICD files (and the date
+    of the libraries they reference) and the environment variables used
+    by OpenCL loaders and drivers to select devices.
+
+    :rtype: str
+    """
+    description = [socket.gethostname(),
+                   getattr(pyopencl, "VERSION", None)]
+    for name in ("OCL_ICD_VENDORS", "OPENCL_VENDOR_PATH", "OCL_ICD_FILENAMES",
+                 "POCL_DEVICES", "CUDA_VISIBLE_DEVICES", "ROCR_VISIBLE_DEVICES",
+                 "GPU_DEVICE_ORDINAL", "GPU"):
+        description.append((name, os.environ.get(name)))
+
+    vendors = os.environ.get("OCL_ICD_VENDORS")
+    if not vendors or not os.path.isdir(vendors):
+        vendors = "/etc/OpenCL/vendors"
+    icd_files = glob.glob(os.path.join(vendors, "*.icd"))
+    icd_files += [name for name in os.environ.get("OCL_ICD_FILENAMES", "").split(os.pathsep)
+                  if name]
+    for filename in sorted(icd_files):
+        library = filename
+        if filename.endswith(".icd"):
+            try:
+                with open(filename) as f:
+                    library = f.read().strip()
+            except (IOError, OSError, UnicodeDecodeError):
+                pass
+        path = _find_library(library)
+        if path is None:  # Use the date of the ICD file instead
+            path = filename
+        try:
+            mtime = os.stat(path).st_mtime
+        except (IOError, OSError):
+            mtime = None
+        description.append((filename, library, path, mtime))
+    return hashlib.sha1(repr(description).encode()).hexdigest()
+
+
+def _find_library(name):
+    """Returns the path of a shared library referenced by an ICD file.
+
+    Bare library names (e.g. libOpenCL-vendor.so.1) are looked for as the
+    dynamic loader does: in LD_LIBRARY_PATH, the directories configured in
+    /etc/ld.so.conf and the default directories.
+
+    :param str name: Name or path of the library
+    :return: The path or None if not found
+    :rtype: Union[str,None]
+    """
+    if os.path.dirname(name):
+        return name if os.path.exists(name) else None
+
+    directories = os.environ.get("LD_LIBRARY_PATH", "").split(os.pathsep)
+    configurations = ["/etc/ld.so.conf"] + sorted(glob.glob("/etc/ld.so.conf.d/*.conf"))
+    for configuration in configurations:
+        try:
+            with open(configuration) as f:
+                for line in f:
+                    line = line.split("#")[0].strip()
+                    if line and not line.startswith("include"):
+                        directories.append(line)
+        except (IOError, OSError, UnicodeDecodeError):
+            pass
+    directories += ["/lib64", "/usr/lib64", "/lib", "/usr/lib", "/usr/local/lib"]
+    directories += sorted(glob.glob("/usr/lib/*-linux-gnu"))
+
+    for directory in directories:
+        if directory:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def _probe_cache_filename():
+    """Returns the file caching the probed platforms or None if disabled"""
+    directory = _get_cache_directory()
+    if directory is None:
+        return None
+    return os.path.join(directory, "devices_%s.json" % _icd_configuration())
+
+
+def _load_probed_platforms():
+    """Load platforms and devices saved by :func:`_save_probed_platforms`.
+
+    :return: List of :class:`Platform` or None if not available
+    """
+    filename = _probe_cache_filename()
+    if filename is None or not os.path.exists(filename):
+        return None
+    try:
+        with open(filename) as f:
+            description = json.load(f)
+        platforms = []
+        for platform_desc in description["platforms"]:
+            platform = Platform.__new__(Platform)
+            platform.__dict__.update(platform_desc)
+            devices = platform.devices
+            platform.devices = []
+            for device_desc in devices:
+                device = Device.__new__(Device)
+                device.__dict__.update(device_desc)
+                platform.add_device(device)
+            platforms.append(platform)
+    except Exception as error:
+        logger.warning("Unable to read cached OpenCL devices %s: %s", filename, error)
+        return None
+    logger.debug("OpenCL devices read from %s", filename)
+    return platforms
+
+
+def _save_probed_platforms(platforms):
+    """Save platforms and devices to avoid probing them next time.
+
+    :param platforms: List of :class:`Platform`
+    """
+    filename = _probe_cache_filename()
+    if filename is None:
+        return
+    description = {"platforms": []}
+    for platform in platforms:
+        platform_desc = dict(platform.__dict__)
+        platform_desc["devices"] = [dict(device.__dict__) for device in platform.devices]
+        description["platforms"].append(platform_desc)
+    try:
+        directory = os.path.dirname(filename)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmpname = tempfile.mkstemp(suffix=".json", dir=directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(description, f)
+        # os.replace overwrites an existing file on Windows (Python 3 only)
+        getattr(os, "replace", os.rename)(tmpname, filename)
+    except Exception as error:
+        logger.debug("Unable to cache OpenCL devices in %s: %s", filename, error)
+
+
 class OpenCL(object):
     """
     Simple class that wraps the structure ocl_tools_extended.h
 
     This is a static class.
     ocl should be the only instance and shared among all python modules.
+
+    Platforms and devices are probed on first use (e.g., access to
+    :attr:`platforms`, :meth:`select_device` or :meth:`create_context`)
+    rather than when importing silx.opencl. The result is cached on disk
+    (see :func:`_get_cache_directory`) for the same OpenCL configuration.
+    An instance evaluates to False if no OpenCL device is available.
     """
 
-    platforms = []
-    nb_devices = 0
     context_cache = {}  # key: 2-tuple of int, value: context
-    if pyopencl:
-        platform = device = pypl = devtype = extensions = pydev = None
-        for idx, platform in enumerate(pyopencl.get_platforms()):
-            pypl = Platform(platform.name, platform.vendor, platform.version, platform.extensions, idx)
-            for idd, device in enumerate(platform.get_devices()):
-                ####################################################
-                # Nvidia does not report int64 atomics (we are using) ...
-                # this is a hack around as any nvidia GPU with double-precision supports int64 atomics
-                ####################################################
-                extensions = device.extensions
-                if (pypl.vendor == "NVIDIA Corporation") and ('cl_khr_fp64' in extensions):
-                                extensions += ' cl_khr_int64_base_atomics cl_khr_int64_extended_atomics'
-                try:
-                    devtype = pyopencl.device_type.to_string(device.type).upper()
-                except ValueError:
-                    # pocl does not describe itself as a CPU !
-                    devtype = "CPU"
-                if len(devtype) > 3:
-                    devtype = devtype[:3]
-                if _is_nvidia_gpu(pypl.vendor, devtype) and "compute_capability_major_nv" in dir(device):
-                    comput_cap = device.compute_capability_major_nv, device.compute_capability_minor_nv
-                    flop_core = NVIDIA_FLOP_PER_CORE.get(comput_cap, min(NVIDIA_FLOP_PER_CORE.values()))
-                elif (pypl.vendor == "Advanced Micro Devices, Inc.") and (devtype == "GPU"):
-                    flop_core = AMD_FLOP_PER_CORE
-                elif devtype == "CPU":
-                    flop_core = FLOP_PER_CORE.get(devtype, 1)
-                else:
-                    flop_core = 1
-                workgroup = device.max_work_group_size
-                if (devtype == "CPU") and (pypl.vendor == "Apple"):
-                    logger.info("For Apple's OpenCL on CPU: Measuring actual valid max_work_goup_size.")
-                    workgroup = _measure_workgroup_size(device, fast=True)
-                if (devtype == "GPU") and os.environ.get("GPU") == "False":
-                    # Environment variable to disable GPU devices
-                    continue
-                pydev = Device(device.name, devtype, device.version, device.driver_version, extensions,
-                               device.global_mem_size, bool(device.available), device.max_compute_units,
-                               device.max_clock_frequency, flop_core, idd, workgroup)
-                pypl.add_device(pydev)
-                nb_devices += 1
-            platforms.append(pypl)
-        del platform, device, pypl, devtype, extensions, pydev
+
+    def __init__(self):
+        self._platforms = None
+        self._nb_devices = 0
+        self._lock = threading.Lock()
+
+    def _probe(self):
+        """Probe platforms and devices if not yet done"""
+        if self._platforms is not None:
+            return
+        with self._lock:
+            if self._platforms is not None:
+                return
+            platforms = _load_probed_platforms()
+            if platforms is None:
+                platforms = _probe_platforms()
+                _save_probed_platforms(platforms)
+            self._nb_devices = sum(len(platform.devices) for platform in platforms)
+            self._platforms = platforms
+
+    @property
+    def platforms(self):
+        """List of available :class:`Platform`"""
+        self._probe()
+        return self._platforms
+
+    @property
+    def nb_devices(self):
+        """Number of available devices"""
+        self._probe()
+        return self._nb_devices
+
+    def __bool__(self):
+        return self.nb_devices > 0
+
+    __nonzero__ = __bool__  # Python 2
 
     def __repr__(self):
         out = ["OpenCL devices:"]
@@ -458,9 +672,9 @@ class OpenCL(object):
 
 
 if pyopencl:
+    # Devices are only probed on first use.
+    # Unlike None, ocl is also False when there is no device: use "if ocl:"
     ocl = OpenCL()
-    if ocl.nb_devices == 0:
-        ocl = None
 else:
     ocl = None
 
@@ -537,7 +751,7 @@ def measure_workgroup_size(device):
 
     if device is "all", returns a dict with all devices with their ids as keys.
     """
-    if (ocl is None) or (device is None):
+    if (not ocl) or (device is None):
         return None
 
     if isinstance(device, tuple) and (len(device) == 2):
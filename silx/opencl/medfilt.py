@@ -36,7 +36,7 @@ from __future__ import absolute_import, print_function, with_statement, division
 
 __author__ = "Jerome Kieffer"
 __license__ = "MIT"
-__date__ = "12/09/2017"
+__date__ = "19/10/2026"
 __copyright__ = "2012-2017, ESRF, Grenoble"
 __contact__ = "jerome.kieffer@esrf.fr"
 
@@ -48,6 +48,7 @@ from .common import pyopencl, kernel_workgroup_size
 from .processing import EventDescription, OpenclProcessing, BufferDescription
 
 if pyopencl:
+    import pyopencl.array
     mf = pyopencl.mem_flags
 else:
     raise ImportError("pyopencl is not installed")
@@ -71,7 +72,7 @@ class MedianFilter2D(OpenclProcessing):
 
     def __init__(self, shape, kernel_size=(3, 3),
                  ctx=None, devicetype="all", platformid=None, deviceid=None,
-                 block_size=None, profile=False
+                 block_size=None, profile=False, session=None
                  ):
         """Constructor of the OpenCL 2D median filtering class
 
@@ -85,10 +86,12 @@ class MedianFilter2D(OpenclProcessing):
         :param block_size: preferred workgroup size, may vary depending on the outpcome of the compilation
         :param profile: switch on profiling to be able to profile at the kernel level,
                         store profiling elements (makes code slightly slower)
+        :param session: OpenclSession sharing context, queue and memory pool
         """
         OpenclProcessing.__init__(self, ctx=ctx, devicetype=devicetype,
                                   platformid=platformid, deviceid=deviceid,
-                                  block_size=block_size, profile=profile)
+                                  block_size=block_size, profile=profile,
+                                  session=session)
         self.shape = shape
         self.size = self.shape[0] * self.shape[1]
         self.kernel_size = self.calc_kernel_size(kernel_size)
@@ -97,6 +100,8 @@ class MedianFilter2D(OpenclProcessing):
                         for i in self.__class__.buffers]
 
         self.allocate_buffers()
+        self.upload_queue = None  # Created by medfilt2d_stack
+        self._stack_slots = None
         self.local_mem = self._get_local_mem(self.workgroup_size[0])
         OpenclProcessing.compile_kernels(self, self.kernel_files, "-D NIMAGE=%i" % self.size)
         self.set_kernel_arguments()
@@ -121,13 +126,28 @@ class MedianFilter2D(OpenclProcessing):
     def send_buffer(self, data, dest):
         """Send a numpy array to the device, including the cast on the device if possible
 
-        :param data: numpy array with data
+        :param data: numpy array with data, or pyopencl array in the same
+                     context which is copied on the device
         :param dest: name of the buffer as registered in the class
         """
 
         dest_type = numpy.dtype([i.dtype for i in self.buffers if i.name == dest][0])
         events = []
-        if (data.dtype == dest_type) or (data.dtype.itemsize > dest_type.itemsize):
+        if isinstance(data, pyopencl.array.Array):
+            if data.dtype == dest_type:
+                copy_image = pyopencl.enqueue_copy(self.queue, self.cl_mem[dest], data.data,
+                                                   byte_count=data.nbytes)
+                events.append(EventDescription("copy D->D %s" % dest, copy_image, data.nbytes))
+            elif data.dtype.type in self.mapping:
+                copy_image = pyopencl.enqueue_copy(self.queue, self.cl_mem["image_raw"], data.data,
+                                                   byte_count=data.nbytes)
+                kernel = getattr(self.program, self.mapping[data.dtype.type])
+                cast_to_float = kernel(self.queue, (self.size,), None, self.cl_mem["image_raw"], self.cl_mem[dest])
+                events += [EventDescription("copy D->D %s" % dest, copy_image, data.nbytes),
+                           EventDescription("cast to float", cast_to_float)]
+            else:
+                raise ValueError("Unsupported data type %s on device" % data.dtype)
+        elif (data.dtype == dest_type) or (data.dtype.itemsize > dest_type.itemsize):
             copy_image = pyopencl.enqueue_copy(self.queue, self.cl_mem[dest], numpy.ascontiguousarray(data, dest_type))
             events.append(EventDescription("copy H->D %s" % dest, copy_image))
         else:
@@ -138,6 +158,26 @@ class MedianFilter2D(OpenclProcessing):
         if self.profile:
             self.events += events
 
+    def _prepare_kernel(self, kernel_size=None):
+        """Check the kernel size and the matching workgroup
+
+        :param kernel_size: 2-tuple of odd values, None for the default one
+        :return: kernel size as numpy array, workgroup size, local memory
+        """
+        if kernel_size is None:
+            kernel_size = self.kernel_size
+        else:
+            kernel_size = self.calc_kernel_size(kernel_size)
+        # this is the workgroup size
+        wg = self.calc_wg(kernel_size)
+
+        # check for valid work group size:
+        amws = kernel_workgroup_size(self.program, "medfilt2d")
+        logger.debug("max actual workgroup size: %s, expected: %s", amws, wg)
+        if wg > amws:
+            raise RuntimeError("Workgroup size is too big for medfilt2d: %s>%s" % (wg, amws))
+        return kernel_size, wg, self._get_local_mem(wg)
+
     def calc_wg(self, kernel_size):
         """calculate and return the optimal workgroup size for the first dimension, taking into account
         the 8-height band
@@ -154,38 +194,27 @@ class MedianFilter2D(OpenclProcessing):
             wg = 1 << (int(needed_threads).bit_length())
         return wg
 
-    def medfilt2d(self, image, kernel_size=None):
+    def medfilt2d(self, image, kernel_size=None, out=None):
         """Actually apply the median filtering on the image
 
-        :param image: numpy array with the image
+        :param image: numpy array with the image, or pyopencl array in the
+                      same context (e.g., from the same OpenclSession)
         :param kernel_size: 2-tuple if
-        :return: median-filtered  2D image
+        :param out: pyopencl array of float32 of the shape of the image in
+                    which to store the result without copy to the host
+        :return: median-filtered  2D image, out if provided
 
 
         Nota: for window size 1x1 -> 7x7     up to 49  /  64 elements in   8 threads, 8elt/th
                               9x9 -> 15x15   up to 225 / 256 elements in  32 threads, 8elt/th
                               17x17 -> 21x21 up to 441 / 512 elements in  64 threads, 8elt/th
 
-        TODO: change window size on the fly,
-
-
+        The window size is a kernel argument: changing it does not require
+        any recompilation.
         """
         events = []
-        if kernel_size is None:
-            kernel_size = self.kernel_size
-        else:
-            kernel_size = self.calc_kernel_size(kernel_size)
+        kernel_size, wg, localmem = self._prepare_kernel(kernel_size)
         kernel_half_size = kernel_size // numpy.int32(2)
-        # this is the workgroup size
-        wg = self.calc_wg(kernel_size)
-
-        # check for valid work group size:
-        amws = kernel_workgroup_size(self.program, "medfilt2d")
-        logger.warning("max actual workgroup size: %s, expected: %s", amws, wg)
-        if wg > amws:
-            raise RuntimeError("Workgroup size is too big for medfilt2d: %s>%s" % (wg, amws))
-
-        localmem = self._get_local_mem(wg)
 
         assert image.ndim == 2, "Treat only 2D images"
         assert image.shape[0] <= self.shape[0], "height is OK"
@@ -207,15 +236,137 @@ class MedianFilter2D(OpenclProcessing):
                                           (wg, 1), *list(kwargs.values()))
             events.append(EventDescription("median filter 2d", mf2d))
 
-            result = numpy.empty(image.shape, numpy.float32)
-            ev = pyopencl.enqueue_copy(self.queue, result, self.cl_mem["result"])
-            events.append(EventDescription("copy D->H result", ev))
-            ev.wait()
+            if out is not None:
+                assert out.shape == image.shape and out.dtype == numpy.float32
+                ev = pyopencl.enqueue_copy(self.queue, out.data, self.cl_mem["result"],
+                                           byte_count=out.nbytes)
+                events.append(EventDescription("copy D->D result", ev, out.nbytes))
+                result = out
+            else:
+                result = numpy.empty(image.shape, numpy.float32)
+                ev = pyopencl.enqueue_copy(self.queue, result, self.cl_mem["result"])
+                events.append(EventDescription("copy D->H result", ev, result.nbytes))
+                ev.wait()
         if self.profile:
             self.events += events
         return result
     __call__ = medfilt2d
 
+    def _get_stack_slots(self):
+        """Returns the two sets of buffers used alternately by
+        :meth:`medfilt2d_stack`.
+
+        The first set uses the buffers of single image filtering.
+
+        :return: list of 2 dicts with keys "image_raw", "image" and "result"
+        """
+        if self._stack_slots is None:
+            self.allocate_buffers([BufferDescription(i.name + "_1", i.size, i.dtype, i.flags)
+                                   for i in self.buffers])
+            self._stack_slots = [dict((name, self.cl_mem[name + suffix])
+                                      for name in ("image_raw", "image", "result"))
+                                 for suffix in ("", "_1")]
+        return self._stack_slots
+
+    def medfilt2d_stack(self, stack, kernel_size=None, out=None, batch_size=16):
+        """Apply the median filtering on each frame of a stack
+
+        Frames are read by batches and uploaded on a second command queue
+        into two sets of buffers used alternately, so that the upload of
+        frame N+1 runs while frame N is filtered and frame N-1 is copied
+        back.
+        Integer frames are sent as they are and cast on the device.
+
+        :param stack: Stack of images of shape (frames, height, width)
+            as a numpy array, a memory-mapped array or a h5py dataset.
+            Frames may be smaller than the shape given at construction.
+        :param kernel_size: 2-tuple of odd values, default to the one
+            given at construction
+        :param out: Array or dataset of the shape of the stack in which to
+            store the filtered frames. Default: a new float32 numpy array.
+        :param int batch_size: Number of frames read at once
+        :return: The median-filtered frames (out if provided)
+        """
+        if len(stack.shape) != 3:
+            raise ValueError("Expected a 3D stack of images")
+        nframes, height, width = stack.shape
+        if height > self.shape[0] or width > self.shape[1]:
+            raise ValueError("Frames of shape %s are larger than %s" % (stack.shape[1:], self.shape))
+        if out is None:
+            out = numpy.empty(stack.shape, dtype=numpy.float32)
+        elif tuple(out.shape) != tuple(stack.shape):
+            raise ValueError("out must be of shape %s" % (tuple(stack.shape),))
+        if nframes == 0:
+            return out
+
+        kernel_size, wg, localmem = self._prepare_kernel(kernel_size)
+        kernel_half_size = kernel_size // numpy.int32(2)
+        slots = self._get_stack_slots()
+        if self.upload_queue is None:
+            if self.profile:
+                self.upload_queue = pyopencl.CommandQueue(
+                    self.ctx,
+                    properties=pyopencl.command_queue_properties.PROFILING_ENABLE)
+            else:
+                self.upload_queue = pyopencl.CommandQueue(self.ctx)
+
+        dtype = numpy.dtype(stack.dtype)
+        cast = self.mapping.get(dtype.type)
+        if cast is None:
+            dtype = numpy.dtype(numpy.float32)
+        hosts = [numpy.empty((height, width), dtype=numpy.float32) for _ in slots]
+        size = height * width
+        events = []
+        pending = [None, None]  # (frame index, read back event, frame) per slot
+        image_used = [None, None]  # Last kernel reading each input buffer
+
+        def retrieve(index):
+            """Wait for the frame using a slot and store it in out"""
+            if pending[index] is not None:
+                frame_index, evt, _frame = pending[index]
+                evt.wait()
+                out[frame_index] = hosts[index]
+                pending[index] = None
+
+        for start in range(0, nframes, batch_size):
+            batch = numpy.ascontiguousarray(stack[start:start + batch_size], dtype=dtype)
+            for offset, frame in enumerate(batch):
+                index = (start + offset) % 2
+                retrieve(index)
+                slot = slots[index]
+                wait_for = None if image_used[index] is None else [image_used[index]]
+                with self.sem:
+                    dest = "image" if cast is None else "image_raw"
+                    evt = pyopencl.enqueue_copy(self.upload_queue, slot[dest], frame,
+                                                is_blocking=False, wait_for=wait_for)
+                    events.append(EventDescription("copy H->D %s" % dest, evt, frame.nbytes))
+                    self.upload_queue.flush()
+                    if cast is not None:
+                        evt = getattr(self.program, cast)(self.queue, (size,), None,
+                                                          slot["image_raw"], slot["image"],
+                                                          wait_for=[evt])
+                        events.append(EventDescription("cast to float", evt))
+
+                    evt = self.kernels.medfilt2d(self.queue, (wg, width), (wg, 1),
+                                                 slot["image"], slot["result"], localmem,
+                                                 kernel_half_size[0], kernel_half_size[1],
+                                                 numpy.int32(height), numpy.int32(width),
+                                                 wait_for=[evt])
+                    events.append(EventDescription("median filter 2d", evt))
+                    image_used[index] = evt
+
+                    evt = pyopencl.enqueue_copy(self.queue, hosts[index], slot["result"],
+                                                is_blocking=False)
+                    events.append(EventDescription("copy D->H result", evt, hosts[index].nbytes))
+                    self.queue.flush()
+                pending[index] = start + offset, evt, frame
+
+        for index in (nframes % 2, (nframes + 1) % 2):
+            retrieve(index)
+        if self.profile:
+            self.events += events
+        return out
+
     @staticmethod
     def calc_kernel_size(kernel_size):
         """format the kernel size to be a 2-length numpy array of int32
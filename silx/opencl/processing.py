@@ -41,26 +41,408 @@ __author__ = "Jerome Kieffer"
 __contact__ = "Jerome.Kieffer@ESRF.eu"
 __license__ = "MIT"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "27/02/2018"
+__date__ = "19/10/2026"
 __status__ = "stable"
 
 
 import os
 import logging
 import gc
-from collections import namedtuple
+import hashlib
+import json
+import tempfile
+import time
+import weakref
+from collections import deque, namedtuple, OrderedDict
 import numpy
 import threading
-from .common import ocl, pyopencl, release_cl_buffers, kernel_workgroup_size
+from .common import ocl, pyopencl, release_cl_buffers, kernel_workgroup_size, \
+    _get_cache_directory
 from .utils import concatenate_cl_kernel
 
 
 BufferDescription = namedtuple("BufferDescription", ["name", "size", "dtype", "flags"])
-EventDescription = namedtuple("EventDescription", ["name", "event"])
+EventDescription = namedtuple("EventDescription", ["name", "event", "nbytes"])
+EventDescription.__new__.__defaults__ = (None,)  # nbytes: size of transfers
+CompilationDescription = namedtuple("CompilationDescription", ["name", "origin", "duration"])
 
 logger = logging.getLogger(__name__)
 
 
+_program_cache = weakref.WeakValueDictionary()
+"""Process-wide cache of built programs, released when no longer used.
+key: (context pointer, hash of the source, compile options), value: program
+
+As a program references its context, the context pointer of a key can not be
+reused by another context while the program is alive."""
+
+_program_cache_lock = threading.Lock()
+
+
+_replace = getattr(os, "replace", os.rename)  # os.replace is Python 3 only
+
+
+def _program_binary_filename(device, source_hash, compile_options):
+    """Returns the file storing the binary of a program for a device
+
+    :param pyopencl.Device device: The device the program is built for
+    :param str source_hash: Hash of the source of the program
+    :param str compile_options: Options used to build the program
+    :return: The filename or None if the cache is disabled
+    """
+    directory = _get_cache_directory()
+    if directory is None:
+        return None
+    description = (device.platform.name, device.platform.version,
+                   device.name, device.version, device.driver_version,
+                   source_hash, compile_options)
+    key = hashlib.sha1(repr(description).encode()).hexdigest()
+    return os.path.join(directory, "programs", key + ".bin")
+
+
+def _load_program_binary(ctx, filename, compile_options):
+    """Build a program from a binary saved by :func:`_save_program_binary`
+
+    :return: The program or None if not available
+    """
+    if filename is None or not os.path.exists(filename):
+        return None
+    try:
+        with open(filename, "rb") as f:
+            binary = f.read()
+        program = pyopencl.Program(ctx, ctx.devices, [binary])
+        return program.build(options=compile_options)
+    except Exception as error:
+        logger.warning("Unable to load OpenCL program binary %s: %s", filename, error)
+        return None
+
+
+def _save_program_binary(program, filename):
+    """Save the binary of a program built for a single device"""
+    if filename is None:
+        return
+    try:
+        binary = program.binaries[0]
+        if not binary:
+            return
+        directory = os.path.dirname(filename)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmpname = tempfile.mkstemp(suffix=".bin", dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(binary)
+        _replace(tmpname, filename)
+    except Exception as error:
+        logger.debug("Unable to save OpenCL program binary %s: %s", filename, error)
+
+
+def build_program(ctx, kernel_src, compile_options=""):
+    """Returns a program built from its source, using caches.
+
+    Built programs are reused within the process for the same context,
+    source and compile options as long as they are in use. For single device contexts, binaries are
+    also saved on disk (see :func:`silx.opencl.common._get_cache_directory`)
+    to avoid compiling the same program again in other processes.
+
+    :param pyopencl.Context ctx: The context for which to build the program
+    :param str kernel_src: The OpenCL source code
+    :param str compile_options: Options passed to the compiler
+    :return: The built program and where it comes from: "memory", "disk"
+        or "source"
+    :rtype: List[pyopencl.Program,str]
+    """
+    source_hash = hashlib.sha1(kernel_src.encode()).hexdigest()
+    key = ctx.int_ptr, source_hash, compile_options
+    with _program_cache_lock:
+        program = _program_cache.get(key)
+    if program is not None:
+        return program, "memory"
+
+    filename = None
+    if len(ctx.devices) == 1:
+        filename = _program_binary_filename(ctx.devices[0], source_hash, compile_options)
+
+    program = _load_program_binary(ctx, filename, compile_options)
+    origin = "disk"
+    if program is None:
+        program = pyopencl.Program(ctx, kernel_src).build(options=compile_options)
+        origin = "source"
+        _save_program_binary(program, filename)
+
+    with _program_cache_lock:
+        try:
+            _program_cache[key] = program
+        except TypeError:  # Program which cannot be weakly referenced
+            pass
+    return program, origin
+
+
+class EventRecord(namedtuple("EventRecord", ["name", "start", "end", "nbytes"])):
+    """Timing of a completed OpenCL event.
+
+    start and end are device timestamps in nanoseconds,
+    or None if the command queue was not profiling.
+    """
+
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        """Duration of the event in milliseconds or None"""
+        if self.start is None:
+            return None
+        return 1e-6 * (self.end - self.start)
+
+
+class _EventStatistics(object):
+    """Aggregated statistics of the events with the same name"""
+
+    def __init__(self, nsamples):
+        self.count = 0
+        self.total = 0.
+        self.nbytes = 0
+        self.durations = deque(maxlen=nsamples)
+
+    def add(self, record):
+        self.count += 1
+        if record.nbytes:
+            self.nbytes += record.nbytes
+        duration = record.duration
+        if duration is not None:
+            self.total += duration
+            self.durations.append(duration)
+
+    def as_dict(self):
+        durations = numpy.array(self.durations, dtype=numpy.float64)
+        return {"count": self.count,
+                "total": self.total,
+                "mean": self.total / self.count if self.count else 0.,
+                "p95": numpy.percentile(durations, 95) if len(durations) else 0.,
+                "nbytes": self.nbytes}
+
+
+class EventLog(object):
+    """Memory-bounded log of OpenCL events with per-name statistics.
+
+    It is used as :attr:`OpenclProcessing.events` and supports
+    `append` and `+=` with :class:`EventDescription` or (name, event) tuples.
+
+    Events are converted to :class:`EventRecord` once completed: only the
+    last `maxlen` records are kept while statistics aggregate all events
+    since the last :meth:`clear`.
+    The 95th percentile is computed over the last `nsamples` durations
+    of each name.
+
+    :param int maxlen: Number of records to keep
+    :param int nsamples: Number of durations kept per name for percentiles
+    :param bool profiling: True if events come from a profiling queue
+    """
+
+    PENDING_SIZE = 64
+    """Number of events kept before waiting for the oldest one"""
+
+    def __init__(self, maxlen=1000, nsamples=1000, profiling=True):
+        self.profiling = profiling
+        self.nsamples = nsamples
+        self._lock = threading.RLock()
+        self._pending = deque()
+        self._records = deque(maxlen=maxlen)
+        self._statistics = OrderedDict()
+
+    @property
+    def maxlen(self):
+        """Maximum number of records kept"""
+        return self._records.maxlen
+
+    def _record(self, description):
+        """Wait for an event and convert it to an EventRecord"""
+        name, event = description[0], description[1]
+        nbytes = description[2] if len(description) > 2 else None
+        if self.profiling:
+            event.wait()
+            record = EventRecord(name, event.profile.start, event.profile.end, nbytes)
+        else:
+            record = EventRecord(name, None, None, nbytes)
+        self._records.append(record)
+        if name not in self._statistics:
+            self._statistics[name] = _EventStatistics(self.nsamples)
+        self._statistics[name].add(record)
+
+    def _flush(self, size=0):
+        """Convert pending events to records until size events are left"""
+        while len(self._pending) > size:
+            self._record(self._pending.popleft())
+
+    def append(self, description):
+        """Add an event to the log
+
+        :param description: EventDescription or (name, event) tuple
+        """
+        if description is None:  # No command was enqueued
+            return
+        with self._lock:
+            if self.profiling:
+                self._pending.append(description)
+                self._flush(self.PENDING_SIZE)
+            else:  # No timing to wait for
+                self._record(description)
+
+    def extend(self, descriptions):
+        """Add many events to the log"""
+        for description in descriptions:
+            self.append(description)
+
+    def __iadd__(self, descriptions):
+        self.extend(descriptions)
+        return self
+
+    def clear(self):
+        """Remove all events and reset statistics"""
+        with self._lock:
+            self._pending.clear()
+            self._records.clear()
+            self._statistics.clear()
+
+    def records(self):
+        """Returns the last records, waiting for pending events
+
+        :rtype: List[EventRecord]
+        """
+        with self._lock:
+            self._flush()
+            return list(self._records)
+
+    def __iter__(self):
+        return iter(self.records())
+
+    def __len__(self):
+        with self._lock:
+            return min(len(self._records) + len(self._pending), self.maxlen)
+
+    def statistics(self):
+        """Returns statistics aggregated per event name.
+
+        Durations are in milliseconds.
+
+        :return: {name: {"count", "total", "mean", "p95", "nbytes"}}
+        :rtype: OrderedDict
+        """
+        with self._lock:
+            self._flush()
+            return OrderedDict((name, statistics.as_dict())
+                               for name, statistics in self._statistics.items())
+
+    def statistics_array(self):
+        """Returns statistics aggregated per event name as a record array.
+
+        :rtype: numpy.recarray
+        """
+        dtype = [("name", "U64"), ("count", numpy.int64), ("total", numpy.float64),
+                 ("mean", numpy.float64), ("p95", numpy.float64), ("nbytes", numpy.int64)]
+        rows = [(name[:64], s["count"], s["total"], s["mean"], s["p95"], s["nbytes"])
+                for name, s in self.statistics().items()]
+        return numpy.rec.array(rows, dtype=dtype) if rows else numpy.recarray((0,), dtype=dtype)
+
+    def chrome_trace(self, filename=None):
+        """Returns the last records in the Chrome trace event format.
+
+        The result can be loaded in chrome://tracing or Perfetto.
+
+        :param str filename: If provided, save the trace as JSON in this file
+        :rtype: dict
+        """
+        events = []
+        for record in self.records():
+            if record.start is None:
+                continue
+            event = {"name": record.name,
+                     "cat": "opencl",
+                     "ph": "X",
+                     "ts": record.start * 1e-3,
+                     "dur": (record.end - record.start) * 1e-3,
+                     "pid": os.getpid(),
+                     "tid": 0}
+            if record.nbytes:
+                event["args"] = {"nbytes": record.nbytes}
+            events.append(event)
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if filename is not None:
+            with open(filename, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+
+class OpenclSession(object):
+    """OpenCL context, command queue and device memory pool shared by
+    several :class:`OpenclProcessing` instances.
+
+    Processings created with the same session run on a single in-order
+    command queue, so that the `pyopencl.array.Array` produced by one can
+    be consumed by the next one without synchronisation nor host
+    round-trip.
+    Their buffers, and arrays created with :meth:`empty`, :meth:`zeros`
+    and :meth:`to_device`, are allocated from a memory pool so that
+    device memory released by a processing is reused by the next ones.
+
+    :param ctx: actual working context, left to None for automatic
+                initialization from device type or platformid/deviceid
+    :param devicetype: type of device, can be "CPU", "GPU", "ACC" or "ALL"
+    :param platformid: integer with the platform_identifier, as given by clinfo
+    :param deviceid: Integer with the device identifier, as given by clinfo
+    :param memory: minimum memory available on device
+    :param profile: switch on profiling of the shared command queue
+    """
+
+    def __init__(self, ctx=None, devicetype="all", platformid=None, deviceid=None,
+                 memory=None, profile=False):
+        import pyopencl.array
+        import pyopencl.tools
+        if ctx:
+            self.ctx = ctx
+        else:
+            self.ctx = ocl.create_context(devicetype=devicetype,
+                                          platformid=platformid, deviceid=deviceid,
+                                          memory=memory)
+        self.profile = bool(profile)
+        if self.profile:
+            self.queue = pyopencl.CommandQueue(self.ctx,
+                properties=pyopencl.command_queue_properties.PROFILING_ENABLE)
+        else:
+            self.queue = pyopencl.CommandQueue(self.ctx)
+        self.allocator = pyopencl.tools.MemoryPool(
+            pyopencl.tools.ImmediateAllocator(self.queue))
+
+    def empty(self, shape, dtype=numpy.float32):
+        """Returns an uninitialized array allocated from the memory pool
+
+        :rtype: pyopencl.array.Array
+        """
+        return pyopencl.array.empty(self.queue, shape, dtype, allocator=self.allocator)
+
+    def zeros(self, shape, dtype=numpy.float32):
+        """Returns an array of zeros allocated from the memory pool
+
+        :rtype: pyopencl.array.Array
+        """
+        return pyopencl.array.zeros(self.queue, shape, dtype, allocator=self.allocator)
+
+    def to_device(self, array):
+        """Copy a numpy array to an array allocated from the memory pool
+
+        :rtype: pyopencl.array.Array
+        """
+        return pyopencl.array.to_device(self.queue, numpy.ascontiguousarray(array),
+                                        allocator=self.allocator)
+
+    def finish(self):
+        """Wait for all commands of the shared queue to complete"""
+        self.queue.finish()
+
+    def free_held(self):
+        """Release the device memory held by the pool and not in use"""
+        self.allocator.free_held()
+
+
 class KernelContainer(object):
     """Those object holds a copy of all kernels accessible as attributes"""
 
@@ -107,9 +489,11 @@ class OpenclProcessing(object):
                ]
     # list of kernel source files to be concatenated before compilation of the program
     kernel_files = []
+    # Number of profiled events kept in memory, see EventLog
+    event_log_size = 1000
 
     def __init__(self, ctx=None, devicetype="all", platformid=None, deviceid=None,
-                 block_size=None, memory=None, profile=False):
+                 block_size=None, memory=None, profile=False, session=None):
         """Constructor of the abstract OpenCL processing class
 
         :param ctx: actual working context, left to None for automatic
@@ -122,15 +506,23 @@ class OpenclProcessing(object):
         :param memory: minimum memory available on device
         :param profile: switch on profiling to be able to profile at the kernel
                          level, store profiling elements (makes code slightly slower)
+        :param OpenclSession session: share the context, command queue and
+                         memory pool of this session. It overrides ctx,
+                         devicetype, platformid, deviceid and profile.
         """
         self.sem = threading.Semaphore()
+        self.session = session
         self.profile = None
-        self.events = []  # List with of EventDescription, kept for profiling
+        self.events = EventLog(self.event_log_size)  # Bounded log of EventDescription, kept for profiling
+        self.compilations = []  # List of CompilationDescription, kept for profiling
         self.cl_mem = {}  # dict with all buffer allocated
         self.cl_program = None  # The actual OpenCL program
         self.cl_kernel_args = {}  # dict with all kernel arguments
         self.queue = None
-        if ctx:
+        if session is not None:
+            self.ctx = session.ctx
+            profile = session.profile
+        elif ctx:
             self.ctx = ctx
         else:
             self.ctx = ocl.create_context(devicetype=devicetype,
@@ -197,13 +589,18 @@ class OpenclProcessing(object):
 
             # do the allocation
             try:
+                allocator = None if self.session is None else self.session.allocator
                 if use_array:
                     for buf in buffers:
-                        mem[buf.name] = pyopencl.array.empty(self.queue, buf.size, buf.dtype)
+                        mem[buf.name] = pyopencl.array.empty(self.queue, buf.size, buf.dtype,
+                                                             allocator=allocator)
                 else:
                     for buf in buffers:
                         size = numpy.dtype(buf.dtype).itemsize * numpy.prod(buf.size)
-                        mem[buf.name] = pyopencl.Buffer(self.ctx, buf.flags, int(size))
+                        if allocator is not None:  # Pooled buffers are read-write
+                            mem[buf.name] = allocator(int(size))
+                        else:
+                            mem[buf.name] = pyopencl.Buffer(self.ctx, buf.flags, int(size))
             except pyopencl.MemoryError as error:
                 release_cl_buffers(mem)
                 raise MemoryError(error)
@@ -257,11 +654,16 @@ class OpenclProcessing(object):
 
         compile_options = compile_options or ""
         logger.info("Compiling file %s with options %s", kernel_files, compile_options)
+        start = time.time()
         try:
-            self.program = pyopencl.Program(self.ctx, kernel_src).build(options=compile_options)
+            self.program, origin = build_program(self.ctx, kernel_src, compile_options)
         except (pyopencl.MemoryError, pyopencl.LogicError) as error:
             raise MemoryError(error)
         else:
+            duration = time.time() - start
+            logger.info("Program built from %s in %.3fms", origin, 1000 * duration)
+            name = ", ".join(os.path.basename(name) for name in kernel_files)
+            self.compilations.append(CompilationDescription(name, origin, duration))
             self.kernels = KernelContainer(self.program)
 
     def free_kernels(self):
@@ -280,9 +682,17 @@ class OpenclProcessing(object):
 
         Profiling information can then be retrieved with the 'log_profile' method
         """
-        if bool(value) != self.profile:
+        if self.session is not None:
+            if bool(value) != self.session.profile:
+                logger.warning("Profiling is set by the shared OpenclSession")
+            self.profile = self.session.profile
+            self.events.profiling = self.profile
+            self.queue = self.session.queue
+        elif bool(value) != self.profile:
             with self.sem:
+                self.events.records()  # Collect timings before switching queue
                 self.profile = bool(value)
+                self.events.profiling = self.profile
                 if self.profile:
                     self.queue = pyopencl.CommandQueue(self.ctx,
                         properties=pyopencl.command_queue_properties.PROFILING_ENABLE)
@@ -290,28 +700,59 @@ class OpenclProcessing(object):
                     self.queue = pyopencl.CommandQueue(self.ctx)
 
     def log_profile(self):
-        """If we are in profiling mode, prints out all timing for every single OpenCL call
+        """If we are in profiling mode, prints out the timing of the last
+        OpenCL calls and statistics aggregated per call name
         """
         t = 0.0
         out = ["", "Profiling info for OpenCL %s" % self.__class__.__name__]
         if self.profile:
-            for e in self.events:
-                if "__len__" in dir(e) and len(e) >= 2:
-                    et = 1e-6 * (e[1].profile.end - e[1].profile.start)
-                    out.append("%50s:\t%.3fms" % (e[0], et))
-                    t += et
+            for record in self.events:
+                if record.duration is not None:
+                    out.append("%50s:\t%.3fms" % (record.name, record.duration))
+                    t += record.duration
 
         out.append("_" * 80)
         out.append("%50s:\t%.3fms" % ("Total execution time", t))
+        if self.profile:
+            out.append("_" * 80)
+            out.append("%50s:\t%8s %10s %10s %10s %12s" % (
+                "Statistics", "count", "total ms", "mean ms", "p95 ms", "bytes"))
+            for name, stats in self.events.statistics().items():
+                out.append("%50s:\t%8d %10.3f %10.3f %10.3f %12d" % (
+                    name[:50], stats["count"], stats["total"], stats["mean"],
+                    stats["p95"], stats["nbytes"]))
+        for compilation in self.compilations:
+            out.append("%50s:\t%.3fms (%s)" % ("Build " + compilation.name[:44],
+                                               1000 * compilation.duration,
+                                               compilation.origin))
         logger.info(os.linesep.join(out))
         return out
 
+    def get_profile_statistics(self, as_array=False):
+        """Returns profiling statistics aggregated per OpenCL call name.
+
+        See :meth:`EventLog.statistics`.
+
+        :param bool as_array: True to return a numpy record array,
+                              False (default) for a dict
+        """
+        if as_array:
+            return self.events.statistics_array()
+        return self.events.statistics()
+
+    def save_profile_trace(self, filename):
+        """Save the last profiled OpenCL calls as a Chrome trace JSON file
+
+        :param str filename: Path of the JSON file
+        """
+        self.events.chrome_trace(filename)
+
     def reset_log(self):
         """
         Resets the profiling timers
         """
         with self.sem:
-            self.events = []
+            self.events.clear()
 
 # This should be implemented by concrete class
 #     def __copy__(self):
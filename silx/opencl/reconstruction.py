@@ -29,7 +29,7 @@ from __future__ import absolute_import, print_function, with_statement, division
 
 __authors__ = ["P. Paleo"]
 __license__ = "MIT"
-__date__ = "19/09/2017"
+__date__ = "19/10/2026"
 
 import logging
 import numpy as np
@@ -42,6 +42,7 @@ from .linalg import LinAlg
 
 import pyopencl.array as parray
 from pyopencl.elementwise import ElementwiseKernel
+from pyopencl.reduction import ReductionKernel
 logger = logging.getLogger(__name__)
 
 cl = pyopencl
@@ -111,6 +112,84 @@ class ReconstructionAlgorithm(OpenclProcessing):
             "d_x": self.d_x,
             "d_x_old": self.d_x_old,
         })
+        self.history = []  # Convergence criterion at each iteration of the last run, if tracked
+
+    def _start(self, data, x0=None):
+        """Send the data to the device and initialize the solution
+
+        :param data: sinogram
+        :param x0: Initial solution: None for zeros, "fbp" for the filtered
+                   backprojection of data, or an array of the slice shape.
+        """
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        cl.enqueue_copy(self.queue, self.d_data.data, data)
+        if x0 is None:
+            self.d_x.fill(0)
+        else:
+            if isinstance(x0, str) and x0 == "fbp":
+                x0 = self.backprojector.filtered_backprojection(data)
+            self.d_x.set(np.ascontiguousarray(x0, dtype=np.float32))
+        self.history = []
+
+    def _converged(self, tol):
+        """Returns True if the relative decrease of the convergence criterion
+        during the last iteration is below tol"""
+        if tol is None or len(self.history) < 2:
+            return False
+        previous, current = self.history[-2:]
+        return abs(previous - current) <= tol * abs(previous)
+
+    def reconstruct_slices(self, sinos, n_it, out=None, x0=None, batch_size=16, **kwargs):
+        """Reconstruct a stack of sinograms, one slice after the other.
+
+        This is a sequential helper: each slice is reconstructed by
+        :meth:`run` with its own kernel launches.
+        Sinograms are read by batches and, with x0="fbp", the initial
+        solutions of a batch are computed with
+        :meth:`Backprojection.filtered_backprojection_volume`.
+        The convergence history of each slice is stored in
+        `slices_history` (empty lists unless tol or history is given).
+
+        :param sinos: Stack of sinograms of shape (slices, projections, bins)
+            as a numpy array, a memory-mapped array or a h5py dataset.
+        :param int n_it: Maximum number of iterations per slice
+        :param out: Array or dataset of shape (slices,) + slice_shape
+            in which to store the reconstructed slices.
+            Default: a new float32 numpy array.
+        :param x0: None to start from zeros, "fbp" to start from the
+                   filtered backprojection, or an array or dataset of the
+                   shape of out with the initial slices.
+        :param int batch_size: Number of sinograms read at once
+        :param kwargs: Other arguments of :meth:`run` (e.g., tol)
+        :return: The reconstructed slices (out if provided)
+        :raises ValueError: If out or x0 are not valid
+        """
+        nslices = len(sinos)
+        shape = (nslices,) + tuple(self.backprojector.slice_shape)
+        if out is None:
+            out = np.empty(shape, dtype=np.float32)
+        elif tuple(out.shape) != shape:
+            raise ValueError("out must be of shape %s" % (shape,))
+        use_fbp = isinstance(x0, str) and x0 == "fbp"
+        if isinstance(x0, str) and not use_fbp:
+            raise ValueError("Unsupported x0: %s" % x0)
+        if x0 is not None and not use_fbp and tuple(x0.shape) != shape:
+            raise ValueError("x0 must be None, \"fbp\" or of shape %s" % (shape,))
+
+        self.slices_history = []
+        for start in range(0, nslices, batch_size):
+            batch = np.asarray(sinos[start:start + batch_size], dtype=np.float32)
+            if x0 is None:
+                initial = [None] * len(batch)
+            elif use_fbp:
+                initial = self.backprojector.filtered_backprojection_volume(batch)
+            else:
+                initial = np.asarray(x0[start:start + batch_size], dtype=np.float32)
+            for offset, sino in enumerate(batch):
+                result = self.run(sino, n_it, x0=initial[offset], **kwargs)
+                out[start + offset] = result.get()
+                self.slices_history.append(self.history)
+        return out
 
     def proj(self, d_slice, d_sino):
         """
@@ -191,25 +270,44 @@ class SIRT(ReconstructionAlgorithm):
             "d_C": self.d_C
         })
 
-    # TODO: compute and possibly return the residual
-    def run(self, data, n_it):
+    def run(self, data, n_it, tol=None, x0=None, history=False):
         """
-        Run n_it iterations of the SIRT algorithm.
+        Run at most n_it iterations of the SIRT algorithm.
+
+        With tol or history, the norm of the residual ||A x - b|| of each
+        iterate is stored in `history`.
+
+        :param data: sinogram
+        :param int n_it: maximum number of iterations
+        :param float tol: Optional, stop when the relative decrease of the
+                          residual norm during an iteration is below tol.
+                          This reads the norm back at each iteration.
+        :param x0: Initial solution: None for zeros, "fbp" for the filtered
+                   backprojection of data, or an array of the slice shape.
+        :param bool history: True to store the residual norms without
+                             tol. They are read back once at the end.
+        :return: The reconstructed slice as a pyopencl array
         """
-        cl.enqueue_copy(self.queue, self.d_data.data, np.ascontiguousarray(data.astype(np.float32)))
+        self._start(data, x0)
 
         d_x_old = self.d_x_old
         d_x = self.d_x
         d_R = self.d_R
         d_C = self.d_C
         d_sino = self.d_sino
-        d_x *= 0
+        d_norms = []  # Squared residual norms kept on the device
 
         for k in range(n_it):
             d_x_old[:] = d_x[:]
             # x{k+1} = x{k} - C A^T R (A x{k} - b)
             self.proj(d_x, d_sino)
             d_sino -= self.d_data
+            if tol is not None:
+                self.history.append(float(np.sqrt(parray.dot(d_sino, d_sino).get())))
+                if self._converged(tol):
+                    break
+            elif history:
+                d_norms.append(parray.dot(d_sino, d_sino))
             d_sino *= d_R
             if self.is_cpu:
                 # This sync is necessary when using CPU, while it is not for GPU
@@ -221,6 +319,7 @@ class SIRT(ReconstructionAlgorithm):
                 # This sync is necessary when using CPU, while it is not for GPU
                 d_x.finish()
 
+        self.history += [float(np.sqrt(d_norm.get())) for d_norm in d_norms]
         return d_x
 
     __call__ = run
@@ -274,6 +373,10 @@ class TV(ReconstructionAlgorithm):
             "a[i].x = copysign(min(fabs(a[i].x), Lambda), a[i].x); a[i].y = copysign(min(fabs(a[i].y), Lambda), a[i].y);",
             "elwise_proj_linf"
         )
+        # Isotropic total variation of a gradient
+        self.reduction_tv = ReductionKernel(
+            self.ctx, np.float32, neutral="0", reduce_expr="a+b",
+            map_expr="hypot(g[i].x, g[i].y)", arguments="float2* g")
         # Additional arrays
         self.linalg.gradient(self.d_x)
         self.d_p = parray.zeros_like(self.linalg.cl_mem["d_gradient"])
@@ -322,12 +425,31 @@ class TV(ReconstructionAlgorithm):
             "d_Tau": self.d_Tau
         })
 
-    def run(self, data, n_it, Lambda, pos_constraint=False):
+    def run(self, data, n_it, Lambda, pos_constraint=False, tol=None, x0=None,
+            history=False):
         """
-        Run n_it iterations of the TV-regularized reconstruction,
+        Run at most n_it iterations of the TV-regularized reconstruction,
         with the regularization parameter Lambda.
+
+        With tol or history, the cost 1/2 ||A x - b||^2 + Lambda TV(x) is
+        stored in `history` at each iteration. It is evaluated at the
+        extrapolated point x + theta (x - x_old) computed by the algorithm,
+        which converges to the solution, to avoid additional projections.
+
+        :param data: sinogram
+        :param int n_it: maximum number of iterations
+        :param float Lambda: regularization parameter
+        :param bool pos_constraint: True to enforce positivity
+        :param float tol: Optional, stop when the relative change of the
+                          cost during an iteration is below tol.
+                          This reads the cost back at each iteration.
+        :param x0: Initial solution: None for zeros, "fbp" for the filtered
+                   backprojection of data, or an array of the slice shape.
+        :param bool history: True to store the cost without tol.
+                             It is read back once at the end.
+        :return: The reconstructed slice as a pyopencl array
         """
-        cl.enqueue_copy(self.queue, self.d_data.data, np.ascontiguousarray(data.astype(np.float32)))
+        self._start(data, x0)
 
         d_x = self.d_x
         d_x_old = self.d_x_old
@@ -337,9 +459,10 @@ class TV(ReconstructionAlgorithm):
         d_q = self.d_q
         d_g = self.d_g
 
-        d_x *= 0
         d_p *= 0
         d_q *= 0
+        track = tol is not None or history
+        d_costs = []  # Fidelity and TV terms kept on the device
 
         for k in range(0, n_it):
             # Update primal variables
@@ -363,6 +486,8 @@ class TV(ReconstructionAlgorithm):
             d_tmp *= 1+self.theta
             d_tmp -= self.theta*d_x_old
             self.linalg.gradient(d_tmp)
+            if track:
+                d_tv = self.reduction_tv(self.linalg.cl_mem["d_gradient"])
             # TODO: out of place mul_add
             #~ d_p.mul_add(1, L.cl_mem["d_gradient"], Sigma_grad)
             self.linalg.cl_mem["d_gradient"] *= self.Sigma_grad
@@ -373,9 +498,23 @@ class TV(ReconstructionAlgorithm):
             self.proj(d_tmp, d_sino)
             # TODO: this in less instructions
             d_sino -= self.d_data
+            if track:
+                d_costs.append((parray.dot(d_sino, d_sino), d_tv))
             d_sino *= self.d_Sigma_k
             d_q += d_sino
             d_q /= self.d_Sigma_kp1
+
+            if tol is not None:
+                self._append_costs(d_costs, Lambda)
+                if self._converged(tol):
+                    break
+        self._append_costs(d_costs, Lambda)
         return d_x
 
+    def _append_costs(self, d_costs, Lambda):
+        """Read back costs kept on the device and append them to history"""
+        for d_fidelity, d_tv in d_costs:
+            self.history.append(0.5 * float(d_fidelity.get()) + Lambda * float(d_tv.get()))
+        del d_costs[:]
+
     __call__ = run
@@ -32,3 +32,4 @@ from .param import par
 from .plan import SiftPlan
 from .match import MatchPlan
 from .alignment import LinearAlign
+from .cache import KeypointCache, save_keypoints, load_keypoints
@@ -37,7 +37,7 @@ __authors__ = ["Jérôme Kieffer", "Pierre Paleo"]
 __contact__ = "jerome.kieffer@esrf.eu"
 __license__ = "MIT"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "09/02/2018"
+__date__ = "19/10/2026"
 __status__ = "production"
 
 import os
@@ -84,7 +84,7 @@ class LinearAlign(OpenclProcessing):
 
     def __init__(self, image, mask=None, extra=0, init_sigma=None,
                  ctx=None, devicetype="all", platformid=None, deviceid=None,
-                 block_size=None, profile=False):
+                 block_size=None, profile=False, cache=None):
         """
         Constructor of the class
 
@@ -97,6 +97,8 @@ class LinearAlign(OpenclProcessing):
         :param ROI: Region of interest: to be implemented
         :param extra: extra space around the image, can be an integer, or a 2 tuple in YX convention: TODO!
         :param init_sigma: blurring width, you should have good reasons to modify the 1.6 default value...
+        :param KeypointCache cache: cache of keypoints to skip their detection
+                                    for already processed images
         """
         OpenclProcessing.__init__(self, ctx=ctx,
                                   devicetype=devicetype,
@@ -122,7 +124,11 @@ class LinearAlign(OpenclProcessing):
         self.mask = mask
         self.sift = SiftPlan(template=image, ctx=self.ctx, profile=self.profile,
                              block_size=self.block_size, init_sigma=init_sigma)
-        self.ref_kp = self.sift.keypoints(image)
+        self.cache = cache
+        if cache is None:
+            self.ref_kp = self.sift.keypoints(image)
+        else:
+            self.ref_kp = cache.keypoints(self.sift, image)
         # TODO: move to SIFT
         if self.mask is not None:
             kpx = numpy.round(self.ref_kp.x).astype(numpy.int32)
@@ -229,7 +235,10 @@ class LinearAlign(OpenclProcessing):
             if self.profile:
                 self.events.append(("Copy H->D", cpy))
             cpy.wait()
-            kp = self.sift.keypoints(self.cl_mem["input"])
+            if self.cache is None:
+                kp = self.sift.keypoints(self.cl_mem["input"])
+            else:
+                kp = self.cache.keypoints(self.sift, data, self.cl_mem["input"])
 #            print("ref %s img %s" % (self.cl_mem["ref_kp_gpu"].shape, kp.shape))
             logger.debug("mod image keypoints: %s" % kp.size)
             raw_matching = self.match.match(self.cl_mem["ref_kp_gpu"], kp, raw_results=True)
@@ -353,8 +362,7 @@ class LinearAlign(OpenclProcessing):
         # orient = 0.0
         # descr = 0.0
         if self.profile:
-            for e in self.events:
-                if "__len__" in dir(e) and len(e) >= 2:
-                    et = 1e-6 * (e[1].profile.end - e[1].profile.start)
-                    print("%50s:\t%.3fms" % (e[0], et))
-                    t += et
+            for record in self.events:
+                if record.duration is not None:
+                    print("%50s:\t%.3fms" % (record.name, record.duration))
+                    t += record.duration
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#
+#    Project: Sift implementation in Python + OpenCL
+#             https://github.com/silx-kit/silx
+#
+#    Copyright (C) 2013-2026  European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Contains functions to save and load SIFT keypoints and a cache of keypoints
+to avoid computing them again for the same images.
+"""
+
+from __future__ import division, print_function, with_statement
+
+__authors__ = ["Jérôme Kieffer", "Pierre Paleo"]
+__contact__ = "jerome.kieffer@esrf.eu"
+__license__ = "MIT"
+__copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "19/10/2026"
+__status__ = "beta"
+
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy
+
+from .param import par
+from .plan import SiftPlan
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+logger = logging.getLogger(__name__)
+
+HDF5_EXTENSIONS = (".h5", ".hdf5", ".hdf", ".nx", ".nxs")
+
+
+def save_keypoints(filename, keypoints, name="keypoints"):
+    """Save keypoints in a npz file or in a HDF5 file.
+
+    The format is chosen from the extension of the filename.
+
+    :param str filename: Name of the file to write
+    :param keypoints: keypoints as returned by :meth:`SiftPlan.keypoints`
+    :param str name: Name of the dataset in the file
+    """
+    keypoints = numpy.ascontiguousarray(keypoints, dtype=SiftPlan.dtype_kp)
+    if os.path.splitext(filename)[1].lower() in HDF5_EXTENSIONS:
+        if h5py is None:
+            raise RuntimeError("h5py is required to save keypoints in HDF5")
+        with h5py.File(filename, "a") as h5file:
+            if name in h5file:
+                del h5file[name]
+            h5file.create_dataset(name, data=keypoints)
+    else:
+        with open(filename, "wb") as fileobj:
+            numpy.savez(fileobj, **{name: keypoints})
+
+
+def load_keypoints(filename, name="keypoints"):
+    """Load keypoints saved with :func:`save_keypoints`.
+
+    :param str filename: Name of the file to read
+    :param str name: Name of the dataset in the file
+    :return: keypoints as returned by :meth:`SiftPlan.keypoints`
+    :rtype: numpy.recarray
+    """
+    if os.path.splitext(filename)[1].lower() in HDF5_EXTENSIONS:
+        if h5py is None:
+            raise RuntimeError("h5py is required to load keypoints from HDF5")
+        with h5py.File(filename, "r") as h5file:
+            keypoints = h5file[name][()]
+    else:
+        with numpy.load(filename) as npzfile:
+            keypoints = npzfile[name]
+    return numpy.asarray(keypoints, dtype=SiftPlan.dtype_kp).view(numpy.recarray)
+
+
+def sift_parameters(sift):
+    """Returns a description of the parameters changing the keypoints
+    computed by a SIFT plan.
+
+    :param SiftPlan sift: The SIFT plan
+    :rtype: str
+    """
+    return repr((float(sift._init_sigma),
+                 int(sift.PIX_PER_KP),
+                 sorted(par.items())))
+
+
+def keypoints_key(image, parameters=""):
+    """Returns the key of an image and SIFT parameters in a cache.
+
+    :param numpy.ndarray image: The image
+    :param str parameters: The SIFT parameters, see :func:`sift_parameters`
+    :rtype: str
+    """
+    image = numpy.ascontiguousarray(image)
+    digest = hashlib.sha1()
+    digest.update(repr((image.shape, image.dtype.str, parameters)).encode())
+    digest.update(image.view(numpy.uint8).ravel())
+    return digest.hexdigest()
+
+
+class KeypointCache(object):
+    """Cache of keypoints indexed by a hash of the images and the SIFT
+    parameters.
+
+    Keypoints are kept in memory for the most recently used images and
+    optionally saved as npz files in a directory, so that they are also
+    available to other processes or later runs::
+
+        cache = KeypointCache("/tmp/keypoints")
+        align = LinearAlign(ref, cache=cache)
+        for image in stack:
+            result = align(image)
+
+    :param str directory: Directory where to store keypoints or None to
+        only keep them in memory
+    :param int max_items: Maximum number of keypoints arrays in memory
+    """
+
+    def __init__(self, directory=None, max_items=64):
+        self.directory = directory
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.max_items = int(max_items)
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _filename(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, image, parameters=""):
+        """Returns the cached keypoints of an image or None if not cached.
+
+        :param numpy.ndarray image: The image
+        :param str parameters: The SIFT parameters, see
+            :func:`sift_parameters`
+        :rtype: Union[numpy.recarray,None]
+        """
+        key = keypoints_key(image, parameters)
+        with self._lock:
+            keypoints = self._items.pop(key, None)
+            if keypoints is not None:
+                self._items[key] = keypoints
+
+        if keypoints is None and self.directory is not None:
+            filename = self._filename(key)
+            if os.path.exists(filename):
+                try:
+                    keypoints = load_keypoints(filename)
+                except Exception as error:
+                    logger.warning("Unable to read cached keypoints %s: %s",
+                                   filename, error)
+                else:
+                    self._store(key, keypoints)
+
+        if keypoints is None:
+            return None
+        return keypoints.copy()
+
+    def set(self, image, keypoints, parameters=""):
+        """Store the keypoints of an image.
+
+        :param numpy.ndarray image: The image
+        :param keypoints: keypoints as returned by :meth:`SiftPlan.keypoints`
+        :param str parameters: The SIFT parameters, see
+            :func:`sift_parameters`
+        """
+        key = keypoints_key(image, parameters)
+        keypoints = numpy.array(keypoints, dtype=SiftPlan.dtype_kp).view(numpy.recarray)
+        self._store(key, keypoints)
+
+        if self.directory is not None:
+            # Write to a temporary file first for concurrent readers
+            fd, tmpname = tempfile.mkstemp(suffix=".npz", dir=self.directory)
+            os.close(fd)
+            try:
+                save_keypoints(tmpname, keypoints)
+                # os.replace overwrites an existing file on Windows (Python 3 only)
+                getattr(os, "replace", os.rename)(tmpname, self._filename(key))
+            except Exception as error:
+                logger.warning("Unable to save keypoints in cache: %s", error)
+                if os.path.exists(tmpname):
+                    os.remove(tmpname)
+
+    def _store(self, key, keypoints):
+        """Store keypoints in memory and discard the least recently used"""
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = keypoints
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """Remove all keypoints from memory (not from the directory)"""
+        with self._lock:
+            self._items.clear()
+
+    def keypoints(self, sift, image, data=None):
+        """Returns the keypoints of an image, computing them if not cached.
+
+        :param SiftPlan sift: SIFT plan used to compute the keypoints
+        :param numpy.ndarray image: The image used as key
+        :param data: The image passed to the SIFT plan if different from
+            image (e.g., the same image already on the device)
+        :rtype: numpy.recarray
+        """
+        parameters = sift_parameters(sift)
+        keypoints = self.get(image, parameters)
+        if keypoints is None:
+            keypoints = sift.keypoints(image if data is None else data)
+            self.set(image, keypoints, parameters)
+        else:
+            logger.debug("Using %s cached keypoints", keypoints.size)
+        return keypoints
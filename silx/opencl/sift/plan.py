@@ -54,7 +54,7 @@ __authors__ = ["Jérôme Kieffer", "Pierre Paleo"]
 __contact__ = "jerome.kieffer@esrf.eu"
 __license__ = "MIT"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "05/07/2018"
+__date__ = "19/10/2026"
 __status__ = "production"
 
 import os
@@ -67,7 +67,7 @@ from collections import OrderedDict
 from .param import par
 from silx.opencl import ocl, pyopencl, kernel_workgroup_size
 from silx.opencl.utils import get_opencl_code, nextpower
-from ..processing import OpenclProcessing, BufferDescription
+from ..processing import OpenclProcessing, BufferDescription, EventDescription
 from .utils import calc_size, kernel_size
 logger = logging.getLogger(__name__)
 
@@ -172,6 +172,8 @@ class SiftPlan(OpenclProcessing):
         self.compile_kernels()
         self._allocate_buffers()
         self.cnt = numpy.empty(1, dtype=numpy.int32)
+        self.upload_queue = None  # Created by keypoints_stack
+        self.stack_timings = None
         if "CPU" in self.device.type:
             self.USE_CPU = True
         else:
@@ -401,17 +403,13 @@ class SiftPlan(OpenclProcessing):
     def keypoints(self, image, mask=None):
         """Calculates the keypoints of the image
 
-        TODO: use a temporary list with events and use a single test at the end
-
         :param image: ndimage of 2D (or 3D if RGB)
-        :param mask: TODO: implement a mask for sieving out the keypoints
+        :param mask: region of interest of the image: only keypoints located
+            on non-zero pixels of the mask are kept (all of them if None)
         :return: vector of keypoint (1D numpy array)
         """
         # self.reset_timer()
         with self.sem:
-            total_size = 0
-            keypoints = []
-            descriptors = []
             assert image.shape[:2] == self.shape
             assert image.dtype in [self.dtype, numpy.float32]
             # old versions of pyopencl do not check for data contiguity
@@ -419,130 +417,266 @@ class SiftPlan(OpenclProcessing):
                 image = numpy.ascontiguousarray(image)
             t0 = time.time()
 
-            if image.dtype == numpy.float32:
-                if isinstance(image, pyopencl.array.Array):
-                    evt = pyopencl.enqueue_copy(self.queue, self.cl_mem["scale_0"].data, image.data)
-                else:
-                    evt = pyopencl.enqueue_copy(self.queue, self.cl_mem["scale_0"].data, image)
-                if self.profile:
-                    self.events.append(("copy H->D", evt))
-            elif self.dtype == numpy.float64:
+            dtype, dest = self._input_format(image.dtype)
+            if image.dtype != dtype:
                 # A preprocessing kernel double_to_float exists, but is commented (RUNS ONLY ON GPU WITH FP64)
                 # TODO: benchmark this kernel vs the current pure CPU format conversion with numpy.float32
                 #       and uncomment it if it proves faster (dubious, because of data transfer bottleneck)
-                evt = pyopencl.enqueue_copy(self.queue, self.cl_mem["scale_0"].data, image.astype(numpy.float32))
-                if self.profile:
-                    self.events.append(("copy H->D", evt))
-            elif (len(image.shape) == 3) and (image.dtype == numpy.uint8) and (self.RGB):
-                if isinstance(image, pyopencl.array.Array):
-                    evt = pyopencl.enqueue_copy(self.queue, self.cl_mem["raw"].data, image.data)
-                else:
-                    evt = pyopencl.enqueue_copy(self.queue, self.cl_mem["raw"].data, image)
-                if self.profile:
-                    self.events.append(("copy H->D", evt))
+                image = image.astype(dtype)
+            self._upload(self.cl_mem[dest], image)
+            if dest == "raw":
+                self._raw_to_float()
 
-                evt = self.kernels.get_kernel("rgb_to_float")(self.queue, self.procsize[0], self.wgsize[0],
-                                                       self.cl_mem["raw"].data, self.cl_mem["scale_0"].data,
-                                                       *self.scales[0])
-                if self.profile:
-                    self.events.append(("RGB -> float", evt))
+            output = self._extract()
+            logger.info("Execution time: %.3fms" % (1000 * (time.time() - t0)))
+        if mask is not None:
+            kpx = numpy.round(output.x).astype(numpy.int32)
+            kpy = numpy.round(output.y).astype(numpy.int32)
+            output = output[numpy.asarray(mask)[(kpy, kpx)].astype(bool)]
+        return output
 
-            elif self.dtype in self.converter:
-                program = self.kernels.get_kernel(self.converter[self.dtype])
-                evt = pyopencl.enqueue_copy(self.queue, self.cl_mem["raw"].data, image)
-                if self.profile:
-                    self.events.append(("copy H->D", evt))
-                evt = program(self.queue, self.procsize[0], self.wgsize[0],
-                              self.cl_mem["raw"].data, self.cl_mem["scale_0"].data, *self.scales[0])
-                if self.profile:
-                    self.events.append(("convert -> float", evt))
-            else:
-                raise RuntimeError("invalid input format error (%s)" % (str(self.dtype)))
-
-            wg1 = self.kernels_wg["max_min_global_stage1"]
-            wg2 = self.kernels_wg["max_min_global_stage2"]
-            if min(wg1, wg2) < self.red_size:
-                # common bug on OSX when running on CPU
-                logger.info("Unable to use MinMax Reduction: stage1 wg: %s; stage2 wg: %s < max_work_group_size: %s, expected: %s",
-                            wg1, wg2, self.block_size, self.red_size)
-                kernel = self.kernels.get_kernel("max_min_vec16")
-                k = kernel(self.queue, (1,), (1,),
-                               self.cl_mem["scale_0"].data,
-                               numpy.int32(self.shape[0] * self.shape[1]),
-                               self.cl_mem["max"].data,
-                               self.cl_mem["min"].data)
-                if self.profile:
-                    self.events.append(("max_min_serial", k))
-                # python implementation:
-                # buffer_ = self.cl_mem["scale_0"].get()
-                # self.cl_mem["max"].set(numpy.array([buffer_.max()], dtype=numpy.float32))
-                # self.cl_mem["min"].set(numpy.array([buffer_.min()], dtype=numpy.float32))
-            else:
-                kernel1 = self.kernels.get_kernel("max_min_global_stage1")
-                kernel2 = self.kernels.get_kernel("max_min_global_stage2")
-                # logger.debug("self.red_size: %s", self.red_size)
-                shm = pyopencl.LocalMemory(self.red_size * 2 * 4)
-                k1 = kernel1(self.queue, (self.red_size * self.red_size,), (self.red_size,),
-                             self.cl_mem["scale_0"].data,
-                             self.cl_mem["max_min"].data,
-                             numpy.int32(self.shape[0] * self.shape[1]),
-                             shm)
-                k2 = kernel2(self.queue, (self.red_size,), (self.red_size,),
-                             self.cl_mem["max_min"].data,
-                             self.cl_mem["max"].data,
-                             self.cl_mem["min"].data,
-                             shm)
+    def _input_format(self, dtype):
+        """Returns how frames of the given dtype are sent to the device
 
-                if self.profile:
-                    self.events.append(("max_min_stage1", k1))
-                    self.events.append(("max_min_stage2", k2))
-
-            evt = self.kernels.get_kernel("normalizes")(self.queue, self.procsize[0], self.wgsize[0],
-                                                        self.cl_mem["scale_0"].data,
-                                                        self.cl_mem["min"].data,
-                                                        self.cl_mem["max"].data,
-                                                        self.cl_mem["255"].data,
-                                                        *self.scales[0])
+        :param dtype: dtype of the input frames
+        :return: 2-tuple (dtype sent to the device, name of the destination buffer)
+        """
+        if dtype == numpy.float32 or self.dtype == numpy.float64:
+            return numpy.dtype(numpy.float32), "scale_0"
+        return numpy.dtype(self.dtype), "raw"
+
+    def _upload(self, buffer_, data, queue=None, name="copy H->D", **kwargs):
+        """Copy data into a device buffer and record the transfer
+
+        :param buffer_: destination pyopencl array
+        :param data: numpy or pyopencl array to copy
+        :param queue: command queue to use, :attr:`queue` by default
+        :param str name: name of the transfer in the profiling events
+        :param kwargs: extra arguments of :func:`pyopencl.enqueue_copy`
+        :return: the event of the copy
+        """
+        if queue is None:
+            queue = self.queue
+        src = data.data if isinstance(data, pyopencl.array.Array) else data
+        evt = pyopencl.enqueue_copy(queue, buffer_.data, src, **kwargs)
+        if self.profile:
+            self.events.append(EventDescription(name, evt, data.nbytes))
+        return evt
+
+    def _raw_to_float(self):
+        """Convert the raw input buffer into the float32 scale_0 buffer"""
+        if self.RGB and self.dtype == numpy.uint8:
+            evt = self.kernels.get_kernel("rgb_to_float")(self.queue, self.procsize[0], self.wgsize[0],
+                                                          self.cl_mem["raw"].data, self.cl_mem["scale_0"].data,
+                                                          *self.scales[0])
             if self.profile:
-                self.events.append(("normalize", evt))
-
-            curSigma = 1.0 if par.DoubleImSize else 0.5
-            octave = 0
-            if self._init_sigma > curSigma:
-                logger.debug("Bluring image to achieve std: %f", self._init_sigma)
-                sigma = math.sqrt(self._init_sigma ** 2 - curSigma ** 2)
-                self._gaussian_convolution(self.cl_mem["scale_0"], self.cl_mem["scale_0"], sigma, 0)
-
-            for octave in range(self.octave_max):
-                kp, descriptor = self._one_octave(octave)
-                logger.info("in octave %i found %i kp" % (octave, kp.shape[0]))
-
-                if len(kp):
-                    # sieve out coordinates with NaNs
-                    mask = numpy.where(numpy.logical_not(numpy.isnan(kp.sum(axis=-1))))
-                    keypoints.append(kp[mask])
-                    descriptors.append(descriptor[mask])
-                    total_size += len(mask[0])
+                self.events.append(("RGB -> float", evt))
+        elif self.dtype in self.converter:
+            program = self.kernels.get_kernel(self.converter[self.dtype])
+            evt = program(self.queue, self.procsize[0], self.wgsize[0],
+                          self.cl_mem["raw"].data, self.cl_mem["scale_0"].data, *self.scales[0])
+            if self.profile:
+                self.events.append(("convert -> float", evt))
+        else:
+            raise RuntimeError("invalid input format error (%s)" % (str(self.dtype)))
 
-            ########################################################################
-            # Merge keypoints in central memory
-            ########################################################################
-            output = numpy.recarray(shape=(total_size,), dtype=self.dtype_kp)
-            last = 0
-            for ds, desc in zip(keypoints, descriptors):
-                l = ds.shape[0]
-                if l > 0:
-                    output[last:last + l].x = ds[:, 0]
-                    output[last:last + l].y = ds[:, 1]
-                    output[last:last + l].scale = ds[:, 2]
-                    output[last:last + l].angle = ds[:, 3]
-                    output[last:last + l].desc = desc
-                    last += l
-            logger.info("Execution time: %.3fms" % (1000 * (time.time() - t0)))
+    def _extract(self):
+        """Extract the keypoints of the image in the scale_0 buffer
+
+        :return: vector of keypoint (1D numpy array)
+        """
+        total_size = 0
+        keypoints = []
+        descriptors = []
+        wg1 = self.kernels_wg["max_min_global_stage1"]
+        wg2 = self.kernels_wg["max_min_global_stage2"]
+        if min(wg1, wg2) < self.red_size:
+            # common bug on OSX when running on CPU
+            logger.info("Unable to use MinMax Reduction: stage1 wg: %s; stage2 wg: %s < max_work_group_size: %s, expected: %s",
+                        wg1, wg2, self.block_size, self.red_size)
+            kernel = self.kernels.get_kernel("max_min_vec16")
+            k = kernel(self.queue, (1,), (1,),
+                           self.cl_mem["scale_0"].data,
+                           numpy.int32(self.shape[0] * self.shape[1]),
+                           self.cl_mem["max"].data,
+                           self.cl_mem["min"].data)
+            if self.profile:
+                self.events.append(("max_min_serial", k))
+            # python implementation:
+            # buffer_ = self.cl_mem["scale_0"].get()
+            # self.cl_mem["max"].set(numpy.array([buffer_.max()], dtype=numpy.float32))
+            # self.cl_mem["min"].set(numpy.array([buffer_.min()], dtype=numpy.float32))
+        else:
+            kernel1 = self.kernels.get_kernel("max_min_global_stage1")
+            kernel2 = self.kernels.get_kernel("max_min_global_stage2")
+            # logger.debug("self.red_size: %s", self.red_size)
+            shm = pyopencl.LocalMemory(self.red_size * 2 * 4)
+            k1 = kernel1(self.queue, (self.red_size * self.red_size,), (self.red_size,),
+                         self.cl_mem["scale_0"].data,
+                         self.cl_mem["max_min"].data,
+                         numpy.int32(self.shape[0] * self.shape[1]),
+                         shm)
+            k2 = kernel2(self.queue, (self.red_size,), (self.red_size,),
+                         self.cl_mem["max_min"].data,
+                         self.cl_mem["max"].data,
+                         self.cl_mem["min"].data,
+                         shm)
+
+            if self.profile:
+                self.events.append(("max_min_stage1", k1))
+                self.events.append(("max_min_stage2", k2))
+
+        evt = self.kernels.get_kernel("normalizes")(self.queue, self.procsize[0], self.wgsize[0],
+                                                    self.cl_mem["scale_0"].data,
+                                                    self.cl_mem["min"].data,
+                                                    self.cl_mem["max"].data,
+                                                    self.cl_mem["255"].data,
+                                                    *self.scales[0])
+        if self.profile:
+            self.events.append(("normalize", evt))
+
+        curSigma = 1.0 if par.DoubleImSize else 0.5
+        octave = 0
+        if self._init_sigma > curSigma:
+            logger.debug("Bluring image to achieve std: %f", self._init_sigma)
+            sigma = math.sqrt(self._init_sigma ** 2 - curSigma ** 2)
+            self._gaussian_convolution(self.cl_mem["scale_0"], self.cl_mem["scale_0"], sigma, 0)
+
+        for octave in range(self.octave_max):
+            kp, descriptor = self._one_octave(octave)
+            logger.info("in octave %i found %i kp" % (octave, kp.shape[0]))
+
+            if len(kp):
+                # sieve out coordinates with NaNs
+                mask = numpy.where(numpy.logical_not(numpy.isnan(kp.sum(axis=-1))))
+                keypoints.append(kp[mask])
+                descriptors.append(descriptor[mask])
+                total_size += len(mask[0])
+
+        ########################################################################
+        # Merge keypoints in central memory
+        ########################################################################
+        output = numpy.recarray(shape=(total_size,), dtype=self.dtype_kp)
+        last = 0
+        for ds, desc in zip(keypoints, descriptors):
+            l = ds.shape[0]
+            if l > 0:
+                output[last:last + l].x = ds[:, 0]
+                output[last:last + l].y = ds[:, 1]
+                output[last:last + l].scale = ds[:, 2]
+                output[last:last + l].angle = ds[:, 3]
+                output[last:last + l].desc = desc
+                last += l
         return output
 
     __call__ = keypoints
 
+    def _get_stack_inputs(self, dtype):
+        """Returns the two input buffers used alternately by
+        :meth:`keypoints_stack` for frames of the given dtype
+
+        :param dtype: dtype of the frames as sent to the device
+        :return: list of 2 pyopencl arrays
+        """
+        name = "stack_%s" % numpy.dtype(dtype).name
+        if (name + "_0") not in self.cl_mem:
+            shape = tuple(self.shape)
+            if self.RGB and dtype != numpy.float32:
+                shape += (3,)
+            self.allocate_buffers([BufferDescription(name + "_%i" % i, shape, dtype, None)
+                                   for i in range(2)], use_array=True)
+        return [self.cl_mem[name + "_%i" % i] for i in range(2)]
+
+    def keypoints_stack(self, stack, batch_size=16):
+        """Calculates the keypoints of all frames of a stack
+
+        Frames are read by batches and uploaded on a second command queue
+        into two buffers used alternately, so that the upload of frame N+1
+        runs while the keypoints of frame N are extracted.
+
+        The time spent in each stage on the host is stored in
+        :attr:`stack_timings` as an OrderedDict of seconds:
+        "read" (reading and converting frames), "upload" (waiting for
+        the upload of a frame to complete), "extract" (keypoints
+        extraction) and "merge" (concatenation of the results).
+        Timings of individual kernels are available with profiling.
+
+        :param stack: Stack of images of shape (frames,) + shape
+            as a numpy array, a memory-mapped array or a h5py dataset
+        :param int batch_size: Number of frames read at once
+        :return: 2-tuple (keypoints, offsets) where keypoints is the
+            vector of keypoints of all frames and keypoints of frame i
+            are keypoints[offsets[i]:offsets[i + 1]]
+        """
+        nframes = len(stack)
+        assert tuple(stack.shape[1:3]) == tuple(self.shape)
+        assert stack.dtype in [self.dtype, numpy.float32]
+        timings = OrderedDict((stage, 0.0) for stage in ("read", "upload", "extract", "merge"))
+        self.stack_timings = timings
+        offsets = numpy.zeros(nframes + 1, dtype=numpy.int64)
+        if nframes == 0:
+            return numpy.recarray(shape=(0,), dtype=self.dtype_kp), offsets
+
+        dtype, dest = self._input_format(stack.dtype)
+        inputs = self._get_stack_inputs(dtype)
+        if self.upload_queue is None:
+            if self.profile:
+                self.upload_queue = pyopencl.CommandQueue(
+                    self.ctx,
+                    properties=pyopencl.command_queue_properties.PROFILING_ENABLE)
+            else:
+                self.upload_queue = pyopencl.CommandQueue(self.ctx)
+
+        def read_frames():
+            """Read the stack by batches"""
+            for start in range(0, nframes, batch_size):
+                t0 = time.time()
+                batch = numpy.ascontiguousarray(stack[start:start + batch_size], dtype=dtype)
+                timings["read"] += time.time() - t0
+                for frame in batch:
+                    yield frame
+
+        frames = read_frames()
+        input_used = [None, None]  # Last copy reading each input buffer
+        results = []
+
+        def upload(index):
+            """Send the next frame to the device without waiting"""
+            frame = next(frames)
+            wait_for = None if input_used[index] is None else [input_used[index]]
+            evt = self._upload(inputs[index], frame, queue=self.upload_queue,
+                               is_blocking=False, wait_for=wait_for)
+            self.upload_queue.flush()
+            return evt, frame
+
+        with self.sem:
+            uploaded = upload(0)
+            for index in range(nframes):
+                slot = index % 2
+                evt, _frame = uploaded
+                if index + 1 < nframes:
+                    uploaded = upload((index + 1) % 2)
+
+                t0 = time.time()
+                evt.wait()
+                t1 = time.time()
+                evt = self._upload(self.cl_mem[dest], inputs[slot], name="copy D->D")
+                input_used[slot] = evt
+                if dest == "raw":
+                    self._raw_to_float()
+                results.append(self._extract())
+                t2 = time.time()
+                timings["upload"] += t1 - t0
+                timings["extract"] += t2 - t1
+
+            t0 = time.time()
+            offsets[1:] = numpy.cumsum([len(kp) for kp in results])
+            output = numpy.recarray(shape=(offsets[-1],), dtype=self.dtype_kp)
+            for index, kp in enumerate(results):
+                output[offsets[index]:offsets[index + 1]] = kp
+            timings["merge"] += time.time() - t0
+        return output, offsets
+
     def _gaussian_convolution(self, input_data, output_data, sigma, octave=0):
         """
         Calculate the gaussian convolution with precalculated kernels.
@@ -24,7 +24,7 @@
 
 __authors__ = ["J. Kieffer"]
 __license__ = "MIT"
-__date__ = "12/01/2017"
+__date__ = "19/10/2026"
 
 import unittest
 from . import test_gaussian
@@ -37,6 +37,8 @@ from . import test_keypoints
 from . import test_matching
 from . import test_align
 from . import test_transform
+from . import test_cache
+from . import test_plan
 
 
 def suite():
@@ -51,5 +53,7 @@ def suite():
     testSuite.addTest(test_matching.suite())
     testSuite.addTests(test_align.suite())
     testSuite.addTests(test_transform.suite())
+    testSuite.addTests(test_cache.suite())
+    testSuite.addTests(test_plan.suite())
 
     return testSuite
@@ -80,7 +80,7 @@ class TestLinalign(unittest.TestCase):
         cls.queue = None
 
     def setUp(self):
-        if scipy and ocl is None:
+        if scipy and not ocl:
             return
 
         if hasattr(scipy.misc, "ascent"):
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#    Project: Sift implementation in Python + OpenCL
+#             https://github.com/silx-kit/silx
+#
+#    Copyright (C) 2013-2026  European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Test suite for the keypoint cache
+"""
+
+from __future__ import division, print_function
+
+__authors__ = ["Jérôme Kieffer", "Pierre Paleo"]
+__contact__ = "jerome.kieffer@esrf.eu"
+__license__ = "MIT"
+__copyright__ = "2013-2026 European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "19/10/2026"
+
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+import numpy
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from ..cache import KeypointCache, save_keypoints, load_keypoints
+from ..plan import SiftPlan
+logger = logging.getLogger(__name__)
+
+
+def random_keypoints(size):
+    """Returns random keypoints"""
+    keypoints = numpy.recarray(shape=(size,), dtype=SiftPlan.dtype_kp)
+    keypoints.x = numpy.random.uniform(0, 100, size)
+    keypoints.y = numpy.random.uniform(0, 100, size)
+    keypoints.scale = numpy.random.uniform(1, 10, size)
+    keypoints.angle = numpy.random.uniform(-numpy.pi, numpy.pi, size)
+    keypoints.desc = numpy.random.randint(0, 256, (size, 128))
+    return keypoints
+
+
+class TestKeypointCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.image = numpy.random.random((64, 32)).astype(numpy.float32)
+        self.keypoints = random_keypoints(50)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_npz(self):
+        filename = os.path.join(self.tempdir, "kp.npz")
+        save_keypoints(filename, self.keypoints)
+        result = load_keypoints(filename)
+        self.assertIsInstance(result, numpy.recarray)
+        self.assertTrue(numpy.array_equal(result, self.keypoints))
+
+    @unittest.skipIf(h5py is None, "h5py is not available")
+    def test_hdf5(self):
+        filename = os.path.join(self.tempdir, "kp.h5")
+        save_keypoints(filename, self.keypoints)
+        save_keypoints(filename, self.keypoints[:10], name="other")
+        result = load_keypoints(filename)
+        self.assertTrue(numpy.array_equal(result, self.keypoints))
+        self.assertTrue(numpy.array_equal(
+            load_keypoints(filename, name="other").desc,
+            self.keypoints[:10].desc))
+
+    def test_memory(self):
+        cache = KeypointCache(max_items=2)
+        self.assertIsNone(cache.get(self.image))
+        cache.set(self.image, self.keypoints, "parameters")
+        self.assertIsNone(cache.get(self.image))
+        self.assertIsNone(cache.get(self.image.astype(numpy.float64),
+                                    "parameters"))
+        self.assertTrue(numpy.array_equal(
+            cache.get(self.image, "parameters"), self.keypoints))
+
+        # Least recently used keypoints are discarded
+        cache.set(self.image + 1, self.keypoints[:1])
+        cache.get(self.image, "parameters")
+        cache.set(self.image + 2, self.keypoints[:2])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(self.image + 1))
+        self.assertIsNotNone(cache.get(self.image, "parameters"))
+
+    def test_directory(self):
+        directory = os.path.join(self.tempdir, "cache")
+        cache = KeypointCache(directory)
+        cache.set(self.image, self.keypoints)
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+        # Another cache sharing the same directory
+        cache = KeypointCache(directory)
+        self.assertEqual(len(cache), 0)
+        result = cache.get(self.image)
+        self.assertTrue(numpy.array_equal(result, self.keypoints))
+        self.assertEqual(len(cache), 1)
+
+
+def suite():
+    testSuite = unittest.TestSuite()
+    testSuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestKeypointCache))
+    return testSuite
@@ -98,7 +98,7 @@ class TestKeypoints(unittest.TestCase):
 
     def setUp(self):
         self.abort = False
-        if scipy and ocl is None:
+        if scipy and not ocl:
             return
         try:
             self.testdata = scipy.misc.ascent()
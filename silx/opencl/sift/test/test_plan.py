@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#    Project: Sift implementation in Python + OpenCL
+#             https://github.com/silx-kit/silx
+#
+#    Copyright (C) 2013-2026  European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Test suite for the keypoints extraction of a stack of images
+"""
+
+from __future__ import division, print_function
+
+__authors__ = ["Jérôme Kieffer", "Pierre Paleo"]
+__contact__ = "jerome.kieffer@esrf.eu"
+__license__ = "MIT"
+__copyright__ = "2013-2026 European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "19/10/2026"
+
+import unittest
+import logging
+import numpy
+try:
+    import scipy.misc
+    import scipy.ndimage
+except ImportError:
+    scipy = None
+
+from silx.opencl import ocl
+from ..plan import SiftPlan
+logger = logging.getLogger(__name__)
+
+
+@unittest.skipUnless(scipy and ocl, "scipy or ocl missing")
+class TestSiftPlanStack(unittest.TestCase):
+
+    def setUp(self):
+        if hasattr(scipy.misc, "ascent"):
+            image = scipy.misc.ascent()
+        else:
+            image = scipy.misc.lena()
+        image = image[:256, :256].astype(numpy.uint16)
+        self.stack = numpy.array([numpy.roll(image, 5 * i, axis=1)
+                                  for i in range(5)])
+
+    def test_keypoints_stack(self):
+        plan = SiftPlan(template=self.stack[0])
+        keypoints, offsets = plan.keypoints_stack(self.stack, batch_size=2)
+        self.assertEqual(len(offsets), len(self.stack) + 1)
+        self.assertEqual(offsets[-1], len(keypoints))
+        for index, frame in enumerate(self.stack):
+            ref = plan.keypoints(frame)
+            got = keypoints[offsets[index]:offsets[index + 1]]
+            self.assertTrue(numpy.array_equal(got, ref),
+                            "Keypoints of frame %d are correct" % index)
+        self.assertEqual(list(plan.stack_timings.keys()),
+                         ["read", "upload", "extract", "merge"])
+
+        # float32 frames are sent without conversion
+        keypoints, offsets = plan.keypoints_stack(
+            self.stack.astype(numpy.float32))
+        self.assertEqual(offsets[-1], len(keypoints))
+
+    def test_keypoints_mask(self):
+        plan = SiftPlan(template=self.stack[0])
+        ref = plan.keypoints(self.stack[0])
+        mask = numpy.zeros(self.stack[0].shape, dtype=numpy.uint8)
+        mask[:, :128] = 1
+        keypoints = plan.keypoints(self.stack[0], mask=mask)
+        self.assertLess(len(keypoints), len(ref))
+        self.assertTrue((numpy.round(keypoints.x) < 128).all())
+
+    def test_empty_stack(self):
+        plan = SiftPlan(template=self.stack[0])
+        keypoints, offsets = plan.keypoints_stack(self.stack[:0])
+        self.assertEqual(len(keypoints), 0)
+        self.assertTrue(numpy.array_equal(offsets, [0]))
+
+
+def suite():
+    testSuite = unittest.TestSuite()
+    testSuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestSiftPlanStack))
+    return testSuite
@@ -24,7 +24,7 @@
 
 __authors__ = ["J. Kieffer"]
 __license__ = "MIT"
-__date__ = "17/10/2017"
+__date__ = "19/10/2026"
 
 import os
 import unittest
@@ -32,10 +32,12 @@ from . import test_addition
 from . import test_medfilt
 from . import test_backprojection
 from . import test_projection
+from . import test_reconstruction
 from . import test_linalg
 from . import test_array_utils
 from ..codec import test as test_codec
 from . import test_image
+from . import test_common
 
 def suite():
     test_suite = unittest.TestSuite()
@@ -43,10 +45,12 @@ def suite():
     test_suite.addTests(test_medfilt.suite())
     test_suite.addTests(test_backprojection.suite())
     test_suite.addTests(test_projection.suite())
+    test_suite.addTests(test_reconstruction.suite())
     test_suite.addTests(test_linalg.suite())
     test_suite.addTests(test_array_utils.suite())
     test_suite.addTests(test_codec.suite())
     test_suite.addTests(test_image.suite())
+    test_suite.addTests(test_common.suite())
     # Allow to remove sift from the project
     test_base_dir = os.path.dirname(__file__)
     sift_dir = os.path.join(test_base_dir, "..", "sift")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# coding: utf-8
+# /*##########################################################################
+#
+# Copyright (c) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ###########################################################################*/
+"""Benchmark of the filtered backprojection of a volume, slice by slice
+and with the batched volume API"""
+
+__authors__ = ["P. Paleo"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import logging
+import time
+import unittest
+
+import numpy
+
+from silx.opencl.common import ocl
+
+try:
+    import mako
+except ImportError:
+    mako = None
+
+if ocl:
+    from silx.opencl import backprojection
+
+_logger = logging.getLogger(__name__)
+_logger.setLevel(logging.DEBUG)
+
+
+@unittest.skipUnless(ocl and mako, "pyopencl is missing")
+class BenchmarkBackprojectionVolume(unittest.TestCase):
+    """Compare slice by slice and volume reconstruction throughput"""
+
+    SIZES = 512, 1024
+    """Number of detector bins and of projections"""
+
+    NSLICES = 64
+
+    BATCH_SIZES = 1, 8, 32
+
+    def _sinograms(self, size):
+        sino = numpy.zeros((size, size), dtype=numpy.float32)
+        sino[:, size // 4:3 * size // 4] = 1
+        return numpy.array([sino] * self.NSLICES)
+
+    def test_throughput(self):
+        for size in self.SIZES:
+            sinos = self._sinograms(size)
+            fbp = backprojection.Backprojection(sinos.shape[1:])
+            if fbp.compiletime_workgroup_size < 16 * 16:
+                self.skipTest("Backprojection is not supported on this platform")
+            out = numpy.empty((self.NSLICES,) + tuple(fbp.slice_shape),
+                              dtype=numpy.float32)
+            fbp.filtered_backprojection_volume(sinos[:2], out=out[:2])  # Warm-up
+
+            start = time.time()
+            for index, sino in enumerate(sinos):
+                out[index] = fbp.filtered_backprojection(sino)
+            duration = time.time() - start
+            _logger.info("%dx%d: slice by slice %.1f slices/s",
+                         size, size, self.NSLICES / duration)
+            expected = out.copy()
+
+            for batch_size in self.BATCH_SIZES:
+                start = time.time()
+                fbp.filtered_backprojection_volume(sinos, out=out,
+                                                   batch_size=batch_size)
+                duration = time.time() - start
+                _logger.info("%dx%d: volume (batch_size=%d) %.1f slices/s",
+                             size, size, batch_size, self.NSLICES / duration)
+                self.assertLess(numpy.abs(out - expected).max(),
+                                1e-4 * numpy.abs(expected).max())
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(
+        BenchmarkBackprojectionVolume))
+    return test_suite
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#    Project: silx: OpenCL devices
+#             https://github.com/silx-kit/silx
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Benchmark of the import time of silx.opencl and of the probing of devices
+"""
+
+from __future__ import division, print_function
+
+__authors__ = ["Jérôme Kieffer"]
+__contact__ = "jerome.kieffer@esrf.eu"
+__license__ = "MIT"
+__copyright__ = "2026 European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "19/10/2026"
+
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+_logger = logging.getLogger(__name__)
+_logger.setLevel(logging.DEBUG)
+
+
+class BenchmarkImport(unittest.TestCase):
+    """Measure the time to import silx.opencl and to probe devices in a
+    new Python process"""
+
+    NREPEAT = 3
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def _run(self, code, cache):
+        """Returns the best duration of running code in a new interpreter"""
+        env = dict(os.environ)
+        env["SILX_OPENCL_CACHE"] = cache
+        durations = []
+        for _ in range(self.NREPEAT):
+            start = time.time()
+            subprocess.check_call([sys.executable, "-c", code], env=env)
+            durations.append(time.time() - start)
+        return min(durations)
+
+    def test_import(self):
+        baseline = self._run("import numpy", "0")
+        imported = self._run("import silx.opencl", "0")
+        code = "import silx.opencl; bool(silx.opencl.ocl)"
+        no_cache = self._run(code, "0")
+        cache = os.path.join(self.tempdir, "cache")
+        self._run(code, cache)  # Fill the cache
+        cached = self._run(code, cache)
+
+        _logger.info("python+numpy %.3f s\timport silx.opencl %.3f s", baseline, imported)
+        _logger.info("import and probe devices: no cache %.3f s\tcached %.3f s",
+                     no_cache, cached)
+
+
+def suite():
+    testSuite = unittest.TestSuite()
+    testSuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(BenchmarkImport))
+    return testSuite
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(defaultTest="suite")
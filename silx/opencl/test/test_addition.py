@@ -75,7 +75,7 @@ class TestAddition(unittest.TestCase):
         cls.queue = None
 
     def setUp(self):
-        if ocl is None:
+        if not ocl:
             return
         self.shape = 4096
         self.data = numpy.random.random(self.shape).astype(numpy.float32)
@@ -62,7 +62,7 @@ except ImportError:
 class TestCpy2d(unittest.TestCase):
 
     def setUp(self):
-        if ocl is None:
+        if not ocl:
             return
         self.ctx = ocl.create_context()
         if logger.getEffectiveLevel() <= logging.INFO:
@@ -30,9 +30,12 @@ from __future__ import division, print_function
 __authors__ = ["Pierre paleo"]
 __license__ = "MIT"
 __copyright__ = "2013-2017 European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "19/01/2018"
+__date__ = "19/10/2026"
 
 
+import os
+import shutil
+import tempfile
 import time
 import logging
 import numpy
@@ -41,6 +44,10 @@ try:
     import mako
 except ImportError:
     mako = None
+try:
+    import h5py
+except ImportError:
+    h5py = None
 from ..common import ocl
 if ocl:
     from .. import backprojection
@@ -83,7 +90,7 @@ def clip_circle(img, center=None, radius=None):
 class TestFBP(unittest.TestCase):
 
     def setUp(self):
-        if ocl is None:
+        if not ocl:
             return
         # ~ if sys.platform.startswith('darwin'):
             # ~ self.skipTest("Backprojection is not implemented on CPU for OS X yet")
@@ -154,10 +161,43 @@ class TestFBP(unittest.TestCase):
             errmax = numpy.max(numpy.abs(res - res0))
             self.assertTrue(errmax < 1.e-6, "Max error is too high")
 
+    @unittest.skipUnless(ocl and mako, "pyopencl is missing")
+    def test_fbp_volume(self):
+        """
+        tests FBP of a stack of sinograms, from numpy and HDF5
+        """
+        sinos = numpy.array([self.sino, 2 * self.sino, self.sino[:, ::-1],
+                             numpy.zeros_like(self.sino), self.sino + 1.])
+        expected = numpy.array([self.fbp.filtered_backprojection(sino)
+                                for sino in sinos])
+        tolerance = 1e-4 * abs(expected).max()
+
+        for batch_size in (1, 2, 16):
+            res = self.fbp.filtered_backprojection_volume(sinos, batch_size=batch_size)
+            self.assertEqual(res.shape, expected.shape)
+            errmax = numpy.max(numpy.abs(res - expected))
+            self.assertLess(errmax, tolerance, "Max error is too high")
+
+        if h5py is None:
+            return
+        tmpdir = tempfile.mkdtemp()
+        try:
+            with h5py.File(os.path.join(tmpdir, "volume.h5"), "w") as h5file:
+                h5file["sinos"] = sinos
+                slices = h5file.create_dataset("slices", expected.shape, dtype=numpy.float32)
+                res = self.fbp.filtered_backprojection_volume(
+                    h5file["sinos"], out=slices, batch_size=2)
+                self.assertIs(res, slices)
+                errmax = numpy.max(numpy.abs(res[()] - expected))
+                self.assertLess(errmax, tolerance, "Max error is too high")
+        finally:
+            shutil.rmtree(tmpdir)
+
 
 def suite():
     testSuite = unittest.TestSuite()
     testSuite.addTest(TestFBP("test_fbp"))
+    testSuite.addTest(TestFBP("test_fbp_volume"))
     return testSuite
 
 
@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#    Project: silx: OpenCL devices
+#             https://github.com/silx-kit/silx
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use,
+# copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following
+# conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+# OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Test of the lazy probing of OpenCL devices and of the caches
+"""
+
+from __future__ import division, print_function
+
+__authors__ = ["Jérôme Kieffer"]
+__contact__ = "jerome.kieffer@esrf.eu"
+__license__ = "MIT"
+__copyright__ = "2026 European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "19/10/2026"
+
+import gc
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import weakref
+
+import numpy
+
+from .. import common
+from .. import processing
+from ..common import OpenCL, Platform, Device, ocl, pyopencl
+from ..utils import get_opencl_code
+
+
+class TestProbeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self._environ = os.environ.get("SILX_OPENCL_CACHE")
+        os.environ["SILX_OPENCL_CACHE"] = self.tempdir
+
+    def tearDown(self):
+        if self._environ is None:
+            del os.environ["SILX_OPENCL_CACHE"]
+        else:
+            os.environ["SILX_OPENCL_CACHE"] = self._environ
+        shutil.rmtree(self.tempdir)
+
+    def platforms(self):
+        platform = Platform("Portable Computing Language", "The pocl project",
+                            "OpenCL 1.2 pocl", "cl_khr_icd", 0)
+        platform.add_device(Device("pthread", "CPU", "OpenCL 1.2", "1.1",
+                                   "cl_khr_fp64 cl_khr_int64_base_atomics",
+                                   2 ** 30, True, 4, 2000, None, 0, 4096))
+        return [platform]
+
+    def test_cache(self):
+        self.assertIsNone(common._load_probed_platforms())
+        common._save_probed_platforms(self.platforms())
+        self.assertEqual(len(os.listdir(self.tempdir)), 1)
+
+        # Devices are read from the cache without probing them
+        ocl = OpenCL()
+        self.assertEqual(ocl.nb_devices, 1)
+        self.assertTrue(ocl)
+        device = ocl.platforms[0].devices[0]
+        ref = self.platforms()[0].devices[0]
+        self.assertEqual(device.__dict__, ref.__dict__)
+        self.assertEqual(ocl.select_device("cpu"), (0, 0))
+        self.assertIsNone(ocl.select_device("gpu"))
+
+    def test_no_device(self):
+        common._save_probed_platforms([])
+        ocl = OpenCL()
+        self.assertFalse(ocl)
+        self.assertEqual(ocl.platforms, [])
+
+    def test_disabled(self):
+        os.environ["SILX_OPENCL_CACHE"] = "0"
+        self.assertIsNone(common._get_cache_directory())
+        common._save_probed_platforms(self.platforms())
+        self.assertIsNone(common._load_probed_platforms())
+        self.assertEqual(os.listdir(self.tempdir), [])
+
+    def test_lazy_image_backends(self):
+        common._save_probed_platforms([])
+        names = ("silx.image.reconstruction", "silx.image.backprojection",
+                 "silx.image.projection")
+        modules = dict((name, sys.modules.pop(name)) for name in names
+                       if name in sys.modules)
+        self.addCleanup(sys.modules.update, modules)
+        for name in names:  # Called first: drop the modules imported here
+            self.addCleanup(sys.modules.pop, name, None)
+        ocl = OpenCL()
+        self.addCleanup(setattr, common, "ocl", common.ocl)
+        common.ocl = ocl
+
+        # Importing does not probe devices
+        from silx.image import reconstruction
+        self.assertIsNone(ocl._platforms)
+
+        from silx.image import radon
+        projection = reconstruction.Projection((16, 16), 8)
+        self.assertIsInstance(projection, radon.Projection)
+        self.assertEqual(ocl.platforms, [])
+        self.assertIsInstance(reconstruction.Backprojection((8, 16)),
+                              radon.Backprojection)
+        self.assertRaises(RuntimeError, reconstruction.SIRT, (8, 16))
+
+    def test_icd_bare_soname(self):
+        vendors = os.path.join(self.tempdir, "vendors")
+        libraries = os.path.join(self.tempdir, "lib")
+        os.mkdir(vendors)
+        os.mkdir(libraries)
+        with open(os.path.join(vendors, "dummy.icd"), "w") as f:
+            f.write("libdummy-opencl.so.1\n")
+        library = os.path.join(libraries, "libdummy-opencl.so.1")
+        with open(library, "wb") as f:
+            f.write(b"\x7fELF")
+        for name, value in (("OCL_ICD_VENDORS", vendors),
+                            ("LD_LIBRARY_PATH", libraries)):
+            self.addCleanup(self._restore_environ, name, os.environ.get(name))
+            os.environ[name] = value
+
+        self.assertEqual(common._find_library("libdummy-opencl.so.1"), library)
+        configuration = common._icd_configuration()
+        self.assertEqual(common._icd_configuration(), configuration)
+
+        # Upgrading the driver library invalidates the configuration
+        os.utime(library, (0, 0))
+        self.assertNotEqual(common._icd_configuration(), configuration)
+
+    @staticmethod
+    def _restore_environ(name, value):
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+    def test_invalid_cache(self):
+        common._save_probed_platforms(self.platforms())
+        filename = common._probe_cache_filename()
+        with open(filename, "w") as f:
+            f.write("not json")
+        self.assertIsNone(common._load_probed_platforms())
+
+
+class TestProgramCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self._environ = os.environ.get("SILX_OPENCL_CACHE")
+        os.environ["SILX_OPENCL_CACHE"] = self.tempdir
+
+    def tearDown(self):
+        if self._environ is None:
+            del os.environ["SILX_OPENCL_CACHE"]
+        else:
+            os.environ["SILX_OPENCL_CACHE"] = self._environ
+        shutil.rmtree(self.tempdir)
+
+    @unittest.skipUnless(ocl, "no OpenCL device available")
+    def test_build_program(self):
+        ctx = ocl.create_context()
+        source = get_opencl_code("addition")
+        # Make the source unique to avoid programs already built by other tests
+        source += "\n// %s\n" % self.tempdir
+        program, origin = processing.build_program(ctx, source, "")
+        self.assertEqual(origin, "source")
+
+        program2, origin = processing.build_program(ctx, source, "")
+        self.assertEqual(origin, "memory")
+        self.assertIs(program2, program)
+
+        program3, origin = processing.build_program(ctx, source, "-D DUMMY=1")
+        self.assertEqual(origin, "source")
+        self.assertIsNot(program3, program)
+
+        # Program built from the binary saved on disk
+        processing._program_cache.clear()
+        program, origin = processing.build_program(ctx, source, "")
+        if not os.path.isdir(os.path.join(self.tempdir, "programs")):
+            self.skipTest("Device does not provide program binaries")
+        self.assertEqual(origin, "disk")
+
+        queue = pyopencl.CommandQueue(ctx)
+        data = numpy.arange(64, dtype=numpy.float32)
+        d_data = pyopencl.array.to_device(queue, data)
+        d_res = pyopencl.array.empty_like(d_data)
+        program.addition(queue, (64,), None, d_data.data, d_data.data,
+                         d_res.data, numpy.int32(64)).wait()
+        self.assertTrue(numpy.array_equal(d_res.get(), 2 * data))
+
+        # Programs are released when no longer used, with their context
+        other_ctx = pyopencl.Context(ctx.devices)
+        other_program, _origin = processing.build_program(other_ctx, source, "")
+        key = other_ctx.int_ptr, hashlib.sha1(source.encode()).hexdigest(), ""
+        self.assertIs(processing._program_cache[key], other_program)
+        context_ref = weakref.ref(other_ctx)
+        del other_program, other_ctx
+        gc.collect()
+        self.assertNotIn(key, processing._program_cache)
+        self.assertIsNone(context_ref())
+
+
+@unittest.skipUnless(ocl, "PyOpenCl is missing")
+class TestOpenclSession(unittest.TestCase):
+    """Tests of processings sharing an OpenclSession"""
+
+    def test_pipeline(self):
+        from ..codec.byte_offset import ByteOffset
+        from ..medfilt import MedianFilter2D
+
+        shape = 64, 48
+        data = numpy.random.poisson(100, shape).astype(numpy.int32)
+        data[::7, ::5] = 100000
+
+        session = processing.OpenclSession()
+        codec = ByteOffset(dec_size=data.size, session=session)
+        median = MedianFilter2D(shape, kernel_size=3, session=session)
+        self.assertIs(codec.queue, session.queue)
+        self.assertIs(median.queue, session.queue)
+        self.assertIs(median.ctx, session.ctx)
+
+        raw = codec.encode(data).get()
+        decoded = codec.decode(raw, as_float=True, out=session.empty(data.size))
+        filtered = session.empty(shape)
+        result = median.medfilt2d(decoded.reshape(shape), out=filtered)
+        self.assertIs(result, filtered)
+
+        expected = median.medfilt2d(data.astype(numpy.float32))
+        self.assertTrue(numpy.array_equal(filtered.get(), expected))
+
+        # Device input of another dtype is cast on the device
+        d_data = session.to_device(data)
+        self.assertTrue(numpy.array_equal(median.medfilt2d(d_data), expected))
+        session.finish()
+
+
+class _FakeEvent(object):
+    """Completed event with profiling info, in nanoseconds"""
+
+    class _Profile(object):
+        pass
+
+    def __init__(self, start, end):
+        self.profile = self._Profile()
+        self.profile.start, self.profile.end = start, end
+
+    def wait(self):
+        pass
+
+
+class TestEventLog(unittest.TestCase):
+    """Tests of the bounded OpenCL event log"""
+
+    def test_bounded(self):
+        log = processing.EventLog(maxlen=10, nsamples=5)
+        for index in range(100):
+            log.append(processing.EventDescription(
+                "copy", _FakeEvent(1000 * index, 1000 * index + 10 ** 6), 8))
+        log += [("kernel", _FakeEvent(0, 2 * 10 ** 6))]
+        self.assertEqual(len(log), 10)
+        self.assertLessEqual(len(log._pending), log.PENDING_SIZE)
+
+        records = log.records()
+        self.assertEqual(len(records), 10)
+        self.assertEqual(records[-1].name, "kernel")
+        self.assertEqual(records[-1].duration, 2.)
+
+        stats = log.statistics()
+        self.assertEqual(list(stats.keys()), ["copy", "kernel"])
+        self.assertEqual(stats["copy"]["count"], 100)
+        self.assertAlmostEqual(stats["copy"]["total"], 100.)
+        self.assertAlmostEqual(stats["copy"]["mean"], 1.)
+        self.assertAlmostEqual(stats["copy"]["p95"], 1.)
+        self.assertEqual(stats["copy"]["nbytes"], 800)
+        self.assertEqual(stats["kernel"]["nbytes"], 0)
+
+        array = log.statistics_array()
+        self.assertEqual(list(array.name), ["copy", "kernel"])
+        self.assertEqual(list(array.count), [100, 1])
+
+        log.clear()
+        self.assertEqual(len(log), 0)
+        self.assertEqual(len(log.statistics()), 0)
+        self.assertEqual(len(log.statistics_array()), 0)
+
+    def test_no_profiling(self):
+        log = processing.EventLog(maxlen=10, profiling=False)
+        log.append(("kernel", object()))
+        self.assertEqual(log.records()[0].duration, None)
+        self.assertEqual(log.statistics()["kernel"]["count"], 1)
+        self.assertEqual(log.chrome_trace()["traceEvents"], [])
+
+    def test_chrome_trace(self):
+        log = processing.EventLog()
+        log.append(processing.EventDescription("copy", _FakeEvent(0, 5000), 64))
+        log.append(processing.EventDescription("kernel", _FakeEvent(5000, 8000)))
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, "trace.json")
+            trace = log.chrome_trace(filename)
+            with open(filename) as f:
+                self.assertEqual(json.load(f), trace)
+        finally:
+            shutil.rmtree(tmpdir)
+        events = trace["traceEvents"]
+        self.assertEqual([event["name"] for event in events], ["copy", "kernel"])
+        self.assertEqual(events[1]["ts"], 5.)
+        self.assertEqual(events[1]["dur"], 3.)
+        self.assertEqual(events[0]["args"]["nbytes"], 64)
+
+
+def suite():
+    testSuite = unittest.TestSuite()
+    testSuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestProbeCache))
+    testSuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestProgramCache))
+    testSuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestEventLog))
+    testSuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestOpenclSession))
+    return testSuite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest="suite")
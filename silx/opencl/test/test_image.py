@@ -77,7 +77,7 @@ class TestImage(unittest.TestCase):
         cls.ip = None
 
     def setUp(self):
-        if ocl is None:
+        if not ocl:
             return
         self.data = numpy.asarray(Image.open(self.lena))
 
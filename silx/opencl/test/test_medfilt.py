@@ -35,7 +35,7 @@ __authors__ = ["Jérôme Kieffer"]
 __contact__ = "jerome.kieffer@esrf.eu"
 __license__ = "MIT"
 __copyright__ = "2013-2017 European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "05/07/2018"
+__date__ = "19/10/2026"
 
 
 import sys
@@ -76,7 +76,7 @@ except:
 class TestMedianFilter(unittest.TestCase):
 
     def setUp(self):
-        if ocl is None:
+        if not ocl:
             return
         self.data = ascent().astype(numpy.float32)
         self.medianfilter = medfilt.MedianFilter2D(self.data.shape, devicetype="gpu")
@@ -114,6 +114,28 @@ class TestMedianFilter(unittest.TestCase):
             logger.info("test_medfilt: size: %s error %s, t_ref: %.3fs, t_ocl: %.3fs" % r)
             self.assertEqual(r.error, 0, 'Results are correct')
 
+    @unittest.skipUnless(ocl and mako, "pyopencl is missing")
+    def test_medfilt_stack(self):
+        """
+        tests the median filter of a stack of frames
+        """
+        stack = numpy.random.randint(0, 1000, (5, 100, 120)).astype(numpy.uint16)
+        for size in (3, (5, 3)):
+            try:
+                res = self.medianfilter.medfilt2d_stack(stack, size, batch_size=2)
+            except RuntimeError as msg:
+                logger.error(msg)
+                continue
+            self.assertEqual(res.dtype, numpy.float32)
+            for frame, got in zip(stack, res):
+                ref = self.medianfilter.medfilt2d(frame, size)
+                self.assertEqual(abs(got - ref).max(), 0, "Frames are correct")
+
+        out = numpy.zeros(stack.shape, dtype=numpy.float32)
+        res = self.medianfilter.medfilt2d_stack(stack.astype(numpy.float64), out=out)
+        self.assertIs(res, out)
+        self.assertEqual(abs(out[-1] - self.medianfilter.medfilt2d(stack[-1])).max(), 0)
+
     def benchmark(self, limit=36):
         "Run some benchmarking"
         try:
@@ -162,6 +184,7 @@ class TestMedianFilter(unittest.TestCase):
 def suite():
     testSuite = unittest.TestSuite()
     testSuite.addTest(TestMedianFilter("test_medfilt"))
+    testSuite.addTest(TestMedianFilter("test_medfilt_stack"))
     return testSuite
 
 
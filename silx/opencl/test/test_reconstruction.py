@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# coding: utf-8
+# /*##########################################################################
+#
+# Copyright (c) 2026 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ###########################################################################*/
+"""Test of the iterative reconstruction module"""
+
+from __future__ import division, print_function
+
+__authors__ = ["P. Paleo"]
+__license__ = "MIT"
+__date__ = "19/10/2026"
+
+
+import logging
+import unittest
+
+import numpy
+try:
+    import mako
+except ImportError:
+    mako = None
+from ..common import ocl
+if ocl:
+    from .. import reconstruction
+from silx.image.phantomgenerator import PhantomGenerator
+
+logger = logging.getLogger(__name__)
+
+
+@unittest.skipUnless(ocl and mako, "PyOpenCl is missing")
+class TestReconstruction(unittest.TestCase):
+
+    def setUp(self):
+        self.size = 64
+        self.image = PhantomGenerator.get2DPhantomSheppLogan(self.size).astype(numpy.float32)
+        self.sino_shape = (90, self.size)
+        self.sirt = reconstruction.SIRT(self.sino_shape)
+        if self.sirt.backprojector.compiletime_workgroup_size < 16 * 16:
+            self.skipTest("Current implementation of OpenCL backprojection is not supported on this platform yet")
+        self.sino = self.sirt.projector.projection(self.image)
+
+    def tearDown(self):
+        self.sirt = None
+
+    def test_sirt_early_stopping(self):
+        """SIRT residuals decrease and iterations stop at tolerance"""
+        self.sirt.run(self.sino, 50)
+        self.assertEqual(self.sirt.history, [])
+        self.sirt.run(self.sino, 50, history=True)
+        residuals = self.sirt.history
+        self.assertEqual(len(residuals), 50)
+        self.assertTrue(numpy.all(numpy.diff(residuals) <= 1e-3 * residuals[0]))
+
+        self.sirt.run(self.sino, 500, tol=1e-2)
+        self.assertLess(len(self.sirt.history), 500)
+
+    def test_sirt_warm_start(self):
+        """Starting from FBP gives a lower initial residual"""
+        self.sirt.run(self.sino, 2, history=True)
+        cold = self.sirt.history[0]
+        self.sirt.run(self.sino, 2, x0="fbp", history=True)
+        self.assertLess(self.sirt.history[0], cold)
+
+    def test_tv(self):
+        tv = reconstruction.TV(self.sino_shape)
+        tv.run(self.sino, 100, 1e-2, tol=1e-4)
+        self.assertLessEqual(len(tv.history), 100)
+        self.assertLess(tv.history[-1], tv.history[0])
+
+    def test_slices(self):
+        """Reconstruction of a stack is the same as slice by slice"""
+        sinos = numpy.array([self.sino, 2 * self.sino, self.sino[:, ::-1]])
+        expected = []
+        for sino in sinos:
+            expected.append(self.sirt.run(sino, 10, x0="fbp").get())
+        expected = numpy.array(expected)
+        result = self.sirt.reconstruct_slices(sinos, 10, x0="fbp", batch_size=2)
+        self.assertEqual(len(self.sirt.slices_history), 3)
+        self.assertLess(numpy.abs(result - expected).max(), 1e-3 * numpy.abs(expected).max())
+
+        # Initial slices given as an array
+        self.sirt.run(sinos[0], 1, history=True)
+        cold = self.sirt.history[0]
+        self.sirt.reconstruct_slices(sinos, 1, x0=expected, history=True)
+        self.assertLess(self.sirt.slices_history[0][0], cold)
+        self.assertRaises(ValueError, self.sirt.reconstruct_slices, sinos, 1, x0=expected[:2])
+        self.assertRaises(ValueError, self.sirt.reconstruct_slices, sinos, 1, x0="zeros")
+
+
+def suite():
+    testSuite = unittest.TestSuite()
+    testSuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestReconstruction))
+    return testSuite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest="suite")